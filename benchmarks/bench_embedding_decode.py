@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark decoding embedding responses: JSON floats against base64 into NumPy.
+
+Each mode runs in its own process and decodes the same embeddings, one
+API-sized response (64 vectors) at a time: "float" parses JSON floats into
+Python lists (the previous behaviour of OpenAIClient.embed), "base64"
+decodes base64 strings into a preallocated float32 matrix (the current
+one). Reports decode time and the peak RSS added by decoding.
+
+    python benchmarks/bench_embedding_decode.py --texts 20000 --dim 1536
+"""
+
+import argparse
+import base64
+import json
+import resource
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from vector_chat.clients import decode_embedding
+
+MODES = ("float", "base64")
+RESPONSE_SIZE = 64
+
+
+def peak_rss_mb() -> float:
+    """
+    Get the peak resident set size of this process.
+
+    Returns:
+        Peak RSS in MiB
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def build_responses(mode: str, texts: int, dim: int) -> List[bytes]:
+    """
+    Build the raw embeddings response bodies the API would send.
+
+    Args:
+        mode: "float" or "base64"
+        texts: Total number of embeddings
+        dim: Vector dimension
+
+    Returns:
+        One JSON body per response
+    """
+    rng = np.random.default_rng(0)
+    bodies = []
+    for start in range(0, texts, RESPONSE_SIZE):
+        count = min(RESPONSE_SIZE, texts - start)
+        matrix = rng.standard_normal((count, dim)).astype(np.float32)
+        if mode == "float":
+            embeddings = matrix.tolist()
+        else:
+            embeddings = [base64.b64encode(row.tobytes()).decode() for row in matrix]
+        data = [
+            {"object": "embedding", "index": i, "embedding": embedding}
+            for i, embedding in enumerate(embeddings)
+        ]
+        bodies.append(json.dumps({"object": "list", "data": data}).encode())
+    return bodies
+
+
+def decode(mode: str, bodies: List[bytes], texts: int, dim: int) -> object:
+    """
+    Decode all responses the way OpenAIClient.embed does in each mode.
+
+    Args:
+        mode: "float" or "base64"
+        bodies: Response bodies
+        texts: Total number of embeddings
+        dim: Vector dimension
+
+    Returns:
+        The decoded vectors (list of lists or matrix)
+    """
+    if mode == "float":
+        vectors: List[List[float]] = []
+        for body in bodies:
+            vectors.extend(item["embedding"] for item in json.loads(body)["data"])
+        return vectors
+
+    matrix = np.empty((texts, dim), dtype=np.float32)
+    row = 0
+    for body in bodies:
+        for item in json.loads(body)["data"]:
+            matrix[row] = decode_embedding(item["embedding"])
+            row += 1
+    return matrix
+
+
+def run_child(mode: str, texts: int, dim: int) -> Dict[str, float]:
+    """
+    Measure one mode in the current process.
+
+    Args:
+        mode: "float" or "base64"
+        texts: Total number of embeddings
+        dim: Vector dimension
+
+    Returns:
+        Dictionary of measurements
+    """
+    bodies = build_responses(mode, texts, dim)
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    vectors = decode(mode, bodies, texts, dim)
+    elapsed = time.perf_counter() - started
+    assert len(vectors) == texts
+    return {
+        "mode": mode,
+        "decode_s": elapsed,
+        "rss_added_mb": peak_rss_mb() - baseline,
+        "wire_mb": sum(len(body) for body in bodies) / (1024 * 1024),
+    }
+
+
+def main() -> int:
+    """
+    Run each mode in a fresh process and print a comparison table.
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--texts", type=int, default=20000, help="Embeddings")
+    parser.add_argument("--dim", type=int, default=1536, help="Vector dimension")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.texts, args.dim)))
+        return 0
+
+    print(f"{args.texts} embeddings of dimension {args.dim}")
+    print(f"{'mode':<8}{'decode':>10}{'rss added':>12}{'on wire':>11}")
+    for mode in MODES:
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--child",
+                mode,
+                "--texts",
+                str(args.texts),
+                "--dim",
+                str(args.dim),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output)
+        print(
+            f"{mode:<8}{result['decode_s']:>9.2f}s"
+            f"{result['rss_added_mb']:>9.0f}MiB"
+            f"{result['wire_mb']:>8.0f}MiB"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
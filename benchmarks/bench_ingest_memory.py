@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory of the ingest path: chunk dictionaries against ChunkBatch.
+
+Each mode runs in its own process over the same synthetic chunks, with a
+stub embedder and no Qdrant server. "dicts" mirrors the previous
+embed_text (chunk dictionaries, a text list, payload dictionaries, their
+deepcopy and a PointStruct per point); "columns" runs the current one (a
+ChunkBatch, payloads built per upsert batch, one columnar models.Batch).
+Reports the memory held by the chunks before embedding, and the peak of the
+whole run, as traced by tracemalloc. Vectors are the same matrix in both
+modes, so a small dimension keeps the (slow) traced run short.
+
+    python benchmarks/bench_ingest_memory.py --chunks 200000 --dim 32
+"""
+
+import argparse
+import copy
+import json
+import random
+import subprocess
+import sys
+import tracemalloc
+from typing import Dict, List
+
+import numpy as np
+from qdrant_client.http import models
+
+from vector_chat.services.chunker import ChunkBatch, make_chunk_id
+
+MODES = ("dicts", "columns")
+SOURCE = "corpus/large_document.txt"
+WORDS = (
+    "vector search chunk embedding payload memory index query model context "
+    "answer latency token batch collection source point score sentence text"
+).split()
+
+
+def make_texts(count: int, words_per_chunk: int) -> List[str]:
+    """
+    Build deterministic chunk texts.
+
+    Args:
+        count: Number of chunks
+        words_per_chunk: Words in each chunk
+
+    Returns:
+        Chunk texts
+    """
+    rng = random.Random(0)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(words_per_chunk)) + "."
+        for _ in range(count)
+    ]
+
+
+def embed(texts: List[str], dim: int) -> np.ndarray:
+    """
+    Stand-in embedder returning a float32 matrix.
+
+    Args:
+        texts: Texts to embed
+        dim: Vector dimension
+
+    Returns:
+        Matrix of shape (len(texts), dim)
+    """
+    return np.ones((len(texts), dim), dtype=np.float32)
+
+
+def ingest_dicts(texts: List[str], dim: int, batch_size: int) -> float:
+    """
+    Ingest the way embed_text did with chunk dictionaries.
+
+    Args:
+        texts: Chunk texts
+        dim: Vector dimension
+        batch_size: Chunks per upsert
+
+    Returns:
+        Memory held by the chunks before embedding, in MiB
+    """
+    chunks_data = [
+        {
+            "chunk_text": text,
+            "source": SOURCE,
+            "chunk_index": i,
+            "total_chunks": len(texts),
+        }
+        for i, text in enumerate(texts)
+    ]
+    chunks = [item["chunk_text"] for item in chunks_data]
+    ids = [
+        make_chunk_id(chunk["source"], chunk["chunk_index"]) for chunk in chunks_data
+    ]
+    held = tracemalloc.get_traced_memory()[0] / (1024 * 1024)
+
+    for start in range(0, len(chunks), batch_size):
+        end = start + batch_size
+        vectors = embed(chunks[start:end], dim)
+        payloads = [
+            {
+                "chunk_text": chunk["chunk_text"],
+                "source": chunk["source"],
+                "model_name": "bench",
+                "chunk_index": chunk["chunk_index"],
+                "total_chunks": chunk["total_chunks"],
+            }
+            for chunk in chunks_data[start:end]
+        ]
+        copied = copy.deepcopy(payloads)
+        points = [
+            models.PointStruct(id=ids[start + i], vector=vec, payload=copied[i])
+            for i, vec in enumerate(vectors)
+        ]
+        del points
+    return held
+
+
+def ingest_columns(texts: List[str], dim: int, batch_size: int) -> float:
+    """
+    Ingest the way embed_text does with a ChunkBatch.
+
+    Args:
+        texts: Chunk texts
+        dim: Vector dimension
+        batch_size: Chunks per upsert
+
+    Returns:
+        Memory held by the chunks before embedding, in MiB
+    """
+    chunk_batch = ChunkBatch.from_texts(texts, SOURCE)
+    held = tracemalloc.get_traced_memory()[0] / (1024 * 1024)
+
+    for start in range(0, len(chunk_batch), batch_size):
+        part = chunk_batch.slice(start, start + batch_size)
+        part.vectors = embed(part.texts, dim)
+        batch = models.Batch(
+            ids=part.ids, vectors=part.vectors, payloads=part.payloads("bench")
+        )
+        del batch
+    return held
+
+
+def run_child(mode: str, chunks: int, dim: int, batch_size: int) -> Dict[str, float]:
+    """
+    Measure one mode in the current process.
+
+    Args:
+        mode: "dicts" or "columns"
+        chunks: Number of chunks
+        dim: Vector dimension
+        batch_size: Chunks per upsert
+
+    Returns:
+        Dictionary of measurements
+    """
+    texts = make_texts(chunks, 40)
+    ingest = ingest_dicts if mode == "dicts" else ingest_columns
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0] / (1024 * 1024)
+    held = ingest(texts, dim, batch_size)
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return {
+        "mode": mode,
+        "held_mb": held - baseline,
+        "peak_mb": peak - baseline,
+    }
+
+
+def main() -> int:
+    """
+    Run each mode in a fresh process and print a comparison table.
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--chunks", type=int, default=200000, help="Chunks")
+    parser.add_argument("--dim", type=int, default=32, help="Vector dimension")
+    parser.add_argument("--batch-size", type=int, default=256, help="Upsert batch")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_child(args.child, args.chunks, args.dim, args.batch_size)
+        print(json.dumps(result))
+        return 0
+
+    print(f"{args.chunks} chunks, dimension {args.dim}, batches of {args.batch_size}")
+    print(f"{'mode':<9}{'held':>10}{'peak':>10}")
+    for mode in MODES:
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--child",
+                mode,
+                "--chunks",
+                str(args.chunks),
+                "--dim",
+                str(args.dim),
+                "--batch-size",
+                str(args.batch_size),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<9}{result['held_mb']:>7.0f}MiB{result['peak_mb']:>7.0f}MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
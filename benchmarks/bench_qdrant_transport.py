@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark REST and gRPC transports for Qdrant search and upsert.
+
+Requires a running Qdrant server exposing both the REST (6333) and gRPC
+(6334) ports, for example:
+
+    docker run -p 6333:6333 -p 6334:6334 qdrant/qdrant
+    python benchmarks/bench_qdrant_transport.py --points 5000 --queries 500
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from vector_chat.config import QDRANT_URL
+from vector_chat.services.qdrant_service import (
+    QdrantService,
+    close_qdrant_clients,
+    get_qdrant_client,
+)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Return the given percentile of a list of samples.
+
+    Args:
+        samples: Latency samples
+        pct: Percentile in [0, 100]
+
+    Returns:
+        Percentile value
+    """
+    return float(np.percentile(np.asarray(samples), pct))
+
+
+def run_transport(
+    prefer_grpc: bool,
+    url: str,
+    dim: int,
+    points: int,
+    batch_size: int,
+    queries: int,
+    top_k: int,
+) -> Dict[str, List[float]]:
+    """
+    Time upserts and searches against a scratch collection.
+
+    Args:
+        prefer_grpc: Whether to use gRPC
+        url: Qdrant URL
+        dim: Vector dimension
+        points: Number of points to upsert
+        batch_size: Points per upsert call
+        queries: Number of search queries
+        top_k: Results per query
+
+    Returns:
+        Dictionary of latency samples in milliseconds per operation
+    """
+    rng = np.random.default_rng(42)
+    collection = f"bench_transport_{'grpc' if prefer_grpc else 'rest'}"
+    client = get_qdrant_client(url=url, prefer_grpc=prefer_grpc)
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+
+    service = QdrantService(collection_name=collection, vector_size=dim, client=client)
+
+    timings: Dict[str, List[float]] = {"upsert": [], "search": []}
+    try:
+        vectors = rng.standard_normal((points, dim)).astype(np.float32)
+        for start in range(0, points, batch_size):
+            ids = list(range(start + 1, min(start + batch_size, points) + 1))
+            batch = vectors[start : start + batch_size].tolist()
+            payloads = [{"chunk_text": f"chunk {i}"} for i in ids]
+            t0 = time.perf_counter()
+            service.upsert(ids, batch, payloads)
+            timings["upsert"].append((time.perf_counter() - t0) * 1000)
+
+        query_vectors = rng.standard_normal((queries, dim)).astype(np.float32)
+        for q in query_vectors:
+            t0 = time.perf_counter()
+            service.search(q.tolist(), top_k=top_k, score_threshold=0.0)
+            timings["search"].append((time.perf_counter() - t0) * 1000)
+    finally:
+        client.delete_collection(collection)
+
+    return timings
+
+
+def main() -> int:
+    """
+    Run the transport benchmark and print a latency table.
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", default=QDRANT_URL, help="Qdrant URL")
+    parser.add_argument("--dim", type=int, default=1536, help="Vector dimension")
+    parser.add_argument("--points", type=int, default=5000, help="Points to upsert")
+    parser.add_argument("--batch-size", type=int, default=256, help="Upsert batch")
+    parser.add_argument("--queries", type=int, default=500, help="Search queries")
+    parser.add_argument("--top-k", type=int, default=5, help="Results per query")
+    args = parser.parse_args()
+
+    print(f"{'transport':<10}{'op':<8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for prefer_grpc in (False, True):
+        timings = run_transport(
+            prefer_grpc,
+            args.url,
+            args.dim,
+            args.points,
+            args.batch_size,
+            args.queries,
+            args.top_k,
+        )
+        name = "grpc" if prefer_grpc else "rest"
+        for op, samples in timings.items():
+            print(
+                f"{name:<10}{op:<8}"
+                f"{statistics.mean(samples):>9.2f}ms"
+                f"{percentile(samples, 50):>8.2f}ms"
+                f"{percentile(samples, 95):>8.2f}ms"
+                f"{percentile(samples, 99):>8.2f}ms"
+            )
+
+    close_qdrant_clients()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
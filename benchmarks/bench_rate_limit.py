@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark several processes sharing one OpenAI quota, with and without the limiter.
+
+Each process embeds one text per request through OpenAIClient and a fake
+embeddings API. The fake enforces the quota like the real API: a request
+finding the (server-side) RPM bucket empty fails with a 429-style error and
+is retried after a random backoff. In "limited" mode the processes share a
+RateLimiter, so they wait for quota instead of failing. Reports the
+throughput reached against the quota and the number of failed calls.
+
+    python benchmarks/bench_rate_limit.py --processes 4 --requests 100 --rpm 600
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+from vector_chat.clients import OpenAIClient
+from vector_chat.fakes import FakeAPIError, FakeOpenAI, LatencyModel
+from vector_chat.services.rate_limiter import RateLimiter
+
+MODES = ("unlimited", "limited")
+MODEL = "text-embedding-3-small"
+
+
+def run_child(
+    mode: str, rpm: float, requests: int, server_db: str, client_db: str
+) -> Dict[str, Any]:
+    """
+    Send requests from one process.
+
+    Args:
+        mode: "unlimited" or "limited"
+        rpm: Requests per minute of the quota
+        requests: Successful requests to make
+        server_db: Bucket database of the fake API's quota
+        client_db: Bucket database of the shared client-side limiter
+
+    Returns:
+        Dictionary with successful and failed calls
+    """
+    logging.disable(logging.CRITICAL)
+    server = RateLimiter(rpm=rpm, path=server_db)
+    fake = FakeOpenAI(dimension=8, embedding_latency=LatencyModel(0.05, 0.3))
+    create = fake.embeddings.create
+
+    def enforce_quota(**kwargs: Any) -> Any:
+        if server.try_acquire(MODEL, 0) > 0:
+            raise FakeAPIError("Too Many Requests", status_code=429)
+        return create(**kwargs)
+
+    fake.embeddings.create = enforce_quota
+    limiter = RateLimiter(rpm=rpm, path=client_db) if mode == "limited" else None
+    client = OpenAIClient(embedding_model=MODEL, client=fake, rate_limiter=limiter)
+
+    failed = 0
+    for i in range(requests):
+        while True:
+            try:
+                client.embed([f"text {os.getpid()} {i}"])
+                break
+            except FakeAPIError:
+                failed += 1
+                time.sleep(random.uniform(0.5, 1.0))
+    return {"ok": requests, "failed": failed}
+
+
+def main() -> int:
+    """
+    Run each mode with several concurrent processes and print a table.
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--processes", type=int, default=4, help="Processes")
+    parser.add_argument("--requests", type=int, default=100, help="Per process")
+    parser.add_argument("--rpm", type=float, default=600, help="Quota")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--server-db", help=argparse.SUPPRESS)
+    parser.add_argument("--client-db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_child(
+            args.child, args.rpm, args.requests, args.server_db, args.client_db
+        )
+        print(json.dumps(result))
+        return 0
+
+    print(
+        f"{args.processes} processes x {args.requests} requests, "
+        f"quota {args.rpm:g} requests/minute"
+    )
+    print(f"{'mode':<11}{'time':>8}{'req/min':>10}{'of quota':>10}{'failed':>8}")
+    for mode in MODES:
+        with tempfile.TemporaryDirectory() as tmp:
+            command = [
+                sys.executable,
+                __file__,
+                "--child",
+                mode,
+                "--rpm",
+                str(args.rpm),
+                "--requests",
+                str(args.requests),
+                "--server-db",
+                os.path.join(tmp, "server.db"),
+                "--client-db",
+                os.path.join(tmp, "client.db"),
+            ]
+            start = time.perf_counter()
+            children = [
+                subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+                for _ in range(args.processes)
+            ]
+            results = [
+                json.loads(child.communicate()[0].strip().splitlines()[-1])
+                for child in children
+            ]
+            elapsed = time.perf_counter() - start
+        ok = sum(result["ok"] for result in results)
+        failed = sum(result["failed"] for result in results)
+        rate = ok / elapsed * 60
+        print(
+            f"{mode:<11}{elapsed:>7.1f}s{rate:>10.0f}{rate / args.rpm:>9.0%}"
+            f"{failed:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
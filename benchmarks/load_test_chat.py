@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Load-test the chat pipeline with concurrent simulated sessions.
+
+Each request runs the real retrieval and prompt assembly (get_context and
+a streamed response) against local stand-ins: a fake LLM with log-normal
+time-to-first-token and per-token delays, and an in-memory Qdrant seeded
+from a text corpus. No API key or server is needed.
+
+    python benchmarks/load_test_chat.py --concurrency 1 4 16 64 --requests 400
+    python benchmarks/load_test_chat.py --qps 20 50 --duration 30
+    python benchmarks/load_test_chat.py --concurrency 64 --batch-queries
+"""
+
+import argparse
+import itertools
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from vector_chat.cli.chat import get_context
+from vector_chat.clients import OpenAIClient
+from vector_chat.config import DEFAULT_CONTEXT_TOKENS, DEFAULT_EMBEDDING_MODEL
+from vector_chat.fakes import (
+    FakeChatCompletions,
+    FakeOpenAI,
+    InMemoryQdrant,
+    LatencyModel,
+)
+from vector_chat.services.chunker import chunk_text
+from vector_chat.services.query_batcher import QueryBatcher
+
+SYSTEM_PROMPT = (
+    "You are a helpful assistant that can answer questions based on provided "
+    "context or general knowledge."
+)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Return the given percentile of a list of samples.
+
+    Args:
+        samples: Latency samples
+        pct: Percentile in [0, 100]
+
+    Returns:
+        Percentile value, or NaN without samples
+    """
+    if not samples:
+        return float("nan")
+    return float(np.percentile(np.asarray(samples), pct))
+
+
+def build_index(
+    corpus_path: str, openai_client: OpenAIClient, search_latency: LatencyModel
+) -> InMemoryQdrant:
+    """
+    Chunk and embed a corpus into an in-memory collection.
+
+    Args:
+        corpus_path: Path to a text file
+        openai_client: Client used for embeddings
+        search_latency: Delay of each search
+
+    Returns:
+        Seeded in-memory collection
+    """
+    with open(corpus_path, "r", encoding="utf-8") as f:
+        chunks = chunk_text(f.read(), 5, corpus_path)
+    index = InMemoryQdrant(latency=search_latency)
+    index.upsert(
+        list(range(len(chunks))),
+        openai_client.embed([chunk["chunk_text"] for chunk in chunks]),
+        chunks,
+    )
+    return index
+
+
+def load_questions(path: Optional[str], corpus_path: str) -> List[str]:
+    """
+    Load the question set, or derive questions from the corpus.
+
+    Args:
+        path: File with one question per line, or None
+        corpus_path: Corpus to take sentences from when no file is given
+
+    Returns:
+        List of questions
+    """
+    source = path or corpus_path
+    with open(source, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    if path:
+        return lines
+    return [f"What does this mean: {line[:120]}?" for line in lines]
+
+
+class LoadTest:
+    """
+    Runs chat requests against the stand-ins and collects their timings.
+    """
+
+    def __init__(self, args: argparse.Namespace):
+        """
+        Set up the stand-ins.
+
+        Args:
+            args: Command-line arguments
+        """
+        self.args = args
+        self.fake = FakeOpenAI(
+            chat_completions=FakeChatCompletions(
+                first_token_latency=LatencyModel(
+                    args.ttft_ms / 1000, args.sigma, seed=1
+                ),
+                token_interval=args.token_ms / 1000,
+                answer_tokens=args.answer_tokens,
+                error_rate=args.error_rate,
+                seed=2,
+            ),
+            embedding_latency=LatencyModel(args.embed_ms / 1000, args.sigma, seed=3),
+        )
+        seed_client = OpenAIClient(
+            embedding_model=DEFAULT_EMBEDDING_MODEL, client=self.fake
+        )
+        self.index = build_index(
+            args.corpus,
+            seed_client,
+            LatencyModel(args.search_ms / 1000, args.sigma, seed=4),
+        )
+        self.questions = load_questions(args.questions, args.corpus)
+        # Shared by all sessions, like in a server process
+        self.batcher = (
+            QueryBatcher(
+                seed_client.embed,
+                window_ms=args.batch_window_ms,
+                max_batch_size=args.batch_size,
+            )
+            if args.batch_queries
+            else None
+        )
+
+    def run_request(self, question: str) -> Dict[str, Any]:
+        """
+        Run one chat turn: retrieval, then a streamed response.
+
+        Args:
+            question: User question
+
+        Returns:
+            Dictionary with latency, ttft (seconds) and error
+        """
+        client = OpenAIClient(client=self.fake, query_batcher=self.batcher)
+        client.add_system_message(SYSTEM_PROMPT)
+        client.add_user_message(question)
+
+        start = time.perf_counter()
+        ttft = None
+        try:
+            _, context = get_context(
+                question,
+                client,
+                self.index,
+                top_k=self.args.top_k,
+                score_threshold=0.0,
+                max_context_tokens=self.args.context_tokens,
+            )
+            for _ in client.stream_response(context=context):
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+            return {
+                "latency": time.perf_counter() - start,
+                "ttft": ttft,
+                "error": None,
+            }
+        except Exception as e:
+            return {"latency": time.perf_counter() - start, "ttft": ttft, "error": e}
+
+    def run_concurrency(self, concurrency: int) -> Dict[str, Any]:
+        """
+        Run a fixed number of requests with a fixed number of sessions.
+
+        Args:
+            concurrency: Number of concurrent sessions
+
+        Returns:
+            Results and wall time of the run
+        """
+        questions = itertools.islice(
+            itertools.cycle(self.questions), self.args.requests
+        )
+        embed_calls = self.fake.embeddings.calls
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(self.run_request, questions))
+        return {
+            "results": results,
+            "elapsed": time.perf_counter() - start,
+            "embed_calls": self.fake.embeddings.calls - embed_calls,
+        }
+
+    def run_qps(self, qps: float) -> Dict[str, Any]:
+        """
+        Send requests at a target rate, whatever the response times.
+
+        Args:
+            qps: Target requests per second
+
+        Returns:
+            Results and wall time of the run
+        """
+        total = int(qps * self.args.duration)
+        questions = itertools.cycle(self.questions)
+        futures = []
+        embed_calls = self.fake.embeddings.calls
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.max_workers) as executor:
+            for i in range(total):
+                delay = start + i / qps - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(executor.submit(self.run_request, next(questions)))
+            results = [future.result() for future in futures]
+        return {
+            "results": results,
+            "elapsed": time.perf_counter() - start,
+            "embed_calls": self.fake.embeddings.calls - embed_calls,
+        }
+
+
+def report_row(label: str, run: Dict[str, Any]) -> str:
+    """
+    Format the statistics of one run as a table row.
+
+    Args:
+        label: Load level of the run
+        run: Results and wall time of the run
+
+    Returns:
+        Table row
+    """
+    results = run["results"]
+    ok = [r for r in results if r["error"] is None]
+    latencies = [r["latency"] * 1000 for r in ok]
+    ttfts = [r["ttft"] * 1000 for r in ok if r["ttft"] is not None]
+    error_rate = 100 * (len(results) - len(ok)) / max(1, len(results))
+    return (
+        f"{label:<12}{len(ok) / run['elapsed']:>10.1f}"
+        f"{percentile(latencies, 50):>9.0f}ms{percentile(latencies, 95):>9.0f}ms"
+        f"{percentile(latencies, 99):>9.0f}ms"
+        f"{percentile(ttfts, 50):>9.0f}ms{percentile(ttfts, 99):>9.0f}ms"
+        f"{error_rate:>8.1f}%"
+        f"{len(results) / max(1, run['embed_calls']):>10.1f}"
+    )
+
+
+def main() -> int:
+    """
+    Run the load test and print one row per load level.
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument(
+        "--concurrency", type=int, nargs="+", help="Concurrent sessions per run"
+    )
+    load.add_argument("--qps", type=float, nargs="+", help="Target rates per run")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per run")
+    parser.add_argument(
+        "--duration", type=float, default=20, help="Seconds per rate in --qps mode"
+    )
+    parser.add_argument(
+        "--max-workers", type=int, default=256, help="Thread cap in --qps mode"
+    )
+    parser.add_argument("--corpus", default="data/demo.txt", help="Text to index")
+    parser.add_argument("--questions", help="File with one question per line")
+    parser.add_argument("--top-k", type=int, default=3, help="Context chunks")
+    parser.add_argument(
+        "--context-tokens",
+        type=int,
+        default=DEFAULT_CONTEXT_TOKENS,
+        help="Context token budget",
+    )
+    parser.add_argument("--ttft-ms", type=float, default=400, help="Median TTFT")
+    parser.add_argument("--token-ms", type=float, default=20, help="Per-token delay")
+    parser.add_argument("--answer-tokens", type=int, default=150, help="Answer size")
+    parser.add_argument("--embed-ms", type=float, default=80, help="Median embed")
+    parser.add_argument("--search-ms", type=float, default=5, help="Median search")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Latency spread")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="LLM failures")
+    parser.add_argument(
+        "--batch-queries",
+        action="store_true",
+        help="Embed the sessions' queries through one shared QueryBatcher",
+    )
+    parser.add_argument(
+        "--batch-window-ms", type=float, default=5, help="Batching window"
+    )
+    parser.add_argument("--batch-size", type=int, default=64, help="Max batch size")
+    args = parser.parse_args()
+
+    # Per-request logging would dominate the measurements; errors are counted
+    logging.disable(logging.ERROR)
+
+    test = LoadTest(args)
+    print(
+        f"{'load':<12}{'req/s':>10}{'p50':>11}{'p95':>11}{'p99':>11}"
+        f"{'ttft p50':>11}{'ttft p99':>11}{'errors':>9}{'q/embed':>10}"
+    )
+    if args.qps:
+        for qps in args.qps:
+            print(report_row(f"{qps:g} qps", test.run_qps(qps)))
+    else:
+        for concurrency in args.concurrency or [1, 4, 16, 64]:
+            print(report_row(f"{concurrency} conc", test.run_concurrency(concurrency)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,8 +16,10 @@ setup(
         "openai>=1.0.0",
         "python-dotenv>=1.0.0",
         "qdrant-client>=1.6.0",
+        "httpx>=0.20.0",
         "nltk>=3.8.1",
         "requests>=2.31.0",
+        "numpy>=1.20.0",
     ],
     entry_points={
         "console_scripts": [
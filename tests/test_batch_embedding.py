@@ -0,0 +1,196 @@
+"""
+Tests for the batch_embedding module.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from vector_chat.cli.embed import import_batch_results
+from vector_chat.cli.embed import main as embed_main
+from vector_chat.fakes import FakeOpenAI, fake_embedding
+from vector_chat.services.batch_embedding import (
+    BATCH_IDS_FILE,
+    find_result_files,
+    load_batch_payloads,
+    read_batch_results,
+    submit_batch_files,
+    wait_for_batches,
+    write_batch_payloads,
+    write_batch_requests,
+)
+
+
+class TestBatchEmbedding(unittest.TestCase):
+    """Tests for the batch_embedding module."""
+
+    def setUp(self):
+        """Create a temporary batch directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.batch_dir = self.tmp.name
+
+    def tearDown(self):
+        """Remove the batch directory."""
+        self.tmp.cleanup()
+
+    def test_write_batch_requests(self):
+        """Test that requests are split into Batch-format files."""
+        paths = write_batch_requests(
+            ["a", "b", "c"], ["one", "two", "three"], "model", self.batch_dir, 2
+        )
+
+        self.assertEqual(len(paths), 2)
+        with open(paths[0], "r", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0]["custom_id"], "a")
+        self.assertEqual(lines[0]["url"], "/v1/embeddings")
+        self.assertEqual(lines[0]["body"], {"model": "model", "input": "one"})
+
+    def test_payloads_round_trip(self):
+        """Test writing and loading chunk payloads."""
+        write_batch_payloads(["a", "b"], [{"x": 1}, {"x": 2}], self.batch_dir)
+
+        self.assertEqual(
+            load_batch_payloads(self.batch_dir), {"a": {"x": 1}, "b": {"x": 2}}
+        )
+
+    def test_full_flow_with_local_endpoint(self):
+        """Test export, submit, poll and result parsing against the stand-in."""
+        client = FakeOpenAI(dimension=8, polls_until_complete=2)
+        paths = write_batch_requests(
+            ["a", "b", "c"], ["one", "two", "three"], "model", self.batch_dir, 2
+        )
+
+        batch_ids = submit_batch_files(client, paths)
+        result_paths = wait_for_batches(
+            client, batch_ids, self.batch_dir, poll_interval=0
+        )
+        results = dict(read_batch_results(result_paths))
+
+        self.assertEqual(len(batch_ids), 2)
+        self.assertEqual(sorted(result_paths), find_result_files(self.batch_dir))
+        self.assertEqual(set(results), {"a", "b", "c"})
+        self.assertEqual(results["b"], fake_embedding("two", 8))
+
+    def test_failed_requests_are_skipped(self):
+        """Test that errored result lines are not returned."""
+        path = os.path.join(self.batch_dir, "results_x.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(
+                json.dumps(
+                    {
+                        "custom_id": "a",
+                        "response": {"status_code": 400, "body": {}},
+                        "error": None,
+                    }
+                )
+                + "\n"
+            )
+            f.write(
+                json.dumps(
+                    {
+                        "custom_id": "b",
+                        "response": {
+                            "status_code": 200,
+                            "body": {"data": [{"embedding": [0.5]}]},
+                        },
+                        "error": None,
+                    }
+                )
+                + "\n"
+            )
+
+        failed = []
+        self.assertEqual(list(read_batch_results([path], failed)), [("b", [0.5])])
+        self.assertEqual(failed, ["a"])
+
+    def test_cli_rejects_unusable_modes(self):
+        """Test that batch modes that cannot work are rejected up front."""
+        with self.assertLogs("vector_chat.cli.embed", level="ERROR") as logs:
+            code = embed_main(["--batch-api", "--batch-mode", "import"])
+        self.assertEqual(code, 1)
+        self.assertIn("--batch-dir", logs.output[0])
+
+        for mode in ("submit", "import"):
+            with self.assertLogs("vector_chat.cli.embed", level="ERROR") as logs:
+                code = embed_main(
+                    [
+                        "--batch-api",
+                        "--local-batch",
+                        "--batch-mode",
+                        mode,
+                        "--batch-dir",
+                        self.batch_dir,
+                        "--text",
+                        "One.",
+                    ]
+                )
+            self.assertEqual(code, 1)
+            self.assertIn("--local-batch", logs.output[0])
+        self.assertEqual(os.listdir(self.batch_dir), [])
+
+    def test_wait_for_batches_timeout(self):
+        """Test that waiting gives up after the timeout."""
+        client = FakeOpenAI(dimension=8, polls_until_complete=100)
+        paths = write_batch_requests(["a"], ["one"], "model", self.batch_dir)
+        batch_ids = submit_batch_files(client, paths)
+
+        with self.assertRaises(TimeoutError):
+            wait_for_batches(
+                client, batch_ids, self.batch_dir, poll_interval=0, timeout=0
+            )
+
+    @patch("vector_chat.cli.embed.QdrantService")
+    def test_import_waits_for_every_pending_batch(self, mock_qdrant):
+        """Test that batches without a result file are still waited for."""
+        client = FakeOpenAI(dimension=8)
+        paths = write_batch_requests(
+            ["a", "b", "c"], ["one", "two", "three"], "model", self.batch_dir, 2
+        )
+        batch_ids = submit_batch_files(client, paths)
+        with open(os.path.join(self.batch_dir, BATCH_IDS_FILE), "w") as f:
+            json.dump(batch_ids, f)
+        # Only the first batch was downloaded before
+        wait_for_batches(client, batch_ids[:1], self.batch_dir, poll_interval=0)
+
+        openai_client = SimpleNamespace(client=client)
+        self.assertTrue(
+            import_batch_results(
+                self.batch_dir, "docs", openai_client=openai_client, poll_interval=0
+            )
+        )
+
+        upserted = [
+            i
+            for call in mock_qdrant.return_value.upsert.call_args_list
+            for i in call[0][0]
+        ]
+        self.assertEqual(sorted(upserted), ["a", "b", "c"])
+
+    @patch("vector_chat.cli.embed.QdrantService")
+    def test_import_reports_failed_batches(self, mock_qdrant):
+        """Test that results are loaded but the import fails if a batch failed."""
+        client = FakeOpenAI(dimension=8)
+        paths = write_batch_requests(
+            ["a", "b", "c"], ["one", "two", "three"], "model", self.batch_dir, 2
+        )
+        batch_ids = submit_batch_files(client, paths)
+        with open(os.path.join(self.batch_dir, BATCH_IDS_FILE), "w") as f:
+            json.dump(batch_ids, f)
+        client.batches._batches[batch_ids[1]]["status"] = "failed"
+
+        with self.assertLogs("vector_chat.cli.embed", level="ERROR") as logs:
+            success = import_batch_results(
+                self.batch_dir,
+                "docs",
+                openai_client=SimpleNamespace(client=client),
+                poll_interval=0,
+            )
+
+        self.assertFalse(success)
+        self.assertIn("1 batches and 0 requests failed", logs.output[-1])
+        mock_qdrant.return_value.upsert.assert_called_once()
@@ -8,16 +8,21 @@ import unittest
 from typing import List
 from unittest.mock import mock_open, patch
 
+import numpy as np
 import pytest
 
+from vector_chat.cli.embed import embed_text
 from vector_chat.config import DEFAULT_MAX_SENTENCES_PER_CHUNK
 from vector_chat.services.chunker import (
+    ChunkBatch,
     chunk_by_sentences,
     chunk_text,
     list_text_files,
+    make_chunk_id,
     process_file,
     read_file_content,
 )
+from vector_chat.services.text_store import ChunkTextStore
 
 
 class TestChunker(unittest.TestCase):
@@ -88,6 +93,12 @@ class TestChunker(unittest.TestCase):
         self.assertEqual(chunks[1]["chunk_index"], 1)
         self.assertEqual(chunks[1]["total_chunks"], 2)
 
+    def test_make_chunk_id(self):
+        """Test that chunk IDs are stable and unique per position."""
+        self.assertEqual(make_chunk_id("doc.txt", 0), make_chunk_id("doc.txt", 0))
+        self.assertNotEqual(make_chunk_id("doc.txt", 0), make_chunk_id("doc.txt", 1))
+        self.assertNotEqual(make_chunk_id("doc.txt", 0), make_chunk_id("other.txt", 0))
+
     @patch("os.listdir")
     @patch("os.path.isfile")
     def test_list_text_files(self, mock_isfile, mock_listdir):
@@ -183,3 +194,68 @@ class TestChunker(unittest.TestCase):
 
         # Should return empty list
         self.assertEqual(chunks, [])
+
+
+class TestChunkBatch(unittest.TestCase):
+    """Tests for the columnar chunk batch."""
+
+    def setUp(self):
+        """Set up a batch of four chunks."""
+        self.batch = ChunkBatch.from_texts(["A.", "B.", "C.", "D."], "doc.txt")
+
+    def test_columns_and_payloads(self):
+        """Test that columns match the chunk dictionaries of chunk_text."""
+        self.assertEqual(len(self.batch), 4)
+        self.assertEqual(self.batch.ids[2], make_chunk_id("doc.txt", 2))
+        self.assertEqual(
+            self.batch.payloads("m")[1],
+            {
+                "chunk_text": "B.",
+                "source": "doc.txt",
+                "model_name": "m",
+                "chunk_index": 1,
+                "total_chunks": 4,
+            },
+        )
+        self.assertNotIn("chunk_text", self.batch.payloads("m", with_text=False)[0])
+
+    def test_select_and_slice(self):
+        """Test that subsets keep their positions, IDs and vector rows."""
+        self.batch.vectors = np.arange(8, dtype=np.float32).reshape(4, 2)
+
+        selected = self.batch.select([1, 3])
+        part = self.batch.slice(2, 10)
+
+        self.assertEqual(selected.texts, ["B.", "D."])
+        self.assertEqual(selected.chunk_index.tolist(), [1, 3])
+        self.assertEqual(selected.ids, [self.batch.ids[1], self.batch.ids[3]])
+        self.assertEqual(selected.vectors.tolist(), [[2, 3], [6, 7]])
+        self.assertEqual(part.texts, ["C.", "D."])
+        self.assertTrue(np.shares_memory(part.vectors, self.batch.vectors))
+
+    @patch("vector_chat.cli.embed.QdrantService")
+    def test_embed_text_upserts_columns(self, mock_qdrant):
+        """Test that a batch flows from chunks to columnar upserts."""
+        store = ChunkTextStore(":memory:")
+
+        ok = embed_text(
+            text="",
+            source_name="doc.txt",
+            model_name="local-hash",
+            collection_name="docs",
+            max_sentences=1,
+            batch_size=3,
+            text_store=store,
+            chunk_batch=self.batch,
+        )
+
+        self.assertTrue(ok)
+        calls = mock_qdrant.return_value.upsert_batch.call_args_list
+        self.assertEqual(len(calls), 2)
+        ids, vectors, payloads = calls[1].args
+        self.assertEqual(ids, self.batch.ids[3:])
+        self.assertEqual(vectors.shape, (1, 384))
+        self.assertEqual(payloads[0]["chunk_index"], 3)
+        self.assertNotIn("chunk_text", payloads[0])
+        self.assertEqual(store.get_many("docs", ids), {ids[0]: "D."})
+        store.close()
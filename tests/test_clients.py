@@ -2,13 +2,16 @@
 Tests for the OpenAIClient class.
 """
 
+import base64
 import unittest
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 
 from vector_chat.clients import OpenAIClient
 from vector_chat.config import DEFAULT_CHAT_MODEL, DEFAULT_EMBEDDING_MODEL
+from vector_chat.fakes import FakeOpenAI, InMemoryQdrant, fake_embedding
 
 
 class TestOpenAIClient(unittest.TestCase):
@@ -161,9 +164,11 @@ class TestOpenAIClient(unittest.TestCase):
         mock_client = MagicMock()
         mock_embedding = MagicMock()
         mock_data1 = MagicMock()
-        mock_data1.embedding = [0.1, 0.2]
+        mock_data1.embedding = base64.b64encode(
+            np.array([0.1, 0.2], dtype="<f4").tobytes()
+        ).decode()
         mock_data2 = MagicMock()
-        mock_data2.embedding = [0.3, 0.4]
+        mock_data2.embedding = [0.3, 0.4]  # Servers may ignore encoding_format
 
         mock_embedding.data = [mock_data1, mock_data2]
         mock_client.embeddings.create.return_value = mock_embedding
@@ -177,11 +182,13 @@ class TestOpenAIClient(unittest.TestCase):
             vectors = client.embed(["text1", "text2"])
 
             # Assert
-            self.assertEqual(vectors, [[0.1, 0.2], [0.3, 0.4]])
+            self.assertEqual(vectors.dtype, np.float32)
+            np.testing.assert_allclose(vectors, [[0.1, 0.2], [0.3, 0.4]], rtol=1e-6)
             mock_client.embeddings.create.assert_called_once()
             call_args = mock_client.embeddings.create.call_args[1]
             self.assertEqual(call_args["model"], DEFAULT_EMBEDDING_MODEL)
             self.assertEqual(call_args["input"], ["text1", "text2"])
+            self.assertEqual(call_args["encoding_format"], "base64")
 
     @patch("vector_chat.clients.OpenAI")
     def test_reset_conversation(self, mock_openai):
@@ -243,3 +250,78 @@ class TestOpenAIClient(unittest.TestCase):
             self.assertEqual(
                 client.conversation_history[-1]["content"], "Test response"
             )
+
+    def test_context_not_kept_in_history(self):
+        """Test that per-turn context is sent once, before the user message."""
+        fake = FakeOpenAI()
+        client = OpenAIClient(client=fake)
+        client.add_system_message("System prompt")
+        client.add_user_message("Question")
+
+        client.get_response(context="Context")
+
+        sent = fake.chat.completions.requests[0]
+        self.assertEqual(
+            [m["content"] for m in sent], ["System prompt", "Context", "Question"]
+        )
+        self.assertEqual(
+            [m["content"] for m in client.conversation_history],
+            ["System prompt", "Question", "You asked: Question"],
+        )
+
+    def test_prompt_prefix_is_stable(self):
+        """Test that each turn repeats the previous prompt as its prefix."""
+        fake = FakeOpenAI()
+        fake.chat.completions.cache_block_tokens = 1
+        client = OpenAIClient(client=fake)
+        client.add_system_message("You are a helpful assistant. " * 20)
+
+        for turn in range(3):
+            client.add_user_message(f"Question {turn}")
+            client.get_response(context=f"Context for turn {turn} " * 10)
+
+        first, second, third = fake.chat.completions.requests
+        # Everything before the new turn matches the earlier requests
+        self.assertEqual(second[0], first[0])
+        self.assertEqual(third[:3], second[:3])
+        self.assertEqual(third[:5], client.conversation_history[:5])
+        self.assertGreater(client.last_usage["cached_tokens"], 0)
+        self.assertLess(
+            client.last_usage["cached_tokens"], client.last_usage["prompt_tokens"]
+        )
+
+    def test_stream_response(self):
+        """Test streaming a response and recording it once consumed."""
+        client = OpenAIClient(client=FakeOpenAI())
+        client.add_user_message("Question")
+
+        pieces = list(client.stream_response(context="Context"))
+
+        self.assertEqual("".join(pieces), "You asked: Question")
+        self.assertGreater(len(pieces), 1)
+        self.assertEqual(
+            client.conversation_history[-1]["content"], "You asked: Question"
+        )
+        self.assertGreater(client.last_usage["completion_tokens"], 0)
+
+    def test_embed_base64_matrix(self):
+        """Test that base64 vectors of several API calls fill one float32 matrix."""
+        fake = FakeOpenAI()
+        client = OpenAIClient(client=fake)
+        texts = [f"text {i}" for i in range(70)]
+
+        vectors = client.embed(texts)
+
+        self.assertEqual(fake.embeddings.calls, 2)
+        self.assertEqual(vectors.shape, (70, client.embedding_dimension))
+        self.assertEqual(vectors.dtype, np.float32)
+        np.testing.assert_array_equal(
+            vectors[69], fake_embedding("text 69", client.embedding_dimension)
+        )
+
+        # Rows go to the in-memory index as they are, searched in one product
+        index = InMemoryQdrant()
+        index.upsert(list(range(70)), vectors)
+        hits = index.search_batch(vectors[:3], top_k=1)
+        self.assertEqual([batch[0][0] for batch in hits], [0, 1, 2])
+        self.assertEqual(index.search(vectors[5], top_k=1)[0][0], 5)
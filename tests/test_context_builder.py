@@ -0,0 +1,73 @@
+"""
+Tests for the context_builder module.
+"""
+
+import unittest
+from unittest.mock import patch
+
+from vector_chat.services.context_builder import (
+    count_tokens,
+    pack_context,
+    truncate_to_tokens,
+)
+
+
+@patch("vector_chat.services.context_builder._get_encoding", return_value=None)
+class TestContextBuilder(unittest.TestCase):
+    """Tests for the context_builder module (approximate token counts)."""
+
+    def test_count_tokens(self, mock_encoding):
+        """Test approximate token counting."""
+        self.assertEqual(count_tokens(""), 0)
+        self.assertEqual(count_tokens("abcd"), 1)
+        self.assertEqual(count_tokens("abcde"), 2)
+
+    def test_truncate_to_tokens(self, mock_encoding):
+        """Test truncating text to a token budget."""
+        self.assertEqual(truncate_to_tokens("abcdefghij", 2), "abcdefgh")
+        self.assertEqual(truncate_to_tokens("abcdefghij", 0), "")
+
+    def test_pack_context_no_limit(self, mock_encoding):
+        """Test packing every hit in score order without a budget."""
+        results = [
+            (1, 0.5, {"chunk_text": "second", "source": "doc"}),
+            (2, 0.9, {"chunk_text": "first"}),
+        ]
+
+        context, tokens, chunks = pack_context(results)
+
+        self.assertEqual(context, "[1] first\n\n[2] (doc) second")
+        self.assertEqual(chunks, 2)
+        self.assertEqual(
+            tokens, count_tokens("[1] first") + 1 + count_tokens("[2] (doc) second")
+        )
+
+    def test_pack_context_drops_low_value(self, mock_encoding):
+        """Test that hits beyond the budget are dropped."""
+        results = [
+            (1, 0.9, {"chunk_text": "a" * 40}),
+            (2, 0.8, {"chunk_text": "b" * 400}),
+        ]
+
+        context, tokens, chunks = pack_context(
+            results, max_tokens=20, min_chunk_tokens=16
+        )
+
+        self.assertEqual(chunks, 1)
+        self.assertNotIn("b", context)
+        self.assertLessEqual(tokens, 20)
+
+    def test_pack_context_trims_to_budget(self, mock_encoding):
+        """Test that a hit is trimmed when enough budget remains."""
+        results = [
+            (1, 0.9, {"chunk_text": "a" * 40}),
+            (2, 0.8, {"chunk_text": "b" * 400}),
+        ]
+
+        context, tokens, chunks = pack_context(
+            results, max_tokens=50, min_chunk_tokens=8
+        )
+
+        self.assertEqual(chunks, 2)
+        self.assertIn("[2] bbb", context)
+        self.assertLessEqual(tokens, 50)
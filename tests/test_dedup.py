@@ -0,0 +1,174 @@
+"""
+Tests for the dedup module.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from vector_chat.cli.embed import embed_text
+from vector_chat.services.chunker import ChunkBatch, make_chunk_id
+from vector_chat.services.dedup import (
+    SimHashIndex,
+    content_hash,
+    deduplicate_chunks,
+    hamming_distance,
+    simhash,
+)
+
+LICENSE = (
+    "Permission is hereby granted, free of charge, to any person obtaining a copy "
+    "of this software and associated documentation files, to deal in the Software "
+    "without restriction, including without limitation the rights to use, copy, "
+    "modify, merge, publish, distribute, sublicense, and sell copies of the Software."
+)
+
+
+class TestDedup(unittest.TestCase):
+    """Tests for the dedup module."""
+
+    def test_simhash_near_duplicates(self):
+        """Test that small edits keep fingerprints close."""
+        edited = LICENSE.replace("sell copies", "sell copie")
+        other = "The robot Naro explored the craters of the Moon with Matita."
+
+        self.assertEqual(simhash(LICENSE), simhash(LICENSE))
+        self.assertLessEqual(hamming_distance(simhash(LICENSE), simhash(edited)), 6)
+        self.assertGreater(hamming_distance(simhash(LICENSE), simhash(other)), 6)
+
+    def test_simhash_ignores_case_and_punctuation(self):
+        """Test that formatting differences do not change the fingerprint."""
+        self.assertEqual(simhash("Hello, World!"), simhash("hello world"))
+        self.assertEqual(simhash(""), 0)
+
+    def test_index_find(self):
+        """Test near-duplicate lookup in the index."""
+        index = SimHashIndex(max_distance=3)
+        index.add("a", 0b1111)
+
+        self.assertEqual(index.find(0b1110), ("a", 1))
+        self.assertIsNone(index.find(0b11110000))
+
+        index.remove("a")
+        self.assertIsNone(index.find(0b1111))
+        self.assertEqual(len(index), 0)
+
+    def test_index_save_load(self):
+        """Test persisting the index."""
+        index = SimHashIndex()
+        index.add("a", simhash(LICENSE), content_hash(LICENSE))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "nested", "index.json")
+            index.save(path)
+            loaded = SimHashIndex.load(path)
+
+        self.assertEqual(loaded.fingerprints, index.fingerprints)
+        self.assertEqual(loaded.content_hashes, index.content_hashes)
+        self.assertEqual(loaded.find(simhash(LICENSE)), ("a", 0))
+
+    def test_load_missing_index(self):
+        """Test that a missing index file gives an empty index."""
+        index = SimHashIndex.load("/nonexistent/index.json")
+        self.assertEqual(len(index), 0)
+
+    def test_deduplicate_chunks(self):
+        """Test filtering duplicates within a batch and against the index."""
+        index = SimHashIndex()
+        index.add(
+            "old", simhash("An existing chunk that was embedded in an earlier run.")
+        )
+        texts = [
+            LICENSE,
+            "The robot Naro explored the craters of the Moon with Matita.",
+            LICENSE,
+            "An existing chunk that was embedded in an earlier run.",
+        ]
+
+        kept, duplicates = deduplicate_chunks(texts, ["1", "2", "3", "4"], index)
+
+        self.assertEqual(kept, [0, 1])
+        self.assertEqual(duplicates, {2: "1", 3: "old"})
+        self.assertEqual(len(index), 3)
+
+    def test_deduplicate_unchanged_and_edited_chunks(self):
+        """Test re-embedding a source skips unchanged chunks only."""
+        index = SimHashIndex()
+        deduplicate_chunks([LICENSE], ["1"], index)
+
+        kept, duplicates = deduplicate_chunks([LICENSE], ["1"], index)
+        self.assertEqual(kept, [])
+        self.assertEqual(duplicates, {0: "1"})
+
+        edited = LICENSE.replace("sell copies", "sell copie")
+        kept, duplicates = deduplicate_chunks([edited], ["1"], index)
+        self.assertEqual(kept, [0])
+        self.assertEqual(index.fingerprints["1"], simhash(edited))
+
+        # Same fingerprint, different text
+        recased = edited.upper().replace(",", ";")
+        kept, duplicates = deduplicate_chunks([recased], ["1"], index)
+        self.assertEqual(kept, [0])
+        self.assertEqual(index.content_hashes["1"], content_hash(recased))
+
+    @patch("vector_chat.cli.embed.QdrantService")
+    def test_embed_deletes_stale_duplicate(self, mock_qdrant):
+        """Test that a chunk now duplicating another chunk drops its old point."""
+        other = "The robot Naro explored the craters of the Moon with Matita."
+        edited = LICENSE.replace("sell copies", "sell copie")
+        mock_qdrant.return_value.created = False
+        mock_qdrant.return_value.is_empty.return_value = False
+
+        with tempfile.TemporaryDirectory() as tmp_dir, patch(
+            "vector_chat.cli.embed.DEDUP_INDEX_DIR", tmp_dir
+        ):
+            for texts in ([LICENSE, other], [LICENSE, edited]):
+                self.assertTrue(
+                    embed_text(
+                        text="\n".join(texts),
+                        source_name="doc.txt",
+                        model_name="local-hash",
+                        collection_name="docs",
+                        max_sentences=1,
+                        dedup=True,
+                        chunk_batch=ChunkBatch.from_texts(texts, "doc.txt"),
+                    )
+                )
+
+            index = SimHashIndex.load(os.path.join(tmp_dir, "docs.json"))
+
+        qdrant = mock_qdrant.return_value
+        # Only the first run embedded anything, the second deleted the point
+        # that still held the old text of chunk 1
+        self.assertEqual(qdrant.upsert_batch.call_count, 1)
+        qdrant.delete.assert_called_once_with([make_chunk_id("doc.txt", 1)])
+        self.assertNotIn(make_chunk_id("doc.txt", 1), index.fingerprints)
+
+    @patch("vector_chat.cli.embed.QdrantService")
+    def test_embed_resets_index_of_empty_collection(self, mock_qdrant):
+        """Test that chunks are embedded again once their collection is emptied."""
+        qdrant = mock_qdrant.return_value
+        qdrant.created = False
+        qdrant.is_empty.return_value = False
+
+        with tempfile.TemporaryDirectory() as tmp_dir, patch(
+            "vector_chat.cli.embed.DEDUP_INDEX_DIR", tmp_dir
+        ):
+            for empty in (False, False, True):
+                qdrant.is_empty.return_value = empty
+                self.assertTrue(
+                    embed_text(
+                        text=LICENSE,
+                        source_name="doc.txt",
+                        model_name="local-hash",
+                        collection_name="docs",
+                        max_sentences=1,
+                        dedup=True,
+                        chunk_batch=ChunkBatch.from_texts([LICENSE], "doc.txt"),
+                    )
+                )
+
+        # The unchanged second run is skipped, the run into the emptied
+        # collection is not
+        self.assertEqual(qdrant.upsert_batch.call_count, 2)
@@ -0,0 +1,99 @@
+"""
+Tests for the local embedding providers.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from vector_chat.clients import OpenAIClient
+from vector_chat.config import EMBEDDING_DIMENSIONS
+from vector_chat.services.embeddings import (
+    EmbeddingProvider,
+    HashingEmbedder,
+    get_embedding_provider,
+    is_local_model,
+)
+
+
+class TestEmbeddings(unittest.TestCase):
+    """Tests for the local embedding providers."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.embedder = HashingEmbedder(dimension=64, batch_size=2)
+
+    def test_hashing_embedder_is_deterministic_and_normalized(self):
+        """Test that vectors are stable, unit length and of the right size."""
+        first = self.embedder.embed(["Paris is the capital of France", ""])
+        second = HashingEmbedder(dimension=64).embed(["Paris is the capital of France"])
+
+        self.assertEqual(first.shape, (2, 64))
+        self.assertEqual(first.dtype, np.float32)
+        self.assertAlmostEqual(float(np.linalg.norm(first[0])), 1.0, places=5)
+        np.testing.assert_array_equal(first[0], second[0])
+        np.testing.assert_array_equal(first[1], np.zeros(64))
+
+    def test_hashing_embedder_similarity_is_lexical(self):
+        """Test that texts sharing words score higher than unrelated ones."""
+        query, close, far = np.array(
+            self.embedder.embed(
+                [
+                    "capital of France",
+                    "Paris is the capital of France",
+                    "Bananas grow on trees",
+                ]
+            )
+        )
+
+        self.assertGreater(query @ close, query @ far)
+
+    def test_batches_keep_input_order(self):
+        """Test that threaded batches are reassembled in order."""
+
+        class LengthEmbedder(EmbeddingProvider):
+            def embed_batch(self, texts):
+                return np.array([[len(text), 0.0] for text in texts])
+
+        embedder = LengthEmbedder("length", 2, batch_size=2, max_workers=4)
+        texts = ["x" * i for i in range(9)]
+
+        vectors = embedder.embed(texts)
+
+        np.testing.assert_array_equal(vectors[:, 0], np.arange(9))
+        self.assertEqual(self.embedder.embed([]).shape, (0, 64))
+        self.assertEqual(self.embedder.max_workers, 1)
+        with self.assertRaises(TypeError):
+            EmbeddingProvider("abstract", 2)
+
+    def test_provider_registry(self):
+        """Test that local models are registered and shared."""
+        provider = get_embedding_provider("local-hash")
+
+        self.assertTrue(is_local_model("local-hash"))
+        self.assertFalse(is_local_model("text-embedding-3-small"))
+        self.assertIs(provider, get_embedding_provider("local-hash"))
+        self.assertEqual(provider.dimension, EMBEDDING_DIMENSIONS["local-hash"])
+        self.assertIsNone(get_embedding_provider("text-embedding-3-small"))
+
+    def test_client_embeds_locally(self):
+        """Test that a local model makes no API calls and needs no key."""
+        api = MagicMock()
+        client = OpenAIClient(embedding_model="local-hash", client=api)
+
+        vectors = client.embed(["hello world"])
+
+        self.assertEqual(client.embedding_dimension, 384)
+        self.assertEqual(len(vectors[0]), 384)
+        api.embeddings.create.assert_not_called()
+        with patch("vector_chat.clients.OPENAI_API_KEY", None):
+            local = OpenAIClient(embedding_model="local-hash")
+        self.assertIsNone(local.client)
+        local.add_user_message("hi")
+        with self.assertRaises(ValueError):
+            local.get_response()
+
+
+if __name__ == "__main__":
+    unittest.main()
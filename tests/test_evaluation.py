@@ -0,0 +1,154 @@
+"""
+Tests for the retrieval evaluation module.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from vector_chat.cli.evaluate import main, with_chunk_text
+from vector_chat.services.chunker import make_chunk_id
+from vector_chat.services.evaluation import (
+    EvalQuery,
+    evaluate_retrieval,
+    load_eval_set,
+    score_ranking,
+)
+from vector_chat.services.text_store import ChunkTextStore
+
+
+class TestEvaluation(unittest.TestCase):
+    """Tests for the retrieval evaluation module."""
+
+    def test_score_ranking(self):
+        """Test recall, MRR and nDCG of one ranking."""
+        query = EvalQuery("q", relevant_ids=["b", "d"])
+        results = [("a", 0.9, {}), ("b", 0.8, {}), ("c", 0.7, {}), ("d", 0.6, {})]
+
+        scores = score_ranking(query, results, [1, 2, 4])
+
+        self.assertEqual(scores["recall@1"], 0.0)
+        self.assertEqual(scores["recall@2"], 0.5)
+        self.assertEqual(scores["recall@4"], 1.0)
+        self.assertEqual(scores["mrr"], 0.5)
+        self.assertAlmostEqual(scores["ndcg@2"], 0.6309 / 1.6309, places=3)
+        self.assertEqual(
+            score_ranking(query, [("b", 1, {}), ("d", 1, {})], [2])["ndcg@2"], 1.0
+        )
+
+    def test_answers_count_once(self):
+        """Test answer labels matched by chunk text, counted at first match."""
+        query = EvalQuery("q", answers=["Paris"])
+        results = [
+            ("x", 0.9, {"chunk_text": "nothing here"}),
+            ("y", 0.8, {"chunk_text": "The capital is paris."}),
+            ("z", 0.7, {"chunk_text": "Paris again"}),
+        ]
+
+        scores = score_ranking(query, results, [3])
+
+        self.assertEqual(scores["recall@3"], 1.0)
+        self.assertEqual(scores["mrr"], 0.5)
+
+    def test_load_eval_set(self):
+        """Test loading labels given by ID, chunk position and answer."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "eval.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(
+                    json.dumps(
+                        {
+                            "query": "q1",
+                            "relevant_ids": ["id-1"],
+                            "relevant_chunks": [
+                                {"source": "doc.txt", "chunk_index": 2}
+                            ],
+                        }
+                    )
+                    + "\n\n"
+                )
+                f.write(json.dumps({"query": "q2", "answers": ["Text"]}) + "\n")
+
+            queries = load_eval_set(path)
+
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"query": "unlabeled"}) + "\n")
+            with self.assertRaises(ValueError):
+                load_eval_set(path)
+
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(queries[0].relevant_ids, {"id-1", make_chunk_id("doc.txt", 2)})
+        self.assertEqual(queries[1].answers, ["text"])
+
+    def test_evaluate_retrieval(self):
+        """Test batched evaluation with a stand-in search."""
+        queries = [EvalQuery(f"q{i}", relevant_ids=[str(i)]) for i in range(5)]
+        vectors = [[float(i)] for i in range(5)]
+        calls = []
+
+        def search_batch(batch, top_k, score_threshold):
+            calls.append((len(batch), top_k, score_threshold))
+            # Queries 0-2 find their chunk first, the others miss it
+            return [[(str(int(v[0])) if v[0] < 3 else "x", 0.9, {})] for v in batch]
+
+        result = evaluate_retrieval(
+            queries, vectors, search_batch, k_values=[1, 5], batch_size=2
+        )
+
+        self.assertEqual(calls, [(2, 5, 0.0), (2, 5, 0.0), (1, 5, 0.0)])
+        self.assertEqual(result["queries"], 5)
+        self.assertAlmostEqual(result["metrics"]["recall@1"], 0.6)
+        self.assertAlmostEqual(result["metrics"]["mrr"], 0.6)
+        self.assertGreaterEqual(result["latency_ms"]["p95"], 0.0)
+
+    def test_with_chunk_text(self):
+        """Test that stored texts fill slim payloads without dropping hits."""
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ChunkTextStore(os.path.join(tmp, "chunks.db"))
+            store.put_many("docs", [("a", "Paris is the capital")])
+
+            def search_batch(batch, top_k, score_threshold):
+                return [
+                    [
+                        ("a", 0.9, {}),
+                        ("b", 0.8, {"chunk_text": "kept"}),
+                        ("c", 0.7, None),
+                    ]
+                ]
+
+            search = with_chunk_text(search_batch, store, "docs")
+            results = search([[0.0]], 3, 0.0)[0]
+            store.close()
+
+        self.assertEqual([r[0] for r in results], ["a", "b", "c"])
+        self.assertEqual(results[0][2], {"chunk_text": "Paris is the capital"})
+        self.assertEqual(results[1][2], {"chunk_text": "kept"})
+        self.assertEqual(results[2][2], {})
+        query = EvalQuery("q", answers=["paris"])
+        self.assertEqual(score_ranking(query, results, [1])["recall@1"], 1.0)
+
+    def test_cli_refuses_answers_on_slim_collection(self):
+        """Test that answer labels need --text-store on a slim collection."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "eval.jsonl")
+            with open(path, "w") as f:
+                f.write(json.dumps({"query": "q", "answers": ["Paris"]}) + "\n")
+            qdrant = MagicMock()
+            qdrant.scroll.return_value = iter([[MagicMock(payload={"source": "a"})]])
+            with patch(
+                "vector_chat.cli.evaluate.validate_environment", return_value=True
+            ), patch(
+                "vector_chat.cli.evaluate.QdrantService", return_value=qdrant
+            ), patch(
+                "vector_chat.cli.evaluate.OpenAIClient"
+            ) as client:
+                self.assertEqual(main([path]), 1)
+
+        client.assert_not_called()
+        qdrant.search_batch.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
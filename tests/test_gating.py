@@ -0,0 +1,95 @@
+"""
+Tests for the retrieval gate.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from vector_chat.cli.chat import chat_loop
+from vector_chat.services.gating import (
+    RETRIEVE,
+    REUSE,
+    SKIP,
+    RetrievalGate,
+    content_words,
+)
+
+
+class TestGating(unittest.TestCase):
+    """Tests for the retrieval gate."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.gate = RetrievalGate(reuse_similarity=0.6)
+
+    def test_content_words(self):
+        """Test that stopwords and punctuation are dropped."""
+        self.assertEqual(
+            content_words("What is the capital of France?"), {"capital", "france"}
+        )
+
+    def test_chit_chat_is_skipped(self):
+        """Test that small talk and rephrasing requests skip retrieval."""
+        for query in ["Thanks!", "thank you so much", "OK", "Can you rephrase that?"]:
+            self.assertEqual(self.gate.decide(query)[0], SKIP, query)
+
+    def test_questions_are_retrieved(self):
+        """Test that questions are retrieved, however short, in any script."""
+        for query in [
+            "What is the capital of France?",
+            "Why?",
+            "What is it?",
+            "東京の人口は？",
+            "Какая столица Франции?",
+            "?",
+        ]:
+            self.assertEqual(self.gate.decide(query)[0], RETRIEVE, query)
+
+    def test_content_words_non_latin(self):
+        """Test that words outside ASCII are kept."""
+        self.assertEqual(content_words("Столица Франции"), {"столица", "франции"})
+        self.assertEqual(content_words("東京の人口は？"), {"東京の人口は"})
+
+    def test_follow_up_reuses_context(self):
+        """Test that a query repeating the last topic reuses its context."""
+        self.gate.record_retrieval("What is the capital of France?", 0.2)
+
+        self.assertEqual(self.gate.decide("capital of France please")[0], REUSE)
+        self.assertEqual(self.gate.decide("What about Germany?")[0], RETRIEVE)
+        self.assertAlmostEqual(self.gate.average_seconds, 0.2)
+
+        self.gate.reset()
+        self.assertEqual(self.gate.decide("capital of France")[0], RETRIEVE)
+
+    def test_disabled_rules(self):
+        """Test that chit-chat patterns and reuse can be turned off."""
+        gate = RetrievalGate(chit_chat_patterns=[], reuse_similarity=None)
+        gate.record_retrieval("capital of France", 0.1)
+
+        self.assertEqual(gate.decide("hello there")[0], RETRIEVE)
+        self.assertEqual(gate.decide("capital of France")[0], RETRIEVE)
+
+    @patch("vector_chat.cli.chat.get_context")
+    def test_chat_loop_skips_retrieval(self, mock_get_context):
+        """Test that gated turns do not embed or search."""
+        mock_get_context.return_value = (True, "Paris is the capital.")
+        openai_client = MagicMock()
+        openai_client.conversation_history = []
+        openai_client.get_response.return_value = "answer"
+
+        with patch(
+            "builtins.input",
+            side_effect=["What is the capital of France?", "thanks", "exit"],
+        ), patch("builtins.print"):
+            chat_loop(openai_client, MagicMock(), retrieval_gate=RetrievalGate())
+
+        self.assertEqual(mock_get_context.call_count, 1)
+        contexts = [
+            call.kwargs["context"] for call in openai_client.get_response.call_args_list
+        ]
+        self.assertIn("Paris is the capital.", contexts[0])
+        self.assertIsNone(contexts[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Tests for the journal module.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from vector_chat.cli.embed import embed_text
+from vector_chat.clients import OpenAIClient
+from vector_chat.services.journal import (
+    BATCH_EMBEDDED,
+    BATCH_UPSERTED,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_RUNNING,
+    IngestJournal,
+)
+
+
+class TestIngestJournal(unittest.TestCase):
+    """Tests for the IngestJournal class."""
+
+    def setUp(self):
+        """Create a journal in a temporary directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "jobs.db")
+        self.journal = IngestJournal(self.path)
+
+    def tearDown(self):
+        """Close the journal and remove its files."""
+        self.journal.close()
+        self.tmp.cleanup()
+
+    def test_create_and_get_job(self):
+        """Test registering and looking up a job."""
+        job_id = self.journal.create_job({"source_name": "doc.txt"}, "Some text")
+
+        job = self.journal.get_job(job_id)
+
+        self.assertEqual(job["status"], JOB_RUNNING)
+        self.assertEqual(job["params"], {"source_name": "doc.txt"})
+        self.assertEqual(job["text"], "Some text")
+        self.assertIsNone(self.journal.get_job("unknown"))
+
+    def test_batch_lifecycle(self):
+        """Test that embeddings are kept until their batch is upserted."""
+        job_id = self.journal.create_job({"source_name": "doc.txt"}, "Some text")
+        self.assertIsNone(self.journal.batch_state(job_id, 0))
+
+        self.journal.save_embeddings(job_id, 0, [[0.5, 0.25], [1.0, -1.0]])
+        self.assertEqual(self.journal.batch_state(job_id, 0), BATCH_EMBEDDED)
+        self.assertEqual(
+            self.journal.load_embeddings(job_id, 0).tolist(),
+            [[0.5, 0.25], [1.0, -1.0]],
+        )
+
+        self.journal.mark_upserted(job_id, 0)
+        self.assertEqual(self.journal.batch_state(job_id, 0), BATCH_UPSERTED)
+        with self.assertRaises(KeyError):
+            self.journal.load_embeddings(job_id, 0)
+
+    def test_journal_survives_reopen(self):
+        """Test that progress is persisted across processes."""
+        job_id = self.journal.create_job({"source_name": "doc.txt"}, "Some text")
+        self.journal.save_embeddings(job_id, 1, [[0.1, 0.2]])
+        self.journal.close()
+
+        self.journal = IngestJournal(self.path)
+
+        self.assertEqual(self.journal.batch_state(job_id, 1), BATCH_EMBEDDED)
+        self.assertEqual(len(self.journal.load_embeddings(job_id, 1)), 1)
+
+    def test_list_jobs(self):
+        """Test listing jobs with their progress."""
+        job_id = self.journal.create_job({"source_name": "doc.txt"}, "Some text")
+        self.journal.save_embeddings(job_id, 0, [[0.1]])
+        self.journal.mark_upserted(job_id, 0)
+        self.journal.set_status(job_id, JOB_COMPLETED)
+
+        jobs = self.journal.list_jobs()
+
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(jobs[0]["job_id"], job_id)
+        self.assertEqual(jobs[0]["status"], JOB_COMPLETED)
+        self.assertEqual(jobs[0]["source"], "doc.txt")
+        self.assertEqual(jobs[0]["upserted_batches"], 1)
+
+    @patch("vector_chat.cli.embed.QdrantService")
+    @patch(
+        "vector_chat.services.chunker.chunk_by_sentences",
+        side_effect=lambda text, max_sents: text.split("\n"),
+    )
+    def test_resume_interrupted_embed(self, mock_chunk, mock_qdrant):
+        """Test that a resumed job re-embeds nothing before the failed batch."""
+        texts = [f"Sentence number {i} of the document." for i in range(6)]
+        upserted = []
+        failures = []
+
+        def upsert_batch(ids, vectors, payloads):
+            # The upsert of batch 1 fails once
+            if len(upserted) == 1 and not failures:
+                failures.append(ids)
+                raise ConnectionError("Qdrant went away")
+            upserted.append((list(ids), np.array(vectors)))
+
+        mock_qdrant.return_value.upsert_batch.side_effect = upsert_batch
+        embedded = []
+        original_embed = OpenAIClient.embed
+
+        def embed(client, batch, *args, **kwargs):
+            embedded.append(list(batch))
+            return original_embed(client, batch, *args, **kwargs)
+
+        params = dict(
+            text="\n".join(texts),
+            source_name="doc.txt",
+            model_name="local-hash",
+            collection_name="docs",
+            max_sentences=1,
+            journal=self.journal,
+            batch_size=2,
+        )
+        with patch.object(OpenAIClient, "embed", autospec=True, side_effect=embed):
+            # Batch 0 is stored, batch 1 embedded but its upsert fails
+            self.assertFalse(embed_text(**params))
+            (job,) = self.journal.list_jobs()
+            self.assertEqual(job["status"], JOB_FAILED)
+            self.assertEqual(embedded, [texts[0:2], texts[2:4]])
+            failed_vectors = self.journal.load_embeddings(job["job_id"], 1)
+
+            embedded.clear()
+            self.assertTrue(embed_text(job_id=job["job_id"], **params))
+
+        # Only the batch never embedded is embedded again; batch 1 is upserted
+        # with its journaled vectors
+        self.assertEqual(embedded, [texts[4:6]])
+        self.assertEqual(len(upserted), 3)
+        np.testing.assert_array_equal(upserted[1][1], failed_vectors)
+        self.assertEqual(self.journal.get_job(job["job_id"])["status"], JOB_COMPLETED)
@@ -0,0 +1,107 @@
+"""
+Tests for the chat model router.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from vector_chat.clients import OpenAIClient
+from vector_chat.fakes import FakeOpenAI
+from vector_chat.services.model_router import ChatModelRouter, RoutingPolicy
+
+
+class TestModelRouter(unittest.TestCase):
+    """Tests for the chat model router."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.policy = RoutingPolicy(
+            fast_model="fast",
+            strong_model="strong",
+            max_fast_query_tokens=10,
+            min_fast_score=0.5,
+            max_fast_turns=3,
+        )
+
+    def test_easy_query_goes_to_fast_model(self):
+        """Test that a short, well-grounded question uses the fast model."""
+        model, reason = self.policy.classify(
+            "What is the capital of France?", top_score=0.9, context_found=True
+        )
+
+        self.assertEqual(model, "fast")
+        self.assertEqual(reason, "easy query")
+        # Without retrieval only the query and depth signals apply
+        self.assertEqual(self.policy.classify("Hello there")[0], "fast")
+
+    def test_hard_signals_go_to_strong_model(self):
+        """Test each rule that sends a question to the strong model."""
+        cases = [
+            ("word " * 30, {"top_score": 0.9, "context_found": True}, "long query"),
+            ("Why is it so?", {"top_score": 0.9, "context_found": True}, "keyword"),
+            (
+                "Capital of France?",
+                {"top_score": 0.0, "context_found": False},
+                "no context",
+            ),
+            ("Capital of France?", {"top_score": 0.4, "context_found": True}, "weak"),
+            ("Capital of France?", {"turn": 4}, "deep"),
+        ]
+        for query, signals, reason in cases:
+            model, why = self.policy.classify(query, **signals)
+            self.assertEqual(model, "strong", query)
+            self.assertIn(reason, why)
+
+    def test_keywords_match_whole_words(self):
+        """Test that keywords do not match inside other words."""
+        self.assertEqual(self.policy.classify("Who is Whyte?")[0], "fast")
+        self.assertEqual(self.policy.classify("Compare A and B")[0], "strong")
+
+    def test_policy_from_file(self):
+        """Test loading thresholds from JSON with overrides."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "policy.json")
+            with open(path, "w") as f:
+                json.dump({"fast_model": "a", "hard_keywords": ["prove"]}, f)
+
+            policy = RoutingPolicy.from_file(path, strong_model="b", fast_model=None)
+
+        self.assertEqual((policy.fast_model, policy.strong_model), ("a", "b"))
+        self.assertEqual(policy.classify("Why not?")[0], "a")
+        self.assertEqual(policy.classify("Prove it")[0], "b")
+
+    def test_latency_stats(self):
+        """Test per-model latency statistics."""
+        router = ChatModelRouter(self.policy)
+        for seconds in (0.1, 0.2, 0.3):
+            router.record_latency("fast", seconds)
+        router.record_latency("strong", 1.0)
+
+        stats = router.stats()
+
+        self.assertEqual(stats["fast"]["turns"], 3)
+        self.assertAlmostEqual(stats["fast"]["p50_ms"], 200.0)
+        self.assertAlmostEqual(stats["strong"]["p95_ms"], 1000.0)
+
+    def test_client_model_override(self):
+        """Test that a routed model is used and billed for one request only."""
+        fake = FakeOpenAI()
+        client = OpenAIClient(chat_model="strong", client=fake)
+        client.add_user_message("Hi")
+
+        completions = fake.chat.completions
+        with patch.object(completions, "create", wraps=completions.create) as create:
+            client.get_response(model="fast")
+            client.add_user_message("Again")
+            client.get_response()
+
+        models = [call.kwargs["model"] for call in create.call_args_list]
+        self.assertEqual(models, ["fast", "strong"])
+        self.assertEqual(set(client.usage.summary()["models"]), {"fast", "strong"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+"""
+Tests for the shared command-line options.
+"""
+
+import argparse
+import unittest
+from unittest.mock import patch
+
+from vector_chat.cli import options
+
+
+class TestTransportArguments(unittest.TestCase):
+    """Tests for add_transport_arguments."""
+
+    def make_parser(self):
+        """Build a parser with only the transport options."""
+        parser = argparse.ArgumentParser()
+        options.add_transport_arguments(parser)
+        return parser
+
+    def test_flags_override_default(self):
+        """Test that either flag wins over the configured default."""
+        with patch.object(options, "QDRANT_PREFER_GRPC", True):
+            parser = self.make_parser()
+        self.assertTrue(parser.parse_args([]).prefer_grpc)
+        self.assertFalse(parser.parse_args(["--no-prefer-grpc"]).prefer_grpc)
+
+        with patch.object(options, "QDRANT_PREFER_GRPC", False):
+            parser = self.make_parser()
+        self.assertFalse(parser.parse_args([]).prefer_grpc)
+        self.assertTrue(parser.parse_args(["--prefer-grpc"]).prefer_grpc)
+
+    def test_flags_are_exclusive(self):
+        """Test that both flags cannot be given together."""
+        with self.assertRaises(SystemExit), patch("sys.stderr"):
+            self.make_parser().parse_args(["--prefer-grpc", "--no-prefer-grpc"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Tests for the built-in stage profiler.
+"""
+
+import os
+import pstats
+import tempfile
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+from vector_chat.cli.embed import main as embed_main
+from vector_chat.services.profiling import Profiler, profile_stage
+
+
+class TestProfiling(unittest.TestCase):
+    """Tests for the built-in stage profiler."""
+
+    def setUp(self):
+        """Set up a temporary output directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Clean up the output directory."""
+        self.tmp.cleanup()
+
+    def test_stages_and_output(self):
+        """Test that stages are timed, profiled and written with a summary."""
+        profiler = Profiler("both", command="test", output_dir=self.tmp.name)
+        profiler.start()
+        try:
+            for _ in range(2):
+                with profiler.stage("chunking"):
+                    blocks = [bytearray(1024) for _ in range(100)]
+            with profiler.stage("embedding"):
+                with profiler.stage("search"):  # Nested: left to the outer stage
+                    sorted(range(1000), key=lambda i: -i)
+            path = profiler.write()
+        finally:
+            profiler.stop()
+
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertEqual(set(profiler.stages), {"chunking", "embedding"})
+        self.assertEqual(profiler.stages["chunking"]["calls"], 2)
+        self.assertGreater(profiler.stages["chunking"]["allocated"], 100 * 1024)
+        self.assertEqual(
+            sorted(os.listdir(path)),
+            [
+                "cpu-chunking.pstats",
+                "cpu-embedding.pstats",
+                "cpu.pstats",
+                "mem.snapshot",
+                "summary.txt",
+            ],
+        )
+        pstats.Stats(os.path.join(path, "cpu.pstats"))
+        with open(os.path.join(path, "summary.txt")) as f:
+            summary = f.read()
+        self.assertIn("CPU hotspots", summary)
+        self.assertIn("Biggest allocators during the first 'chunking'", summary)
+        self.assertIn("test_profiling.py", summary)
+        del blocks
+
+    def test_modes(self):
+        """Test mode validation and the no-op helper."""
+        with self.assertRaises(ValueError):
+            Profiler("gpu")
+        with profile_stage(None, "search"):
+            pass
+
+        profiler = Profiler("cpu", output_dir=self.tmp.name)
+        profiler.start()
+        with profile_stage(profiler, "search"):
+            pass
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertNotIn("mem.snapshot", os.listdir(profiler.write()))
+
+    @patch("vector_chat.cli.embed.QdrantService")
+    @patch(
+        "vector_chat.services.chunker.chunk_by_sentences",
+        side_effect=lambda text, max_sents: text.split(". "),
+    )
+    def test_embed_cli_profile(self, mock_chunk, mock_qdrant):
+        """Test that embed --profile covers chunking, embedding and upsert."""
+        code = embed_main(
+            [
+                "--text",
+                "One. Two. Three",
+                "--model",
+                "local-hash",
+                "--no-journal",
+                "--profile",
+                "cpu",
+                "--profile-dir",
+                self.tmp.name,
+            ]
+        )
+
+        self.assertEqual(code, 0)
+        (run_dir,) = os.listdir(self.tmp.name)
+        self.assertTrue(run_dir.startswith("embed-"))
+        files = os.listdir(os.path.join(self.tmp.name, run_dir))
+        for stage in ("chunking", "embedding", "upsert"):
+            self.assertIn(f"cpu-{stage}.pstats", files)
+
+
+if __name__ == "__main__":
+    unittest.main()
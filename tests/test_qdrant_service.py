@@ -5,15 +5,28 @@ Tests for the QdrantService class.
 import unittest
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
 from qdrant_client.http import models
 
-from vector_chat.services.qdrant_service import QdrantService
+from vector_chat.services.qdrant_service import (
+    QdrantService,
+    close_qdrant_clients,
+    get_qdrant_client,
+)
 
 
 class TestQdrantService(unittest.TestCase):
     """Tests for the QdrantService class."""
 
+    def setUp(self):
+        """Start every test with an empty client registry."""
+        close_qdrant_clients()
+
+    def tearDown(self):
+        """Drop clients created during the test."""
+        close_qdrant_clients()
+
     @patch("vector_chat.services.qdrant_service.QdrantClient")
     def test_init_existing_collection(self, mock_client):
         """Test initialization with existing collection."""
@@ -30,6 +43,7 @@ class TestQdrantService(unittest.TestCase):
         )
         mock_client_instance.create_collection.assert_not_called()
         self.assertEqual(service.collection_name, "test_collection")
+        self.assertFalse(service.created)
 
     @patch("vector_chat.services.qdrant_service.QdrantClient")
     def test_init_new_collection(self, mock_client):
@@ -46,6 +60,7 @@ class TestQdrantService(unittest.TestCase):
             "test_collection"
         )
         mock_client_instance.create_collection.assert_called_once()
+        self.assertTrue(service.created)
 
         # Check create_collection arguments
         call_args = mock_client_instance.create_collection.call_args[1]
@@ -53,6 +68,70 @@ class TestQdrantService(unittest.TestCase):
         self.assertEqual(call_args["vectors_config"].size, 1536)
         self.assertEqual(call_args["vectors_config"].distance, models.Distance.COSINE)
 
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_init_sharded_collection(self, mock_client):
+        """Test creating a collection spread over shards and replicas."""
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.collection_exists.return_value = False
+
+        QdrantService(
+            collection_name="test_collection",
+            vector_size=8,
+            shard_number=4,
+            replication_factor=2,
+        )
+
+        call_args = mock_client_instance.create_collection.call_args[1]
+        self.assertEqual(call_args["shard_number"], 4)
+        self.assertEqual(call_args["replication_factor"], 2)
+        self.assertNotIn("sharding_method", call_args)
+
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_shard_key(self, mock_client):
+        """Test that a shard key is created and used for every request."""
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.collection_exists.return_value = False
+        mock_client_instance.search.return_value = []
+
+        service = QdrantService(
+            collection_name="test_collection", vector_size=2, shard_key="acme"
+        )
+        service.upsert([1], [[0.1, 0.2]])
+        service.search([0.1, 0.2])
+
+        call_args = mock_client_instance.create_collection.call_args[1]
+        self.assertEqual(call_args["sharding_method"], models.ShardingMethod.CUSTOM)
+        mock_client_instance.create_shard_key.assert_called_once_with(
+            "test_collection", "acme"
+        )
+        self.assertEqual(
+            mock_client_instance.upsert.call_args[1]["shard_key_selector"], "acme"
+        )
+        self.assertEqual(
+            mock_client_instance.search.call_args[1]["shard_key_selector"], "acme"
+        )
+
+        # The shard key is only created once per client
+        QdrantService(collection_name="test_collection", shard_key="acme")
+        mock_client_instance.create_shard_key.assert_called_once()
+
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_shard_key_errors(self, mock_client):
+        """Test that an existing shard key is accepted and other errors raised."""
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.collection_exists.return_value = True
+        mock_client_instance.create_shard_key.side_effect = RuntimeError(
+            "Shard key acme already exists"
+        )
+        service = QdrantService(collection_name="test_collection", shard_key="acme")
+        self.assertEqual(service.shard_key, "acme")
+
+        mock_client_instance.create_shard_key.side_effect = RuntimeError(
+            "Forbidden: read-only API key"
+        )
+        with self.assertRaisesRegex(RuntimeError, "Forbidden"):
+            QdrantService(collection_name="test_collection", shard_key="globex")
+
     @patch("vector_chat.services.qdrant_service.QdrantClient")
     def test_init_missing_vector_size(self, mock_client):
         """Test error when creating new collection without vector_size."""
@@ -125,6 +204,25 @@ class TestQdrantService(unittest.TestCase):
         self.assertEqual(points[0].payload, {})
         self.assertEqual(points[1].payload, {})
 
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_upsert_batch(self, mock_client):
+        """Test upserting points as parallel columns."""
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.collection_exists.return_value = True
+        service = QdrantService(collection_name="test_collection")
+
+        service.upsert_batch(
+            [1, 2],
+            np.array([[0.1, 0.2], [0.3, 0.4]], dtype=np.float32),
+            [{"text": "test1"}, {"text": "test2"}],
+        )
+
+        batch = mock_client_instance.upsert.call_args[1]["points"]
+        self.assertIsInstance(batch, models.Batch)
+        self.assertEqual(batch.ids, [1, 2])
+        self.assertEqual(len(batch.vectors), 2)
+        self.assertEqual(batch.payloads[1], {"text": "test2"})
+
     @patch("vector_chat.services.qdrant_service.QdrantClient")
     def test_search(self, mock_client):
         """Test searching for vectors."""
@@ -167,6 +265,137 @@ class TestQdrantService(unittest.TestCase):
         self.assertEqual(results[0], (1, 0.9, {"text": "test1"}))
         self.assertEqual(results[1], (2, 0.8, {"text": "test2"}))
 
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_search_with_vectors(self, mock_client):
+        """Test searching with stored vectors returned."""
+        mock_hit = MagicMock()
+        mock_hit.id = 1
+        mock_hit.score = 0.9
+        mock_hit.payload = {"text": "test1"}
+        mock_hit.vector = [0.1, 0.2]
+
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.collection_exists.return_value = True
+        mock_client_instance.search.return_value = [mock_hit]
+
+        service = QdrantService(collection_name="test_collection")
+        results = service.search([0.1, 0.2], top_k=5, with_vectors=True)
+
+        call_args = mock_client_instance.search.call_args[1]
+        self.assertTrue(call_args["with_vectors"])
+        self.assertEqual(results, [(1, 0.9, {"text": "test1"}, [0.1, 0.2])])
+
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_search_payload_fields(self, mock_client):
+        """Test fetching only selected payload fields."""
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.collection_exists.return_value = True
+        mock_client_instance.search.return_value = []
+
+        service = QdrantService(collection_name="test_collection")
+        service.search([0.1, 0.2], payload_fields=["source", "chunk_index"])
+
+        call_args = mock_client_instance.search.call_args[1]
+        self.assertEqual(call_args["with_payload"], ["source", "chunk_index"])
+
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_retrieve(self, mock_client):
+        """Test fetching points by ID."""
+        record = MagicMock()
+        record.id = "a"
+        record.payload = {"source": "doc"}
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.collection_exists.return_value = True
+        mock_client_instance.retrieve.return_value = [record]
+
+        service = QdrantService(collection_name="test_collection")
+        records = service.retrieve(["a", "b"], payload_fields=["source"])
+
+        self.assertEqual(records, [("a", {"source": "doc"})])
+        call_args = mock_client_instance.retrieve.call_args[1]
+        self.assertEqual(call_args["ids"], ["a", "b"])
+        self.assertEqual(call_args["with_payload"], ["source"])
+        self.assertFalse(call_args["with_vectors"])
+
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_scroll(self, mock_client):
+        """Test paging through a collection."""
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.collection_exists.return_value = True
+        mock_client_instance.scroll.side_effect = [
+            (["record1", "record2"], 2),
+            (["record3"], None),
+        ]
+
+        service = QdrantService(collection_name="test_collection")
+        pages = list(service.scroll(page_size=2))
+
+        self.assertEqual(pages, [["record1", "record2"], ["record3"]])
+        second_call = mock_client_instance.scroll.call_args_list[1][1]
+        self.assertEqual(second_call["offset"], 2)
+        self.assertEqual(second_call["limit"], 2)
+        self.assertTrue(second_call["with_vectors"])
+
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_upload(self, mock_client):
+        """Test bulk-loading a vector matrix."""
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.collection_exists.return_value = True
+
+        service = QdrantService(collection_name="test_collection")
+        service.upload([1, 2], "matrix", [{}, {}], batch_size=128, parallel=4)
+
+        call_args = mock_client_instance.upload_collection.call_args[1]
+        self.assertEqual(call_args["collection_name"], "test_collection")
+        self.assertEqual(call_args["vectors"], "matrix")
+        self.assertEqual(call_args["batch_size"], 128)
+        self.assertEqual(call_args["parallel"], 4)
+
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_search_batch(self, mock_client):
+        """Test running several searches in one request."""
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.collection_exists.return_value = True
+        hits = [[MagicMock(id=1, score=0.9, payload={"text": "a"})], []]
+        # Older clients use search_batch, newer ones query_batch_points
+        mock_client_instance.search_batch.return_value = hits
+        mock_client_instance.query_batch_points.return_value = [
+            MagicMock(points=points) for points in hits
+        ]
+
+        service = QdrantService(collection_name="test_collection")
+        results = service.search_batch([[0.1, 0.2], [0.3, 0.4]], top_k=3)
+
+        self.assertEqual(results, [[(1, 0.9, {"text": "a"})], []])
+        batch_call = (
+            mock_client_instance.query_batch_points.call_args
+            or mock_client_instance.search_batch.call_args
+        )
+        requests = batch_call[1]["requests"]
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(requests[0].limit, 3)
+
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_estimate_memory(self, mock_client):
+        """Test the memory estimate with and without quantization."""
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.collection_exists.return_value = True
+        info = mock_client_instance.get_collection.return_value
+        info.points_count = 1000
+        info.config.params.vectors.size = 256
+        info.config.params.vectors.on_disk = False
+        info.config.quantization_config = None
+
+        service = QdrantService(collection_name="test_collection")
+        self.assertEqual(service.estimate_memory(), int(1000 * 256 * 4 * 1.5))
+
+        # Scalar quantization with originals on disk keeps only int8 vectors
+        info.config.params.vectors.on_disk = True
+        info.config.quantization_config = models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8)
+        )
+        self.assertEqual(service.estimate_memory(), int(1000 * 256 * 1.5))
+
     @patch("vector_chat.services.qdrant_service.QdrantClient")
     def test_check_collection_exists(self, mock_client):
         """Test checking if collection exists."""
@@ -188,3 +417,91 @@ class TestQdrantService(unittest.TestCase):
         mock_client_instance.collection_exists.side_effect = Exception("Test error")
         exists = service.check_collection_exists()
         self.assertFalse(exists)
+
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_is_empty(self, mock_client):
+        """Test checking if the collection holds any points."""
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.collection_exists.return_value = True
+        service = QdrantService(collection_name="test_collection")
+
+        mock_client_instance.get_collection.return_value.points_count = 0
+        self.assertTrue(service.is_empty())
+        mock_client_instance.get_collection.return_value.points_count = 3
+        self.assertFalse(service.is_empty())
+
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_services_share_client(self, mock_client):
+        """Test that services with the same settings share one client."""
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.collection_exists.return_value = True
+
+        service1 = QdrantService(collection_name="test_collection")
+        service2 = QdrantService(collection_name="test_collection")
+        service3 = QdrantService(collection_name="other_collection")
+
+        # One client, one existence check per collection
+        mock_client.assert_called_once()
+        self.assertIs(service1.client, service2.client)
+        self.assertIs(service1.client, service3.client)
+        self.assertEqual(mock_client_instance.collection_exists.call_count, 2)
+
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_missing_collection_checked_again(self, mock_client):
+        """Test that a collection reported missing is verified again."""
+        mock_client_instance = mock_client.return_value
+        mock_client_instance.collection_exists.return_value = True
+        mock_client_instance.search.side_effect = Exception(
+            "Not found: Collection `test_collection` doesn't exist!"
+        )
+
+        service = QdrantService(collection_name="test_collection")
+        with self.assertRaises(Exception):
+            service.search([0.1, 0.2])
+        QdrantService(collection_name="test_collection")
+
+        self.assertEqual(mock_client_instance.collection_exists.call_count, 2)
+
+    def test_given_client_checked_every_time(self):
+        """Test that services given their own client skip the shared cache."""
+        client = MagicMock()
+        client.collection_exists.return_value = True
+
+        QdrantService(collection_name="test_collection", client=client)
+        QdrantService(collection_name="test_collection", client=client)
+
+        self.assertEqual(client.collection_exists.call_count, 2)
+
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_prefer_grpc(self, mock_client):
+        """Test that gRPC settings are passed to the client."""
+        mock_client.return_value.collection_exists.return_value = True
+
+        QdrantService(
+            collection_name="test_collection",
+            prefer_grpc=True,
+            grpc_port=7334,
+            pool_size=4,
+        )
+
+        call_args = mock_client.call_args[1]
+        self.assertTrue(call_args["prefer_grpc"])
+        self.assertEqual(call_args["grpc_port"], 7334)
+        self.assertEqual(call_args["limits"].max_connections, 4)
+        self.assertIn("grpc.keepalive_time_ms", call_args["grpc_options"])
+
+    @patch("vector_chat.services.qdrant_service.QdrantClient")
+    def test_registry_separates_transports(self, mock_client):
+        """Test that REST and gRPC clients are kept apart."""
+        mock_client.side_effect = [MagicMock(), MagicMock()]
+
+        rest = get_qdrant_client(prefer_grpc=False)
+        grpc = get_qdrant_client(prefer_grpc=True)
+
+        self.assertIsNot(rest, grpc)
+        self.assertIs(get_qdrant_client(prefer_grpc=True), grpc)
+
+        # Closing the registry closes every client
+        close_qdrant_clients()
+        rest.close.assert_called_once()
+        grpc.close.assert_called_once()
@@ -0,0 +1,72 @@
+"""
+Tests for batching query embeddings across sessions.
+"""
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from vector_chat.clients import OpenAIClient
+from vector_chat.fakes import FakeAPIError, FakeOpenAI, LatencyModel
+from vector_chat.services.query_batcher import QueryBatcher
+
+
+class TestQueryBatcher(unittest.TestCase):
+    """Tests for batching query embeddings across sessions."""
+
+    def setUp(self):
+        """Set up a shared client with slow embedding calls."""
+        fake = FakeOpenAI(dimension=8, embedding_latency=LatencyModel(median=0.02))
+        self.shared = OpenAIClient(client=fake)
+        self.sizes = []
+
+    def embed(self, texts):
+        """Embed with the shared client, recording the batch sizes."""
+        self.sizes.append(len(texts))
+        return self.shared.embed(texts)
+
+    def test_concurrent_sessions_share_batches(self):
+        """Test that concurrent queries are embedded in a few batched calls."""
+        batcher = QueryBatcher(self.embed, window_ms=50, max_batch_size=8)
+        sessions = [
+            OpenAIClient(client=self.shared.client, query_batcher=batcher)
+            for _ in range(16)
+        ]
+        queries = [f"question {i % 4}" for i in range(16)]
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            vectors = list(executor.map(OpenAIClient.embed_query, sessions, queries))
+        batcher.close()
+
+        expected = self.shared.embed(queries)
+        np.testing.assert_allclose(np.stack(vectors), expected)
+        stats = batcher.stats()
+        self.assertEqual(stats["queries"], 16)
+        self.assertLess(stats["batches"], 8)
+        self.assertEqual(stats["mean_batch_size"], 16 / stats["batches"])
+        self.assertLessEqual(max(self.sizes), 8)
+        # Repeated questions in a batch are embedded once
+        self.assertLess(sum(self.sizes), 16)
+
+    def test_errors_reach_every_caller(self):
+        """Test that a failed batch fails each waiting query."""
+
+        def fail(texts):
+            raise FakeAPIError("embedding failed")
+
+        batcher = QueryBatcher(fail, window_ms=20)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(batcher.embed, f"q{i}") for i in range(4)]
+            for future in futures:
+                with self.assertRaises(FakeAPIError):
+                    future.result()
+        batcher.close()
+
+        self.assertEqual(batcher.stats()["batches"], 0)
+        with self.assertRaises(RuntimeError):
+            batcher.embed("too late")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Tests for the rate limiter shared between processes.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from vector_chat.clients import OpenAIClient
+from vector_chat.fakes import FakeOpenAI
+from vector_chat.services.rate_limiter import BULK, INTERACTIVE, RateLimiter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Tests for the rate limiter shared between processes."""
+
+    def setUp(self):
+        """Set up a bucket database and a fake clock."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "ratelimit.db")
+        self.now = 1000.0
+        self.limiters = []
+
+    def tearDown(self):
+        """Close the limiters and remove the database."""
+        for limiter in self.limiters:
+            limiter.close()
+        self.tmp.cleanup()
+
+    def sleep(self, seconds):
+        """Advance the fake clock."""
+        self.now += seconds
+
+    def make_limiter(self, **kwargs):
+        """Create a limiter on the shared database with the fake clock."""
+        kwargs.setdefault("burst_seconds", 60)
+        limiter = RateLimiter(
+            path=self.path, clock=lambda: self.now, sleep=self.sleep, **kwargs
+        )
+        self.limiters.append(limiter)
+        return limiter
+
+    def test_buckets_refill(self):
+        """Test taking requests and tokens, and waiting for the refill."""
+        limiter = self.make_limiter(rpm=60, tpm=1000)
+
+        self.assertEqual(limiter.try_acquire("m", 600), 0.0)
+        # 400 tokens left: 200 more refill at 1000 per minute in 12 seconds
+        self.assertAlmostEqual(limiter.try_acquire("m", 600), 12.0)
+        self.assertAlmostEqual(limiter.acquire("m", 600), 12.0)
+        self.assertEqual(limiter.try_acquire("other", 0), 0.0)
+
+        limiter.limits = {"free": {"rpm": 0, "tpm": 0}}
+        for _ in range(100):
+            self.assertEqual(limiter.try_acquire("free", 10**6), 0.0)
+        with self.assertRaises(TimeoutError):
+            limiter.acquire("m", 1000, timeout=1.0)
+
+    def test_bulk_leaves_reserve_to_interactive(self):
+        """Test that bulk requests stop at the interactive reserve."""
+        bulk = self.make_limiter(rpm=0, tpm=1000, interactive_reserve=0.3)
+        chat = self.make_limiter(rpm=0, tpm=1000, interactive_reserve=0.3)
+
+        self.assertEqual(bulk.try_acquire("m", 700, BULK), 0.0)
+        self.assertGreater(bulk.try_acquire("m", 100, BULK), 0.0)
+        self.assertEqual(chat.try_acquire("m", 300, INTERACTIVE), 0.0)
+
+        waited = bulk.acquire("m", 100, BULK)
+        # The bucket has to refill up to the reserve plus the request
+        self.assertAlmostEqual(waited, 24.0)
+        self.assertEqual(bulk.waited[BULK], waited)
+
+    def test_bulk_at_low_rpm(self):
+        """Test that bulk requests still get quota when a bucket holds one request."""
+        limiter = self.make_limiter(rpm=3, tpm=0, burst_seconds=10)
+
+        self.assertEqual(limiter.try_acquire("m", 0, BULK), 0.0)
+        # One request refills every 20 seconds
+        self.assertAlmostEqual(limiter.try_acquire("m", 0, BULK), 20.0)
+        self.now += 3600
+        self.assertEqual(limiter.try_acquire("m", 0, BULK), 0.0)
+        self.assertAlmostEqual(limiter.acquire("m", 0, BULK), 20.0)
+
+    def test_shared_between_processes(self):
+        """Test that quota taken by another process is not available here."""
+        code = (
+            "from vector_chat.services.rate_limiter import RateLimiter; "
+            f"RateLimiter(rpm=6, path={self.path!r}).acquire('m', 0)"
+        )
+        subprocess.run(
+            [sys.executable, "-c", code],
+            check=True,
+            cwd=REPO_ROOT,
+            capture_output=True,
+        )
+
+        # At 6 rpm a bucket holds one request, refilled every 10 seconds
+        limiter = RateLimiter(rpm=6, path=self.path)
+        self.limiters.append(limiter)
+        self.assertGreater(limiter.try_acquire("m", 0), 5.0)
+
+    def test_client_waits_and_settles(self):
+        """Test that client requests take quota and settle the actual usage."""
+        limiter = self.make_limiter(
+            rpm=2, tpm=0, burst_seconds=30, limits={"gpt-4o": {"rpm": 0, "tpm": 600}}
+        )
+        client = OpenAIClient(
+            chat_model="gpt-4o", client=FakeOpenAI(dimension=4), rate_limiter=limiter
+        )
+
+        client.embed(["one"])
+        client.embed(["two"])
+        # The bucket holds one request, refilled every 30 seconds
+        self.assertAlmostEqual(self.now, 1030.0)
+
+        client.add_user_message("Question")
+        client.get_response()
+        (tokens,) = limiter._conn.execute(
+            "SELECT tokens FROM buckets WHERE name = 'gpt-4o'"
+        ).fetchone()
+        usage = client.last_usage
+        # Charged what the API counted, not the estimate
+        self.assertEqual(
+            tokens, 300 - usage["prompt_tokens"] - usage["completion_tokens"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+"""
+Tests for deadlines, hedged requests, retries and circuit breaking.
+"""
+
+import time
+import unittest
+
+from vector_chat.cli.chat import get_context
+from vector_chat.clients import OpenAIClient
+from vector_chat.fakes import FakeAPIError, FakeOpenAI, FaultInjector, InMemoryQdrant
+from vector_chat.services.chunker import make_chunk_id
+from vector_chat.services.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    ResilientCaller,
+    ResilientIndex,
+    is_transient,
+)
+
+
+class TestResilience(unittest.TestCase):
+    """Tests for deadlines, hedged requests, retries and circuit breaking."""
+
+    def setUp(self):
+        """Set up a client whose embedding calls can be disturbed."""
+        self.fake = FakeOpenAI(dimension=8)
+        self.embeddings = FaultInjector(self.fake.embeddings, stall_seconds=1.0)
+        self.fake.embeddings = self.embeddings
+        self.callers = []
+
+    def tearDown(self):
+        """Stop the callers' worker threads."""
+        for caller in self.callers:
+            caller.close()
+
+    def make_caller(self, **kwargs):
+        """Create a caller with fast backoff, closed on teardown."""
+        kwargs.setdefault("backoff_base", 0.001)
+        caller = ResilientCaller("test", **kwargs)
+        self.callers.append(caller)
+        return caller
+
+    def test_hedged_request_cuts_stall(self):
+        """Test that a stalled request is overtaken by its hedged duplicate."""
+        caller = self.make_caller(deadline=5.0, initial_hedge_delay=0.05)
+        client = OpenAIClient(client=self.fake, resilience=caller)
+        self.embeddings.stall_next = 1
+
+        started = time.monotonic()
+        matrix = client.embed(["slow query"])
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(matrix.shape, (1, 8))
+        self.assertEqual(self.embeddings.calls, 2)
+        self.assertEqual(caller.counts["hedges"], 1)
+        self.assertEqual(caller.counts["hedge_wins"], 1)
+
+    def test_retries_and_deadline(self):
+        """Test retrying failed calls and giving up at the deadline."""
+        caller = self.make_caller(deadline=5.0, hedge_percentile=0, max_retries=2)
+        client = OpenAIClient(client=self.fake, resilience=caller)
+
+        self.embeddings.fail_next = 2
+        self.assertEqual(client.embed(["query"]).shape, (1, 8))
+        self.assertEqual(caller.counts["retries"], 2)
+
+        self.embeddings.fail_next = 3
+        with self.assertRaises(FakeAPIError):
+            client.embed(["query"])
+
+        caller.deadline = 0.1
+        self.embeddings.stall_next = 1
+        started = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            client.embed(["query"])
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(caller.counts["timeouts"], 1)
+
+    def test_permanent_errors_are_not_retried(self):
+        """Test that a rejected request is raised at once, not as an outage."""
+        breaker = CircuitBreaker(failure_threshold=1)
+        caller = self.make_caller(breaker=breaker, max_retries=3, hedge_percentile=0)
+        calls = []
+
+        def unauthorized():
+            calls.append(1)
+            raise FakeAPIError("Incorrect API key provided", status_code=401)
+
+        with self.assertRaisesRegex(FakeAPIError, "API key"):
+            caller.call(unauthorized)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(caller.counts["errors"], 1)
+        self.assertEqual(breaker.state, CLOSED)
+
+        self.assertTrue(is_transient(FakeAPIError("overloaded")))
+        self.assertTrue(is_transient(FakeAPIError("slow down", status_code=429)))
+        self.assertTrue(is_transient(ConnectionResetError()))
+        self.assertFalse(is_transient(FakeAPIError("not found", status_code=404)))
+        self.assertFalse(is_transient(ValueError("bad vector size")))
+
+    def test_circuit_breaker(self):
+        """Test opening, the half-open trial and closing again."""
+        now = [0.0]
+        breaker = CircuitBreaker(
+            failure_threshold=2, reset_timeout=10.0, clock=lambda: now[0]
+        )
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+
+        now[0] = 10.0
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # Only one trial call
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open)
+
+        now[0] = 20.0
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+
+        caller = self.make_caller(breaker=breaker, max_retries=0)
+        breaker.record_failure()
+        breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            caller.call(self.fail)
+        self.assertEqual(caller.counts["rejected"], 1)
+
+    def test_get_context_fails_fast_without_qdrant(self):
+        """Test answering without context, then without calls, while Qdrant is down."""
+        client = OpenAIClient(embedding_model="local-hash", client=self.fake)
+        index = InMemoryQdrant(collection_name="docs")
+        text = "Tickets cost ten euros."
+        index.upsert(
+            [make_chunk_id("guide.txt", 0)],
+            client.embed([text]),
+            [{"chunk_text": text, "source": "guide.txt"}],
+        )
+        flaky = FaultInjector(index)
+        flaky.down = True
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+        resilient = ResilientIndex(
+            flaky, self.make_caller(breaker=breaker, max_retries=0, hedge_percentile=0)
+        )
+
+        for _ in range(3):
+            self.assertEqual(
+                get_context(text, client, resilient, score_threshold=0.1),
+                (False, None),
+            )
+        # The breaker opened after two failures: the third query made no call
+        self.assertEqual(flaky.calls, 2)
+        self.assertEqual(resilient.collection_name, "docs")
+
+        flaky.down = False
+        time.sleep(0.25)
+        found, context = get_context(text, client, resilient, score_threshold=0.1)
+        self.assertTrue(found)
+        self.assertIn(text, context)
+        self.assertEqual(breaker.state, CLOSED)
+
+    @staticmethod
+    def fail():
+        """Fail like a remote call."""
+        raise FakeAPIError("down")
+
+
+if __name__ == "__main__":
+    unittest.main()
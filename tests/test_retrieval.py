@@ -0,0 +1,257 @@
+"""
+Tests for the retrieval module.
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from vector_chat.cli.chat import get_context
+from vector_chat.clients import OpenAIClient
+from vector_chat.fakes import FakeOpenAI, InMemoryQdrant
+from vector_chat.services.chunker import make_chunk_id
+from vector_chat.services.retrieval import (
+    adaptive_cutoff,
+    diversify_results,
+    fetch_neighbors,
+    maximal_marginal_relevance,
+    merge_adjacent_chunks,
+)
+
+
+class TestRetrieval(unittest.TestCase):
+    """Tests for the retrieval module."""
+
+    def test_mmr_prefers_diverse_candidates(self):
+        """Test that MMR skips a candidate redundant with one already chosen."""
+        query = [1.0, 1.0, 0.0]
+        candidates = [
+            [1.0, 0.9, 0.0],  # most relevant
+            [1.0, 0.85, 0.0],  # nearly identical to the first
+            [0.2, 1.0, 0.3],  # less relevant but different
+        ]
+
+        selected = maximal_marginal_relevance(
+            query, candidates, k=2, lambda_mult=0.5, duplicate_threshold=1.1
+        )
+
+        self.assertEqual(selected, [0, 2])
+
+    def test_mmr_pure_relevance(self):
+        """Test that lambda 1.0 keeps plain relevance order."""
+        query = [1.0, 0.0]
+        candidates = [[0.5, 0.5], [1.0, 0.0], [0.9, 0.1]]
+
+        selected = maximal_marginal_relevance(
+            query, candidates, k=3, lambda_mult=1.0, duplicate_threshold=1.1
+        )
+
+        self.assertEqual(selected, [1, 2, 0])
+
+    def test_mmr_drops_duplicates(self):
+        """Test that near-duplicates are suppressed."""
+        query = [1.0, 0.0]
+        candidates = [[1.0, 0.0], [1.0, 0.001], [0.0, 1.0]]
+
+        selected = maximal_marginal_relevance(
+            query, candidates, k=3, lambda_mult=1.0, duplicate_threshold=0.99
+        )
+
+        self.assertEqual(selected, [0, 2])
+
+    def test_mmr_empty(self):
+        """Test MMR with no candidates."""
+        self.assertEqual(maximal_marginal_relevance([1.0, 0.0], [], k=3), [])
+
+    def test_merge_adjacent_chunks(self):
+        """Test merging consecutive chunks of the same source."""
+        results = [
+            (1, 0.7, {"chunk_text": "B", "source": "doc", "chunk_index": 1}),
+            (2, 0.9, {"chunk_text": "A", "source": "doc", "chunk_index": 0}),
+            (3, 0.8, {"chunk_text": "D", "source": "doc", "chunk_index": 3}),
+            (4, 0.6, {"chunk_text": "X", "source": "other", "chunk_index": 2}),
+        ]
+
+        merged = merge_adjacent_chunks(results)
+
+        self.assertEqual(len(merged), 3)
+        self.assertEqual(merged[0][0], 2)
+        self.assertEqual(merged[0][1], 0.9)
+        self.assertEqual(merged[0][2]["chunk_text"], "A B")
+        self.assertEqual(merged[0][2]["chunk_index"], 0)
+        self.assertEqual(merged[0][2]["chunk_end_index"], 1)
+        self.assertEqual(merged[1][2]["chunk_text"], "D")
+        self.assertEqual(merged[2][2]["chunk_text"], "X")
+
+    def test_diversify_results(self):
+        """Test reranking and merging of over-fetched hits."""
+        query = [1.0, 0.0]
+        results = [
+            (
+                1,
+                0.95,
+                {"chunk_text": "A", "source": "doc", "chunk_index": 0},
+                [1.0, 0.0],
+            ),
+            (
+                2,
+                0.94,
+                {"chunk_text": "A", "source": "copy", "chunk_index": 5},
+                [1.0, 0.0],
+            ),
+            (
+                3,
+                0.80,
+                {"chunk_text": "B", "source": "doc", "chunk_index": 1},
+                [0.8, 0.6],
+            ),
+        ]
+
+        diversified = diversify_results(query, results, top_k=3)
+
+        # The duplicate is dropped and the neighbours are merged
+        self.assertEqual(len(diversified), 1)
+        self.assertEqual(diversified[0][0], 1)
+        self.assertEqual(diversified[0][2]["chunk_text"], "A B")
+
+    def test_adaptive_cutoff_largest_gap(self):
+        """Test cutting at the largest drop between scores."""
+        results = [(i, score, {}) for i, score in enumerate([0.9, 0.88, 0.86, 0.6])]
+
+        kept = adaptive_cutoff(results, max_k=4, min_ratio=0.5, min_gap=0.05)
+
+        self.assertEqual([r[0] for r in kept], [0, 1, 2])
+
+    def test_adaptive_cutoff_ratio(self):
+        """Test dropping hits far below the best score without a clear gap."""
+        results = [(i, score, {}) for i, score in enumerate([0.9, 0.8, 0.7, 0.6])]
+
+        kept = adaptive_cutoff(results, max_k=4, min_ratio=0.85, min_gap=0.5)
+
+        self.assertEqual([r[0] for r in kept], [0, 1])
+
+    def test_adaptive_cutoff_limits(self):
+        """Test max_k, min_k and empty input."""
+        results = [(i, score, {}) for i, score in enumerate([0.9, 0.5, 0.4, 0.3])]
+
+        self.assertEqual(len(adaptive_cutoff(results, max_k=4)), 1)
+        self.assertEqual(len(adaptive_cutoff(results, max_k=4, min_k=3)), 3)
+        self.assertEqual(len(adaptive_cutoff(results, max_k=2, min_ratio=0.0)), 1)
+        self.assertEqual(
+            len(adaptive_cutoff(results, max_k=2, min_ratio=0.0, min_gap=1.0)), 2
+        )
+        self.assertEqual(adaptive_cutoff([], max_k=3), [])
+
+    def test_get_context_adaptive_mmr(self):
+        """Test that the cutoff leaves MMR all close candidates to choose from."""
+        openai_client = MagicMock()
+        openai_client.embed_query.return_value = [1.0, 0.0]
+        index = MagicMock()
+        index.search.return_value = [
+            (
+                1,
+                0.95,
+                {"chunk_text": "Alpha.", "source": "a", "chunk_index": 0},
+                [1, 0],
+            ),
+            (
+                2,
+                0.94,
+                {"chunk_text": "Alpha.", "source": "b", "chunk_index": 0},
+                [1, 0],
+            ),
+            (
+                3,
+                0.90,
+                {"chunk_text": "Beta.", "source": "c", "chunk_index": 0},
+                [0.8, 0.6],
+            ),
+            (
+                4,
+                0.40,
+                {"chunk_text": "Gamma.", "source": "d", "chunk_index": 0},
+                [0, 1],
+            ),
+        ]
+
+        found, context = get_context(
+            "query",
+            openai_client,
+            index,
+            top_k=2,
+            mmr=True,
+            adaptive=True,
+            max_context_tokens=None,
+        )
+
+        self.assertEqual(index.search.call_args[1]["top_k"], 8)
+        self.assertTrue(found)
+        # The duplicate is replaced by the next close hit, not by the outlier
+        self.assertIn("Alpha.", context)
+        self.assertIn("Beta.", context)
+        self.assertNotIn("Gamma.", context)
+
+    def test_fetch_neighbors(self):
+        """Test that neighbours are fetched in one call, within the source."""
+        hits = [
+            (make_chunk_id("doc", 0), 0.9, {"source": "doc", "chunk_index": 0}),
+            (
+                make_chunk_id("doc", 4),
+                0.7,
+                {"source": "doc", "chunk_index": 4, "total_chunks": 5},
+            ),
+            ("x", 0.5, {"chunk_text": "no position"}),
+        ]
+        retrieve = MagicMock(
+            side_effect=lambda ids: [(i, {"source": "doc"}) for i in ids]
+        )
+
+        neighbors = fetch_neighbors(hits, retrieve, window=2)
+
+        retrieve.assert_called_once()
+        requested = retrieve.call_args[0][0]
+        self.assertEqual(
+            sorted(requested),
+            sorted(make_chunk_id("doc", i) for i in (1, 2, 3)),
+        )
+        scores = {point_id: score for point_id, score, _ in neighbors}
+        # Chunk 2 neighbours both hits and keeps the better score
+        self.assertEqual(scores[make_chunk_id("doc", 2)], 0.9)
+        self.assertEqual(scores[make_chunk_id("doc", 3)], 0.7)
+        self.assertEqual(fetch_neighbors(hits, retrieve, window=0), [])
+
+    def test_get_context_window(self):
+        """Test that a hit is expanded into a passage of its neighbours."""
+        client = OpenAIClient(embedding_model="local-hash", client=FakeOpenAI())
+        sentences = [
+            "The museum opens at nine.",
+            "Tickets cost ten euros.",
+            "Children enter for free.",
+            "The cafe closes at five.",
+        ]
+        index = InMemoryQdrant()
+        index.upsert(
+            [make_chunk_id("guide.txt", i) for i in range(4)],
+            client.embed(sentences),
+            [
+                {
+                    "chunk_text": text,
+                    "source": "guide.txt",
+                    "chunk_index": i,
+                    "total_chunks": 4,
+                }
+                for i, text in enumerate(sentences)
+            ],
+        )
+
+        found, context = get_context(
+            "How much do tickets cost?",
+            client,
+            index,
+            top_k=1,
+            score_threshold=0.1,
+            window=1,
+        )
+
+        self.assertTrue(found)
+        self.assertIn(" ".join(sentences[:3]), context)
+        self.assertNotIn(sentences[3], context)
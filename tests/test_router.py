@@ -0,0 +1,155 @@
+"""
+Tests for the multi-collection router.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from vector_chat.services.router import CollectionRouter
+
+
+def make_service(results):
+    """Create a mock service returning fixed search results."""
+    service = MagicMock()
+    service.search.return_value = results
+    return service
+
+
+class TestCollectionRouter(unittest.TestCase):
+    """Tests for the CollectionRouter class."""
+
+    def setUp(self):
+        """Create a router over three collections backed by mocks."""
+        self.services = {
+            ("acme", None): make_service(
+                [("a1", 0.9, {"chunk_text": "a1"}), ("a2", 0.5, {"chunk_text": "a2"})]
+            ),
+            ("globex", None): make_service([("g1", 0.7, {"chunk_text": "g1"})]),
+            ("shared", "initech"): make_service([("i1", 0.8, {"chunk_text": "i1"})]),
+        }
+        self.factory = MagicMock(
+            side_effect=lambda collection, shard_key: self.services[
+                (collection, shard_key)
+            ]
+        )
+        self.router = CollectionRouter(
+            {
+                "acme": "acme",
+                "globex": "globex",
+                "initech": {"collection": "shared", "shard_key": "initech"},
+            },
+            service_factory=self.factory,
+        )
+
+    def tearDown(self):
+        """Stop the router's search threads."""
+        self.router.close()
+
+    def test_search_merges_by_score(self):
+        """Test that results from all routes are merged into one top-k."""
+        results = self.router.search([0.1, 0.2], top_k=3, score_threshold=0.1)
+
+        self.assertEqual([r[0] for r in results], ["a1", "i1", "g1"])
+        self.assertEqual(results[1][2]["collection"], "shared")
+        for service in self.services.values():
+            service.search.assert_called_once_with(
+                [0.1, 0.2],
+                top_k=3,
+                score_threshold=0.1,
+                with_vectors=False,
+                payload_fields=None,
+            )
+
+    def test_search_selected_tenants(self):
+        """Test searching a subset of tenants."""
+        results = self.router.search([0.1], top_k=5, tenants=["globex"])
+
+        self.assertEqual([r[0] for r in results], ["g1"])
+        self.services[("acme", None)].search.assert_not_called()
+
+    def test_search_keeps_vectors(self):
+        """Test that 4-tuples with vectors pass through the merge."""
+        self.services[("globex", None)].search.return_value = [
+            ("g1", 0.7, {}, [1.0, 0.0])
+        ]
+
+        results = self.router.search(
+            [0.1], top_k=1, with_vectors=True, tenants=["globex"]
+        )
+
+        self.assertEqual(results[0][3], [1.0, 0.0])
+        self.assertEqual(results[0][2], {"collection": "globex"})
+
+    def test_failing_route_is_skipped(self):
+        """Test that one failing collection does not fail the search."""
+        self.services[("acme", None)].search.side_effect = RuntimeError("down")
+
+        results = self.router.search([0.1], top_k=5)
+
+        self.assertEqual([r[0] for r in results], ["i1", "g1"])
+
+    def test_all_routes_failing(self):
+        """Test that the search fails when every collection fails."""
+        for service in self.services.values():
+            service.search.side_effect = RuntimeError("down")
+
+        with self.assertRaises(RuntimeError):
+            self.router.search([0.1])
+
+    def test_unknown_tenant(self):
+        """Test that unknown tenants are rejected."""
+        with self.assertRaises(KeyError):
+            self.router.search([0.1], tenants=["umbrella"])
+
+    def test_services_created_once(self):
+        """Test that each route's service is created lazily and reused."""
+        self.router.search([0.1])
+        self.router.search([0.1])
+
+        self.assertEqual(self.factory.call_count, 3)
+        self.assertIs(self.router.get_service("acme"), self.services[("acme", None)])
+
+    def test_search_threads_reused(self):
+        """Test that fan-out searches share the router's thread pool."""
+        threads = set()
+        for service in self.services.values():
+            results = service.search.return_value
+            service.search.side_effect = lambda *args, results=results, **kwargs: (
+                threads.add(threading.get_ident()) or results
+            )
+
+        for _ in range(10):
+            self.router.search([0.1])
+
+        self.assertLessEqual(len(threads), 3)
+        self.router.close()
+        with self.assertRaises(RuntimeError):
+            self.router.search([0.1])
+
+    def test_from_file(self):
+        """Test loading routes from a JSON file."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "routes.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"t1": {"collection": "c", "shard_key": "t1"}}, f)
+
+            router = CollectionRouter.from_file(path, service_factory=self.factory)
+
+        self.assertEqual(router.routes, {"t1": ("c", "t1")})
+
+    def test_for_collections(self):
+        """Test creating one route per collection."""
+        router = CollectionRouter.for_collections(
+            ["a", "b"], service_factory=self.factory
+        )
+
+        self.assertEqual(router.routes, {"a": ("a", None), "b": ("b", None)})
+        self.assertEqual(router.collection_name, "a, b")
+
+
+if __name__ == "__main__":
+    unittest.main()
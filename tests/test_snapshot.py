@@ -0,0 +1,116 @@
+"""
+Tests for the snapshot module.
+"""
+
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from vector_chat.services.snapshot import (
+    export_collection,
+    import_collection,
+    read_manifest,
+)
+from vector_chat.services.text_store import ChunkTextStore
+
+
+def make_source_service(count, dim=4, page_size=3):
+    """Build a mock service whose scroll yields count points in pages."""
+    records = [
+        SimpleNamespace(
+            id=i, vector=[float(i)] * dim, payload={"chunk_text": f"chunk {i}"}
+        )
+        for i in range(count)
+    ]
+    service = MagicMock()
+    service.collection_name = "source"
+    service.get_vector_size.return_value = dim
+    service.scroll.return_value = iter(
+        [records[i : i + page_size] for i in range(0, count, page_size)]
+    )
+    return service
+
+
+class TestSnapshot(unittest.TestCase):
+    """Tests for the snapshot module."""
+
+    def setUp(self):
+        """Create a temporary snapshot directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.snapshot_dir = os.path.join(self.tmp.name, "snapshot")
+
+    def tearDown(self):
+        """Remove the snapshot directory."""
+        self.tmp.cleanup()
+
+    def test_export_writes_blocks(self):
+        """Test that vectors are split into .npy blocks with a manifest."""
+        source = make_source_service(7)
+
+        count = export_collection(source, self.snapshot_dir, block_size=4)
+
+        manifest = read_manifest(self.snapshot_dir)
+        self.assertEqual(count, 7)
+        self.assertEqual(manifest["count"], 7)
+        self.assertEqual(manifest["dimension"], 4)
+        self.assertEqual([b["count"] for b in manifest["blocks"]], [4, 3])
+        block = np.load(os.path.join(self.snapshot_dir, manifest["blocks"][1]["file"]))
+        self.assertEqual(block.dtype, np.float16)
+        self.assertEqual(block.shape, (3, 4))
+
+    def test_export_import_round_trip(self):
+        """Test that an exported collection is uploaded back unchanged."""
+        source = make_source_service(5)
+        export_collection(source, self.snapshot_dir, dtype="float32", block_size=2)
+
+        target = MagicMock()
+        target.collection_name = "target"
+        factory = MagicMock(return_value=target)
+
+        imported = import_collection(
+            self.snapshot_dir, factory, parallel=2, batch_size=10
+        )
+
+        self.assertEqual(imported, 5)
+        factory.assert_called_once_with(4)
+        self.assertEqual(target.upload.call_count, 3)
+        ids, vectors, payloads = [], [], []
+        for call in target.upload.call_args_list:
+            kwargs = call[1]
+            self.assertEqual(kwargs["parallel"], 2)
+            self.assertEqual(kwargs["vectors"].dtype, np.float32)
+            ids.extend(kwargs["ids"])
+            vectors.extend(kwargs["vectors"].tolist())
+            payloads.extend(kwargs["payloads"])
+        self.assertEqual(ids, [0, 1, 2, 3, 4])
+        self.assertEqual(vectors[3], [3.0] * 4)
+        self.assertEqual(payloads[4], {"chunk_text": "chunk 4"})
+
+    def test_export_fills_text_from_store(self):
+        """Test that slim payloads get their chunk text from the text store."""
+        source = make_source_service(3)
+        records = [
+            SimpleNamespace(id=i, vector=[float(i)] * 4, payload={"source": "a"})
+            for i in range(3)
+        ]
+        source.scroll.return_value = iter([records])
+        store = ChunkTextStore(os.path.join(self.tmp.name, "chunks.db"))
+        store.put_many("source", [(0, "chunk 0"), (1, "chunk 1")])
+
+        export_collection(source, self.snapshot_dir, text_store=store)
+        store.close()
+
+        target = MagicMock()
+        import_collection(self.snapshot_dir, MagicMock(return_value=target))
+        payloads = target.upload.call_args[1]["payloads"]
+        self.assertEqual(payloads[0], {"source": "a", "chunk_text": "chunk 0"})
+        self.assertEqual(payloads[2], {"source": "a"})
+
+    def test_export_rejects_unknown_dtype(self):
+        """Test that unsupported dtypes are rejected."""
+        with self.assertRaises(ValueError):
+            export_collection(make_source_service(1), self.snapshot_dir, dtype="int8")
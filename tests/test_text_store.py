@@ -0,0 +1,99 @@
+"""
+Tests for the external chunk text store.
+"""
+
+import unittest
+
+from vector_chat.cli.chat import get_context
+from vector_chat.clients import OpenAIClient
+from vector_chat.fakes import FakeOpenAI, InMemoryQdrant
+from vector_chat.services.text_store import ChunkTextStore, hydrate_results
+
+
+class TestTextStore(unittest.TestCase):
+    """Tests for the external chunk text store."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.store = ChunkTextStore(":memory:")
+        self.store.put_many("docs", [("a", "Alpha text"), ("b", "Beta text")])
+        self.store.put_many("other", [("a", "Other alpha")])
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.store.close()
+
+    def test_get_many(self):
+        """Test bulk lookup by ID within a collection."""
+        self.assertEqual(
+            self.store.get_many("docs", ["b", "a", "missing", "a"]),
+            {"a": "Alpha text", "b": "Beta text"},
+        )
+        self.assertEqual(self.store.get_many("other", ["a"]), {"a": "Other alpha"})
+
+    def test_get_many_large_batch(self):
+        """Test lookups of more IDs than one SQL statement takes."""
+        self.store.put_many("big", [(i, f"text {i}") for i in range(1200)])
+
+        texts = self.store.get_many("big", list(range(1200)))
+
+        self.assertEqual(len(texts), 1200)
+        self.assertEqual(texts["1199"], "text 1199")
+
+    def test_put_replaces_and_delete(self):
+        """Test that re-stored IDs are replaced and collections can be dropped."""
+        self.store.put_many("docs", [("a", "New alpha")])
+
+        self.assertEqual(self.store.get_many("docs", ["a"]), {"a": "New alpha"})
+        self.assertEqual(self.store.delete_collection("docs"), 2)
+        self.assertEqual(self.store.get_many("docs", ["a", "b"]), {})
+
+    def test_hydrate_results(self):
+        """Test filling in texts by hit collection, keeping inline texts."""
+        results = [
+            ("a", 0.9, {"source": "s"}),
+            ("a", 0.8, {"collection": "other"}),
+            ("c", 0.7, {"chunk_text": "Inline"}),
+            ("missing", 0.6, {}),
+        ]
+
+        hydrated = hydrate_results(results, self.store, "docs")
+
+        self.assertEqual(
+            [r[2]["chunk_text"] for r in hydrated],
+            ["Alpha text", "Other alpha", "Inline"],
+        )
+        self.assertEqual(hydrated[0][2]["source"], "s")
+        self.assertNotIn("chunk_text", results[0][2])
+
+    def test_get_context_with_slim_payloads(self):
+        """Test that context is built from stored texts and selected fields."""
+        client = OpenAIClient(embedding_model="local-hash", client=FakeOpenAI())
+        index = InMemoryQdrant(collection_name="docs")
+        texts = ["Paris is the capital of France.", "Bananas grow on trees."]
+        index.upsert(
+            ["a", "b"],
+            client.embed(texts),
+            [
+                {"source": "facts.txt", "chunk_index": i, "model_name": "local-hash"}
+                for i in range(2)
+            ],
+        )
+        self.store.put_many("docs", zip(["a", "b"], texts))
+
+        found, context = get_context(
+            "capital of France",
+            client,
+            index,
+            top_k=1,
+            score_threshold=0.0,
+            text_store=self.store,
+            payload_fields=["source", "chunk_index"],
+        )
+
+        self.assertTrue(found)
+        self.assertIn("(facts.txt) Paris is the capital of France.", context)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Tests for the usage accounting module.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from vector_chat.clients import OpenAIClient
+from vector_chat.fakes import FakeOpenAI
+from vector_chat.services.usage import UsageTracker, load_price_table, usage_counts
+
+PRICES = {
+    "chat-model": {"input": 2.0, "cached_input": 1.0, "output": 8.0},
+    "embed-model": {"input": 0.1},
+}
+
+
+class TestUsage(unittest.TestCase):
+    """Tests for the usage accounting module."""
+
+    def test_usage_counts(self):
+        """Test reading token counts from a usage object."""
+        usage = SimpleNamespace(
+            prompt_tokens=100,
+            completion_tokens=20,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=64),
+        )
+
+        self.assertEqual(
+            usage_counts(usage),
+            {"prompt_tokens": 100, "completion_tokens": 20, "cached_tokens": 64},
+        )
+        self.assertEqual(
+            usage_counts(SimpleNamespace(prompt_tokens=5)),
+            {"prompt_tokens": 5, "completion_tokens": 0, "cached_tokens": 0},
+        )
+
+    def test_summary_and_cost(self):
+        """Test aggregation per model and pricing of cached tokens."""
+        tracker = UsageTracker(scope="session", prices=PRICES)
+        tracker.record("chat-model", "chat", 1_000_000, 500_000, cached_tokens=400_000)
+        tracker.record("chat-model", "chat", 0, 0)
+        tracker.record("embed-model", "embedding", 2_000_000)
+
+        summary = tracker.summary()
+
+        chat = summary["models"]["chat-model"]
+        self.assertEqual(chat["calls"], 2)
+        # 600k uncached * $2 + 400k cached * $1 + 500k output * $8
+        self.assertAlmostEqual(chat["cost_usd"], 1.2 + 0.4 + 4.0)
+        self.assertAlmostEqual(summary["models"]["embed-model"]["cost_usd"], 0.2)
+        self.assertEqual(summary["totals"]["prompt_tokens"], 3_000_000)
+        self.assertAlmostEqual(summary["totals"]["cost_usd"], 5.8)
+        self.assertEqual(summary["scope"], "session")
+
+    def test_unpriced_model(self):
+        """Test that models without a price are reported as unpriced."""
+        tracker = UsageTracker(prices={})
+        tracker.record("mystery", "chat", 10, 10)
+
+        summary = tracker.summary()
+
+        self.assertIsNone(summary["models"]["mystery"]["cost_usd"])
+        self.assertEqual(summary["totals"]["cost_usd"], 0.0)
+        self.assertIn("unpriced", tracker.render("text"))
+
+    def test_render_json(self):
+        """Test the JSON report."""
+        tracker = UsageTracker(prices=PRICES)
+        tracker.record("embed-model", "embedding", 10)
+
+        report = json.loads(tracker.render("json"))
+
+        self.assertEqual(report["totals"]["calls"], 1)
+
+    def test_price_file_overrides(self):
+        """Test extending the built-in price table from a file."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "prices.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"gpt-4o": {"output": 1.0}, "local": {"input": 0.0}}, f)
+
+            prices = load_price_table(path)
+
+        self.assertEqual(prices["gpt-4o"]["output"], 1.0)
+        self.assertIn("input", prices["gpt-4o"])
+        self.assertIn("local", prices)
+
+    def test_client_records_usage(self):
+        """Test that the client records chat and embedding usage."""
+        tracker = UsageTracker(prices=PRICES)
+        client = OpenAIClient(
+            chat_model="chat-model",
+            embedding_model="embed-model",
+            client=FakeOpenAI(dimension=4),
+            usage_tracker=tracker,
+        )
+
+        client.embed(["one text", "another text"])
+        client.ask("A question")
+
+        models = tracker.summary()["models"]
+        self.assertEqual(models["embed-model"]["calls"], 1)
+        self.assertGreater(models["embed-model"]["prompt_tokens"], 0)
+        self.assertEqual(models["chat-model"]["calls"], 1)
+        self.assertGreater(models["chat-model"]["completion_tokens"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+"""
+Tests for watch-mode ingestion.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from vector_chat.cli.embed import main as embed_main
+from vector_chat.cli.embed import watch_directory
+from vector_chat.services.chunker import make_chunk_id
+from vector_chat.services.dedup import SimHashIndex
+from vector_chat.services.usage import UsageTracker
+from vector_chat.services.watcher import (
+    CREATED,
+    DELETED,
+    MODIFIED,
+    DirectoryWatcher,
+    IngestMetrics,
+    WatchState,
+    scan_directory,
+)
+
+
+def fake_sentences(text, max_sents):
+    """Chunk text by line, without NLTK."""
+    return [line for line in text.splitlines() if line.strip()]
+
+
+class TestWatcher(unittest.TestCase):
+    """Tests for watch-mode ingestion."""
+
+    def setUp(self):
+        """Set up a temporary directory to watch."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        os.makedirs(os.path.join(self.dir, "sub"))
+
+    def tearDown(self):
+        """Clean up the temporary directory."""
+        self.tmp.cleanup()
+
+    def write(self, rel_path, text, age=10.0):
+        """Write a file and backdate it past the debounce time."""
+        path = os.path.join(self.dir, rel_path)
+        with open(path, "w") as f:
+            f.write(text)
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_scan_directory(self):
+        """Test that text files are found recursively."""
+        self.write("a.txt", "A")
+        self.write(os.path.join("sub", "b.md"), "B")
+        self.write("image.png", "binary")
+
+        files = scan_directory(self.dir)
+
+        self.assertEqual(set(files), {"a.txt", os.path.join("sub", "b.md")})
+        self.assertEqual(files["a.txt"][1], 1)
+
+    def test_changes(self):
+        """Test detecting created, modified, touched and deleted files."""
+        state = WatchState()
+        watcher = DirectoryWatcher(self.dir, state, debounce=1.0, use_events=False)
+        self.write("a.txt", "one")
+        self.write("b.txt", "two")
+        self.write("fresh.txt", "still being written", age=0.0)
+
+        self.assertEqual(watcher.changes(), [(CREATED, "a.txt"), (CREATED, "b.txt")])
+
+        digest_a = hashlib.sha1(b"one").hexdigest()
+        state.files = {
+            "a.txt": {"mtime": 0, "size": 3, "digest": digest_a},
+            "b.txt": {"mtime": 0, "size": 3, "digest": "old"},
+            "gone.txt": {"mtime": 0, "size": 1, "digest": "x"},
+        }
+        changes = watcher.changes()
+
+        # a.txt was only touched: its state is refreshed instead
+        self.assertEqual(changes, [(MODIFIED, "b.txt"), (DELETED, "gone.txt")])
+        self.assertNotEqual(state.files["a.txt"]["mtime"], 0)
+
+    def test_state_round_trip(self):
+        """Test saving and loading the watch state."""
+        path = os.path.join(self.dir, "state", "watch.json")
+        state = WatchState(path)
+        state.files["a.txt"] = {"mtime": 1.0, "size": 2, "total_chunks": 3}
+        state.save()
+
+        self.assertEqual(WatchState.load(path).files, state.files)
+        self.assertEqual(WatchState.load(path + ".missing").files, {})
+
+    def test_metrics(self):
+        """Test throughput and lag statistics."""
+        metrics = IngestMetrics()
+        metrics.record(chunks=10, seconds=0.5, lag=1.0)
+        metrics.record(chunks=30, seconds=1.5, lag=3.0)
+
+        summary = metrics.summary()
+
+        self.assertEqual(summary["files_ingested"], 2)
+        self.assertEqual(summary["chunks_per_second"], 20.0)
+        self.assertEqual(summary["lag_seconds"]["p50"], 2.0)
+        self.assertEqual(summary["lag_seconds"]["last"], 3.0)
+
+    @patch("vector_chat.cli.embed.QdrantService")
+    @patch("vector_chat.cli.embed.embed_text", return_value=True)
+    @patch(
+        "vector_chat.services.chunker.chunk_by_sentences", side_effect=fake_sentences
+    )
+    def test_watch_directory_syncs_changes(self, mock_chunk, mock_embed, mock_qdrant):
+        """Test that only changed files are embedded and stale chunks removed."""
+        state = WatchState()
+        self.write("a.txt", "one\ntwo\nthree")
+        self.write("b.txt", "bee")
+
+        kwargs = dict(
+            model_name="local-hash",
+            collection_name="docs",
+            max_sentences=1,
+            debounce=0.0,
+            once=True,
+            state=state,
+        )
+        metrics = watch_directory(self.dir, **kwargs)
+
+        self.assertEqual(mock_embed.call_count, 2)
+        self.assertEqual(metrics.chunks, 4)
+        self.assertEqual(state.files["a.txt"]["total_chunks"], 3)
+
+        # Nothing changed: nothing is embedded again
+        mock_embed.reset_mock()
+        watch_directory(self.dir, **kwargs)
+        mock_embed.assert_not_called()
+
+        # a.txt shrinks and b.txt is removed
+        self.write("a.txt", "one", age=5.0)
+        os.remove(os.path.join(self.dir, "b.txt"))
+        metrics = watch_directory(self.dir, **kwargs)
+
+        source_a = os.path.normpath(os.path.join(self.dir, "a.txt"))
+        source_b = os.path.normpath(os.path.join(self.dir, "b.txt"))
+        mock_embed.assert_called_once()
+        self.assertEqual(mock_embed.call_args.kwargs["source_name"], source_a)
+        deletes = mock_qdrant.return_value.delete_chunks.call_args_list
+        self.assertEqual(deletes[0].args, (source_a,))
+        self.assertEqual(deletes[0].kwargs, {"from_index": 1})
+        self.assertEqual(deletes[1].args, (source_b,))
+        self.assertEqual(deletes[1].kwargs, {"from_index": 0})
+        self.assertEqual(metrics.deleted, 1)
+        self.assertNotIn("b.txt", state.files)
+        self.assertNotEqual(make_chunk_id(source_a, 0), make_chunk_id(source_b, 0))
+
+    @patch("vector_chat.cli.embed.QdrantService")
+    @patch("vector_chat.cli.embed.embed_text", return_value=True)
+    @patch(
+        "vector_chat.services.chunker.chunk_by_sentences", side_effect=fake_sentences
+    )
+    def test_watch_directory_passes_options(self, mock_chunk, mock_embed, mock_qdrant):
+        """Test that dedup and shard options apply to watched files too."""
+        self.write("a.txt", "one\ntwo")
+        source = os.path.normpath(os.path.join(self.dir, "a.txt"))
+        usage = UsageTracker(prices={})
+        kwargs = dict(
+            model_name="local-hash",
+            collection_name="docs",
+            max_sentences=1,
+            debounce=0.0,
+            once=True,
+            state=WatchState(),
+            dedup=True,
+            shard_key="tenant",
+            usage_tracker=usage,
+        )
+
+        with tempfile.TemporaryDirectory() as index_dir, patch(
+            "vector_chat.cli.embed.DEDUP_INDEX_DIR", index_dir
+        ):
+            watch_directory(self.dir, **kwargs)
+            self.assertTrue(mock_embed.call_args.kwargs["dedup"])
+            self.assertEqual(mock_embed.call_args.kwargs["shard_key"], "tenant")
+            self.assertEqual(usage.scope, self.dir)
+
+            # The fingerprint embed_text would have kept for the second chunk
+            index_path = os.path.join(index_dir, "docs.json")
+            index = SimHashIndex()
+            index.add(make_chunk_id(source, 1), 1, "hash")
+            index.save(index_path)
+
+            self.write("a.txt", "one", age=5.0)
+            watch_directory(self.dir, **kwargs)
+            index = SimHashIndex.load(index_path)
+
+        self.assertEqual(mock_qdrant.call_args.kwargs["shard_key"], "tenant")
+        mock_qdrant.return_value.delete_chunks.assert_called_once_with(
+            source, from_index=1
+        )
+        self.assertEqual(len(index), 0)
+
+    def test_cli_rejects_watch_with_resume(self):
+        """Test that --watch cannot silently drop --resume."""
+        with self.assertLogs("vector_chat.cli.embed", level="ERROR") as logs:
+            code = embed_main(["--watch", self.dir, "--resume", "job"])
+        self.assertEqual(code, 1)
+        self.assertIn("--resume", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
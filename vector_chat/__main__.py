@@ -8,6 +8,17 @@ from typing import List, Optional
 
 from vector_chat.cli.chat import main as chat_main
 from vector_chat.cli.embed import main as embed_main
+from vector_chat.cli.evaluate import main as eval_main
+from vector_chat.cli.snapshot import export_main, import_main
+
+# Sub-commands and the entry points that parse their own arguments
+COMMANDS = {
+    "embed": (embed_main, "Embed text into vector database"),
+    "chat": (chat_main, "Chat with OpenAI using vector context"),
+    "export": (export_main, "Export a collection to a snapshot directory"),
+    "import": (import_main, "Import a snapshot directory into a collection"),
+    "eval-retrieval": (eval_main, "Measure retrieval quality against latency"),
+}
 
 
 def main(args: Optional[List[str]] = None) -> int:
@@ -25,33 +36,17 @@ def main(args: Optional[List[str]] = None) -> int:
     )
 
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
+    for name, (_, help_text) in COMMANDS.items():
+        # Each command parses its own options (see `vector-chat <command> --help`)
+        subparsers.add_parser(name, help=help_text, add_help=False)
 
-    # Embed command
-    embed_parser = subparsers.add_parser(
-        "embed", help="Embed text into vector database"
-    )
-    embed_parser.add_argument("-f", "--file", help="Path to text file to embed")
-    embed_parser.add_argument("-t", "--text", help="Text to embed directly")
-    embed_parser.add_argument(
-        "-l", "--list-files", help="List available text files", action="store_true"
-    )
-
-    # Chat command
-    chat_parser = subparsers.add_parser(
-        "chat", help="Chat with OpenAI using vector context"
-    )
-    chat_parser.add_argument(
-        "--no-context", help="Disable context retrieval", action="store_true"
-    )
-
-    # Parse arguments
-    parsed_args = parser.parse_args(args)
+    # Parse the command name only; the rest goes to the command itself
+    parsed_args, remaining = parser.parse_known_args(args)
 
     # Run command
-    if parsed_args.command == "embed":
-        return embed_main()
-    elif parsed_args.command == "chat":
-        return chat_main()
+    if parsed_args.command in COMMANDS:
+        command_main = COMMANDS[parsed_args.command][0]
+        return command_main(remaining)
     else:
         parser.print_help()
         return 1
@@ -5,24 +5,64 @@ Command-line interface for chatting with OpenAI using vector context.
 import argparse
 import logging
 import sys
-from typing import List, Optional, Tuple
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+from vector_chat.cli.options import add_transport_arguments
 from vector_chat.clients import OpenAIClient
 from vector_chat.config import (
     AVAILABLE_EMBEDDING_MODELS,
+    CALL_DEADLINE_SECONDS,
+    CALL_MAX_RETRIES,
     DEFAULT_CHAT_MODEL,
+    DEFAULT_CONTEXT_TOKENS,
+    DEFAULT_CUTOFF_MIN_GAP,
+    DEFAULT_CUTOFF_RATIO,
     DEFAULT_EMBEDDING_MODEL,
+    DEFAULT_FAST_CHAT_MODEL,
+    DEFAULT_MMR_FETCH_MULTIPLIER,
+    DEFAULT_MMR_LAMBDA,
     EMOJI_AI,
     EMOJI_CONTEXT,
     EMOJI_ERROR,
     EMOJI_SEARCH,
+    GATE_REUSE_SIMILARITY,
+    HEDGE_PERCENTILE,
+    PROFILE_DIR,
+    PROFILE_MODES,
     QDRANT_COLLECTION,
+    TEXT_STORE_PATH,
     validate_environment,
 )
+from vector_chat.services.context_builder import pack_context
+from vector_chat.services.gating import RETRIEVE, REUSE, RetrievalGate
+from vector_chat.services.model_router import ChatModelRouter, RoutingPolicy
+from vector_chat.services.profiling import Profiler, profile_stage
 from vector_chat.services.qdrant_service import QdrantService
+from vector_chat.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    ResilientCaller,
+    ResilientIndex,
+)
+from vector_chat.services.retrieval import (
+    adaptive_cutoff,
+    diversify_results,
+    fetch_neighbors,
+    merge_adjacent_chunks,
+)
+from vector_chat.services.router import CollectionRouter
+from vector_chat.services.text_store import ChunkTextStore, hydrate_results
+from vector_chat.services.usage import UsageTracker
 
 logger = logging.getLogger(__name__)
 
+# Anything get_context can search: one collection, a router over several,
+# or either wrapped in the resilience layer
+SearchIndex = Union[QdrantService, CollectionRouter, ResilientIndex]
+
 
 def setup_argparse() -> argparse.ArgumentParser:
     """
@@ -45,7 +85,7 @@ def setup_argparse() -> argparse.ArgumentParser:
     parser.add_argument(
         "-e",
         "--embedding-model",
-        help=f"Embedding model to use (default: {DEFAULT_EMBEDDING_MODEL})",
+        help=f"Embedding model to use, matching the collection; local-* models run on the CPU (default: {DEFAULT_EMBEDDING_MODEL})",
         choices=AVAILABLE_EMBEDDING_MODELS,
         default=DEFAULT_EMBEDDING_MODEL,
     )
@@ -56,6 +96,23 @@ def setup_argparse() -> argparse.ArgumentParser:
         default=QDRANT_COLLECTION,
     )
 
+    parser.add_argument(
+        "--collections",
+        help="Search several collections at once and merge the results",
+        nargs="+",
+    )
+
+    parser.add_argument(
+        "--routes",
+        help="JSON file mapping tenants to collections or shard keys",
+    )
+
+    parser.add_argument(
+        "--tenant",
+        help="Restrict the search to these tenants of the routes file",
+        nargs="+",
+    )
+
     parser.add_argument(
         "-k",
         "--top-k",
@@ -72,12 +129,162 @@ def setup_argparse() -> argparse.ArgumentParser:
         default=0.3,
     )
 
+    parser.add_argument(
+        "--context-tokens",
+        help=f"Token budget for retrieved context (default: {DEFAULT_CONTEXT_TOKENS})",
+        type=int,
+        default=DEFAULT_CONTEXT_TOKENS,
+    )
+
+    parser.add_argument(
+        "--mmr",
+        help="Rerank context with MMR and merge adjacent chunks",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--mmr-lambda",
+        help=f"MMR relevance/diversity trade-off (default: {DEFAULT_MMR_LAMBDA})",
+        type=float,
+        default=DEFAULT_MMR_LAMBDA,
+    )
+
+    parser.add_argument(
+        "--fetch-multiplier",
+        help=f"Candidates fetched per context chunk for MMR and --adaptive (default: {DEFAULT_MMR_FETCH_MULTIPLIER})",
+        type=int,
+        default=DEFAULT_MMR_FETCH_MULTIPLIER,
+    )
+
+    parser.add_argument(
+        "--window",
+        help="Add this many neighbouring chunks on each side of every hit and "
+        "merge them into passages (default: 0)",
+        type=int,
+        default=0,
+    )
+
+    parser.add_argument(
+        "--adaptive",
+        help="Over-fetch and keep only context close to the best match "
+        "(--top-k becomes the maximum)",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--cutoff-ratio",
+        help=f"Fraction of the best score a chunk must reach with --adaptive (default: {DEFAULT_CUTOFF_RATIO})",
+        type=float,
+        default=DEFAULT_CUTOFF_RATIO,
+    )
+
+    parser.add_argument(
+        "--cutoff-min-gap",
+        help=f"Smallest score drop treated as a cut point with --adaptive (default: {DEFAULT_CUTOFF_MIN_GAP})",
+        type=float,
+        default=DEFAULT_CUTOFF_MIN_GAP,
+    )
+
+    parser.add_argument(
+        "--text-store",
+        help="Read chunk text from the local store of collections embedded "
+        f"with --text-store (default path: {TEXT_STORE_PATH})",
+        nargs="?",
+        const=TEXT_STORE_PATH,
+        metavar="PATH",
+    )
+
+    parser.add_argument(
+        "--payload-fields",
+        help="Payload fields to fetch with each hit (default: all), e.g. "
+        "chunk_text source chunk_index",
+        nargs="+",
+    )
+
+    add_transport_arguments(parser)
+
     parser.add_argument(
         "--no-context",
         help="Disable context retrieval, use only general knowledge",
         action="store_true",
     )
 
+    parser.add_argument(
+        "--no-gate",
+        help="Retrieve context for every input, including chit-chat",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--gate-reuse-similarity",
+        help="Word overlap with the previous query above which its context is "
+        f"reused instead of searching again; above 1 never reuses (default: {GATE_REUSE_SIMILARITY})",
+        type=float,
+        default=GATE_REUSE_SIMILARITY,
+    )
+
+    parser.add_argument(
+        "--route-models",
+        help="Send easy questions to --fast-model and hard ones to --chat-model",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--fast-model",
+        help=f"Chat model for easy questions with --route-models (default: {DEFAULT_FAST_CHAT_MODEL})",
+        default=DEFAULT_FAST_CHAT_MODEL,
+    )
+
+    parser.add_argument(
+        "--routing-policy",
+        help="JSON file with routing thresholds for --route-models",
+    )
+
+    parser.add_argument(
+        "--usage-report",
+        help="Print token usage and cost of the session on exit",
+        choices=["text", "json"],
+    )
+
+    parser.add_argument(
+        "--profile",
+        help="Profile embedding, search and completion (CPU with cProfile, memory "
+        "with tracemalloc, or both) and write the profiles and a summary on exit",
+        choices=PROFILE_MODES,
+    )
+    parser.add_argument(
+        "--profile-dir",
+        help=f"Directory for --profile output (default: {PROFILE_DIR})",
+        default=PROFILE_DIR,
+    )
+
+    parser.add_argument(
+        "--deadline",
+        help="Seconds an embedding or search call may take, retries included "
+        f"(default: {CALL_DEADLINE_SECONDS})",
+        type=float,
+        default=CALL_DEADLINE_SECONDS,
+    )
+    parser.add_argument(
+        "--hedge-percentile",
+        help="Send a duplicate embedding or search request when one is slower than "
+        f"this latency percentile; 0 disables hedging (default: {HEDGE_PERCENTILE})",
+        type=float,
+        default=HEDGE_PERCENTILE,
+    )
+    parser.add_argument(
+        "--retries",
+        help=f"Retries of an embedding or search call failing with a transient error (default: {CALL_MAX_RETRIES})",
+        type=int,
+        default=CALL_MAX_RETRIES,
+    )
+    parser.add_argument(
+        "--no-resilience",
+        help="Call OpenAI embeddings and Qdrant without deadlines, hedging, "
+        "retries or circuit breaking",
+        action="store_true",
+    )
+
     parser.add_argument("--verbose", help="Enable verbose logging", action="store_true")
 
     return parser
@@ -85,19 +292,26 @@ def setup_argparse() -> argparse.ArgumentParser:
 
 def initialize_clients(
     args: argparse.Namespace,
-) -> Tuple[OpenAIClient, Optional[QdrantService]]:
+) -> Tuple[OpenAIClient, Optional[SearchIndex]]:
     """
     Initialize OpenAI and Qdrant clients.
 
+    Unless --no-resilience is given, query embeddings and searches get
+    deadlines, hedged requests, retries and a circuit breaker each.
+
     Args:
         args: Command-line arguments
 
     Returns:
-        Tuple of (OpenAIClient, QdrantService or None)
+        Tuple of (OpenAIClient, QdrantService or CollectionRouter (possibly
+        wrapped in a ResilientIndex), or None)
     """
     # Initialize OpenAI client
     openai_client = OpenAIClient(
-        chat_model=args.chat_model, embedding_model=args.embedding_model
+        chat_model=args.chat_model,
+        embedding_model=args.embedding_model,
+        usage_tracker=UsageTracker(scope=f"session {uuid.uuid4().hex[:12]}"),
+        resilience=None if args.no_resilience else make_caller("embeddings", args),
     )
 
     # Add system message
@@ -110,11 +324,21 @@ def initialize_clients(
     )
 
     # Initialize Qdrant client if context is enabled
-    qdrant_client = None
+    qdrant_client: Optional[SearchIndex] = None
     if not args.no_context:
         try:
-            qdrant_client = QdrantService(collection_name=args.collection)
-            logger.info(f"Connected to Qdrant collection: {args.collection}")
+            index: Union[QdrantService, CollectionRouter]
+            if args.routes or args.collections:
+                index = initialize_router(args)
+            else:
+                index = QdrantService(
+                    collection_name=args.collection, prefer_grpc=args.prefer_grpc
+                )
+            logger.info(f"Connected to Qdrant collection: {index.collection_name}")
+            if args.no_resilience:
+                qdrant_client = index
+            else:
+                qdrant_client = ResilientIndex(index, make_caller("qdrant", args))
         except Exception as e:
             logger.error(f"Error connecting to Qdrant: {str(e)}")
             logger.info("Continuing without context retrieval")
@@ -122,12 +346,95 @@ def initialize_clients(
     return openai_client, qdrant_client
 
 
+def make_caller(name: str, args: argparse.Namespace) -> ResilientCaller:
+    """
+    Create a resilient caller with its own circuit breaker.
+
+    Args:
+        name: Service name, e.g. "qdrant"
+        args: Command-line arguments
+
+    Returns:
+        Caller applying the deadline, hedging and retry options
+    """
+    return ResilientCaller(
+        name,
+        deadline=args.deadline,
+        hedge_percentile=args.hedge_percentile,
+        max_retries=args.retries,
+        breaker=CircuitBreaker(),
+    )
+
+
+def initialize_router(args: argparse.Namespace) -> CollectionRouter:
+    """
+    Create a router over several collections from command-line arguments.
+
+    Args:
+        args: Command-line arguments
+
+    Returns:
+        Router searching the selected collections
+
+    Raises:
+        KeyError: If a selected tenant is not in the routes file
+    """
+    if args.routes:
+        router = CollectionRouter.from_file(args.routes, prefer_grpc=args.prefer_grpc)
+    else:
+        router = CollectionRouter.for_collections(
+            args.collections, prefer_grpc=args.prefer_grpc
+        )
+
+    if args.tenant:
+        missing = [tenant for tenant in args.tenant if tenant not in router.routes]
+        if missing:
+            raise KeyError(f"Unknown tenants: {', '.join(missing)}")
+        router.routes = {tenant: router.routes[tenant] for tenant in args.tenant}
+    return router
+
+
+def initialize_model_router(args: argparse.Namespace) -> Optional[ChatModelRouter]:
+    """
+    Create the chat model router from command-line arguments.
+
+    Args:
+        args: Command-line arguments
+
+    Returns:
+        Chat model router, or None if routing is disabled
+    """
+    if not args.route_models:
+        return None
+    models = {"fast_model": args.fast_model, "strong_model": args.chat_model}
+    if args.routing_policy:
+        policy = RoutingPolicy.from_file(args.routing_policy, **models)
+    else:
+        policy = RoutingPolicy(**models)
+    logger.info(
+        f"Routing between {policy.fast_model} (easy) and {policy.strong_model} (hard)"
+    )
+    return ChatModelRouter(policy)
+
+
 def get_context(
     query: str,
     openai_client: OpenAIClient,
-    qdrant_client: QdrantService,
+    qdrant_client: SearchIndex,
     top_k: int = 3,
     score_threshold: float = 0.3,
+    mmr: bool = False,
+    fetch_multiplier: int = DEFAULT_MMR_FETCH_MULTIPLIER,
+    mmr_lambda: float = DEFAULT_MMR_LAMBDA,
+    max_context_tokens: Optional[int] = DEFAULT_CONTEXT_TOKENS,
+    adaptive: bool = False,
+    cutoff_ratio: float = DEFAULT_CUTOFF_RATIO,
+    cutoff_min_gap: float = DEFAULT_CUTOFF_MIN_GAP,
+    stats: Optional[Dict[str, Any]] = None,
+    text_store: Optional[ChunkTextStore] = None,
+    payload_fields: Optional[List[str]] = None,
+    window: int = 0,
+    profiler: Optional[Profiler] = None,
 ) -> Tuple[bool, Optional[str]]:
     """
     Get relevant context for a query.
@@ -135,51 +442,137 @@ def get_context(
     Args:
         query: User query
         openai_client: OpenAI client
-        qdrant_client: Qdrant client
+        qdrant_client: Qdrant service or multi-collection router
         top_k: Number of results to retrieve
         score_threshold: Similarity threshold
+        mmr: Over-fetch, rerank with MMR and merge adjacent chunks
+        fetch_multiplier: Candidates fetched per result when mmr is enabled
+        mmr_lambda: MMR relevance/diversity trade-off
+        max_context_tokens: Token budget for the context, or None for no limit
+        adaptive: Over-fetch and keep only hits close to the best one (top_k
+            becomes the maximum)
+        cutoff_ratio: Fraction of the best score a hit must reach when adaptive
+        cutoff_min_gap: Smallest score drop treated as a cut point when adaptive
+        stats: Dictionary to fill with the best retrieval score (top_score),
+            e.g. for model routing
+        text_store: Store to fetch chunk texts missing from the payloads
+        payload_fields: Payload fields to fetch with each hit, or None for all
+        window: Neighbouring chunks added on each side of every hit
+        profiler: Profiler timing the embedding and search stages
 
     Returns:
         Tuple of (context_found, context_text)
     """
+    breaker = (
+        qdrant_client.breaker if isinstance(qdrant_client, ResilientIndex) else None
+    )
+    if breaker is not None and breaker.is_open:
+        # Skip the query embedding too: there is nothing to search
+        logger.warning(
+            f"{EMOJI_ERROR} Qdrant is unavailable, answering without context"
+        )
+        return False, None
+
     try:
         # Generate query embedding
         logger.info(f"{EMOJI_SEARCH} Searching for relevant information...")
-        q_vec = openai_client.embed([query])[0]
+        with profile_stage(profiler, "embedding"):
+            q_vec = openai_client.embed_query(query)
 
         # Search for relevant chunks
-        results = qdrant_client.search(
-            q_vec, top_k=top_k, score_threshold=score_threshold
-        )
+        with profile_stage(profiler, "search"):
+            if mmr or adaptive:
+                candidates = qdrant_client.search(
+                    q_vec,
+                    top_k=top_k * fetch_multiplier,
+                    score_threshold=score_threshold,
+                    with_vectors=mmr,
+                    payload_fields=payload_fields,
+                )
+            else:
+                candidates = qdrant_client.search(
+                    q_vec,
+                    top_k=top_k,
+                    score_threshold=score_threshold,
+                    payload_fields=payload_fields,
+                )
+
+            if text_store is not None:
+                candidates = hydrate_results(
+                    candidates, text_store, qdrant_client.collection_name
+                )
+
+        baseline_tokens = 0
+        if stats is not None:
+            stats["top_score"] = candidates[0][1] if candidates else 0.0
+
+        if adaptive:
+            # Context a fixed top_k would have used, to report the savings
+            _, baseline_tokens, _ = pack_context(
+                [result[:3] for result in candidates[:top_k]],
+                max_tokens=max_context_tokens,
+            )
+            # Cut over all candidates; MMR or top_k sets the final size
+            candidates = adaptive_cutoff(
+                candidates,
+                len(candidates),
+                min_ratio=cutoff_ratio,
+                min_gap=cutoff_min_gap,
+            )
+
+        if mmr:
+            results = diversify_results(
+                q_vec, candidates, top_k, lambda_mult=mmr_lambda
+            )
+        else:
+            results = candidates[:top_k]
 
         if not results:
             logger.info(f"{EMOJI_SEARCH} No relevant context found")
             return False, None
 
-        # Prepare context from search results
-        context_parts = []
-        for i, result in enumerate(results):
-            score = result[1]
-            text = result[2]["chunk_text"]
-            source_info = (
-                f" (from {result[2].get('source', 'unknown source')})"
-                if "source" in result[2]
-                else ""
-            )
-            model_info = (
-                f" [model: {result[2].get('model_name', 'unknown model')}]"
-                if "model_name" in result[2]
-                else ""
-            )
-            context_parts.append(
-                f"Context {i+1} (Relevance: {score:.2f}){source_info}{model_info}: {text}"
+        if window > 0:
+            # Small chunks match precisely; their neighbours complete the passage
+            with profile_stage(profiler, "search"):
+                neighbors = fetch_neighbors(
+                    results,
+                    lambda ids: qdrant_client.retrieve(
+                        ids, payload_fields=payload_fields
+                    ),
+                    window,
+                )
+                if text_store is not None:
+                    neighbors = hydrate_results(
+                        neighbors, text_store, qdrant_client.collection_name
+                    )
+            results = merge_adjacent_chunks(
+                [result[:3] for result in results] + neighbors
             )
 
-        context = "\n\n".join(context_parts)
-        logger.info(f"{EMOJI_CONTEXT} Found {len(results)} relevant context chunks")
+        # Pack context from search results within the token budget
+        context, tokens_used, chunks_used = pack_context(
+            results, max_tokens=max_context_tokens
+        )
+        if not chunks_used:
+            logger.info(f"{EMOJI_SEARCH} No context fits the token budget")
+            return False, None
+
+        logger.info(
+            f"{EMOJI_CONTEXT} Using {chunks_used} of {len(results)} relevant context "
+            f"chunks ({tokens_used} tokens)"
+        )
+        if adaptive:
+            logger.info(
+                f"{EMOJI_CONTEXT} Adaptive cutoff saved "
+                f"{max(0, baseline_tokens - tokens_used)} prompt tokens"
+            )
 
         return True, context
 
+    except (CircuitOpenError, DeadlineExceeded) as e:
+        logger.warning(f"{EMOJI_ERROR} {str(e)}, answering without context")
+        return False, None
+
     except Exception as e:
         logger.error(f"{EMOJI_ERROR} Error retrieving context: {str(e)}")
         return False, None
@@ -187,9 +580,22 @@ def get_context(
 
 def chat_loop(
     openai_client: OpenAIClient,
-    qdrant_client: Optional[QdrantService] = None,
+    qdrant_client: Optional[SearchIndex] = None,
     top_k: int = 3,
     score_threshold: float = 0.3,
+    mmr: bool = False,
+    fetch_multiplier: int = DEFAULT_MMR_FETCH_MULTIPLIER,
+    mmr_lambda: float = DEFAULT_MMR_LAMBDA,
+    max_context_tokens: Optional[int] = DEFAULT_CONTEXT_TOKENS,
+    adaptive: bool = False,
+    cutoff_ratio: float = DEFAULT_CUTOFF_RATIO,
+    cutoff_min_gap: float = DEFAULT_CUTOFF_MIN_GAP,
+    model_router: Optional[ChatModelRouter] = None,
+    retrieval_gate: Optional[RetrievalGate] = None,
+    text_store: Optional[ChunkTextStore] = None,
+    payload_fields: Optional[List[str]] = None,
+    window: int = 0,
+    profiler: Optional[Profiler] = None,
 ) -> None:
     """
     Run the interactive chat loop.
@@ -199,6 +605,21 @@ def chat_loop(
         qdrant_client: Qdrant client (or None to disable context)
         top_k: Number of context chunks to retrieve
         score_threshold: Similarity threshold for context retrieval
+        mmr: Rerank context with MMR and merge adjacent chunks
+        fetch_multiplier: Candidates fetched per context chunk for MMR
+        mmr_lambda: MMR relevance/diversity trade-off
+        max_context_tokens: Token budget for retrieved context
+        adaptive: Keep only context chunks close to the best match
+        cutoff_ratio: Fraction of the best score a chunk must reach when adaptive
+        cutoff_min_gap: Smallest score drop treated as a cut point when adaptive
+        model_router: Router picking the chat model per question, or None to
+            always use the client's chat model
+        retrieval_gate: Gate skipping retrieval for turns that need no
+            context, or None to retrieve for every turn
+        text_store: Store to fetch chunk texts missing from the payloads
+        payload_fields: Payload fields to fetch with each hit, or None for all
+        window: Neighbouring chunks added on each side of every hit
+        profiler: Profiler timing the embedding, search and completion stages
     """
     print(
         "\nChat with OpenAI (type 'exit' to quit, 'reset' to clear conversation history):"
@@ -211,6 +632,10 @@ def chat_loop(
     else:
         print(f"\n{EMOJI_AI} = AI knowledge (no context retrieval enabled)")
 
+    # Context of the last retrieval, reused for follow-ups on the same topic
+    last_context_found, last_context = False, None
+    last_stats: Dict[str, Any] = {}
+
     while True:
         # Get user query
         try:
@@ -225,6 +650,8 @@ def chat_loop(
             break
         elif query.lower() == "reset":
             openai_client.reset_conversation()
+            if retrieval_gate:
+                retrieval_gate.reset()
             print(f"\n{EMOJI_AI} Conversation history has been reset.")
             continue
 
@@ -233,25 +660,71 @@ def chat_loop(
 
         # Try to find relevant context if available
         context_found = False
-        if qdrant_client:
+        retrieved = False
+        retrieval_stats: Dict[str, Any] = {}
+        decision = RETRIEVE
+        if qdrant_client and retrieval_gate:
+            decision, _ = retrieval_gate.decide(query)
+        if qdrant_client and decision == REUSE:
+            context_found, context = last_context_found, last_context
+            retrieval_stats = dict(last_stats)
+            retrieved = True
+        elif qdrant_client and decision == RETRIEVE:
+            start = time.perf_counter()
             context_found, context = get_context(
                 query,
                 openai_client,
                 qdrant_client,
                 top_k=top_k,
                 score_threshold=score_threshold,
+                mmr=mmr,
+                fetch_multiplier=fetch_multiplier,
+                mmr_lambda=mmr_lambda,
+                max_context_tokens=max_context_tokens,
+                adaptive=adaptive,
+                cutoff_ratio=cutoff_ratio,
+                cutoff_min_gap=cutoff_min_gap,
+                stats=retrieval_stats,
+                text_store=text_store,
+                payload_fields=payload_fields,
+                window=window,
+                profiler=profiler,
+            )
+            if retrieval_gate:
+                retrieval_gate.record_retrieval(query, time.perf_counter() - start)
+            last_context_found, last_context = context_found, context
+            last_stats = dict(retrieval_stats)
+            retrieved = True
+
+        # Context goes after the history so the prompt prefix stays cacheable
+        turn_context = None
+        if context_found:
+            turn_context = (
+                f"Here is some relevant context to help answer the question. "
+                f"Use this information if it's helpful for answering the question:\n{context}"
             )
 
-            if context_found:
-                # Add context to chat as system message
-                openai_client.add_system_message(
-                    f"Here is some relevant context to help answer the question. "
-                    f"Use this information if it's helpful for answering the question:\n{context}"
-                )
+        model = None
+        if model_router:
+            turn = sum(
+                1 for m in openai_client.conversation_history if m["role"] == "user"
+            )
+            model = model_router.route(
+                query,
+                top_score=retrieval_stats.get("top_score"),
+                context_found=context_found if retrieved else None,
+                turn=turn - 1,
+            )
 
         # Get response from the model
         try:
-            response = openai_client.get_response(temperature=0.7)
+            start = time.perf_counter()
+            with profile_stage(profiler, "completion"):
+                response = openai_client.get_response(
+                    temperature=0.7, context=turn_context, model=model
+                )
+            if model_router and model is not None:
+                model_router.record_latency(model, time.perf_counter() - start)
             if context_found:
                 print(f"\n{EMOJI_CONTEXT} AI: {response}")
             else:
@@ -262,16 +735,19 @@ def chat_loop(
             continue
 
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None) -> int:
     """
     Main entry point for the chat command.
 
+    Args:
+        argv: Command-line arguments, defaults to sys.argv
+
     Returns:
         Exit code (0 for success, 1 for error)
     """
     # Parse arguments
     parser = setup_argparse()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Configure logging
     log_level = logging.DEBUG if args.verbose else logging.INFO
@@ -284,9 +760,21 @@ def main() -> int:
         logger.error("Environment validation failed")
         return 1
 
+    profiler = None
+    if args.profile:
+        profiler = Profiler(args.profile, command="chat", output_dir=args.profile_dir)
+        profiler.start()
+
+    qdrant_client = None
     try:
         # Initialize clients
         openai_client, qdrant_client = initialize_clients(args)
+        model_router = initialize_model_router(args)
+        retrieval_gate = (
+            None
+            if args.no_gate
+            else RetrievalGate(reuse_similarity=args.gate_reuse_similarity)
+        )
 
         # Run chat loop
         chat_loop(
@@ -294,14 +782,52 @@ def main() -> int:
             qdrant_client=qdrant_client,
             top_k=args.top_k,
             score_threshold=args.threshold,
+            mmr=args.mmr,
+            fetch_multiplier=args.fetch_multiplier,
+            mmr_lambda=args.mmr_lambda,
+            max_context_tokens=args.context_tokens,
+            adaptive=args.adaptive,
+            cutoff_ratio=args.cutoff_ratio,
+            cutoff_min_gap=args.cutoff_min_gap,
+            model_router=model_router,
+            retrieval_gate=retrieval_gate,
+            text_store=ChunkTextStore(args.text_store) if args.text_store else None,
+            payload_fields=args.payload_fields,
+            window=args.window,
+            profiler=profiler,
         )
 
+        if model_router:
+            for model, entry in model_router.stats().items():
+                logger.info(
+                    f"{model}: {entry['turns']} turns, p50 {entry['p50_ms']:.0f} ms, "
+                    f"p95 {entry['p95_ms']:.0f} ms"
+                )
+
+        callers = [openai_client.resilience]
+        if isinstance(qdrant_client, ResilientIndex):
+            callers.append(qdrant_client.caller)
+        for caller in callers:
+            if isinstance(caller, ResilientCaller):
+                logger.info(f"{caller.name} calls: {caller.stats()}")
+
+        if args.usage_report:
+            print(openai_client.usage.render(args.usage_report))
+
         return 0
 
     except Exception as e:
         logger.error(f"Error in chat application: {str(e)}", exc_info=True)
         return 1
 
+    finally:
+        index = getattr(qdrant_client, "index", qdrant_client)
+        if isinstance(index, CollectionRouter):
+            index.close()
+        if profiler is not None:
+            profiler.write()
+            profiler.stop()
+
 
 if __name__ == "__main__":
     sys.exit(main())
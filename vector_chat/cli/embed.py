@@ -3,26 +3,78 @@ Command-line interface for embedding text into vector database.
 """
 
 import argparse
-import copy
+import hashlib
+import json
 import logging
+import os
 import sys
+import time
 from typing import List, Optional
 
+from vector_chat.cli.options import add_transport_arguments
 from vector_chat.clients import OpenAIClient
 from vector_chat.config import (
     AVAILABLE_EMBEDDING_MODELS,
+    BATCH_DIR,
+    BATCH_POLL_INTERVAL,
+    DEDUP_INDEX_DIR,
+    DEDUP_MAX_DISTANCE,
     DEFAULT_EMBEDDING_MODEL,
     DEFAULT_MAX_SENTENCES_PER_CHUNK,
+    EMBEDDING_DIMENSIONS,
+    INGEST_BATCH_SIZE,
+    JOURNAL_PATH,
+    PROFILE_DIR,
+    PROFILE_MODES,
     QDRANT_COLLECTION,
+    QDRANT_PREFER_GRPC,
+    TEXT_STORE_PATH,
+    WATCH_DEBOUNCE_SECONDS,
+    WATCH_POLL_INTERVAL,
+    WATCH_STATE_DIR,
     validate_environment,
 )
+from vector_chat.fakes import FakeOpenAI
+from vector_chat.services.batch_embedding import (
+    BATCH_IDS_FILE,
+    find_result_files,
+    load_batch_payloads,
+    read_batch_results,
+    result_file_path,
+    submit_batch_files,
+    wait_for_batches,
+    write_batch_payloads,
+    write_batch_requests,
+)
 from vector_chat.services.chunker import (
-    chunk_text,
+    ChunkBatch,
     list_text_files,
+    make_chunk_id,
     process_file,
     read_file_content,
 )
+from vector_chat.services.dedup import SimHashIndex, deduplicate_chunks
+from vector_chat.services.embeddings import is_local_model
+from vector_chat.services.journal import (
+    BATCH_EMBEDDED,
+    BATCH_UPSERTED,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_RUNNING,
+    IngestJournal,
+)
+from vector_chat.services.profiling import Profiler, profile_stage
 from vector_chat.services.qdrant_service import QdrantService
+from vector_chat.services.rate_limiter import BULK
+from vector_chat.services.text_store import ChunkTextStore
+from vector_chat.services.usage import UsageTracker
+from vector_chat.services.watcher import (
+    DELETED,
+    DirectoryWatcher,
+    IngestMetrics,
+    WatchState,
+    file_digest,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +97,7 @@ def setup_argparse() -> argparse.ArgumentParser:
     parser.add_argument(
         "-m",
         "--model",
-        help=f"Embedding model to use (default: {DEFAULT_EMBEDDING_MODEL})",
+        help=f"Embedding model to use; local-* models run on the CPU without API calls (default: {DEFAULT_EMBEDDING_MODEL})",
         choices=AVAILABLE_EMBEDDING_MODELS,
         default=DEFAULT_EMBEDDING_MODEL,
     )
@@ -65,6 +117,135 @@ def setup_argparse() -> argparse.ArgumentParser:
         default=DEFAULT_MAX_SENTENCES_PER_CHUNK,
     )
 
+    parser.add_argument(
+        "--dedup",
+        help="Skip chunks that are near-duplicates of already embedded ones",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--dedup-distance",
+        help=f"Maximum SimHash bit distance for near-duplicates (default: {DEDUP_MAX_DISTANCE})",
+        type=int,
+        default=DEDUP_MAX_DISTANCE,
+    )
+
+    add_transport_arguments(parser)
+
+    parser.add_argument(
+        "--shard-number",
+        help="Number of shards when creating the collection",
+        type=int,
+    )
+
+    parser.add_argument(
+        "--replication-factor",
+        help="Number of replicas per shard when creating the collection",
+        type=int,
+    )
+
+    parser.add_argument(
+        "--shard-key",
+        help="Store chunks under this custom shard key (e.g. a tenant name)",
+    )
+
+    parser.add_argument(
+        "--text-store",
+        help="Keep chunk text in a local SQLite store instead of the Qdrant "
+        f"payload (default path: {TEXT_STORE_PATH})",
+        nargs="?",
+        const=TEXT_STORE_PATH,
+        metavar="PATH",
+    )
+
+    parser.add_argument(
+        "--watch",
+        help="Keep ingesting a directory: embed created and modified text "
+        "files and delete the chunks of removed ones",
+        metavar="DIR",
+    )
+
+    parser.add_argument(
+        "--debounce",
+        help=f"Seconds of quiet before a burst of changes is ingested with --watch (default: {WATCH_DEBOUNCE_SECONDS})",
+        type=float,
+        default=WATCH_DEBOUNCE_SECONDS,
+    )
+
+    parser.add_argument(
+        "--watch-interval",
+        help=f"Seconds between directory scans with --watch (default: {WATCH_POLL_INTERVAL})",
+        type=float,
+        default=WATCH_POLL_INTERVAL,
+    )
+
+    parser.add_argument(
+        "--metrics-file",
+        help="Write --watch throughput and lag metrics to this JSON file",
+    )
+
+    parser.add_argument(
+        "--once",
+        help="With --watch, ingest the pending changes and exit",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--batch-api",
+        help="Embed through the OpenAI Batch API instead of synchronous calls",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--batch-mode",
+        help="Batch API step: run everything, only export or submit requests, "
+        "or import finished results (default: run)",
+        choices=["run", "export", "submit", "import"],
+        default="run",
+    )
+
+    parser.add_argument(
+        "--batch-dir",
+        help=f"Directory for batch request and result files, required with --batch-mode import (default: new directory in {BATCH_DIR})",
+    )
+
+    parser.add_argument(
+        "--poll-interval",
+        help=f"Seconds between batch status checks (default: {BATCH_POLL_INTERVAL})",
+        type=float,
+        default=BATCH_POLL_INTERVAL,
+    )
+
+    parser.add_argument(
+        "--local-batch",
+        help="Use a local stand-in for the Batch API (offline testing)",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--resume",
+        help="Resume a failed ingestion job from its last committed batch",
+        metavar="JOB_ID",
+    )
+
+    parser.add_argument(
+        "--list-jobs",
+        help="List recorded ingestion jobs",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--no-journal",
+        help="Do not checkpoint this run in the job journal",
+        action="store_true",
+    )
+
+    parser.add_argument(
+        "--usage-report",
+        help="Print token usage and cost of the run when done",
+        choices=["text", "json"],
+    )
+
     parser.add_argument(
         "-l",
         "--list-files",
@@ -72,6 +253,19 @@ def setup_argparse() -> argparse.ArgumentParser:
         action="store_true",
     )
 
+    parser.add_argument(
+        "--profile",
+        help="Profile chunking, embedding and upsert (CPU with cProfile, memory "
+        "with tracemalloc, or both) and write the profiles and a summary",
+        choices=PROFILE_MODES,
+    )
+
+    parser.add_argument(
+        "--profile-dir",
+        help=f"Directory for --profile output (default: {PROFILE_DIR})",
+        default=PROFILE_DIR,
+    )
+
     parser.add_argument("--verbose", help="Enable verbose logging", action="store_true")
 
     return parser
@@ -144,6 +338,19 @@ def embed_text(
     model_name: str,
     collection_name: str,
     max_sentences: int,
+    prefer_grpc: bool = QDRANT_PREFER_GRPC,
+    dedup: bool = False,
+    dedup_distance: int = DEDUP_MAX_DISTANCE,
+    journal: Optional[IngestJournal] = None,
+    job_id: Optional[str] = None,
+    batch_size: int = INGEST_BATCH_SIZE,
+    shard_number: Optional[int] = None,
+    replication_factor: Optional[int] = None,
+    shard_key: Optional[str] = None,
+    usage_tracker: Optional[UsageTracker] = None,
+    text_store: Optional[ChunkTextStore] = None,
+    chunk_batch: Optional[ChunkBatch] = None,
+    profiler: Optional[Profiler] = None,
 ) -> bool:
     """
     Embed text chunks and store in vector database.
@@ -154,71 +361,599 @@ def embed_text(
         model_name: Name of the embedding model
         collection_name: Name of the Qdrant collection
         max_sentences: Maximum sentences per chunk
+        prefer_grpc: Use gRPC transport for Qdrant
+        dedup: Skip near-duplicates of chunks already in the collection
+        dedup_distance: Maximum SimHash bit distance for near-duplicates
+        journal: Job journal for checkpointing, or None to disable
+        job_id: ID of a journaled job to resume (a new job is created if None)
+        batch_size: Number of chunks embedded and upserted per checkpoint
+        shard_number: Number of shards if the collection is created
+        replication_factor: Number of replicas per shard if the collection is created
+        shard_key: Custom shard key to store the chunks under
+        usage_tracker: Tracker to record embedding token usage in
+        text_store: Store for the chunk texts, which are then left out of the
+            Qdrant payloads
+        chunk_batch: Chunks of the text if already computed (chunked here
+            if None)
+        profiler: Profiler timing the chunking, embedding and upsert stages
 
     Returns:
         True if successful, False otherwise
     """
+    if journal is not None:
+        if job_id is None:
+            job_id = journal.create_job(
+                {
+                    "source_name": source_name,
+                    "model_name": model_name,
+                    "collection_name": collection_name,
+                    "max_sentences": max_sentences,
+                    "dedup": dedup,
+                    "dedup_distance": dedup_distance,
+                    "batch_size": batch_size,
+                    "shard_key": shard_key,
+                    "text_store": text_store.path if text_store else None,
+                },
+                text,
+            )
+        else:
+            journal.set_status(job_id, JOB_RUNNING)
+    if usage_tracker is not None and usage_tracker.scope is None:
+        usage_tracker.scope = f"job {job_id}" if job_id else source_name
+
     try:
-        # Initialize OpenAI client
-        openai_client = OpenAIClient(embedding_model=model_name)
+        # Initialize OpenAI client (ingestion leaves part of the shared rate
+        # limit to chat sessions)
+        openai_client = OpenAIClient(
+            embedding_model=model_name, usage_tracker=usage_tracker, priority=BULK
+        )
 
         # Process text into chunks
-        chunks_data = chunk_text(text, max_sentences, source_name)
-        chunks = [item["chunk_text"] for item in chunks_data]
+        if chunk_batch is None:
+            with profile_stage(profiler, "chunking"):
+                chunk_batch = ChunkBatch.from_text(text, max_sentences, source_name)
 
-        if not chunks:
+        if not len(chunk_batch):
             logger.error("No chunks generated from text")
             return False
 
-        logger.info(f"Text chunked into {len(chunks)} segments")
-        for i, chunk in enumerate(chunks):
+        logger.info(f"Text chunked into {len(chunk_batch)} segments")
+        for i, chunk in enumerate(chunk_batch.texts):
             logger.debug(f"Chunk {i+1}: {chunk[:50]}...")
 
-        # Generate embeddings
-        logger.info(f"Generating embeddings using {model_name}...")
-        vectors = openai_client.embed(chunks)
-
-        # Prepare payloads with metadata
-        ids = list(range(1, len(chunks) + 1))
-        payloads = [
-            {
-                "chunk_text": chunk["chunk_text"],
-                "source": chunk["source"],
-                "model_name": model_name,
-                "chunk_index": chunk["chunk_index"],
-                "total_chunks": chunk["total_chunks"],
-            }
-            for chunk in chunks_data
-        ]
-
-        # Initialize Qdrant and store vectors
+        # Initialize Qdrant
         qdrant = QdrantService(
             collection_name=collection_name,
             vector_size=openai_client.embedding_dimension,
+            prefer_grpc=prefer_grpc,
+            shard_number=shard_number,
+            replication_factor=replication_factor,
+            shard_key=shard_key,
         )
 
-        qdrant.upsert(ids, vectors, copy.deepcopy(payloads))
+        # Drop near-duplicates before paying for their embeddings
+        dedup_index = None
+        stale_ids: List[str] = []
+        if dedup:
+            index_path = dedup_index_path(collection_name)
+            dedup_index = SimHashIndex.load(index_path, max_distance=dedup_distance)
+            if len(dedup_index) and (qdrant.created or qdrant.is_empty()):
+                # The fingerprints describe points that are gone
+                logger.info(
+                    f"Collection '{collection_name}' is empty, "
+                    "resetting its fingerprint index"
+                )
+                dedup_index = SimHashIndex(max_distance=dedup_distance)
+            kept, duplicates = deduplicate_chunks(
+                chunk_batch.texts, chunk_batch.ids, dedup_index
+            )
+            logger.info(
+                f"Skipped {len(duplicates)} near-duplicate chunks, "
+                f"{len(kept)} left to embed"
+            )
+            # Chunks now duplicating another chunk may still have a point
+            # with their previous text under their own ID
+            stale_ids = [
+                chunk_batch.ids[i]
+                for i, original_id in duplicates.items()
+                if original_id != str(chunk_batch.ids[i])
+            ]
+            chunk_batch = chunk_batch.select(kept)
+            if not len(chunk_batch) and not stale_ids:
+                dedup_index.save(index_path)
+                if journal is not None and job_id is not None:
+                    journal.set_status(job_id, JOB_COMPLETED)
+                logger.info("All chunks are already embedded")
+                return True
+
+        if stale_ids:
+            qdrant.delete(stale_ids)
+            if text_store is not None:
+                text_store.delete_many(collection_name, stale_ids)
+
+        # Embed and store batch by batch, checkpointing each step
+        logger.info(f"Generating embeddings using {model_name}...")
+        for batch_index, start in enumerate(range(0, len(chunk_batch), batch_size)):
+            state = None
+            if journal is not None and job_id is not None:
+                state = journal.batch_state(job_id, batch_index)
+            if state == BATCH_UPSERTED:
+                logger.info(f"Batch {batch_index} already stored, skipping")
+                continue
+
+            part = chunk_batch.slice(start, start + batch_size)
+            if state == BATCH_EMBEDDED:
+                assert journal is not None and job_id is not None
+                logger.info(f"Batch {batch_index} reusing journaled embeddings")
+                part.vectors = journal.load_embeddings(job_id, batch_index)
+            else:
+                with profile_stage(profiler, "embedding"):
+                    part.vectors = openai_client.embed(part.texts)
+                if journal is not None and job_id is not None:
+                    journal.save_embeddings(job_id, batch_index, part.vectors)
+
+            with profile_stage(profiler, "upsert"):
+                if text_store is not None:
+                    # Texts go first, so no stored point lacks its text
+                    text_store.put_many(collection_name, zip(part.ids, part.texts))
+
+                # Payloads are built for this batch only and handed over as is
+                qdrant.upsert_batch(
+                    part.ids,
+                    part.vectors,
+                    part.payloads(model_name, with_text=text_store is None),
+                )
+            if journal is not None and job_id is not None:
+                journal.mark_upserted(job_id, batch_index)
+
+        if dedup_index is not None:
+            dedup_index.save(index_path)
+        if journal is not None and job_id is not None:
+            journal.set_status(job_id, JOB_COMPLETED)
 
         logger.info(
-            f"Successfully embedded {len(chunks)} chunks into collection '{collection_name}'"
+            f"Successfully embedded {len(chunk_batch)} chunks into collection '{collection_name}'"
         )
         return True
 
     except Exception as e:
         logger.error(f"Error embedding text: {str(e)}", exc_info=True)
+        if journal is not None and job_id is not None:
+            journal.set_status(job_id, JOB_FAILED)
+            logger.info(f"Resume this job with: embed --resume {job_id}")
+        return False
+
+
+def dedup_index_path(collection_name: str) -> str:
+    """
+    Get the path of the fingerprint index of a collection.
+
+    Args:
+        collection_name: Name of the Qdrant collection
+
+    Returns:
+        Path of the index file
+    """
+    return os.path.join(DEDUP_INDEX_DIR, f"{collection_name}.json")
+
+
+def sync_file(
+    kind: str,
+    rel_path: str,
+    directory: str,
+    state: WatchState,
+    model_name: str,
+    collection_name: str,
+    max_sentences: int,
+    prefer_grpc: bool = QDRANT_PREFER_GRPC,
+    dedup: bool = False,
+    dedup_distance: int = DEDUP_MAX_DISTANCE,
+    shard_number: Optional[int] = None,
+    replication_factor: Optional[int] = None,
+    shard_key: Optional[str] = None,
+    text_store: Optional[ChunkTextStore] = None,
+    usage_tracker: Optional[UsageTracker] = None,
+    profiler: Optional[Profiler] = None,
+) -> Optional[int]:
+    """
+    Bring the chunks of one watched file up to date.
+
+    Created and modified files are re-chunked and re-embedded; chunks past
+    the new end of a shrunk file and all chunks of a deleted file are
+    removed.
+
+    Args:
+        kind: Change kind (created, modified or deleted)
+        rel_path: Path of the file relative to the watched directory
+        directory: Watched directory
+        state: Watch state, updated on success
+        model_name: Name of the embedding model
+        collection_name: Name of the Qdrant collection
+        max_sentences: Maximum sentences per chunk
+        prefer_grpc: Use gRPC transport for Qdrant
+        dedup: Skip near-duplicates of chunks already in the collection
+        dedup_distance: Maximum SimHash bit distance for near-duplicates
+        shard_number: Number of shards if the collection is created
+        replication_factor: Number of replicas per shard if the collection is created
+        shard_key: Custom shard key to store the chunks under
+        text_store: Store for the chunk texts, if used
+        usage_tracker: Tracker to record embedding token usage in
+        profiler: Profiler timing the ingest stages
+
+    Returns:
+        Number of chunks embedded, or None on failure
+    """
+    path = os.path.join(directory, rel_path)
+    source = os.path.normpath(path)
+    old_total = state.files.get(rel_path, {}).get("total_chunks", 0)
+
+    new_total = 0
+    if kind != DELETED:
+        stat = os.stat(path)
+        digest = file_digest(path)
+        text = read_file_content(path) or ""
+        with profile_stage(profiler, "chunking"):
+            chunk_batch = ChunkBatch.from_text(text, max_sentences, source)
+        new_total = len(chunk_batch)
+        if new_total and not embed_text(
+            text=text,
+            source_name=source,
+            model_name=model_name,
+            collection_name=collection_name,
+            max_sentences=max_sentences,
+            prefer_grpc=prefer_grpc,
+            dedup=dedup,
+            dedup_distance=dedup_distance,
+            shard_number=shard_number,
+            replication_factor=replication_factor,
+            shard_key=shard_key,
+            usage_tracker=usage_tracker,
+            text_store=text_store,
+            chunk_batch=chunk_batch,
+            profiler=profiler,
+        ):
+            return None
+
+    if old_total > new_total:
+        qdrant = QdrantService(
+            collection_name=collection_name,
+            vector_size=EMBEDDING_DIMENSIONS.get(model_name),
+            prefer_grpc=prefer_grpc,
+            shard_number=shard_number,
+            replication_factor=replication_factor,
+            shard_key=shard_key,
+        )
+        qdrant.delete_chunks(source, from_index=new_total)
+        removed_ids = [make_chunk_id(source, i) for i in range(new_total, old_total)]
+        if text_store is not None:
+            text_store.delete_many(collection_name, removed_ids)
+        if dedup:
+            # Removed chunks must not count as already embedded if they return
+            index_path = dedup_index_path(collection_name)
+            dedup_index = SimHashIndex.load(index_path, max_distance=dedup_distance)
+            for chunk_id in removed_ids:
+                dedup_index.remove(chunk_id)
+            dedup_index.save(index_path)
+
+    if kind == DELETED:
+        state.files.pop(rel_path, None)
+    else:
+        state.files[rel_path] = {
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "digest": digest,
+            "total_chunks": new_total,
+        }
+    state.save()
+    return new_total
+
+
+def watch_directory(
+    directory: str,
+    model_name: str,
+    collection_name: str,
+    max_sentences: int,
+    prefer_grpc: bool = QDRANT_PREFER_GRPC,
+    dedup: bool = False,
+    dedup_distance: int = DEDUP_MAX_DISTANCE,
+    shard_number: Optional[int] = None,
+    replication_factor: Optional[int] = None,
+    shard_key: Optional[str] = None,
+    text_store: Optional[ChunkTextStore] = None,
+    debounce: float = WATCH_DEBOUNCE_SECONDS,
+    poll_interval: float = WATCH_POLL_INTERVAL,
+    metrics_file: Optional[str] = None,
+    once: bool = False,
+    state: Optional[WatchState] = None,
+    usage_tracker: Optional[UsageTracker] = None,
+    profiler: Optional[Profiler] = None,
+) -> IngestMetrics:
+    """
+    Keep a collection in sync with the text files of a directory.
+
+    Changes made while the watcher was not running are picked up at start,
+    from the state saved per directory and collection.
+
+    Args:
+        directory: Directory to watch (recursively)
+        model_name: Name of the embedding model
+        collection_name: Name of the Qdrant collection
+        max_sentences: Maximum sentences per chunk
+        prefer_grpc: Use gRPC transport for Qdrant
+        dedup: Skip near-duplicates of chunks already in the collection
+        dedup_distance: Maximum SimHash bit distance for near-duplicates
+        shard_number: Number of shards if the collection is created
+        replication_factor: Number of replicas per shard if the collection is created
+        shard_key: Custom shard key to store the chunks under
+        text_store: Store for the chunk texts, if used
+        debounce: Seconds of quiet before a burst of changes is ingested
+        poll_interval: Seconds between scans when no file event arrives
+        metrics_file: JSON file to write the metrics to after every change
+        once: Ingest the pending changes and return
+        state: Watch state (loaded from WATCH_STATE_DIR if None)
+        usage_tracker: Tracker to record embedding token usage in
+        profiler: Profiler timing the ingest stages
+
+    Returns:
+        Ingestion metrics
+    """
+    if state is None:
+        # One state per directory and collection
+        key = hashlib.sha1(
+            f"{os.path.abspath(directory)}|{collection_name}".encode("utf-8")
+        ).hexdigest()[:16]
+        state = WatchState.load(os.path.join(WATCH_STATE_DIR, f"{key}.json"))
+    watcher = DirectoryWatcher(
+        directory, state, debounce=debounce, poll_interval=poll_interval
+    )
+    metrics = IngestMetrics()
+    if usage_tracker is not None and usage_tracker.scope is None:
+        usage_tracker.scope = directory
+    watcher.start()
+    try:
+        while True:
+            for kind, rel_path in watcher.changes():
+                detected = time.time()
+                start = time.perf_counter()
+                try:
+                    chunks = sync_file(
+                        kind,
+                        rel_path,
+                        directory,
+                        state,
+                        model_name,
+                        collection_name,
+                        max_sentences,
+                        prefer_grpc=prefer_grpc,
+                        dedup=dedup,
+                        dedup_distance=dedup_distance,
+                        shard_number=shard_number,
+                        replication_factor=replication_factor,
+                        shard_key=shard_key,
+                        text_store=text_store,
+                        usage_tracker=usage_tracker,
+                        profiler=profiler,
+                    )
+                except Exception as e:
+                    logger.error(f"Error syncing {rel_path}: {str(e)}")
+                    chunks = None
+                if chunks is None:
+                    metrics.errors += 1
+                    continue
+
+                if kind == DELETED:
+                    metrics.deleted += 1
+                    changed_at = detected
+                else:
+                    changed_at = state.files[rel_path]["mtime"]
+                lag = time.time() - changed_at
+                metrics.record(chunks, time.perf_counter() - start, lag)
+                logger.info(
+                    f"{kind.capitalize()} {rel_path}: {chunks} chunks, "
+                    f"searchable {lag:.1f}s after the change"
+                )
+                if metrics_file:
+                    with open(metrics_file, "w", encoding="utf-8") as f:
+                        json.dump(metrics.summary(), f, indent=2)
+
+            if once:
+                break
+            watcher.wait()
+    except KeyboardInterrupt:
+        logger.info("Stopping watcher")
+    finally:
+        watcher.stop()
+        logger.info(f"Watch metrics: {json.dumps(metrics.summary())}")
+    return metrics
+
+
+def embed_text_batch_api(
+    text: str,
+    source_name: str,
+    model_name: str,
+    collection_name: str,
+    max_sentences: int,
+    batch_dir: str,
+    mode: str = "run",
+    openai_client: Optional[OpenAIClient] = None,
+    prefer_grpc: bool = QDRANT_PREFER_GRPC,
+    poll_interval: float = BATCH_POLL_INTERVAL,
+) -> bool:
+    """
+    Embed text chunks through the Batch API and store them in the vector database.
+
+    Args:
+        text: Text to embed
+        source_name: Name of the source
+        model_name: Name of the embedding model
+        collection_name: Name of the Qdrant collection
+        max_sentences: Maximum sentences per chunk
+        batch_dir: Directory for request and result files
+        mode: "export" only writes requests, "submit" also submits them,
+            "run" additionally waits for and imports the results
+        openai_client: OpenAI client used to submit batches
+        prefer_grpc: Use gRPC transport for Qdrant
+        poll_interval: Seconds between batch status checks
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        chunk_batch = ChunkBatch.from_text(text, max_sentences, source_name)
+        if not len(chunk_batch):
+            logger.error("No chunks generated from text")
+            return False
+
+        request_paths = write_batch_requests(
+            chunk_batch.ids, chunk_batch.texts, model_name, batch_dir
+        )
+        write_batch_payloads(
+            chunk_batch.ids, chunk_batch.payloads(model_name), batch_dir
+        )
+        if mode == "export":
+            logger.info(f"Batch requests exported to {batch_dir}")
+            return True
+
+        openai_client = openai_client or OpenAIClient(embedding_model=model_name)
+        submit_batch_files(openai_client.client, request_paths)
+        if mode == "submit":
+            logger.info(
+                f"Batches submitted; import later with: "
+                f"embed --batch-api --batch-mode import --batch-dir {batch_dir}"
+            )
+            return True
+
+        return import_batch_results(
+            batch_dir,
+            collection_name,
+            openai_client=openai_client,
+            prefer_grpc=prefer_grpc,
+            poll_interval=poll_interval,
+        )
+
+    except Exception as e:
+        logger.error(
+            f"Error embedding text with the Batch API: {str(e)}", exc_info=True
+        )
         return False
 
 
-def main() -> int:
+def import_batch_results(
+    batch_dir: str,
+    collection_name: str,
+    openai_client: Optional[OpenAIClient] = None,
+    prefer_grpc: bool = QDRANT_PREFER_GRPC,
+    poll_interval: float = BATCH_POLL_INTERVAL,
+    upsert_batch_size: int = INGEST_BATCH_SIZE,
+) -> bool:
+    """
+    Load Batch API results from a batch directory into the vector database.
+
+    Batches submitted from the directory whose results are not downloaded
+    yet are waited for first. Results that did arrive are loaded even if
+    other batches or requests failed, but the import then reports failure.
+
+    Args:
+        batch_dir: Directory with payloads and result (or batch ID) files
+        collection_name: Name of the Qdrant collection
+        openai_client: OpenAI client used to poll submitted batches
+        prefer_grpc: Use gRPC transport for Qdrant
+        poll_interval: Seconds between batch status checks
+        upsert_batch_size: Number of points per upsert call
+
+    Returns:
+        True if every batch and request succeeded, False otherwise
+    """
+    try:
+        failed_batches: List[str] = []
+        failed_requests: List[str] = []
+        batch_ids_path = os.path.join(batch_dir, BATCH_IDS_FILE)
+        if os.path.exists(batch_ids_path):
+            with open(batch_ids_path, "r", encoding="utf-8") as f:
+                batch_ids = json.load(f)
+            pending = [
+                batch_id
+                for batch_id in batch_ids
+                if not os.path.exists(result_file_path(batch_dir, batch_id))
+            ]
+            if pending:
+                openai_client = openai_client or OpenAIClient()
+                wait_for_batches(
+                    openai_client.client,
+                    pending,
+                    batch_dir,
+                    poll_interval=poll_interval,
+                    failed=failed_batches,
+                )
+        result_paths = find_result_files(batch_dir)
+        if not result_paths:
+            logger.error(f"No batch results found in {batch_dir}")
+            return False
+
+        payloads = load_batch_payloads(batch_dir)
+        qdrant = None
+        ids: List[str] = []
+        vectors: List[List[float]] = []
+        loaded = 0
+        for chunk_id, vector in read_batch_results(result_paths, failed_requests):
+            if qdrant is None:
+                qdrant = QdrantService(
+                    collection_name=collection_name,
+                    vector_size=len(vector),
+                    prefer_grpc=prefer_grpc,
+                )
+            ids.append(chunk_id)
+            vectors.append(vector)
+            if len(ids) >= upsert_batch_size:
+                qdrant.upsert(ids, vectors, [payloads.get(i, {}) for i in ids])
+                loaded += len(ids)
+                ids, vectors = [], []
+        if ids and qdrant is not None:
+            qdrant.upsert(ids, vectors, [payloads.get(i, {}) for i in ids])
+            loaded += len(ids)
+
+        if failed_batches or failed_requests:
+            logger.error(
+                f"Loaded {loaded} batch embeddings into collection "
+                f"'{collection_name}', but {len(failed_batches)} batches and "
+                f"{len(failed_requests)} requests failed"
+            )
+            return False
+        logger.info(
+            f"Successfully loaded {loaded} batch embeddings into collection '{collection_name}'"
+        )
+        return loaded > 0
+
+    except Exception as e:
+        logger.error(f"Error importing batch results: {str(e)}", exc_info=True)
+        return False
+
+
+def report_usage(usage: UsageTracker, fmt: Optional[str]) -> None:
+    """
+    Print the usage report of a run if one was requested.
+
+    Args:
+        usage: Tracker of the run
+        fmt: Report format ("text" or "json"), or None for no report
+    """
+    if fmt:
+        print(usage.render(fmt))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     """
     Main entry point for the embed command.
 
+    Args:
+        argv: Command-line arguments, defaults to sys.argv
+
     Returns:
         Exit code (0 for success, 1 for error)
     """
     # Parse arguments
     parser = setup_argparse()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Configure logging
     log_level = logging.DEBUG if args.verbose else logging.INFO
@@ -226,11 +961,174 @@ def main() -> int:
         level=log_level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     )
 
-    # Validate environment
-    if not validate_environment():
+    if not args.profile:
+        return run_command(args)
+
+    profiler = Profiler(args.profile, command="embed", output_dir=args.profile_dir)
+    profiler.start()
+    try:
+        return run_command(args, profiler)
+    finally:
+        profiler.write()
+        profiler.stop()
+
+
+def run_command(args: argparse.Namespace, profiler: Optional[Profiler] = None) -> int:
+    """
+    Run the embed command for parsed arguments.
+
+    Args:
+        args: Parsed command-line arguments
+        profiler: Profiler timing the ingest stages, if profiling
+
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    # Validate environment (the local batch stand-in and local embedding
+    # models need no API key)
+    if args.batch_api and is_local_model(args.model):
+        logger.error(f"{args.model} runs locally and cannot use the Batch API")
+        return 1
+    if args.watch and args.batch_api:
+        logger.error("--watch is not supported with --batch-api")
+        return 1
+    if args.watch and args.resume:
+        logger.error("--watch is not supported with --resume")
+        return 1
+    if args.batch_api and args.text_store:
+        logger.error("--text-store is not supported with --batch-api")
+        return 1
+    if args.batch_api and args.batch_mode == "import" and not args.batch_dir:
+        logger.error("--batch-mode import needs the --batch-dir of the submitted run")
+        return 1
+    if args.local_batch and args.batch_mode in ("submit", "import"):
+        # The stand-in keeps its batches in memory, so they do not outlive
+        # the submitting process
+        logger.error(
+            "--local-batch only supports --batch-mode run and export, "
+            "not separate submit and import runs"
+        )
+        return 1
+    needs_api = not args.local_batch and not is_local_model(args.model)
+    if needs_api and not validate_environment():
         logger.error("Environment validation failed")
         return 1
 
+    journal = None if args.no_journal else IngestJournal(JOURNAL_PATH)
+    usage = UsageTracker()
+
+    # List jobs if requested
+    if args.list_jobs:
+        jobs = journal.list_jobs() if journal else []
+        for entry in jobs:
+            logger.info(
+                f"- {entry['job_id']} [{entry['status']}] {entry['source']} "
+                f"({entry['upserted_batches']} batches stored)"
+            )
+        if not jobs:
+            logger.info("No ingestion jobs recorded")
+        return 0
+
+    # Resume a previous job if requested
+    if args.resume:
+        job = journal.get_job(args.resume) if journal else None
+        if not job:
+            logger.error(f"Unknown ingestion job: {args.resume}")
+            return 1
+        if job["status"] == JOB_COMPLETED:
+            logger.info(f"Job {args.resume} already completed")
+            return 0
+        params = job["params"]
+        success = embed_text(
+            text=job["text"],
+            source_name=params["source_name"],
+            model_name=params["model_name"],
+            collection_name=params["collection_name"],
+            max_sentences=params["max_sentences"],
+            prefer_grpc=args.prefer_grpc,
+            dedup=params["dedup"],
+            dedup_distance=params["dedup_distance"],
+            journal=journal,
+            job_id=args.resume,
+            batch_size=params["batch_size"],
+            shard_key=params.get("shard_key"),
+            usage_tracker=usage,
+            text_store=(
+                ChunkTextStore(params["text_store"])
+                if params.get("text_store")
+                else None
+            ),
+            profiler=profiler,
+        )
+        report_usage(usage, args.usage_report)
+        return 0 if success else 1
+
+    # Batch API embedding
+    if args.batch_api:
+        batch_dir = args.batch_dir or os.path.join(
+            BATCH_DIR, time.strftime("%Y%m%d-%H%M%S")
+        )
+        openai_client = None
+        if args.local_batch:
+            openai_client = OpenAIClient(
+                embedding_model=args.model, client=FakeOpenAI(polls_until_complete=0)
+            )
+        if args.batch_mode == "import":
+            success = import_batch_results(
+                batch_dir,
+                args.collection,
+                openai_client=openai_client,
+                prefer_grpc=args.prefer_grpc,
+                poll_interval=args.poll_interval,
+            )
+            return 0 if success else 1
+
+        input_data = get_input_text(args)
+        if not input_data:
+            logger.error("No input text provided")
+            return 1
+        text, source = input_data
+        success = embed_text_batch_api(
+            text=text,
+            source_name=source,
+            model_name=args.model,
+            collection_name=args.collection,
+            max_sentences=args.sentences,
+            batch_dir=batch_dir,
+            mode=args.batch_mode,
+            openai_client=openai_client,
+            prefer_grpc=args.prefer_grpc,
+            poll_interval=args.poll_interval,
+        )
+        return 0 if success else 1
+
+    # Keep a directory in sync
+    if args.watch:
+        if not os.path.isdir(args.watch):
+            logger.error(f"Not a directory: {args.watch}")
+            return 1
+        metrics = watch_directory(
+            args.watch,
+            model_name=args.model,
+            collection_name=args.collection,
+            max_sentences=args.sentences,
+            prefer_grpc=args.prefer_grpc,
+            dedup=args.dedup,
+            dedup_distance=args.dedup_distance,
+            shard_number=args.shard_number,
+            replication_factor=args.replication_factor,
+            shard_key=args.shard_key,
+            text_store=ChunkTextStore(args.text_store) if args.text_store else None,
+            debounce=args.debounce,
+            poll_interval=args.watch_interval,
+            metrics_file=args.metrics_file,
+            once=args.once,
+            usage_tracker=usage,
+            profiler=profiler,
+        )
+        report_usage(usage, args.usage_report)
+        return 0 if not metrics.errors else 1
+
     # List files if requested
     if args.list_files:
         files = list_text_files()
@@ -257,7 +1155,18 @@ def main() -> int:
         model_name=args.model,
         collection_name=args.collection,
         max_sentences=args.sentences,
+        prefer_grpc=args.prefer_grpc,
+        dedup=args.dedup,
+        dedup_distance=args.dedup_distance,
+        journal=journal,
+        shard_number=args.shard_number,
+        replication_factor=args.replication_factor,
+        shard_key=args.shard_key,
+        usage_tracker=usage,
+        text_store=ChunkTextStore(args.text_store) if args.text_store else None,
+        profiler=profiler,
     )
+    report_usage(usage, args.usage_report)
 
     return 0 if success else 1
 
@@ -0,0 +1,285 @@
+"""
+Command-line interface for evaluating retrieval quality against latency.
+"""
+
+import argparse
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from vector_chat.cli.options import add_transport_arguments
+from vector_chat.clients import OpenAIClient
+from vector_chat.config import (
+    AVAILABLE_EMBEDDING_MODELS,
+    DEFAULT_EMBEDDING_MODEL,
+    QDRANT_COLLECTION,
+    TEXT_STORE_PATH,
+    validate_environment,
+)
+from vector_chat.services.evaluation import evaluate_retrieval, load_eval_set
+from vector_chat.services.qdrant_service import QdrantService
+from vector_chat.services.text_store import ChunkTextStore
+
+logger = logging.getLogger(__name__)
+
+
+def setup_argparse() -> argparse.ArgumentParser:
+    """
+    Set up command-line argument parser.
+
+    Returns:
+        Configured argument parser
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure recall@k, MRR and nDCG next to search latency and "
+        "index memory, for one or more collections and thresholds"
+    )
+
+    parser.add_argument(
+        "eval_set",
+        help="JSONL file of labeled queries (query, relevant_ids, "
+        "relevant_chunks and/or answers)",
+    )
+
+    parser.add_argument(
+        "--collections",
+        help=f"Collections to compare, e.g. built with different chunking or models (default: {QDRANT_COLLECTION})",
+        nargs="+",
+        default=[QDRANT_COLLECTION],
+    )
+
+    parser.add_argument(
+        "-e",
+        "--embedding-model",
+        help="Embedding model for the queries (default: the model recorded in "
+        f"each collection, else {DEFAULT_EMBEDDING_MODEL})",
+        choices=AVAILABLE_EMBEDDING_MODELS,
+    )
+
+    parser.add_argument(
+        "-t",
+        "--thresholds",
+        help="Similarity thresholds to compare (default: 0.0)",
+        type=float,
+        nargs="+",
+        default=[0.0],
+    )
+
+    parser.add_argument(
+        "-k",
+        "--k-values",
+        help="Cutoffs for recall@k and nDCG@k (default: 1 3 5 10)",
+        type=int,
+        nargs="+",
+        default=[1, 3, 5, 10],
+    )
+
+    parser.add_argument(
+        "--batch-size",
+        help="Queries per batched search request (default: 32)",
+        type=int,
+        default=32,
+    )
+
+    parser.add_argument(
+        "--output",
+        help="Report format (default: table)",
+        choices=["table", "json"],
+        default="table",
+    )
+
+    parser.add_argument(
+        "--text-store",
+        help="Match answer labels of collections embedded with --text-store "
+        f"against the chunk text in this store (default path: {TEXT_STORE_PATH})",
+        nargs="?",
+        const=TEXT_STORE_PATH,
+        metavar="PATH",
+    )
+
+    add_transport_arguments(parser)
+
+    parser.add_argument("--verbose", help="Enable verbose logging", action="store_true")
+
+    return parser
+
+
+SearchBatch = Callable[[np.ndarray, int, float], List[List[Tuple[Any, ...]]]]
+
+
+def sample_payload(qdrant: QdrantService) -> Optional[Dict[str, Any]]:
+    """
+    Get the payload of the first point in a collection.
+
+    Args:
+        qdrant: Service bound to the collection
+
+    Returns:
+        Payload dictionary, or None if the collection is empty
+    """
+    for records in qdrant.scroll(page_size=1, with_vectors=False):
+        for record in records:
+            return record.payload or {}
+        break
+    return None
+
+
+def with_chunk_text(
+    search_batch: SearchBatch, store: ChunkTextStore, collection: str
+) -> SearchBatch:
+    """
+    Wrap a batched search to fill in chunk text missing from the payloads.
+
+    Unlike hydrate_results, hits without a stored text are kept, so ID
+    labels are scored on the same ranking as without the store.
+
+    Args:
+        search_batch: Batched search of the collection
+        store: Store holding the chunk texts
+        collection: Collection the chunk texts are stored under
+
+    Returns:
+        Batched search whose payloads carry chunk_text where stored
+    """
+
+    def search(
+        vectors: np.ndarray, top_k: int, score_threshold: float
+    ) -> List[List[Tuple[Any, ...]]]:
+        batches = search_batch(vectors, top_k, score_threshold)
+        slim_ids = [
+            result[0]
+            for results in batches
+            for result in results
+            if "chunk_text" not in (result[2] or {})
+        ]
+        if not slim_ids:
+            return batches
+        texts = store.get_many(collection, slim_ids)
+        filled = []
+        for results in batches:
+            hits = []
+            for result in results:
+                payload = result[2] or {}
+                text = texts.get(str(result[0]))
+                if "chunk_text" not in payload and text is not None:
+                    payload = dict(payload, chunk_text=text)
+                hits.append((result[0], result[1], payload) + tuple(result[3:]))
+            filled.append(hits)
+        return filled
+
+    return search
+
+
+def format_table(rows: List[Dict[str, Any]], k_values: List[int]) -> str:
+    """
+    Format evaluation rows as a text table.
+
+    Args:
+        rows: One result dictionary per collection and threshold
+        k_values: Cutoffs reported
+
+    Returns:
+        Table text
+    """
+    header = f"{'collection':<24}{'threshold':>10}"
+    header += "".join(f"{f'R@{k}':>8}" for k in k_values)
+    header += f"{'MRR':>8}{f'nDCG@{max(k_values)}':>10}"
+    header += f"{'p50 ms':>9}{'p95 ms':>9}{'q/s':>9}{'mem MB':>10}"
+    lines = [header]
+    for row in rows:
+        metrics = row["metrics"]
+        line = f"{row['collection'][:23]:<24}{row['threshold']:>10.2f}"
+        line += "".join(f"{metrics[f'recall@{k}']:>8.3f}" for k in k_values)
+        line += f"{metrics['mrr']:>8.3f}{metrics[f'ndcg@{max(k_values)}']:>10.3f}"
+        line += f"{row['latency_ms']['p50']:>9.1f}{row['latency_ms']['p95']:>9.1f}"
+        line += f"{row['queries_per_second']:>9.1f}"
+        line += f"{row['index_memory_bytes'] / 2**20:>10.1f}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Main entry point for the eval-retrieval command.
+
+    Args:
+        argv: Command-line arguments, defaults to sys.argv
+
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    args = setup_argparse().parse_args(argv)
+
+    log_level = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(
+        level=log_level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    if not validate_environment():
+        logger.error("Environment validation failed")
+        return 1
+
+    try:
+        queries = load_eval_set(args.eval_set)
+        logger.info(f"Loaded {len(queries)} labeled queries")
+
+        text_store = ChunkTextStore(args.text_store) if args.text_store else None
+        uses_answers = any(q.answers for q in queries)
+
+        # Queries are embedded once per model and reused across collections
+        query_vectors: Dict[str, np.ndarray] = {}
+        rows = []
+        for collection in args.collections:
+            qdrant = QdrantService(
+                collection_name=collection, prefer_grpc=args.prefer_grpc
+            )
+            payload = sample_payload(qdrant) or {}
+            search_batch: SearchBatch = qdrant.search_batch
+            if text_store is not None:
+                search_batch = with_chunk_text(search_batch, text_store, collection)
+            elif payload and "chunk_text" not in payload and uses_answers:
+                logger.error(
+                    f"Collection '{collection}' stores no chunk text, so answer "
+                    "labels cannot match; pass --text-store"
+                )
+                return 1
+            model = (
+                args.embedding_model
+                or payload.get("model_name")
+                or DEFAULT_EMBEDDING_MODEL
+            )
+            if model not in query_vectors:
+                client = OpenAIClient(embedding_model=model)
+                query_vectors[model] = client.embed([q.query for q in queries])
+            memory = qdrant.estimate_memory()
+
+            for threshold in args.thresholds:
+                result = evaluate_retrieval(
+                    queries,
+                    query_vectors[model],
+                    search_batch,
+                    k_values=args.k_values,
+                    score_threshold=threshold,
+                    batch_size=args.batch_size,
+                )
+                result.update(
+                    {
+                        "collection": collection,
+                        "embedding_model": model,
+                        "threshold": threshold,
+                        "index_memory_bytes": memory,
+                    }
+                )
+                rows.append(result)
+
+        if args.output == "json":
+            print(json.dumps(rows, indent=2))
+        else:
+            print(format_table(rows, sorted(args.k_values)))
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error evaluating retrieval: {str(e)}", exc_info=True)
+        return 1
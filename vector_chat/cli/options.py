@@ -0,0 +1,35 @@
+"""
+Command-line options shared by several vector_chat commands.
+"""
+
+import argparse
+
+from vector_chat.config import QDRANT_PREFER_GRPC
+
+
+def add_transport_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add --prefer-grpc and --no-prefer-grpc, choosing the Qdrant transport.
+
+    Either flag overrides QDRANT_PREFER_GRPC, so a gRPC default from the
+    environment can still be switched back to REST for one run.
+
+    Args:
+        parser: Parser to add the options to
+    """
+    default = "gRPC" if QDRANT_PREFER_GRPC else "REST"
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument(
+        "--prefer-grpc",
+        help=f"Use gRPC transport for Qdrant (default: {default}, "
+        "from QDRANT_PREFER_GRPC)",
+        dest="prefer_grpc",
+        action="store_true",
+    )
+    transport.add_argument(
+        "--no-prefer-grpc",
+        help="Use REST transport for Qdrant",
+        dest="prefer_grpc",
+        action="store_false",
+    )
+    parser.set_defaults(prefer_grpc=QDRANT_PREFER_GRPC)
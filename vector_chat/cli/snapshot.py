@@ -0,0 +1,167 @@
+"""
+Command-line interface for exporting and importing collection snapshots.
+"""
+
+import argparse
+import logging
+from typing import List, Optional
+
+from vector_chat.cli.options import add_transport_arguments
+from vector_chat.config import QDRANT_COLLECTION, TEXT_STORE_PATH
+from vector_chat.services.qdrant_service import QdrantService
+from vector_chat.services.snapshot import export_collection, import_collection
+from vector_chat.services.text_store import ChunkTextStore
+
+logger = logging.getLogger(__name__)
+
+
+def setup_export_argparse() -> argparse.ArgumentParser:
+    """
+    Set up command-line argument parser for the export command.
+
+    Returns:
+        Configured argument parser
+    """
+    parser = argparse.ArgumentParser(
+        description="Export a collection to a portable snapshot directory"
+    )
+
+    parser.add_argument(
+        "-o", "--output", help="Snapshot directory to write", required=True
+    )
+
+    parser.add_argument(
+        "-c",
+        "--collection",
+        help=f"Qdrant collection name (default: {QDRANT_COLLECTION})",
+        default=QDRANT_COLLECTION,
+    )
+
+    parser.add_argument(
+        "--dtype",
+        help="Vector storage precision (default: float16)",
+        choices=["float16", "float32"],
+        default="float16",
+    )
+
+    parser.add_argument(
+        "--text-store",
+        help="Write the chunk text of collections embedded with --text-store "
+        f"into the snapshot, from this store (default path: {TEXT_STORE_PATH})",
+        nargs="?",
+        const=TEXT_STORE_PATH,
+        metavar="PATH",
+    )
+
+    add_transport_arguments(parser)
+
+    parser.add_argument("--verbose", help="Enable verbose logging", action="store_true")
+
+    return parser
+
+
+def setup_import_argparse() -> argparse.ArgumentParser:
+    """
+    Set up command-line argument parser for the import command.
+
+    Returns:
+        Configured argument parser
+    """
+    parser = argparse.ArgumentParser(
+        description="Import a snapshot directory into a collection"
+    )
+
+    parser.add_argument(
+        "-i", "--input", help="Snapshot directory to read", required=True
+    )
+
+    parser.add_argument(
+        "-c",
+        "--collection",
+        help=f"Qdrant collection name (default: {QDRANT_COLLECTION})",
+        default=QDRANT_COLLECTION,
+    )
+
+    parser.add_argument(
+        "-p",
+        "--parallel",
+        help="Number of parallel upload workers (default: 4)",
+        type=int,
+        default=4,
+    )
+
+    parser.add_argument(
+        "--batch-size",
+        help="Points per upload request (default: 256)",
+        type=int,
+        default=256,
+    )
+
+    add_transport_arguments(parser)
+
+    parser.add_argument("--verbose", help="Enable verbose logging", action="store_true")
+
+    return parser
+
+
+def export_main(argv: Optional[List[str]] = None) -> int:
+    """
+    Main entry point for the export command.
+
+    Args:
+        argv: Command-line arguments, defaults to sys.argv
+
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    args = setup_export_argparse().parse_args(argv)
+
+    log_level = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(
+        level=log_level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    try:
+        qdrant = QdrantService(
+            collection_name=args.collection, prefer_grpc=args.prefer_grpc
+        )
+        text_store = ChunkTextStore(args.text_store) if args.text_store else None
+        export_collection(qdrant, args.output, dtype=args.dtype, text_store=text_store)
+        return 0
+    except Exception as e:
+        logger.error(f"Error exporting collection: {str(e)}", exc_info=True)
+        return 1
+
+
+def import_main(argv: Optional[List[str]] = None) -> int:
+    """
+    Main entry point for the import command.
+
+    Args:
+        argv: Command-line arguments, defaults to sys.argv
+
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    args = setup_import_argparse().parse_args(argv)
+
+    log_level = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(
+        level=log_level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    try:
+        import_collection(
+            args.input,
+            lambda dimension: QdrantService(
+                collection_name=args.collection,
+                vector_size=dimension,
+                prefer_grpc=args.prefer_grpc,
+            ),
+            parallel=args.parallel,
+            batch_size=args.batch_size,
+        )
+        return 0
+    except Exception as e:
+        logger.error(f"Error importing snapshot: {str(e)}", exc_info=True)
+        return 1
@@ -2,10 +2,12 @@
 OpenAI client for both chat completions and embeddings.
 """
 
+import base64
 import json
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 
+import numpy as np
 from openai import OpenAI
 
 from vector_chat.config import (
@@ -15,10 +17,32 @@ from vector_chat.config import (
     EMOJI_ERROR,
     OPENAI_API_KEY,
 )
+from vector_chat.services.context_builder import count_tokens
+from vector_chat.services.embeddings import EmbeddingProvider, get_embedding_provider
+from vector_chat.services.query_batcher import QueryBatcher
+from vector_chat.services.rate_limiter import INTERACTIVE, RateLimiter, get_rate_limiter
+from vector_chat.services.resilience import ResilientCaller
+from vector_chat.services.usage import UsageTracker, usage_counts
 
 logger = logging.getLogger(__name__)
 
 
+def decode_embedding(embedding: Union[str, List[float]]) -> np.ndarray:
+    """
+    Decode one embedding of an API response.
+
+    Args:
+        embedding: Base64 string of little-endian float32 values, or a list
+            of floats (servers ignoring encoding_format)
+
+    Returns:
+        Vector as a float32 array (a view on the decoded bytes, not a copy)
+    """
+    if isinstance(embedding, str):
+        return np.frombuffer(base64.b64decode(embedding), dtype="<f4")
+    return np.asarray(embedding, dtype=np.float32)
+
+
 class OpenAIClient:
     """
     Client for interacting with OpenAI APIs for both chat completions and embeddings.
@@ -29,6 +53,13 @@ class OpenAIClient:
         api_key: Optional[str] = None,
         chat_model: str = DEFAULT_CHAT_MODEL,
         embedding_model: str = DEFAULT_EMBEDDING_MODEL,
+        client: Optional[Any] = None,
+        usage_tracker: Optional[UsageTracker] = None,
+        embedding_provider: Optional[EmbeddingProvider] = None,
+        resilience: Optional[ResilientCaller] = None,
+        query_batcher: Optional[QueryBatcher] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        priority: str = INTERACTIVE,
     ):
         """
         Initialize OpenAI client for both chat completions and embeddings.
@@ -37,20 +68,53 @@ class OpenAIClient:
             api_key: OpenAI API key, defaults to environment variable
             chat_model: Model name for chat completions
             embedding_model: Model name for embeddings
+            client: Existing OpenAI-compatible client (e.g. a local stand-in)
+            usage_tracker: Tracker to record token usage in (a new one is
+                created if None)
+            embedding_provider: Local provider computing the embeddings
+                in-process (defaults to the one of a local embedding_model)
+            resilience: Caller applying a deadline, hedging, retries and
+                circuit breaking to embedding requests (the client's own
+                retries are then disabled for them)
+            query_batcher: Batcher shared with other sessions, embedding
+                queries (embed_query) together with theirs
+            rate_limiter: Limiter shared with other processes, waited on
+                before each API request (defaults to the one configured by
+                OPENAI_RPM/OPENAI_TPM when the OpenAI client is created here)
+            priority: INTERACTIVE (chat) or BULK (ingestion) for the limiter
         """
+        self.embedding_provider = embedding_provider or get_embedding_provider(
+            embedding_model
+        )
         self.api_key = api_key or OPENAI_API_KEY
-        if not self.api_key:
-            raise ValueError(
-                "OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass as parameter."
-            )
-
-        self.client = OpenAI(api_key=self.api_key)
+        if not self.api_key and client is None:
+            if self.embedding_provider is None:
+                raise ValueError(
+                    "OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass as parameter."
+                )
+            # Local embeddings only; chat requests need an API key
+            self.client = None
+        else:
+            self.client = client or OpenAI(api_key=self.api_key)
+        if rate_limiter is None and client is None and self.client is not None:
+            rate_limiter = get_rate_limiter()
+        self.rate_limiter = rate_limiter
+        self.priority = priority
+        self.resilience = resilience
+        self.query_batcher = query_batcher
         self.chat_model = chat_model
         self.embedding_model = embedding_model
         self.conversation_history = []
+        # Token usage of the last chat completion, and of all calls
+        self.last_usage: Dict[str, int] = {}
+        self.usage = usage_tracker or UsageTracker()
 
         # Get embedding dimension based on model
-        self.embedding_dimension = EMBEDDING_DIMENSIONS.get(embedding_model, 1536)
+        self.embedding_dimension = (
+            self.embedding_provider.dimension
+            if self.embedding_provider
+            else EMBEDDING_DIMENSIONS.get(embedding_model, 1536)
+        )
 
     def add_system_message(self, content: str) -> None:
         """
@@ -79,12 +143,117 @@ class OpenAIClient:
         """
         self.conversation_history.append({"role": "assistant", "content": content})
 
-    def get_response(self, temperature: float = 0.7) -> str:
+    def build_messages(self, context: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Assemble the messages of the next request.
+
+        The system prompt and earlier turns are sent unchanged, so the start
+        of every request repeats the previous one and can be served from the
+        provider's prompt cache. Per-turn context is not kept in the history;
+        it is inserted right before the latest user message.
+
+        Args:
+            context: Context for the latest user message, if any
+
+        Returns:
+            List of chat messages
+        """
+        messages = list(self.conversation_history)
+        if context:
+            position = len(messages)
+            if messages and messages[-1]["role"] == "user":
+                position -= 1
+            messages.insert(position, {"role": "system", "content": context})
+        return messages
+
+    def _record_usage(self, usage: Any) -> None:
+        """
+        Store the token usage of a chat completion.
+
+        Args:
+            usage: Usage object of the response (may be None)
+        """
+        if usage is None:
+            self.last_usage = {}
+            return
+        self.last_usage = usage_counts(usage)
+        logger.debug(
+            f"Prompt tokens: {self.last_usage['prompt_tokens']} "
+            f"({self.last_usage['cached_tokens']} cached), "
+            f"completion tokens: {self.last_usage['completion_tokens']}"
+        )
+
+    def _require_client(self) -> Any:
+        """
+        Get the OpenAI client for a request that has to go to the API.
+
+        Returns:
+            OpenAI-compatible client
+
+        Raises:
+            ValueError: If the client was created for local embeddings only
+        """
+        if self.client is None:
+            raise ValueError(
+                "OpenAI API key is required for this request. Set OPENAI_API_KEY environment variable or pass as parameter."
+            )
+        return self.client
+
+    def _estimate_tokens(self, texts: List[str]) -> int:
+        """
+        Estimate the tokens of a request for the rate limiter.
+
+        Args:
+            texts: Texts sent in the request
+
+        Returns:
+            Estimated tokens (0 without a limiter)
+        """
+        if self.rate_limiter is None:
+            return 0
+        return sum(count_tokens(text) for text in texts)
+
+    def _acquire(self, model: str, tokens: int) -> None:
+        """
+        Wait for the rate limiter, if any, before an API request.
+
+        Args:
+            model: Model of the request
+            tokens: Estimated tokens of the request
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(model, tokens, self.priority)
+
+    def _settle(self, model: str, estimated: int, usage: Any) -> None:
+        """
+        Correct the tokens taken from the rate limiter with the API's count.
+
+        Args:
+            model: Model of the request
+            estimated: Tokens taken when the request was acquired
+            usage: Usage object of the response (may be None)
+        """
+        if self.rate_limiter is None or usage is None:
+            return
+        counts = usage_counts(usage)
+        self.rate_limiter.settle(
+            model, estimated, counts["prompt_tokens"] + counts["completion_tokens"]
+        )
+
+    def get_response(
+        self,
+        temperature: float = 0.7,
+        context: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> str:
         """
         Get a response from the chat model based on conversation history.
 
         Args:
             temperature: Sampling temperature (0-1)
+            context: Retrieved context for the latest user message, used for
+                this request only
+            model: Chat model for this request only, defaults to chat_model
 
         Returns:
             The model's response text
@@ -92,12 +261,19 @@ class OpenAIClient:
         Raises:
             Exception: If there's an error getting a response
         """
+        model = model or self.chat_model
         try:
-            response = self.client.chat.completions.create(
-                model=self.chat_model,
-                messages=self.conversation_history,
+            messages = self.build_messages(context)
+            estimated = self._estimate_tokens([m["content"] for m in messages])
+            self._acquire(model, estimated)
+            response = self._require_client().chat.completions.create(
+                model=model,
+                messages=messages,
                 temperature=temperature,
             )
+            self._settle(model, estimated, getattr(response, "usage", None))
+            self._record_usage(getattr(response, "usage", None))
+            self.usage.record_response(model, "chat", getattr(response, "usage", None))
             message = response.choices[0].message.content
             self.add_assistant_message(message)
             return message
@@ -105,6 +281,59 @@ class OpenAIClient:
             logger.error(f"Error getting chat response: {str(e)}")
             raise
 
+    def stream_response(
+        self,
+        temperature: float = 0.7,
+        context: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Stream a response from the chat model based on conversation history.
+
+        The full response is added to the history once the stream is consumed.
+
+        Args:
+            temperature: Sampling temperature (0-1)
+            context: Retrieved context for the latest user message, used for
+                this request only
+            model: Chat model for this request only, defaults to chat_model
+
+        Yields:
+            Pieces of the response text as they arrive
+
+        Raises:
+            Exception: If there's an error getting a response
+        """
+        model = model or self.chat_model
+        try:
+            messages = self.build_messages(context)
+            estimated = self._estimate_tokens([m["content"] for m in messages])
+            self._acquire(model, estimated)
+            stream = self._require_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            pieces = []
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None)
+                if usage is not None:
+                    self._settle(model, estimated, usage)
+                    self._record_usage(usage)
+                    self.usage.record_response(model, "chat", usage)
+                if not chunk.choices:
+                    continue
+                piece = chunk.choices[0].delta.content
+                if piece:
+                    pieces.append(piece)
+                    yield piece
+            self.add_assistant_message("".join(pieces))
+        except Exception as e:
+            logger.error(f"Error streaming chat response: {str(e)}")
+            raise
+
     def get_structured_response(
         self, prompt: str, json_structure: Dict[str, Any], temperature: float = 0.0
     ) -> Dict[str, Any]:
@@ -128,47 +357,108 @@ class OpenAIClient:
                 {"role": "user", "content": prompt},
             ]
 
-            response = self.client.chat.completions.create(
+            estimated = self._estimate_tokens([m["content"] for m in messages])
+            self._acquire(self.chat_model, estimated)
+            response = self._require_client().chat.completions.create(
                 model=self.chat_model,
                 messages=messages,
                 response_format={"type": "json_object"},
                 temperature=temperature,
             )
+            self._settle(self.chat_model, estimated, getattr(response, "usage", None))
 
+            self.usage.record_response(
+                self.chat_model, "chat", getattr(response, "usage", None)
+            )
             result = json.loads(response.choices[0].message.content)
             return result
         except Exception as e:
             logger.error(f"Error getting structured response: {str(e)}")
             return json_structure  # Return the default structure on error
 
-    def embed(self, texts: List[str]) -> List[List[float]]:
+    def embed(self, texts: List[str]) -> np.ndarray:
         """
-        Create embeddings using OpenAI's embedding model.
+        Create embeddings using OpenAI's embedding model, or in-process with
+        the local embedding provider if there is one.
+
+        Vectors are requested base64-encoded and decoded straight into one
+        float32 matrix, instead of being parsed from JSON into Python floats.
 
         Args:
             texts: List of text strings to embed
 
         Returns:
-            List of embedding vectors
+            Matrix of shape (len(texts), dimension), one row per text
 
         Raises:
             Exception: If there's an error creating embeddings
         """
         try:
-            vectors = []
+            if self.embedding_provider is not None:
+                return self.embedding_provider.embed(texts)
+
+            client = self._require_client()
+            if self.resilience is not None and hasattr(client, "with_options"):
+                # Retried and timed out by the resilience layer instead
+                options: Dict[str, Any] = {"max_retries": 0}
+                if self.resilience.deadline is not None:
+                    options["timeout"] = self.resilience.deadline
+                client = client.with_options(**options)
+
+            matrix = None
             batch_size = 64
             for i in range(0, len(texts), batch_size):
                 batch = texts[i : i + batch_size]
-                response = self.client.embeddings.create(
-                    model=self.embedding_model,
-                    input=batch,
+                estimated = self._estimate_tokens(batch)
+
+                def create(**request: Any) -> Any:
+                    # Hedged and retried requests take their own quota
+                    self._acquire(self.embedding_model, estimated)
+                    return client.embeddings.create(**request)
+
+                request = dict(
+                    model=self.embedding_model, input=batch, encoding_format="base64"
+                )
+                if self.resilience is not None:
+                    response = self.resilience.call(create, **request)
+                else:
+                    response = create(**request)
+                self._settle(
+                    self.embedding_model, estimated, getattr(response, "usage", None)
+                )
+                self.usage.record_response(
+                    self.embedding_model, "embedding", getattr(response, "usage", None)
                 )
-                vectors.extend([item.embedding for item in response.data])
-            return vectors
+                for row, item in enumerate(response.data, start=i):
+                    vector = decode_embedding(item.embedding)
+                    if matrix is None:
+                        # Sized by the first vector, in case the model's
+                        # dimension is not the configured one
+                        matrix = np.empty((len(texts), len(vector)), dtype=np.float32)
+                    matrix[row] = vector
+            if matrix is None:
+                return np.empty((0, self.embedding_dimension), dtype=np.float32)
+            return matrix
         except Exception as e:
             logger.error(f"Error creating embeddings: {str(e)}")
             raise
 
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Embed one search query, through the shared query batcher if there
+        is one.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Query vector
+        """
+        if self.query_batcher is not None:
+            return self.query_batcher.embed(query)
+        vector: np.ndarray = self.embed([query])[0]
+        return vector
+
     def reset_conversation(self, keep_system_messages: bool = True) -> None:
         """
         Reset the conversation history, optionally keeping system messages.
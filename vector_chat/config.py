@@ -22,22 +22,76 @@ load_dotenv()
 # API Keys
 OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
 
+# Prices in USD per 1M tokens, used for usage reports. Override or extend
+# with a JSON file of the same shape referenced by PRICES_FILE.
+MODEL_PRICES: Dict[str, Dict[str, float]] = {
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "gpt-4-turbo": {"input": 10.00, "cached_input": 10.00, "output": 30.00},
+    "gpt-3.5-turbo": {"input": 0.50, "cached_input": 0.50, "output": 1.50},
+    "text-embedding-3-small": {"input": 0.02},
+    "text-embedding-3-large": {"input": 0.13},
+    "text-embedding-ada-002": {"input": 0.10},
+}
+PRICES_FILE: Optional[str] = os.getenv("PRICES_FILE")
+
 # Qdrant settings
 QDRANT_URL: str = os.getenv("QDRANT_URL", "http://localhost:6333")
 QDRANT_API_KEY: Optional[str] = os.getenv("QDRANT_API_KEY")
 QDRANT_COLLECTION: str = os.getenv("QDRANT_COLLECTION", "openai_embeddings")
 
+# Qdrant transport settings
+QDRANT_PREFER_GRPC: bool = os.getenv("QDRANT_PREFER_GRPC", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+QDRANT_GRPC_PORT: int = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+QDRANT_TIMEOUT: int = int(os.getenv("QDRANT_TIMEOUT", "30"))
+QDRANT_POOL_SIZE: int = int(os.getenv("QDRANT_POOL_SIZE", "10"))
+QDRANT_KEEPALIVE_SECONDS: float = float(os.getenv("QDRANT_KEEPALIVE_SECONDS", "60"))
+
 # OpenAI models
 DEFAULT_CHAT_MODEL: str = os.getenv("DEFAULT_CHAT_MODEL", "gpt-4o")
 DEFAULT_EMBEDDING_MODEL: str = os.getenv(
     "DEFAULT_EMBEDDING_MODEL", "text-embedding-3-small"
 )
 
+DEFAULT_FAST_CHAT_MODEL: str = os.getenv("DEFAULT_FAST_CHAT_MODEL", "gpt-4o-mini")
+
+# Chat model routing defaults (easy queries go to the fast model)
+ROUTING_MAX_FAST_QUERY_TOKENS: int = 32
+ROUTING_MIN_FAST_SCORE: float = 0.5
+ROUTING_HARD_KEYWORDS: List[str] = [
+    "why",
+    "explain",
+    "compare",
+    "difference",
+    "analyze",
+    "step by step",
+    "pros and cons",
+]
+
+# Retrieval gating (skip embedding and search for turns that need no context)
+GATE_REUSE_SIMILARITY: float = 0.8  # Word overlap to reuse the previous context
+GATE_CHIT_CHAT_PATTERNS: List[str] = [
+    r"(hi|hello|hey)( there)?",
+    r"(thanks|thank you|thx|ty)( (so|very) much)?( for (that|this|the help))?",
+    r"(ok|okay|cool|great|nice|got it|i see|perfect|awesome|sounds good)",
+    r"(bye|goodbye|see you|good night)",
+    r"(yes|no|yep|nope|sure)",
+    r"(can|could) you (rephrase|repeat|summari[sz]e|shorten|simplify) (that|this|it)",
+    r"(say|explain) (that|it) again",
+    r"(make it|be) (shorter|simpler|more concise)",
+]
+
 # Available embedding models
 AVAILABLE_EMBEDDING_MODELS: List[str] = [
     "text-embedding-3-small",
     "text-embedding-3-large",
     "text-embedding-ada-002",
+    "local-hash",
+    "local-minilm",
 ]
 
 # Embedding dimensions by model
@@ -45,6 +99,8 @@ EMBEDDING_DIMENSIONS: Dict[str, int] = {
     "text-embedding-3-small": 1536,
     "text-embedding-3-large": 3072,
     "text-embedding-ada-002": 1536,
+    "local-hash": 384,
+    "local-minilm": 384,
 }
 
 # Emoji indicators for different information sources
@@ -56,6 +112,102 @@ EMOJI_ERROR: str = "⚠️"  # Error indicator
 # Default chunking settings
 DEFAULT_MAX_SENTENCES_PER_CHUNK: int = 3
 
+# Local state (fingerprint indexes, job journals, ...)
+VECTOR_CHAT_HOME: str = os.path.expanduser(
+    os.getenv("VECTOR_CHAT_HOME", os.path.join("~", ".vector_chat"))
+)
+
+# CPU-local embedding models (no API calls), see services/embeddings.py
+LOCAL_EMBEDDING_MODELS: List[str] = ["local-hash", "local-minilm"]
+# Directory with model.onnx and tokenizer.json for local-minilm
+LOCAL_EMBEDDING_MODEL_DIR: str = os.getenv(
+    "LOCAL_EMBEDDING_MODEL_DIR",
+    os.path.join(VECTOR_CHAT_HOME, "models", "all-MiniLM-L6-v2"),
+)
+# Batches embedded concurrently by local-minilm (local-hash runs single-threaded)
+LOCAL_EMBEDDING_THREADS: int = int(
+    os.getenv("LOCAL_EMBEDDING_THREADS", str(os.cpu_count() or 1))
+)
+LOCAL_EMBEDDING_BATCH_SIZE: int = 64
+
+# External chunk text store (keeps chunk text out of Qdrant payloads)
+TEXT_STORE_PATH: str = os.getenv(
+    "TEXT_STORE_PATH", os.path.join(VECTOR_CHAT_HOME, "chunks.db")
+)
+
+# Watch-mode ingestion settings (embed --watch)
+WATCH_DEBOUNCE_SECONDS: float = float(os.getenv("WATCH_DEBOUNCE_SECONDS", "0.5"))
+WATCH_POLL_INTERVAL: float = float(os.getenv("WATCH_POLL_INTERVAL", "2"))
+WATCH_STATE_DIR: str = os.path.join(VECTOR_CHAT_HOME, "watch")
+
+# Profiling settings (embed/chat --profile)
+PROFILE_MODES: List[str] = ["cpu", "mem", "both"]
+PROFILE_DIR: str = os.getenv("PROFILE_DIR", os.path.join(VECTOR_CHAT_HOME, "profiles"))
+PROFILE_TOP_N: int = 20  # Hotspots and allocators listed in the summary
+PROFILE_TRACE_FRAMES: int = 1  # Stack depth recorded per allocation (1 is cheapest)
+
+# Ingestion job settings
+INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+JOURNAL_PATH: str = os.getenv("JOURNAL_PATH", os.path.join(VECTOR_CHAT_HOME, "jobs.db"))
+
+# Batch API settings
+BATCH_MAX_REQUESTS_PER_FILE: int = 50000
+BATCH_POLL_INTERVAL: float = float(os.getenv("BATCH_POLL_INTERVAL", "60"))
+BATCH_DIR: str = os.path.join(VECTOR_CHAT_HOME, "batches")
+
+# Snapshot export/import settings
+SNAPSHOT_PAGE_SIZE: int = 1024  # Points per scroll request
+SNAPSHOT_BLOCK_SIZE: int = 65536  # Vectors per .npy block
+
+# Near-duplicate detection settings
+DEDUP_MAX_DISTANCE: int = int(os.getenv("DEDUP_MAX_DISTANCE", "6"))
+DEDUP_INDEX_DIR: str = os.path.join(VECTOR_CHAT_HOME, "fingerprints")
+
+# Multi-collection routing settings
+ROUTER_MAX_WORKERS: int = int(os.getenv("ROUTER_MAX_WORKERS", "8"))
+
+# Resilience settings for query-time embedding and search calls
+CALL_DEADLINE_SECONDS: float = float(os.getenv("CALL_DEADLINE_SECONDS", "10"))
+HEDGE_PERCENTILE: float = float(os.getenv("HEDGE_PERCENTILE", "95"))  # 0 = no hedging
+HEDGE_INITIAL_DELAY: float = 1.0  # Hedge delay until enough latencies are recorded
+HEDGE_MIN_DELAY: float = 0.02  # Shortest hedge delay, in seconds
+HEDGE_MIN_SAMPLES: int = 20  # Latencies needed before the percentile is used
+CALL_MAX_RETRIES: int = int(os.getenv("CALL_MAX_RETRIES", "2"))
+RETRY_BACKOFF_BASE: float = 0.1  # Seconds, doubled on every retry
+RETRY_BACKOFF_MAX: float = 2.0
+BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS: float = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+RESILIENCE_MAX_WORKERS: int = 8
+
+# Query embedding batching across concurrent sessions
+QUERY_BATCH_WINDOW_MS: float = float(os.getenv("QUERY_BATCH_WINDOW_MS", "5"))
+QUERY_BATCH_MAX_SIZE: int = int(os.getenv("QUERY_BATCH_MAX_SIZE", "64"))
+QUERY_BATCH_MAX_INFLIGHT: int = 8  # Batches embedded at the same time
+
+# OpenAI rate limits shared by all local processes (0 = unlimited)
+OPENAI_RPM: float = float(os.getenv("OPENAI_RPM", "0"))
+OPENAI_TPM: float = float(os.getenv("OPENAI_TPM", "0"))
+RATE_LIMITS_FILE: Optional[str] = os.getenv("RATE_LIMITS_FILE")  # Per-model limits
+RATE_LIMIT_PATH: str = os.getenv(
+    "RATE_LIMIT_PATH", os.path.join(VECTOR_CHAT_HOME, "ratelimit.db")
+)
+RATE_LIMIT_BURST_SECONDS: float = 10.0  # Quota a full bucket holds, in seconds
+RATE_LIMIT_INTERACTIVE_RESERVE: float = 0.2  # Bucket share bulk requests leave to chat
+RATE_LIMIT_MAX_SLEEP: float = 0.5  # Longest sleep before checking the buckets again
+
+# Context packing settings
+DEFAULT_CONTEXT_TOKENS: int = int(os.getenv("DEFAULT_CONTEXT_TOKENS", "1500"))
+DEFAULT_MIN_CHUNK_TOKENS: int = 32  # Smaller trimmed chunks are dropped instead
+
+# Diversity reranking settings
+DEFAULT_MMR_LAMBDA: float = 0.5  # 1.0 = pure relevance, 0.0 = pure diversity
+DEFAULT_MMR_FETCH_MULTIPLIER: int = 4  # Over-fetch top_k * multiplier candidates
+DEFAULT_DUPLICATE_THRESHOLD: float = 0.95  # Cosine similarity treated as duplicate
+
+# Adaptive retrieval cutoff settings
+DEFAULT_CUTOFF_RATIO: float = 0.8  # Drop hits scoring below this fraction of the best
+DEFAULT_CUTOFF_MIN_GAP: float = 0.05  # Smallest score drop treated as a cliff
+
 # Text file extensions for auto-detection
 TEXT_FILE_EXTENSIONS: List[str] = [
     ".txt",
@@ -0,0 +1,808 @@
+"""
+Local stand-ins for external services, for offline runs and tests.
+
+FakeOpenAI mimics the parts of the OpenAI client used by vector_chat
+(chat completions, embeddings, files and batches) without any network
+access. Embeddings are deterministic pseudo-random unit vectors derived
+from the input text, and chat completions report cached prompt tokens the
+way a provider-side prefix cache would. InMemoryQdrant stands in for
+QdrantService, and LatencyModel adds realistic delays to all of them.
+FaultInjector wraps any of them to make calls fail or stall.
+"""
+
+import base64
+import hashlib
+import io
+import itertools
+import json
+import random
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union, cast
+
+import numpy as np
+
+from vector_chat.config import EMBEDDING_DIMENSIONS
+
+
+class FakeAPIError(RuntimeError):
+    """
+    Error raised by stand-ins to simulate a failed API call.
+    """
+
+    def __init__(self, message: str, status_code: int = 503):
+        """
+        Initialize the error.
+
+        Args:
+            message: Error message
+            status_code: HTTP status of the simulated response (the default
+                503 is transient, 4xx errors other than 408/429 are not)
+        """
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LatencyModel:
+    """
+    Log-normally distributed delays, the usual shape of service latencies.
+    """
+
+    def __init__(self, median: float = 0.0, sigma: float = 0.0, seed: int = 0):
+        """
+        Initialize the latency model.
+
+        Args:
+            median: Median delay in seconds
+            sigma: Spread of the underlying normal distribution (0 = constant)
+            seed: Random seed
+        """
+        self.median = median
+        self.sigma = sigma
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        """
+        Draw one delay.
+
+        Returns:
+            Delay in seconds
+        """
+        if self.median <= 0:
+            return 0.0
+        with self._lock:
+            noise = self._rng.standard_normal()
+        return self.median * float(np.exp(self.sigma * noise))
+
+    def sleep(self) -> None:
+        """
+        Sleep for one drawn delay.
+        """
+        delay = self.sample()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def fake_embedding(text: str, dimension: int) -> List[float]:
+    """
+    Build a deterministic unit vector for a text.
+
+    Args:
+        text: Input text
+        dimension: Vector dimension
+
+    Returns:
+        Embedding vector
+    """
+    seed = int.from_bytes(
+        hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+    vector = np.random.default_rng(seed).standard_normal(dimension).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+    return cast(List[float], vector.tolist())
+
+
+def _approx_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Approximate number of tokens
+    """
+    return max(1, len(text) // 4)
+
+
+class FakeEmbeddings:
+    """
+    Stand-in for client.embeddings.
+    """
+
+    def __init__(
+        self, dimension: Optional[int] = None, latency: Optional[LatencyModel] = None
+    ):
+        """
+        Initialize the embeddings stand-in.
+
+        Args:
+            dimension: Vector dimension, or None to use the model's dimension
+            latency: Delay of each call, or None for no delay
+        """
+        self.dimension = dimension
+        self.latency = latency
+        self.calls = 0
+
+    def response_body(
+        self, model: str, inputs: Union[str, List[str]]
+    ) -> Dict[str, Any]:
+        """
+        Build a JSON embeddings response as returned by the REST API.
+
+        Args:
+            model: Embedding model name
+            inputs: Text or list of texts
+
+        Returns:
+            Response body dictionary
+        """
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimension = self.dimension or EMBEDDING_DIMENSIONS.get(model, 1536)
+        tokens = sum(_approx_tokens(text) for text in inputs)
+        return {
+            "object": "list",
+            "model": model,
+            "data": [
+                {
+                    "object": "embedding",
+                    "index": i,
+                    "embedding": fake_embedding(text, dimension),
+                }
+                for i, text in enumerate(inputs)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def create(
+        self,
+        model: str,
+        input: Union[str, List[str]],
+        encoding_format: str = "float",
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Create embeddings for the input texts.
+
+        Args:
+            model: Embedding model name
+            input: Text or list of texts
+            encoding_format: "float" for lists of floats, or "base64" for
+                base64 strings of little-endian float32 values
+
+        Returns:
+            Response object with data and usage attributes
+        """
+        self.calls += 1
+        if self.latency is not None:
+            self.latency.sleep()
+        body = self.response_body(model, input)
+        if encoding_format == "base64":
+            for item in body["data"]:
+                item["embedding"] = base64.b64encode(
+                    np.asarray(item["embedding"], dtype="<f4").tobytes()
+                ).decode("ascii")
+        return SimpleNamespace(
+            model=model,
+            data=[
+                SimpleNamespace(index=item["index"], embedding=item["embedding"])
+                for item in body["data"]
+            ],
+            usage=SimpleNamespace(**body["usage"]),
+        )
+
+
+class FakeFiles:
+    """
+    Stand-in for client.files, keeping file contents in memory.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty file store.
+        """
+        self._files: Dict[str, bytes] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def create(self, file: Any, purpose: str = "batch") -> Any:
+        """
+        Store an uploaded file.
+
+        Args:
+            file: File object or bytes
+            purpose: Upload purpose
+
+        Returns:
+            Object with the file id
+        """
+        data = file if isinstance(file, bytes) else file.read()
+        with self._lock:
+            file_id = f"file-local-{next(self._ids)}"
+            self._files[file_id] = data
+        return SimpleNamespace(id=file_id, purpose=purpose, bytes=len(data))
+
+    def content(self, file_id: str) -> Any:
+        """
+        Return the content of a stored file.
+
+        Args:
+            file_id: ID of the file
+
+        Returns:
+            Binary response supporting read()
+        """
+        data = self._files[file_id]
+        return SimpleNamespace(
+            read=lambda: data, content=data, text=data.decode("utf-8")
+        )
+
+
+class FakeBatches:
+    """
+    Stand-in for client.batches that runs embedding batches locally.
+
+    A batch reports "in_progress" for polls_until_complete retrievals and is
+    then processed in one go.
+    """
+
+    def __init__(
+        self,
+        files: FakeFiles,
+        embeddings: FakeEmbeddings,
+        polls_until_complete: int = 1,
+    ):
+        """
+        Initialize the batches stand-in.
+
+        Args:
+            files: File store holding inputs and outputs
+            embeddings: Embedding stand-in used to answer requests
+            polls_until_complete: Number of retrievals before a batch completes
+        """
+        self.files = files
+        self.embeddings = embeddings
+        self.polls_until_complete = polls_until_complete
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+
+    def create(
+        self,
+        input_file_id: str,
+        endpoint: str,
+        completion_window: str = "24h",
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Create a batch from an uploaded request file.
+
+        Args:
+            input_file_id: ID of the uploaded JSONL request file
+            endpoint: API endpoint of the requests
+            completion_window: Requested completion window
+
+        Returns:
+            Batch object
+        """
+        batch_id = f"batch-local-{next(self._ids)}"
+        self._batches[batch_id] = {
+            "id": batch_id,
+            "input_file_id": input_file_id,
+            "endpoint": endpoint,
+            "status": "validating",
+            "output_file_id": None,
+            "polls": 0,
+        }
+        return SimpleNamespace(**self._batches[batch_id])
+
+    def retrieve(self, batch_id: str) -> Any:
+        """
+        Get the current state of a batch, processing it when it is due.
+
+        Args:
+            batch_id: ID of the batch
+
+        Returns:
+            Batch object
+        """
+        batch = self._batches[batch_id]
+        batch["polls"] += 1
+        if batch["status"] not in ("completed", "failed"):
+            if batch["polls"] > self.polls_until_complete:
+                self._process(batch)
+            else:
+                batch["status"] = "in_progress"
+        return SimpleNamespace(**batch)
+
+    def _process(self, batch: Dict[str, Any]) -> None:
+        """
+        Answer every request of a batch and store the output file.
+
+        Args:
+            batch: Batch record to process
+        """
+        output = io.StringIO()
+        requests = self.files.content(batch["input_file_id"]).text.splitlines()
+        for line in requests:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            body = request["body"]
+            result = {
+                "id": f"req-{request['custom_id']}",
+                "custom_id": request["custom_id"],
+                "response": {
+                    "status_code": 200,
+                    "body": self.embeddings.response_body(body["model"], body["input"]),
+                },
+                "error": None,
+            }
+            output.write(json.dumps(result) + "\n")
+
+        uploaded = self.files.create(
+            output.getvalue().encode("utf-8"), purpose="batch_output"
+        )
+        batch["output_file_id"] = uploaded.id
+        batch["status"] = "completed"
+
+
+class FakeChatCompletions:
+    """
+    Stand-in for client.chat.completions with a simulated prefix cache.
+
+    Recent requests' messages are remembered; the leading messages a request
+    shares with one of them count as cached prompt tokens, rounded down to
+    whole cache blocks as providers do. Responses can be delayed (time to
+    first token, then a delay per streamed token) and fail at random, to
+    stand in for a real model under load.
+    """
+
+    def __init__(
+        self,
+        cache_block_tokens: int = 128,
+        min_cached_tokens: int = 0,
+        first_token_latency: Optional[LatencyModel] = None,
+        token_interval: float = 0.0,
+        answer_tokens: Optional[int] = None,
+        error_rate: float = 0.0,
+        history_size: int = 256,
+        seed: int = 0,
+    ):
+        """
+        Initialize the chat completions stand-in.
+
+        Args:
+            cache_block_tokens: Granularity of cached prompt tokens
+            min_cached_tokens: Shortest prefix that is cached at all
+            first_token_latency: Delay before the first token, or None
+            token_interval: Seconds between streamed tokens
+            answer_tokens: Pad answers to this many words, or None for a short echo
+            error_rate: Fraction of requests that fail with FakeAPIError
+            history_size: Number of recent requests remembered for caching
+            seed: Random seed for failures
+        """
+        self.cache_block_tokens = cache_block_tokens
+        self.min_cached_tokens = min_cached_tokens
+        self.first_token_latency = first_token_latency
+        self.token_interval = token_interval
+        self.answer_tokens = answer_tokens
+        self.error_rate = error_rate
+        self.requests: Deque[List[Dict[str, str]]] = deque(maxlen=history_size)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _cached_tokens(self, messages: List[Dict[str, str]]) -> int:
+        """
+        Count the prompt tokens served from the simulated cache.
+
+        Args:
+            messages: Messages of the request
+
+        Returns:
+            Number of cached prompt tokens
+        """
+        best = 0
+        for previous in self.requests:
+            shared = 0
+            for old, new in zip(previous, messages):
+                if old != new:
+                    break
+                shared += _approx_tokens(new["content"])
+            best = max(best, shared)
+        if best < self.min_cached_tokens:
+            return 0
+        return best - best % self.cache_block_tokens
+
+    def create(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Create a chat completion echoing the latest user message.
+
+        Args:
+            model: Chat model name
+            messages: Chat messages
+            stream: Return an iterator of chunks instead of one response
+
+        Returns:
+            Response object with choices and usage attributes, or an iterator
+            of chunk objects if stream is True
+
+        Raises:
+            FakeAPIError: For the simulated fraction of failing requests
+        """
+        messages = [dict(message) for message in messages]
+        with self._lock:
+            cached = self._cached_tokens(messages)
+            self.requests.append(messages)
+            failed = self._random.random() < self.error_rate
+        if failed:
+            raise FakeAPIError("Simulated chat completion failure")
+
+        question = next(
+            (m["content"] for m in reversed(messages) if m["role"] == "user"), ""
+        )
+        words = f"You asked: {question}".split()
+        if self.answer_tokens is not None:
+            words += ["lorem"] * max(0, self.answer_tokens - len(words))
+        content = " ".join(words)
+        prompt_tokens = sum(_approx_tokens(m["content"]) for m in messages)
+        completion_tokens = _approx_tokens(content)
+        usage = SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+        )
+
+        if stream:
+            return self._stream(model, words, usage)
+
+        if self.first_token_latency is not None:
+            self.first_token_latency.sleep()
+        if self.token_interval > 0:
+            time.sleep(self.token_interval * (len(words) - 1))
+        return SimpleNamespace(
+            model=model,
+            choices=[
+                SimpleNamespace(
+                    index=0,
+                    message=SimpleNamespace(role="assistant", content=content),
+                    finish_reason="stop",
+                )
+            ],
+            usage=usage,
+        )
+
+    def _stream(self, model: str, words: List[str], usage: Any) -> Iterator[Any]:
+        """
+        Stream a response word by word, with a final usage chunk.
+
+        Args:
+            model: Chat model name
+            words: Words of the response
+            usage: Usage object sent with the last chunk
+
+        Yields:
+            Chunk objects shaped like the API's streaming chunks
+        """
+        if self.first_token_latency is not None:
+            self.first_token_latency.sleep()
+        for i, word in enumerate(words):
+            if i and self.token_interval > 0:
+                time.sleep(self.token_interval)
+            yield SimpleNamespace(
+                model=model,
+                choices=[
+                    SimpleNamespace(
+                        index=0,
+                        delta=SimpleNamespace(content=word if i == 0 else f" {word}"),
+                        finish_reason=None,
+                    )
+                ],
+                usage=None,
+            )
+        yield SimpleNamespace(model=model, choices=[], usage=usage)
+
+
+class InMemoryQdrant:
+    """
+    Stand-in for QdrantService keeping points in memory.
+
+    Search is an exact cosine similarity scan over all stored vectors.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "in_memory",
+        vector_size: Optional[int] = None,
+        latency: Optional[LatencyModel] = None,
+    ):
+        """
+        Initialize an empty collection.
+
+        Args:
+            collection_name: Name reported for the collection
+            vector_size: Vector dimension (taken from the first upsert if None)
+            latency: Delay of each search, or None for no delay
+        """
+        self.collection_name = collection_name
+        self.vector_size = vector_size
+        self.latency = latency
+        self._ids: List[Any] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._vectors = np.zeros((0, vector_size or 0), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def upsert(
+        self,
+        ids: List[Any],
+        vectors: Union[np.ndarray, List[List[float]]],
+        payloads: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        Add points to the collection.
+
+        Args:
+            ids: Point IDs
+            vectors: Matrix or list of vectors of the points
+            payloads: Payloads of the points
+        """
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        with self._lock:
+            if not self._ids:
+                self.vector_size = matrix.shape[1]
+                self._vectors = np.zeros((0, matrix.shape[1]), dtype=np.float32)
+            self._vectors = np.vstack([self._vectors, matrix / norms])
+            self._ids.extend(ids)
+            self._payloads.extend(payloads or [{} for _ in ids])
+
+    def search(
+        self,
+        vector: Union[np.ndarray, List[float]],
+        top_k: int = 5,
+        score_threshold: float = 0.3,
+        with_vectors: bool = False,
+        payload_fields: Optional[List[str]] = None,
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Search for the most similar points.
+
+        Args:
+            vector: Query vector
+            top_k: Number of results to return
+            score_threshold: Minimum similarity score
+            with_vectors: Also return the stored vectors
+            payload_fields: Payload fields to return, or None for all
+
+        Returns:
+            List of (id, score, payload) tuples, or (id, score, payload, vector)
+            when with_vectors is True
+        """
+        return self.search_batch(
+            np.asarray(vector, dtype=np.float32)[None, :],
+            top_k=top_k,
+            score_threshold=score_threshold,
+            with_vectors=with_vectors,
+            payload_fields=payload_fields,
+        )[0]
+
+    def search_batch(
+        self,
+        vectors: Union[np.ndarray, List[List[float]]],
+        top_k: int = 5,
+        score_threshold: float = 0.3,
+        with_vectors: bool = False,
+        payload_fields: Optional[List[str]] = None,
+    ) -> List[List[Tuple[Any, ...]]]:
+        """
+        Run several searches, scoring all queries in one matrix product.
+
+        Args:
+            vectors: Query matrix or vectors
+            top_k: Number of results per query
+            score_threshold: Minimum similarity score
+            with_vectors: Also return the stored vectors (as array rows)
+            payload_fields: Payload fields to return, or None for all
+
+        Returns:
+            One list of (id, score, payload) tuples per query, or (id, score,
+            payload, vector) when with_vectors is True
+        """
+        if self.latency is not None:
+            self.latency.sleep()
+        queries = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        with self._lock:
+            stored, ids, payloads = self._vectors, self._ids, self._payloads
+        if not ids:
+            return [[] for _ in range(len(queries))]
+
+        batches = []
+        for scores in (queries / norms) @ stored.T:
+            results = []
+            for i in np.argsort(-scores)[:top_k]:
+                if scores[i] < score_threshold:
+                    break
+                payload = payloads[i]
+                if payload_fields is not None:
+                    payload = {k: v for k, v in payload.items() if k in payload_fields}
+                result: Tuple[Any, ...] = (ids[i], float(scores[i]), payload)
+                if with_vectors:
+                    result += (stored[i],)
+                results.append(result)
+            batches.append(results)
+        return batches
+
+    def retrieve(
+        self, ids: List[Any], payload_fields: Optional[List[str]] = None
+    ) -> List[Tuple[Any, Dict[str, Any]]]:
+        """
+        Fetch points by ID.
+
+        Args:
+            ids: Point IDs (missing ones are ignored)
+            payload_fields: Payload fields to return, or None for all
+
+        Returns:
+            List of (id, payload) tuples for the points found
+        """
+        with self._lock:
+            by_id = dict(zip(self._ids, self._payloads))
+        records = []
+        for point_id in ids:
+            if point_id in by_id:
+                payload = by_id[point_id]
+                if payload_fields is not None:
+                    payload = {k: v for k, v in payload.items() if k in payload_fields}
+                records.append((point_id, payload))
+        return records
+
+    def get_vector_size(self) -> Optional[int]:
+        """
+        Get the vector dimension of the collection.
+
+        Returns:
+            Vector dimension, or None if nothing was stored yet
+        """
+        return self.vector_size
+
+
+class FaultInjector:
+    """
+    Wraps a stand-in and makes its method calls fail or stall.
+
+    Faults are drawn at random (error_rate, stall_rate), forced for the next
+    calls (fail_next, stall_next), or applied to every call while down is
+    True. Failures raise FakeAPIError; stalls sleep before the call.
+    """
+
+    def __init__(
+        self,
+        target: Any,
+        error_rate: float = 0.0,
+        stall_rate: float = 0.0,
+        stall_seconds: float = 1.0,
+        methods: Optional[List[str]] = None,
+        seed: int = 0,
+    ):
+        """
+        Initialize the fault injector.
+
+        Args:
+            target: Object whose calls are disturbed, e.g. an InMemoryQdrant
+                or FakeOpenAI().embeddings
+            error_rate: Probability of a call failing
+            stall_rate: Probability of a call stalling
+            stall_seconds: Duration of a stall
+            methods: Methods to disturb, or None for all
+            seed: Random seed
+        """
+        self.target = target
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.methods = methods
+        self.down = False
+        self.fail_next = 0
+        self.stall_next = 0
+        self.calls = 0
+        self.failures = 0
+        self.stalls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Get an attribute of the target, disturbing its calls if it is a
+        selected method.
+        """
+        attr = getattr(self.target, name)
+        if not callable(attr) or (
+            self.methods is not None and name not in self.methods
+        ):
+            return attr
+
+        def disturbed(*args: Any, **kwargs: Any) -> Any:
+            self._inject(name)
+            return attr(*args, **kwargs)
+
+        return disturbed
+
+    def _inject(self, name: str) -> None:
+        """
+        Apply the fault, if any, drawn for one call.
+
+        Args:
+            name: Name of the called method
+
+        Raises:
+            FakeAPIError: If the call fails
+        """
+        with self._lock:
+            self.calls += 1
+            fail = self.down or self._rng.random() < self.error_rate
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                fail = True
+            stall = not fail and self._rng.random() < self.stall_rate
+            if not fail and self.stall_next > 0:
+                self.stall_next -= 1
+                stall = True
+            self.failures += fail
+            self.stalls += stall
+        if fail:
+            raise FakeAPIError(f"Injected failure in {name}")
+        if stall:
+            time.sleep(self.stall_seconds)
+
+
+class FakeOpenAI:
+    """
+    Offline stand-in for the OpenAI client.
+    """
+
+    def __init__(
+        self,
+        dimension: Optional[int] = None,
+        polls_until_complete: int = 1,
+        chat_completions: Optional[FakeChatCompletions] = None,
+        embedding_latency: Optional[LatencyModel] = None,
+    ):
+        """
+        Initialize the client stand-in.
+
+        Args:
+            dimension: Embedding dimension, or None to use each model's dimension
+            polls_until_complete: Number of batch retrievals before completion
+            chat_completions: Chat stand-in to use (e.g. with latency), or None
+                for an instant one
+            embedding_latency: Delay of each embeddings call, or None
+        """
+        self.chat = SimpleNamespace(
+            completions=chat_completions or FakeChatCompletions()
+        )
+        self.embeddings = FakeEmbeddings(dimension, latency=embedding_latency)
+        self.files = FakeFiles()
+        self.batches = FakeBatches(self.files, self.embeddings, polls_until_complete)
@@ -2,5 +2,46 @@
 Services for the vector_chat package.
 """
 
-from vector_chat.services.chunker import chunk_by_sentences, chunk_text
-from vector_chat.services.qdrant_service import QdrantService
+from vector_chat.services.chunker import (
+    ChunkBatch,
+    chunk_by_sentences,
+    chunk_text,
+    make_chunk_id,
+)
+from vector_chat.services.context_builder import count_tokens, pack_context
+from vector_chat.services.dedup import SimHashIndex, deduplicate_chunks, simhash
+from vector_chat.services.embeddings import (
+    EmbeddingProvider,
+    HashingEmbedder,
+    OnnxEmbedder,
+    get_embedding_provider,
+)
+from vector_chat.services.gating import RetrievalGate
+from vector_chat.services.journal import IngestJournal
+from vector_chat.services.model_router import ChatModelRouter, RoutingPolicy
+from vector_chat.services.profiling import Profiler
+from vector_chat.services.qdrant_service import (
+    QdrantService,
+    close_qdrant_clients,
+    get_qdrant_client,
+)
+from vector_chat.services.query_batcher import QueryBatcher
+from vector_chat.services.rate_limiter import RateLimiter, get_rate_limiter
+from vector_chat.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    ResilientCaller,
+    ResilientIndex,
+)
+from vector_chat.services.retrieval import (
+    adaptive_cutoff,
+    diversify_results,
+    fetch_neighbors,
+    maximal_marginal_relevance,
+    merge_adjacent_chunks,
+)
+from vector_chat.services.router import CollectionRouter
+from vector_chat.services.text_store import ChunkTextStore, hydrate_results
+from vector_chat.services.usage import UsageTracker, load_price_table
+from vector_chat.services.watcher import DirectoryWatcher, IngestMetrics, WatchState
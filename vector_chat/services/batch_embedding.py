@@ -0,0 +1,260 @@
+"""
+Offline embedding through the OpenAI Batch API.
+
+Chunks are written to Batch-format JSONL request files, submitted and
+polled, and the returned vectors are bulk-loaded into Qdrant keyed by the
+stable chunk IDs used as each request's custom_id.
+"""
+
+import glob
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from vector_chat.config import BATCH_MAX_REQUESTS_PER_FILE, BATCH_POLL_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_ENDPOINT: str = "/v1/embeddings"
+PAYLOADS_FILE: str = "payloads.jsonl"
+BATCH_IDS_FILE: str = "batches.json"
+
+# Batch statuses after which polling stops
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def write_batch_requests(
+    ids: Sequence[Union[str, int]],
+    texts: Sequence[str],
+    model: str,
+    batch_dir: str,
+    max_requests_per_file: int = BATCH_MAX_REQUESTS_PER_FILE,
+) -> List[str]:
+    """
+    Write embedding requests as Batch API JSONL files.
+
+    Args:
+        ids: Chunk IDs, used as custom_id of each request
+        texts: Chunk texts, parallel to ids
+        model: Embedding model name
+        batch_dir: Directory to write the request files to
+        max_requests_per_file: Maximum requests per file (API limit is 50,000)
+
+    Returns:
+        Paths of the written request files
+    """
+    os.makedirs(batch_dir, exist_ok=True)
+    paths = []
+    for file_index, start in enumerate(range(0, len(texts), max_requests_per_file)):
+        path = os.path.join(batch_dir, f"requests_{file_index:05d}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for chunk_id, text in zip(
+                ids[start : start + max_requests_per_file],
+                texts[start : start + max_requests_per_file],
+            ):
+                request = {
+                    "custom_id": str(chunk_id),
+                    "method": "POST",
+                    "url": EMBEDDINGS_ENDPOINT,
+                    "body": {"model": model, "input": text},
+                }
+                f.write(json.dumps(request) + "\n")
+        paths.append(path)
+
+    logger.info(f"Wrote {len(texts)} embedding requests to {len(paths)} batch files")
+    return paths
+
+
+def write_batch_payloads(
+    ids: Sequence[Union[str, int]],
+    payloads: Sequence[Dict[str, Any]],
+    batch_dir: str,
+) -> str:
+    """
+    Write the payload of every chunk, keyed by chunk ID, next to the requests.
+
+    Args:
+        ids: Chunk IDs
+        payloads: Payload dictionaries, parallel to ids
+        batch_dir: Batch directory
+
+    Returns:
+        Path of the payload file
+    """
+    os.makedirs(batch_dir, exist_ok=True)
+    path = os.path.join(batch_dir, PAYLOADS_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk_id, payload in zip(ids, payloads):
+            f.write(json.dumps({"id": str(chunk_id), "payload": payload}) + "\n")
+    return path
+
+
+def submit_batch_files(client: Any, request_paths: Sequence[str]) -> List[str]:
+    """
+    Upload request files and create one batch per file.
+
+    Args:
+        client: OpenAI client (or a local stand-in) exposing files and batches
+        request_paths: Paths of request files
+
+    Returns:
+        IDs of the created batches
+    """
+    batch_ids = []
+    for path in request_paths:
+        with open(path, "rb") as f:
+            uploaded = client.files.create(file=f, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=EMBEDDINGS_ENDPOINT,
+            completion_window="24h",
+        )
+        logger.info(f"Submitted batch {batch.id} for {os.path.basename(path)}")
+        batch_ids.append(batch.id)
+
+    if request_paths:
+        batch_dir = os.path.dirname(request_paths[0])
+        with open(os.path.join(batch_dir, BATCH_IDS_FILE), "w", encoding="utf-8") as f:
+            json.dump(batch_ids, f)
+    return batch_ids
+
+
+def wait_for_batches(
+    client: Any,
+    batch_ids: Sequence[str],
+    batch_dir: str,
+    poll_interval: float = BATCH_POLL_INTERVAL,
+    timeout: Optional[float] = None,
+    failed: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    Poll batches until they finish and download their result files.
+
+    Args:
+        client: OpenAI client (or a local stand-in) exposing files and batches
+        batch_ids: IDs of the batches to wait for
+        batch_dir: Directory to write result files to
+        poll_interval: Seconds between status checks
+        timeout: Maximum seconds to wait, or None to wait indefinitely
+        failed: List to append the IDs of batches that did not complete to
+
+    Returns:
+        Paths of the downloaded result files
+
+    Raises:
+        TimeoutError: If the batches do not finish in time
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    pending = list(batch_ids)
+    result_paths = []
+
+    while pending:
+        for batch_id in list(pending):
+            batch = client.batches.retrieve(batch_id)
+            if batch.status not in TERMINAL_STATUSES:
+                continue
+            pending.remove(batch_id)
+            if batch.status != "completed" or not batch.output_file_id:
+                logger.error(f"Batch {batch_id} ended with status '{batch.status}'")
+                if failed is not None:
+                    failed.append(batch_id)
+                continue
+
+            path = result_file_path(batch_dir, batch_id)
+            content = client.files.content(batch.output_file_id)
+            with open(path, "wb") as f:
+                f.write(content.read())
+            logger.info(f"Downloaded results of batch {batch_id}")
+            result_paths.append(path)
+
+        if pending:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Batches still running: {', '.join(pending)}")
+            logger.info(f"Waiting for {len(pending)} batches...")
+            time.sleep(poll_interval)
+
+    return result_paths
+
+
+def read_batch_results(
+    result_paths: Sequence[str],
+    failed: Optional[List[str]] = None,
+) -> Iterator[Tuple[str, List[float]]]:
+    """
+    Read embeddings from Batch API result files.
+
+    Failed requests are logged and skipped.
+
+    Args:
+        result_paths: Paths of result files
+        failed: List to append the custom IDs of failed requests to
+
+    Yields:
+        Tuples of (chunk_id, vector)
+    """
+    for path in result_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                result = json.loads(line)
+                response = result.get("response") or {}
+                if result.get("error") or response.get("status_code") != 200:
+                    logger.error(
+                        f"Request {result.get('custom_id')} failed: "
+                        f"{result.get('error') or response.get('body')}"
+                    )
+                    if failed is not None:
+                        failed.append(result.get("custom_id"))
+                    continue
+                yield result["custom_id"], response["body"]["data"][0]["embedding"]
+
+
+def result_file_path(batch_dir: str, batch_id: str) -> str:
+    """
+    Get the path the result file of a batch is downloaded to.
+
+    Args:
+        batch_dir: Batch directory
+        batch_id: ID of the batch
+
+    Returns:
+        Path of the result file
+    """
+    return os.path.join(batch_dir, f"results_{batch_id}.jsonl")
+
+
+def find_result_files(batch_dir: str) -> List[str]:
+    """
+    List result files in a batch directory.
+
+    Args:
+        batch_dir: Batch directory
+
+    Returns:
+        Sorted paths of result files
+    """
+    return sorted(glob.glob(os.path.join(batch_dir, "results_*.jsonl")))
+
+
+def load_batch_payloads(batch_dir: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the payloads written by write_batch_payloads.
+
+    Args:
+        batch_dir: Batch directory
+
+    Returns:
+        Dictionary mapping chunk ID to payload
+    """
+    payloads = {}
+    path = os.path.join(batch_dir, PAYLOADS_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    payloads[record["id"]] = record["payload"]
+    return payloads
@@ -4,9 +4,11 @@ Text chunking utilities for embedding.
 
 import logging
 import os
-from typing import List, Optional
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
 
 import nltk
+import numpy as np
 from nltk.tokenize import sent_tokenize
 
 from vector_chat.config import DEFAULT_MAX_SENTENCES_PER_CHUNK, TEXT_FILE_EXTENSIONS
@@ -78,6 +80,187 @@ def chunk_text(
     ]
 
 
+class ChunkBatch:
+    """
+    Chunks of a source held column by column.
+
+    Texts, sources and point IDs are parallel lists, positions are integer
+    arrays, and vectors (once embedded) a float32 matrix. Payload
+    dictionaries are only built for the slice being upserted, instead of
+    keeping one dictionary per chunk alive for the whole ingest.
+    """
+
+    __slots__ = ("texts", "sources", "chunk_index", "total_chunks", "ids", "vectors")
+
+    def __init__(
+        self,
+        texts: List[str],
+        sources: List[str],
+        chunk_index: np.ndarray,
+        total_chunks: np.ndarray,
+        ids: Optional[List[str]] = None,
+        vectors: Optional[np.ndarray] = None,
+    ):
+        """
+        Initialize a batch from its columns.
+
+        Args:
+            texts: Chunk texts
+            sources: Source of each chunk
+            chunk_index: Position of each chunk within its source
+            total_chunks: Number of chunks of each chunk's source
+            ids: Point IDs (derived from source and position if None)
+            vectors: Embedding matrix, one row per chunk, if embedded
+        """
+        self.texts = texts
+        self.sources = sources
+        self.chunk_index = chunk_index
+        self.total_chunks = total_chunks
+        self.ids = (
+            ids
+            if ids is not None
+            else [
+                make_chunk_id(source, index)
+                for source, index in zip(sources, chunk_index.tolist())
+            ]
+        )
+        self.vectors = vectors
+
+    @classmethod
+    def from_texts(cls, texts: List[str], source_name: str) -> "ChunkBatch":
+        """
+        Build a batch from the consecutive chunks of one source.
+
+        Args:
+            texts: Chunk texts, in order
+            source_name: Name of the source (file or description)
+
+        Returns:
+            Chunk batch
+        """
+        return cls(
+            texts,
+            [source_name] * len(texts),
+            np.arange(len(texts), dtype=np.int64),
+            np.full(len(texts), len(texts), dtype=np.int64),
+        )
+
+    @classmethod
+    def from_text(
+        cls,
+        text: str,
+        max_sents: int = DEFAULT_MAX_SENTENCES_PER_CHUNK,
+        source_name: str = "unknown",
+    ) -> "ChunkBatch":
+        """
+        Chunk a text into a batch.
+
+        Args:
+            text: Text to process
+            max_sents: Maximum number of sentences per chunk
+            source_name: Name of the source (file or description)
+
+        Returns:
+            Chunk batch
+        """
+        return cls.from_texts(chunk_by_sentences(text, max_sents), source_name)
+
+    def __len__(self) -> int:
+        """
+        Get the number of chunks.
+
+        Returns:
+            Number of chunks in the batch
+        """
+        return len(self.texts)
+
+    def select(self, indices: Sequence[int]) -> "ChunkBatch":
+        """
+        Keep only some chunks.
+
+        Args:
+            indices: Positions of the chunks to keep, in order
+
+        Returns:
+            New batch with the selected chunks
+        """
+        positions = np.asarray(indices, dtype=np.int64)
+        return ChunkBatch(
+            [self.texts[i] for i in indices],
+            [self.sources[i] for i in indices],
+            self.chunk_index[positions],
+            self.total_chunks[positions],
+            [self.ids[i] for i in indices],
+            self.vectors[positions] if self.vectors is not None else None,
+        )
+
+    def slice(self, start: int, end: int) -> "ChunkBatch":
+        """
+        Take a contiguous range of chunks, sharing the arrays of this batch.
+
+        Args:
+            start: First position
+            end: Position after the last one
+
+        Returns:
+            Batch with the chunks in [start, end)
+        """
+        return ChunkBatch(
+            self.texts[start:end],
+            self.sources[start:end],
+            self.chunk_index[start:end],
+            self.total_chunks[start:end],
+            self.ids[start:end],
+            self.vectors[start:end] if self.vectors is not None else None,
+        )
+
+    def payloads(self, model_name: str, with_text: bool = True) -> List[Dict[str, Any]]:
+        """
+        Build the Qdrant payloads of the chunks.
+
+        Args:
+            model_name: Embedding model recorded with each chunk
+            with_text: Include the chunk text (False when it is kept in a
+                text store)
+
+        Returns:
+            One new payload dictionary per chunk
+        """
+        payloads = []
+        for text, source, index, total in zip(
+            self.texts,
+            self.sources,
+            self.chunk_index.tolist(),
+            self.total_chunks.tolist(),
+        ):
+            payload: Dict[str, Any] = {"chunk_text": text} if with_text else {}
+            payload.update(
+                source=source,
+                model_name=model_name,
+                chunk_index=index,
+                total_chunks=total,
+            )
+            payloads.append(payload)
+        return payloads
+
+
+def make_chunk_id(source_name: str, chunk_index: int) -> str:
+    """
+    Build a stable point ID for a chunk.
+
+    The same source and position always map to the same ID, so re-embedding
+    a source overwrites its previous points instead of adding new ones.
+
+    Args:
+        source_name: Name of the source (file or description)
+        chunk_index: Position of the chunk within the source
+
+    Returns:
+        UUID string usable as a Qdrant point ID
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{source_name}#{chunk_index}"))
+
+
 def list_text_files(directory: str = ".") -> List[str]:
     """
     List all text files in the directory.
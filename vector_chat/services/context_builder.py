@@ -0,0 +1,135 @@
+"""
+Token-budgeted context packing for chat prompts.
+"""
+
+import functools
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from vector_chat.config import DEFAULT_MIN_CHUNK_TOKENS
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - depends on installed extras
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used when tiktoken is not installed
+CHARS_PER_TOKEN: int = 4
+
+CONTEXT_SEPARATOR: str = "\n\n"
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoding() -> Any:
+    """
+    Load the tiktoken encoding once per process.
+
+    Returns:
+        tiktoken encoding, or None if tiktoken is unavailable
+    """
+    if tiktoken is None:
+        logger.debug("tiktoken not installed, using approximate token counts")
+        return None
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in a piece of text.
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Number of tokens (approximate if tiktoken is not installed)
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Truncate text to at most max_tokens tokens.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Maximum number of tokens to keep
+
+    Returns:
+        Truncated text
+    """
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[: max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text)
+    return str(encoding.decode(tokens[:max_tokens]))
+
+
+def format_context_chunk(position: int, payload: Dict[str, Any]) -> str:
+    """
+    Format a single retrieved chunk for the prompt.
+
+    Args:
+        position: 1-based position of the chunk in the context
+        payload: Payload of the search hit
+
+    Returns:
+        Formatted chunk text
+    """
+    source = f" ({payload['source']})" if "source" in payload else ""
+    return f"[{position}]{source} {payload['chunk_text']}"
+
+
+def pack_context(
+    results: List[Tuple[Any, ...]],
+    max_tokens: Optional[int] = None,
+    min_chunk_tokens: int = DEFAULT_MIN_CHUNK_TOKENS,
+) -> Tuple[str, int, int]:
+    """
+    Pack search hits into a context string within a token budget.
+
+    Hits are added in score order. A hit that does not fit is trimmed to
+    the remaining budget if at least min_chunk_tokens remain, and dropped
+    otherwise.
+
+    Args:
+        results: List of tuples (id, score, payload, ...)
+        max_tokens: Token budget for the context, or None for no limit
+        min_chunk_tokens: Smallest useful size of a trimmed chunk
+
+    Returns:
+        Tuple of (context_text, tokens_used, chunks_used)
+    """
+    ranked = sorted(results, key=lambda result: result[1], reverse=True)
+    separator_tokens = count_tokens(CONTEXT_SEPARATOR)
+
+    parts: List[str] = []
+    used = 0
+    dropped = 0
+    for result in ranked:
+        part = format_context_chunk(len(parts) + 1, result[2])
+        cost = count_tokens(part) + (separator_tokens if parts else 0)
+
+        if max_tokens is None or used + cost <= max_tokens:
+            parts.append(part)
+            used += cost
+            continue
+
+        remaining = max_tokens - used - (separator_tokens if parts else 0)
+        if remaining >= min_chunk_tokens:
+            trimmed = truncate_to_tokens(part, remaining)
+            parts.append(trimmed)
+            used += count_tokens(trimmed) + (separator_tokens if len(parts) > 1 else 0)
+        else:
+            dropped += 1
+
+    if dropped:
+        logger.debug(f"Dropped {dropped} context chunks over the token budget")
+
+    return CONTEXT_SEPARATOR.join(parts), used, len(parts)
@@ -0,0 +1,299 @@
+"""
+Near-duplicate detection for chunks using SimHash fingerprints.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from vector_chat.config import DEDUP_MAX_DISTANCE
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS: int = 64
+SHINGLE_SIZE: int = 2
+
+_BIT_POSITIONS = np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """
+    Split text into overlapping word shingles.
+
+    Args:
+        text: Text to split
+        size: Number of words per shingle
+
+    Returns:
+        List of shingles (the whole text if it has fewer words than size)
+    """
+    words = _TOKEN_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i : i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(text: str) -> int:
+    """
+    Compute a 64-bit SimHash fingerprint of a text.
+
+    Texts that differ only in a few words get fingerprints a small
+    Hamming distance apart.
+
+    Args:
+        text: Text to fingerprint
+
+    Returns:
+        Fingerprint as an unsigned integer
+    """
+    shingles = _shingles(text)
+    if not shingles:
+        return 0
+
+    hashes = np.array(
+        [
+            int.from_bytes(
+                hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little"
+            )
+            for s in shingles
+        ],
+        dtype=np.uint64,
+    )
+    bits = ((hashes[:, None] >> _BIT_POSITIONS) & np.uint64(1)).astype(np.int32)
+    weights = (2 * bits - 1).sum(axis=0)
+    return sum(1 << int(i) for i in np.flatnonzero(weights > 0))
+
+
+def content_hash(text: str) -> str:
+    """
+    Hash the exact text of a chunk.
+
+    Unlike simhash, any edit (case and punctuation included) changes it.
+
+    Args:
+        text: Text to hash
+
+    Returns:
+        Hex digest of the text
+    """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """
+    Count the differing bits of two fingerprints.
+
+    Args:
+        a: First fingerprint
+        b: Second fingerprint
+
+    Returns:
+        Number of differing bits
+    """
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """
+    Index of fingerprints supporting near-duplicate lookups.
+
+    Fingerprints are split into max_distance + 1 bands; by the pigeonhole
+    principle, any fingerprint within max_distance bits of an indexed one
+    matches it exactly in at least one band, so only those candidates are
+    compared.
+    """
+
+    def __init__(self, max_distance: int = DEDUP_MAX_DISTANCE):
+        """
+        Initialize an empty index.
+
+        Args:
+            max_distance: Largest Hamming distance considered a near-duplicate
+        """
+        self.max_distance = max_distance
+        self.num_bands = max_distance + 1
+        self.band_width = FINGERPRINT_BITS // self.num_bands
+        self.fingerprints: Dict[str, int] = {}
+        # Exact content hashes, telling unchanged chunks from edited ones
+        self.content_hashes: Dict[str, str] = {}
+        self._bands: List[Dict[int, List[str]]] = [{} for _ in range(self.num_bands)]
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        """
+        Split a fingerprint into its band values.
+
+        Args:
+            fingerprint: Fingerprint to split
+
+        Returns:
+            List of band values
+        """
+        mask = (1 << self.band_width) - 1
+        return [
+            (fingerprint >> (band * self.band_width)) & mask
+            for band in range(self.num_bands)
+        ]
+
+    def add(
+        self,
+        chunk_id: Union[str, int],
+        fingerprint: int,
+        text_hash: Optional[str] = None,
+    ) -> None:
+        """
+        Add or replace the fingerprint of a chunk.
+
+        Args:
+            chunk_id: ID of the chunk
+            fingerprint: SimHash fingerprint of the chunk text
+            text_hash: content_hash of the chunk text, if known
+        """
+        chunk_id = str(chunk_id)
+        if chunk_id in self.fingerprints:
+            self.remove(chunk_id)
+        self.fingerprints[chunk_id] = fingerprint
+        if text_hash is not None:
+            self.content_hashes[chunk_id] = text_hash
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            band.setdefault(key, []).append(chunk_id)
+
+    def remove(self, chunk_id: Union[str, int]) -> None:
+        """
+        Remove a chunk from the index.
+
+        Args:
+            chunk_id: ID of the chunk
+        """
+        chunk_id = str(chunk_id)
+        self.content_hashes.pop(chunk_id, None)
+        fingerprint = self.fingerprints.pop(chunk_id, None)
+        if fingerprint is None:
+            return
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            members = band.get(key, [])
+            if chunk_id in members:
+                members.remove(chunk_id)
+
+    def find(self, fingerprint: int) -> Optional[Tuple[str, int]]:
+        """
+        Find the closest indexed chunk within max_distance bits.
+
+        Args:
+            fingerprint: Fingerprint to look up
+
+        Returns:
+            Tuple of (chunk_id, distance), or None if there is no near-duplicate
+        """
+        best: Optional[Tuple[str, int]] = None
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            for candidate in band.get(key, []):
+                distance = hamming_distance(fingerprint, self.fingerprints[candidate])
+                if distance <= self.max_distance and (
+                    best is None or distance < best[1]
+                ):
+                    best = (candidate, distance)
+        return best
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to a JSON file.
+
+        Args:
+            path: Destination path
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "max_distance": self.max_distance,
+                    "fingerprints": {
+                        k: format(v, "016x") for k, v in self.fingerprints.items()
+                    },
+                    "content_hashes": self.content_hashes,
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+        logger.debug(f"Saved {len(self)} fingerprints to {path}")
+
+    @classmethod
+    def load(cls, path: str, max_distance: int = DEDUP_MAX_DISTANCE) -> "SimHashIndex":
+        """
+        Load an index from a JSON file, or start an empty one.
+
+        Args:
+            path: Path written by save()
+            max_distance: Largest Hamming distance considered a near-duplicate
+
+        Returns:
+            Loaded index
+        """
+        index = cls(max_distance=max_distance)
+        if not os.path.exists(path):
+            return index
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            hashes = data.get("content_hashes", {})
+            for chunk_id, fingerprint in data.get("fingerprints", {}).items():
+                index.add(chunk_id, int(fingerprint, 16), hashes.get(chunk_id))
+            logger.info(f"Loaded {len(index)} fingerprints from {path}")
+        except Exception as e:
+            logger.error(f"Error loading fingerprint index {path}: {str(e)}")
+        return index
+
+
+def deduplicate_chunks(
+    texts: Sequence[str],
+    ids: Sequence[Union[str, int]],
+    index: SimHashIndex,
+) -> Tuple[List[int], Dict[int, str]]:
+    """
+    Filter out chunks that are near-duplicates of indexed or earlier chunks.
+
+    Kept chunks are added to the index. A chunk that matches its own
+    previous version (same ID) is kept only if its exact text changed,
+    even when the edit leaves the fingerprint as it was. A chunk
+    skipped as a near-duplicate of a different chunk loses its own
+    fingerprint: any point stored under its ID holds older text and should
+    be deleted by the caller.
+
+    Args:
+        texts: Chunk texts
+        ids: Chunk IDs, parallel to texts
+        index: Fingerprint index, updated in place
+
+    Returns:
+        Tuple of (positions of kept chunks, {skipped position: original chunk ID})
+    """
+    kept: List[int] = []
+    duplicates: Dict[int, str] = {}
+
+    for i, (text, chunk_id) in enumerate(zip(texts, ids)):
+        fingerprint = simhash(text)
+        text_hash = content_hash(text)
+        match = index.find(fingerprint)
+        if match is not None:
+            original_id, distance = match
+            if original_id != str(chunk_id):
+                duplicates[i] = original_id
+                index.remove(chunk_id)
+                continue
+            if index.content_hashes.get(original_id) == text_hash:
+                # Unchanged since it was last embedded
+                duplicates[i] = original_id
+                continue
+        index.add(chunk_id, fingerprint, text_hash)
+        kept.append(i)
+
+    return kept, duplicates
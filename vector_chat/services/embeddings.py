@@ -0,0 +1,296 @@
+"""
+CPU-local embedding providers.
+
+Local providers embed text in-process, without API calls or rate limits:
+
+- ``local-hash``: a deterministic hashing vectorizer over words and word
+  pairs. It needs nothing beyond numpy; its similarity is lexical, which
+  suits tests, demos and keyword-heavy corpora.
+- ``local-minilm``: a small sentence model (e.g. all-MiniLM-L6-v2) exported
+  to ONNX, with ``model.onnx`` and ``tokenizer.json`` in
+  LOCAL_EMBEDDING_MODEL_DIR. Needs the ``local`` extra
+  (``poetry install -E local``).
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import re
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+
+import numpy as np
+
+from vector_chat.config import (
+    EMBEDDING_DIMENSIONS,
+    LOCAL_EMBEDDING_BATCH_SIZE,
+    LOCAL_EMBEDDING_MODEL_DIR,
+    LOCAL_EMBEDDING_MODELS,
+    LOCAL_EMBEDDING_THREADS,
+)
+
+try:
+    import onnxruntime
+    from tokenizers import Tokenizer
+except ImportError:  # pragma: no cover - depends on installed extras
+    onnxruntime = None
+    Tokenizer = None
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class EmbeddingProvider(ABC):
+    """
+    Base class of in-process embedding models.
+
+    Subclasses implement embed_batch; embed splits the input into batches
+    and runs them on a thread pool. Threads only help models whose
+    inference releases the GIL, such as ONNX Runtime.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        dimension: int,
+        batch_size: int = LOCAL_EMBEDDING_BATCH_SIZE,
+        max_workers: int = LOCAL_EMBEDDING_THREADS,
+    ):
+        """
+        Initialize the provider.
+
+        Args:
+            model_name: Name recorded with the embeddings
+            dimension: Size of the vectors
+            batch_size: Texts per inference batch
+            max_workers: Batches embedded concurrently
+        """
+        self.model_name = model_name
+        self.dimension = dimension
+        self.batch_size = batch_size
+        self.max_workers = max(1, max_workers)
+
+    @abstractmethod
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed one batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Matrix of shape (len(texts), dimension) with L2-normalized rows
+        """
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts in batches, several batches at a time.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Matrix of shape (len(texts), dimension), one row per text
+        """
+        matrix = np.empty((len(texts), self.dimension), dtype=np.float32)
+        starts = range(0, len(texts), self.batch_size)
+
+        def fill(start: int) -> None:
+            matrix[start : start + self.batch_size] = self.embed_batch(
+                texts[start : start + self.batch_size]
+            )
+
+        if len(starts) <= 1 or self.max_workers == 1:
+            for start in starts:
+                fill(start)
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(fill, starts))
+        return matrix
+
+
+class HashingEmbedder(EmbeddingProvider):
+    """
+    Deterministic feature-hashing embedder.
+
+    Each word and pair of adjacent words is hashed to a signed bucket;
+    counts are dampened with log(1 + n) and the vector is normalized, so
+    cosine similarity measures shared vocabulary. Batches run one after the
+    other: the pure-Python loop holds the GIL, so threads would not help.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "local-hash",
+        dimension: int = 384,
+        batch_size: int = LOCAL_EMBEDDING_BATCH_SIZE,
+    ):
+        """
+        Initialize the embedder.
+
+        Args:
+            model_name: Name recorded with the embeddings
+            dimension: Number of hash buckets
+            batch_size: Texts per batch
+        """
+        super().__init__(model_name, dimension, batch_size=batch_size, max_workers=1)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=65536)
+    def _bucket(feature: str, dimension: int) -> int:
+        """
+        Hash a feature to a signed bucket (stable across processes).
+
+        Args:
+            feature: Word or word pair
+            dimension: Number of buckets
+
+        Returns:
+            Bucket index plus one, negated for negative features
+        """
+        value = int.from_bytes(
+            hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        index = (value >> 1) % dimension + 1
+        return -index if value & 1 else index
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed one batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Matrix of shape (len(texts), dimension) with L2-normalized rows
+        """
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD_PATTERN.findall(text.lower())
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            for feature in features:
+                bucket = self._bucket(feature, self.dimension)
+                matrix[row, abs(bucket) - 1] += 1.0 if bucket > 0 else -1.0
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class OnnxEmbedder(EmbeddingProvider):
+    """
+    Sentence embedding model run with ONNX Runtime on the CPU.
+
+    Token embeddings are mean-pooled over the attention mask and
+    normalized, as in sentence-transformers.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "local-minilm",
+        model_dir: str = LOCAL_EMBEDDING_MODEL_DIR,
+        max_length: int = 256,
+        **kwargs: Any,
+    ):
+        """
+        Load the model and its tokenizer.
+
+        Args:
+            model_name: Name recorded with the embeddings
+            model_dir: Directory with model.onnx and tokenizer.json
+            max_length: Longer inputs are truncated to this many tokens
+            **kwargs: batch_size and max_workers for EmbeddingProvider
+
+        Raises:
+            ImportError: If onnxruntime or tokenizers is not installed
+        """
+        if onnxruntime is None or Tokenizer is None:
+            raise ImportError(
+                f"{model_name} needs onnxruntime and tokenizers "
+                "(install with `poetry install -E local`)"
+            )
+        super().__init__(
+            model_name, EMBEDDING_DIMENSIONS.get(model_name, 384), **kwargs
+        )
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        # Batches already run in parallel; keep each one single-threaded
+        options.intra_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, "model.onnx"),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed one batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Matrix of shape (len(texts), dimension) with L2-normalized rows
+        """
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array(
+                [e.attention_mask for e in encodings], dtype=np.int64
+            ),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        mask = inputs["attention_mask"][:, :, None].astype(np.float32)
+        tokens = self.session.run(
+            None, {name: v for name, v in inputs.items() if name in self.input_names}
+        )[0]
+
+        pooled = (tokens * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        norms = np.where(norms == 0, 1.0, norms)
+        vectors: np.ndarray = (pooled / norms).astype(np.float32)
+        return vectors
+
+
+def is_local_model(model_name: Optional[str]) -> bool:
+    """
+    Check whether an embedding model runs in-process.
+
+    Args:
+        model_name: Embedding model name
+
+    Returns:
+        True for local models
+    """
+    return model_name in LOCAL_EMBEDDING_MODELS
+
+
+@functools.lru_cache(maxsize=None)
+def get_embedding_provider(model_name: str) -> Optional[EmbeddingProvider]:
+    """
+    Get the shared local provider of an embedding model.
+
+    Providers are created once per process, so models are loaded once.
+
+    Args:
+        model_name: Embedding model name
+
+    Returns:
+        Local provider, or None if the model is served by the API
+
+    Raises:
+        ImportError: If the model needs an extra that is not installed
+    """
+    if model_name == "local-hash":
+        return HashingEmbedder(dimension=EMBEDDING_DIMENSIONS[model_name])
+    if model_name == "local-minilm":
+        logger.info(f"Loading {model_name} from {LOCAL_EMBEDDING_MODEL_DIR}")
+        return OnnxEmbedder(model_name)
+    return None
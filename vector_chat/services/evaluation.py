@@ -0,0 +1,204 @@
+"""
+Offline evaluation of retrieval quality and latency.
+
+An evaluation set is a JSONL file with one labeled query per line:
+
+    {"query": "...", "relevant_ids": ["..."],
+     "relevant_chunks": [{"source": "doc.txt", "chunk_index": 3}],
+     "answers": ["text the answer must contain"]}
+
+Relevant chunks can be given by point ID, by source and chunk index (turned
+into the stable chunk ID), or by answer text. Answer text stays valid when
+chunking changes, so it is the label to use when comparing chunk sizes.
+"""
+
+import json
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from vector_chat.services.chunker import make_chunk_id
+
+logger = logging.getLogger(__name__)
+
+
+class EvalQuery:
+    """
+    A labeled query of an evaluation set.
+    """
+
+    def __init__(
+        self,
+        query: str,
+        relevant_ids: Optional[Sequence[str]] = None,
+        answers: Optional[Sequence[str]] = None,
+    ):
+        """
+        Initialize a labeled query.
+
+        Args:
+            query: Query text
+            relevant_ids: IDs of the chunks answering the query
+            answers: Texts that a relevant chunk contains
+        """
+        self.query = query
+        self.relevant_ids: Set[str] = {str(i) for i in relevant_ids or []}
+        self.answers: List[str] = [a.lower() for a in answers or []]
+
+    @property
+    def num_relevant(self) -> int:
+        """
+        Number of relevant items (chunk IDs and answers) to find.
+        """
+        return len(self.relevant_ids) + len(self.answers)
+
+    def matches(self, chunk_id: Any, payload: Optional[Dict[str, Any]]) -> Set[str]:
+        """
+        Get the relevant items a retrieved chunk covers.
+
+        Args:
+            chunk_id: ID of the retrieved chunk
+            payload: Payload of the retrieved chunk
+
+        Returns:
+            Set of covered items ("id:<id>" or "answer:<n>")
+        """
+        found = set()
+        if str(chunk_id) in self.relevant_ids:
+            found.add(f"id:{chunk_id}")
+        text = str((payload or {}).get("chunk_text", "")).lower()
+        for n, answer in enumerate(self.answers):
+            if answer in text:
+                found.add(f"answer:{n}")
+        return found
+
+
+def load_eval_set(path: str) -> List[EvalQuery]:
+    """
+    Load labeled queries from a JSONL file.
+
+    Args:
+        path: Path to the evaluation set
+
+    Returns:
+        List of labeled queries
+
+    Raises:
+        ValueError: If a query has no relevance labels
+    """
+    queries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            relevant_ids = list(record.get("relevant_ids", []))
+            relevant_ids += [
+                make_chunk_id(chunk["source"], chunk["chunk_index"])
+                for chunk in record.get("relevant_chunks", [])
+            ]
+            query = EvalQuery(record["query"], relevant_ids, record.get("answers"))
+            if not query.num_relevant:
+                raise ValueError(f"Query on line {line_number} has no relevance labels")
+            queries.append(query)
+    return queries
+
+
+def score_ranking(
+    query: EvalQuery, results: Sequence[Tuple[Any, ...]], k_values: Sequence[int]
+) -> Dict[str, float]:
+    """
+    Score one ranked result list against its labels.
+
+    Each relevant item counts once, at the first position that covers it.
+
+    Args:
+        query: Labeled query
+        results: Retrieved (id, score, payload) tuples, best first
+        k_values: Cutoffs for recall@k and nDCG@k
+
+    Returns:
+        Dictionary with recall@k, ndcg@k and mrr
+    """
+    # Gain of each position: number of relevant items first covered there
+    seen: Set[str] = set()
+    gains = []
+    for result in results:
+        new = query.matches(result[0], result[2]) - seen
+        seen |= new
+        gains.append(len(new))
+
+    scores: Dict[str, float] = {}
+    first_hit = next((i for i, gain in enumerate(gains) if gain), None)
+    scores["mrr"] = 0.0 if first_hit is None else 1.0 / (first_hit + 1)
+    for k in k_values:
+        top = gains[:k]
+        scores[f"recall@{k}"] = sum(top) / query.num_relevant
+        dcg = sum(gain / math.log2(i + 2) for i, gain in enumerate(top))
+        ideal = sum(1 / math.log2(i + 2) for i in range(min(k, query.num_relevant)))
+        scores[f"ndcg@{k}"] = dcg / ideal if ideal else 0.0
+    return scores
+
+
+def evaluate_retrieval(
+    queries: Sequence[EvalQuery],
+    query_vectors: Union[np.ndarray, Sequence[Sequence[float]]],
+    search_batch: Callable[[np.ndarray, int, float], List[List[Tuple[Any, ...]]]],
+    k_values: Sequence[int] = (1, 3, 5, 10),
+    score_threshold: float = 0.0,
+    batch_size: int = 32,
+) -> Dict[str, Any]:
+    """
+    Run batched retrieval for every query and aggregate quality and latency.
+
+    Args:
+        queries: Labeled queries
+        query_vectors: Embeddings of the queries (matrix rows or vectors),
+            parallel to queries
+        search_batch: Callable taking (vector matrix, top_k, score_threshold)
+            and returning one result list per vector, e.g.
+            QdrantService.search_batch
+        k_values: Cutoffs for recall@k and nDCG@k
+        score_threshold: Minimum similarity score passed to the search
+        batch_size: Number of queries per search request
+
+    Returns:
+        Dictionary with mean metrics, latency percentiles and query count
+    """
+    top_k = max(k_values)
+    query_matrix = np.asarray(query_vectors)
+    per_query: List[Dict[str, float]] = []
+    latencies: List[float] = []
+    search_seconds = 0.0
+
+    for start in range(0, len(queries), batch_size):
+        vectors = query_matrix[start : start + batch_size]
+        t0 = time.perf_counter()
+        batches = search_batch(vectors, top_k, score_threshold)
+        elapsed = time.perf_counter() - t0
+        search_seconds += elapsed
+        # Every query of a batch waits for the whole request
+        latencies.extend([elapsed * 1000] * len(vectors))
+        for query, results in zip(queries[start : start + batch_size], batches):
+            per_query.append(score_ranking(query, results, k_values))
+        logger.debug(f"Evaluated {len(per_query)} of {len(queries)} queries")
+
+    metrics = {
+        name: float(np.mean([scores[name] for scores in per_query]))
+        for name in (per_query[0] if per_query else {})
+    }
+    return {
+        "queries": len(per_query),
+        "metrics": metrics,
+        "latency_ms": {
+            "p50": float(np.percentile(latencies, 50)) if latencies else 0.0,
+            "p95": float(np.percentile(latencies, 95)) if latencies else 0.0,
+            "p99": float(np.percentile(latencies, 99)) if latencies else 0.0,
+        },
+        "queries_per_second": (
+            len(per_query) / search_seconds if search_seconds else 0.0
+        ),
+    }
@@ -0,0 +1,146 @@
+"""
+Retrieval gating: decide per chat turn whether embedding and search are needed.
+"""
+
+import logging
+import re
+from typing import Optional, Sequence, Set, Tuple
+
+from vector_chat.config import (
+    GATE_CHIT_CHAT_PATTERNS,
+    GATE_REUSE_SIMILARITY,
+)
+
+logger = logging.getLogger(__name__)
+
+# Gate decisions
+RETRIEVE = "retrieve"
+REUSE = "reuse"
+SKIP = "skip"
+
+# Words that carry no topic on their own
+STOPWORDS: Set[str] = set("""
+    a about all also am an and any are as at be been but by can could did do
+    does for from had has have he her him his how i if in into is it its just
+    me more my no not now of on or our please she so some tell than that the
+    their them then there these they this those to too us very was we were
+    what when where which who whom why will with would you your
+    """.split())
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def content_words(text: str) -> Set[str]:
+    """
+    Get the topical words of a text.
+
+    Args:
+        text: Text to analyze
+
+    Returns:
+        Set of lowercase words that are not stopwords
+    """
+    return {
+        word
+        for word in _WORD_PATTERN.findall(text.lower())
+        if word not in STOPWORDS and len(word) > 1
+    }
+
+
+class RetrievalGate:
+    """
+    Cheap local check run before retrieval.
+
+    A turn is answered without retrieval if it matches a chit-chat pattern,
+    and reuses the previous context if its content words mostly repeat
+    those of the last retrieved query. Everything else, including short
+    questions made only of stopwords ("Why?"), is retrieved as usual.
+    """
+
+    def __init__(
+        self,
+        chit_chat_patterns: Optional[Sequence[str]] = None,
+        reuse_similarity: Optional[float] = GATE_REUSE_SIMILARITY,
+    ):
+        """
+        Initialize the gate.
+
+        Args:
+            chit_chat_patterns: Regular expressions matching whole inputs that
+                need no retrieval
+            reuse_similarity: Word overlap (Jaccard) with the last retrieved
+                query above which its context is reused, or None to disable
+        """
+        patterns = (
+            GATE_CHIT_CHAT_PATTERNS
+            if chit_chat_patterns is None
+            else chit_chat_patterns
+        )
+        self._chit_chat = (
+            re.compile(r"^(?:" + "|".join(patterns) + r")$") if patterns else None
+        )
+        self.reuse_similarity = reuse_similarity
+        self._last_words: Set[str] = set()
+        # Running average of the retrieval time, to estimate the time saved
+        self.average_seconds = 0.0
+        self._retrievals = 0
+
+    def decide(self, query: str) -> Tuple[str, str]:
+        """
+        Decide how to get context for a turn, and log the decision.
+
+        Args:
+            query: User input
+
+        Returns:
+            Tuple of (decision, reason), decision being RETRIEVE, REUSE or SKIP
+        """
+        decision, reason = self._classify(query)
+        if decision == RETRIEVE:
+            logger.debug(f"Retrieval gate: {decision} ({reason})")
+        else:
+            logger.info(
+                f"Retrieval gate: {decision} ({reason}), saved about "
+                f"{self.average_seconds * 1000:.0f} ms"
+            )
+        return decision, reason
+
+    def _classify(self, query: str) -> Tuple[str, str]:
+        """
+        Classify a turn without logging.
+
+        Args:
+            query: User input
+
+        Returns:
+            Tuple of (decision, reason)
+        """
+        normalized = " ".join(_WORD_PATTERN.findall(query.lower()))
+        if self._chit_chat is not None and self._chit_chat.match(normalized):
+            return SKIP, "chit-chat"
+
+        words = content_words(query)
+        if self.reuse_similarity is not None and words and self._last_words:
+            overlap = len(words & self._last_words) / len(words | self._last_words)
+            if overlap >= self.reuse_similarity:
+                return REUSE, f"same topic as previous query ({overlap:.2f} overlap)"
+
+        return RETRIEVE, "needs context"
+
+    def record_retrieval(self, query: str, seconds: float) -> None:
+        """
+        Remember a retrieved query and how long its retrieval took.
+
+        Args:
+            query: Query that was retrieved for
+            seconds: Time spent embedding and searching
+        """
+        self._last_words = content_words(query)
+        self._retrievals += 1
+        self.average_seconds += (seconds - self.average_seconds) / self._retrievals
+
+    def reset(self) -> None:
+        """
+        Forget the last retrieved query (e.g. when the conversation is reset).
+        """
+        self._last_words = set()
@@ -0,0 +1,251 @@
+"""
+SQLite journal of ingestion jobs for checkpointing and resuming.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from vector_chat.config import JOURNAL_PATH
+
+logger = logging.getLogger(__name__)
+
+# Batch states, in the order a batch moves through them
+BATCH_EMBEDDED: str = "embedded"
+BATCH_UPSERTED: str = "upserted"
+
+JOB_RUNNING: str = "running"
+JOB_FAILED: str = "failed"
+JOB_COMPLETED: str = "completed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS batches (
+    job_id TEXT NOT NULL,
+    batch_index INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    dimension INTEGER,
+    vectors BLOB,
+    PRIMARY KEY (job_id, batch_index)
+);
+"""
+
+
+class IngestJournal:
+    """
+    Records which chunk batches of an ingestion job were embedded and upserted.
+
+    Embeddings are stored as soon as they are created and dropped once their
+    batch is upserted, so a failed job can resume without paying for any
+    embedding twice.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        """
+        Open (and create if needed) the journal database.
+
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self._conn.close()
+
+    def create_job(self, params: Dict[str, Any], text: str) -> str:
+        """
+        Register a new job.
+
+        Args:
+            params: Parameters needed to re-run the job (model, collection, ...)
+            text: Input text of the job
+
+        Returns:
+            New job ID
+        """
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, now, now, JOB_RUNNING, json.dumps(params), text),
+            )
+        logger.info(f"Started ingestion job {job_id}")
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job.
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            Dictionary with job_id, status, params and text, or None if unknown
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row["job_id"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "params": json.loads(row["params"]),
+            "text": row["text"],
+        }
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """
+        List all jobs with their progress, newest first.
+
+        Returns:
+            List of dictionaries with job_id, status, source and upserted batches
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT j.job_id, j.status, j.created_at, j.params, "
+                "SUM(CASE WHEN b.state = ? THEN 1 ELSE 0 END) AS upserted "
+                "FROM jobs j LEFT JOIN batches b ON j.job_id = b.job_id "
+                "GROUP BY j.job_id ORDER BY j.created_at DESC",
+                (BATCH_UPSERTED,),
+            ).fetchall()
+        return [
+            {
+                "job_id": row["job_id"],
+                "status": row["status"],
+                "created_at": row["created_at"],
+                "source": json.loads(row["params"]).get("source_name"),
+                "upserted_batches": row["upserted"] or 0,
+            }
+            for row in rows
+        ]
+
+    def set_status(self, job_id: str, status: str) -> None:
+        """
+        Update the status of a job.
+
+        Args:
+            job_id: ID of the job
+            status: New status
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                (status, time.time(), job_id),
+            )
+
+    def batch_state(self, job_id: str, batch_index: int) -> Optional[str]:
+        """
+        Get the recorded state of a batch.
+
+        Args:
+            job_id: ID of the job
+            batch_index: Position of the batch within the job
+
+        Returns:
+            BATCH_EMBEDDED, BATCH_UPSERTED, or None if nothing was recorded
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM batches WHERE job_id = ? AND batch_index = ?",
+                (job_id, batch_index),
+            ).fetchone()
+        return row["state"] if row else None
+
+    def save_embeddings(
+        self,
+        job_id: str,
+        batch_index: int,
+        vectors: Union[np.ndarray, List[List[float]]],
+    ) -> None:
+        """
+        Record the embeddings of a batch before it is upserted.
+
+        Args:
+            job_id: ID of the job
+            batch_index: Position of the batch within the job
+            vectors: Embedding matrix (or vectors) of the batch
+        """
+        matrix = np.asarray(vectors, dtype=np.float32)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO batches VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    batch_index,
+                    BATCH_EMBEDDED,
+                    matrix.shape[0],
+                    matrix.shape[1] if matrix.ndim == 2 else 0,
+                    matrix.tobytes(),
+                ),
+            )
+
+    def load_embeddings(self, job_id: str, batch_index: int) -> np.ndarray:
+        """
+        Load the embeddings recorded for a batch.
+
+        Args:
+            job_id: ID of the job
+            batch_index: Position of the batch within the job
+
+        Returns:
+            Embedding matrix of the batch, one row per chunk
+
+        Raises:
+            KeyError: If no embeddings are stored for the batch
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, dimension, vectors FROM batches "
+                "WHERE job_id = ? AND batch_index = ? AND vectors IS NOT NULL",
+                (job_id, batch_index),
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"No embeddings stored for batch {batch_index} of {job_id}")
+        matrix = np.frombuffer(row["vectors"], dtype=np.float32)
+        return matrix.reshape(row["size"], row["dimension"])
+
+    def mark_upserted(self, job_id: str, batch_index: int) -> None:
+        """
+        Mark a batch as stored in Qdrant and drop its saved embeddings.
+
+        Args:
+            job_id: ID of the job
+            batch_index: Position of the batch within the job
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE batches SET state = ?, vectors = NULL "
+                "WHERE job_id = ? AND batch_index = ?",
+                (BATCH_UPSERTED, job_id, batch_index),
+            )
@@ -0,0 +1,195 @@
+"""
+Routing of chat turns between a fast model and a strong model.
+"""
+
+import json
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vector_chat.config import (
+    DEFAULT_CHAT_MODEL,
+    DEFAULT_FAST_CHAT_MODEL,
+    ROUTING_HARD_KEYWORDS,
+    ROUTING_MAX_FAST_QUERY_TOKENS,
+    ROUTING_MIN_FAST_SCORE,
+)
+from vector_chat.services.context_builder import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class RoutingPolicy:
+    """
+    Rules deciding which turns are easy enough for the fast model.
+
+    A turn goes to the strong model if any rule flags it as hard; all
+    signals are local and cost nothing to compute.
+    """
+
+    def __init__(
+        self,
+        fast_model: str = DEFAULT_FAST_CHAT_MODEL,
+        strong_model: str = DEFAULT_CHAT_MODEL,
+        max_fast_query_tokens: int = ROUTING_MAX_FAST_QUERY_TOKENS,
+        min_fast_score: float = ROUTING_MIN_FAST_SCORE,
+        require_context: bool = True,
+        max_fast_turns: Optional[int] = None,
+        hard_keywords: Optional[Sequence[str]] = None,
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            fast_model: Model for easy turns
+            strong_model: Model for hard turns
+            max_fast_query_tokens: Longer queries are hard
+            min_fast_score: Turns whose best retrieval score is lower are hard
+            require_context: Turns without retrieved context are hard (only
+                applies when retrieval is enabled)
+            max_fast_turns: Turns deeper into the conversation are hard, or None
+            hard_keywords: Words or phrases marking a query as hard
+        """
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.max_fast_query_tokens = max_fast_query_tokens
+        self.min_fast_score = min_fast_score
+        self.require_context = require_context
+        self.max_fast_turns = max_fast_turns
+        self.hard_keywords = list(
+            ROUTING_HARD_KEYWORDS if hard_keywords is None else hard_keywords
+        )
+        self._keyword_pattern = (
+            re.compile(
+                r"\b(" + "|".join(re.escape(k) for k in self.hard_keywords) + r")\b",
+                re.IGNORECASE,
+            )
+            if self.hard_keywords
+            else None
+        )
+
+    @classmethod
+    def from_file(cls, path: str, **overrides: Any) -> "RoutingPolicy":
+        """
+        Load a policy from a JSON file of constructor arguments.
+
+        Args:
+            path: Path to the JSON file
+            **overrides: Arguments taking precedence over the file
+
+        Returns:
+            Routing policy
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+        settings.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**settings)
+
+    def classify(
+        self,
+        query: str,
+        top_score: Optional[float] = None,
+        context_found: Optional[bool] = None,
+        turn: int = 0,
+    ) -> Tuple[str, str]:
+        """
+        Pick the model for a turn.
+
+        Args:
+            query: User query
+            top_score: Best retrieval score, or None if retrieval did not run
+            context_found: Whether context was found, or None if retrieval
+                did not run
+            turn: Number of earlier user turns in the conversation
+
+        Returns:
+            Tuple of (model, reason)
+        """
+        tokens = count_tokens(query)
+        if tokens > self.max_fast_query_tokens:
+            return self.strong_model, f"long query ({tokens} tokens)"
+        if self._keyword_pattern is not None:
+            match = self._keyword_pattern.search(query)
+            if match:
+                return self.strong_model, f"hard keyword '{match.group(0).lower()}'"
+        if self.require_context and context_found is False:
+            return self.strong_model, "no context found"
+        if top_score is not None and top_score < self.min_fast_score:
+            return self.strong_model, f"weak retrieval (score {top_score:.2f})"
+        if self.max_fast_turns is not None and turn > self.max_fast_turns:
+            return self.strong_model, f"deep conversation (turn {turn})"
+        return self.fast_model, "easy query"
+
+
+class ChatModelRouter:
+    """
+    Applies a routing policy and keeps latency statistics per model.
+    """
+
+    def __init__(self, policy: Optional[RoutingPolicy] = None):
+        """
+        Initialize the router.
+
+        Args:
+            policy: Routing policy, defaults to RoutingPolicy()
+        """
+        self.policy = policy or RoutingPolicy()
+        self._latencies: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def route(
+        self,
+        query: str,
+        top_score: Optional[float] = None,
+        context_found: Optional[bool] = None,
+        turn: int = 0,
+    ) -> str:
+        """
+        Pick and log the model for a turn.
+
+        Args:
+            query: User query
+            top_score: Best retrieval score, or None if retrieval did not run
+            context_found: Whether context was found, or None if retrieval
+                did not run
+            turn: Number of earlier user turns in the conversation
+
+        Returns:
+            Model name
+        """
+        model, reason = self.policy.classify(query, top_score, context_found, turn)
+        logger.info(f"Routing to {model}: {reason}")
+        return model
+
+    def record_latency(self, model: str, seconds: float) -> None:
+        """
+        Record the response time of a routed turn.
+
+        Args:
+            model: Model that answered
+            seconds: Response time in seconds
+        """
+        with self._lock:
+            self._latencies.setdefault(model, []).append(seconds)
+        logger.info(f"{model} answered in {seconds * 1000:.0f} ms")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the number of turns and latency percentiles per model.
+
+        Returns:
+            Dictionary mapping model to turns, p50_ms and p95_ms
+        """
+        with self._lock:
+            latencies = {model: list(v) for model, v in self._latencies.items()}
+        return {
+            model: {
+                "turns": len(samples),
+                "p50_ms": float(np.percentile(samples, 50)) * 1000,
+                "p95_ms": float(np.percentile(samples, 95)) * 1000,
+            }
+            for model, samples in latencies.items()
+        }
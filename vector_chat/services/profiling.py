@@ -0,0 +1,284 @@
+"""
+Built-in profiling of the main pipeline stages (embed/chat --profile).
+
+A Profiler times named stages (chunking, embedding, upsert, search,
+completion). In "cpu" mode each stage runs under its own cProfile profile,
+which is only enabled inside the stage, so idle time (e.g. waiting for user
+input) costs nothing. In "mem" mode tracemalloc traces allocations with a
+shallow stack; each stage records its net and peak allocation, and its first
+run is bracketed by snapshots to list its biggest allocators. Profiles,
+snapshots and a plain-text summary are written to one directory per run.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+from vector_chat.config import (
+    PROFILE_DIR,
+    PROFILE_MODES,
+    PROFILE_TOP_N,
+    PROFILE_TRACE_FRAMES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Allocations of the profiler itself and of imports are not reported
+_IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class Profiler:
+    """
+    Collects CPU profiles and allocation statistics per pipeline stage.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        command: str = "run",
+        output_dir: str = PROFILE_DIR,
+        top_n: int = PROFILE_TOP_N,
+        trace_frames: int = PROFILE_TRACE_FRAMES,
+    ):
+        """
+        Initialize the profiler.
+
+        Args:
+            mode: "cpu", "mem" or "both"
+            command: Name of the profiled command, used in the output path
+            output_dir: Directory the run's profile directory is created in
+            top_n: Hotspots and allocators listed in the summary
+            trace_frames: Stack frames recorded per allocation in "mem" mode
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(
+                f"Unknown profile mode '{mode}', expected one of {PROFILE_MODES}"
+            )
+        self.mode = mode
+        self.command = command
+        self.cpu = mode in ("cpu", "both")
+        self.mem = mode in ("mem", "both")
+        self.top_n = top_n
+        self.trace_frames = trace_frames
+        self.output_dir = os.path.join(
+            output_dir, f"{command}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        )
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._stage_allocators: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+        self._active = False
+        self._owns_tracing = False
+        self._started = time.perf_counter()
+
+    def start(self) -> None:
+        """
+        Start tracing allocations (in "mem" mode).
+        """
+        self._started = time.perf_counter()
+        if self.mem and not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self._owns_tracing = True
+
+    def stop(self) -> None:
+        """
+        Stop tracing allocations, if this profiler started it.
+        """
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Profile a block of code as one run of a stage.
+
+        Only one stage is profiled at a time: stages entered while another
+        one runs (nested, or from other threads) are left to the outer one.
+
+        Args:
+            name: Stage name, e.g. "embedding"
+        """
+        with self._lock:
+            nested = self._active
+            self._active = True
+        if nested:
+            yield
+            return
+
+        stats = self.stages.setdefault(
+            name, {"calls": 0, "seconds": 0.0, "allocated": 0, "peak": 0}
+        )
+        before = None
+        if self.mem and tracemalloc.is_tracing():
+            if stats["calls"] == 0:
+                before = tracemalloc.take_snapshot()
+            if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+                tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+        profile = (
+            self._profiles.setdefault(name, cProfile.Profile()) if self.cpu else None
+        )
+
+        start = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            stats["seconds"] += time.perf_counter() - start
+            stats["calls"] += 1
+            if self.mem and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                stats["allocated"] += current - traced_before
+                if hasattr(tracemalloc, "reset_peak"):
+                    stats["peak"] = max(stats["peak"], peak - traced_before)
+                if before is not None:
+                    after = tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+                    self._stage_allocators[name] = after.compare_to(
+                        before.filter_traces(_IGNORED_TRACES), "lineno"
+                    )[: self.top_n]
+            with self._lock:
+                self._active = False
+
+    def summary(self) -> str:
+        """
+        Summarize stage timings, top CPU hotspots and biggest allocators.
+
+        Returns:
+            Plain-text report
+        """
+        lines = [
+            f"Profile of '{self.command}' ({self.mode}), "
+            f"{time.perf_counter() - self._started:.1f}s",
+            "",
+            f"{'stage':<14}{'calls':>7}{'total':>10}{'mean':>11}"
+            + (f"{'net alloc':>12}{'peak':>12}" if self.mem else ""),
+        ]
+        for name, stats in self.stages.items():
+            line = (
+                f"{name:<14}{stats['calls']:>7}{stats['seconds']:>9.2f}s"
+                f"{stats['seconds'] / stats['calls'] * 1000:>9.1f}ms"
+            )
+            if self.mem:
+                line += (
+                    f"{stats['allocated'] / 1024:>9.0f}KiB"
+                    f"{stats['peak'] / 1024:>9.0f}KiB"
+                )
+            lines.append(line)
+
+        if self._profiles:
+            lines += ["", f"Top {self.top_n} CPU hotspots (by own time):"]
+            lines += self._hotspots()
+
+        if self.mem and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+            lines += ["", f"Top {self.top_n} live allocations:"]
+            for stat in snapshot.statistics("lineno")[: self.top_n]:
+                lines.append(
+                    f"{stat.size / 1024:>10.1f}KiB{stat.count:>9} blocks  "
+                    f"{stat.traceback[0]}"
+                )
+            for name, diffs in self._stage_allocators.items():
+                lines += ["", f"Biggest allocators during the first '{name}':"]
+                for diff in diffs:
+                    lines.append(
+                        f"{diff.size_diff / 1024:>+10.1f}KiB"
+                        f"{diff.count_diff:>+9} blocks  {diff.traceback[0]}"
+                    )
+        return "\n".join(lines) + "\n"
+
+    def _hotspots(self) -> List[str]:
+        """
+        List the functions with the most own time over all stages.
+
+        Returns:
+            One formatted line per function
+        """
+        merged = self._merged_stats()
+        entries = sorted(
+            merged.stats.items(),  # type: ignore[attr-defined]
+            key=lambda item: item[1][2],
+            reverse=True,
+        )[: self.top_n]
+        lines = []
+        for (filename, lineno, function), (_, calls, own, cumulative, _) in entries:
+            lines.append(
+                f"{own:>9.3f}s own{cumulative:>9.3f}s cum{calls:>9} calls  "
+                f"{filename}:{lineno}({function})"
+            )
+        return lines
+
+    def _merged_stats(self) -> pstats.Stats:
+        """
+        Combine the CPU profiles of all stages.
+
+        Returns:
+            Merged statistics
+        """
+        profiles = list(self._profiles.values())
+        merged = pstats.Stats(profiles[0], stream=io.StringIO())
+        for profile in profiles[1:]:
+            merged.add(profile)
+        return merged
+
+    def write(self) -> str:
+        """
+        Write the profiles, the allocation snapshot and the summary.
+
+        Files: cpu.pstats (all stages) and cpu-<stage>.pstats, loadable with
+        pstats or snakeviz; mem.snapshot, loadable with
+        tracemalloc.Snapshot.load; and summary.txt.
+
+        Returns:
+            Directory the files were written to
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self._profiles:
+            for name, profile in self._profiles.items():
+                profile.dump_stats(os.path.join(self.output_dir, f"cpu-{name}.pstats"))
+            self._merged_stats().dump_stats(os.path.join(self.output_dir, "cpu.pstats"))
+        if self.mem and tracemalloc.is_tracing():
+            tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES).dump(
+                os.path.join(self.output_dir, "mem.snapshot")
+            )
+        summary = self.summary()
+        with open(
+            os.path.join(self.output_dir, "summary.txt"), "w", encoding="utf-8"
+        ) as f:
+            f.write(summary)
+        logger.info(f"Profile written to {self.output_dir}\n{summary}")
+        return self.output_dir
+
+
+def profile_stage(profiler: Optional[Profiler], name: str) -> ContextManager[None]:
+    """
+    Profile a block as a stage, or do nothing without a profiler.
+
+    Args:
+        profiler: Active profiler, or None
+        name: Stage name
+
+    Returns:
+        Context manager wrapping the block
+    """
+    if profiler is None:
+        return nullcontext()
+    return profiler.stage(name)
@@ -3,16 +3,151 @@ QdrantService for vector storage and retrieval.
 """
 
 import logging
+import threading
 import warnings
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
+import httpx
+import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
 
-from vector_chat.config import QDRANT_API_KEY, QDRANT_COLLECTION, QDRANT_URL
+from vector_chat.config import (
+    QDRANT_API_KEY,
+    QDRANT_COLLECTION,
+    QDRANT_GRPC_PORT,
+    QDRANT_KEEPALIVE_SECONDS,
+    QDRANT_POOL_SIZE,
+    QDRANT_PREFER_GRPC,
+    QDRANT_TIMEOUT,
+    QDRANT_URL,
+)
 
 logger = logging.getLogger(__name__)
 
+# Process-wide registry of Qdrant clients, keyed by connection settings
+_client_registry: Dict[Tuple[Any, ...], QdrantClient] = {}
+# Collections already verified to exist, keyed by (registry key, collection
+# name); services given their own client check every time
+_verified_collections: Set[Tuple[Tuple[Any, ...], str]] = set()
+_registry_lock = threading.Lock()
+
+
+def _registry_key(
+    url: str,
+    api_key: Optional[str],
+    prefer_grpc: bool,
+    grpc_port: int,
+    timeout: int,
+    pool_size: int,
+) -> Tuple[Any, ...]:
+    """
+    Build the registry key of a shared client.
+
+    Args:
+        url: URL of the Qdrant server
+        api_key: API key for Qdrant server
+        prefer_grpc: Use gRPC for data operations when available
+        grpc_port: Port of the Qdrant gRPC endpoint
+        timeout: Request timeout in seconds
+        pool_size: Maximum number of pooled keep-alive HTTP connections
+
+    Returns:
+        Key of the client in the registry
+    """
+    return (url, api_key, prefer_grpc, grpc_port, timeout, pool_size)
+
+
+def get_qdrant_client(
+    url: str = QDRANT_URL,
+    api_key: Optional[str] = QDRANT_API_KEY,
+    prefer_grpc: bool = QDRANT_PREFER_GRPC,
+    grpc_port: int = QDRANT_GRPC_PORT,
+    timeout: int = QDRANT_TIMEOUT,
+    pool_size: int = QDRANT_POOL_SIZE,
+) -> QdrantClient:
+    """
+    Get a shared Qdrant client for the given connection settings.
+
+    Clients are created once per process and reused, so every service
+    talking to the same server shares its HTTP connection pool or gRPC channel.
+
+    Args:
+        url: URL of the Qdrant server
+        api_key: API key for Qdrant server
+        prefer_grpc: Use gRPC for data operations when available
+        grpc_port: Port of the Qdrant gRPC endpoint
+        timeout: Request timeout in seconds
+        pool_size: Maximum number of pooled keep-alive HTTP connections
+
+    Returns:
+        Shared QdrantClient instance
+    """
+    key = _registry_key(url, api_key, prefer_grpc, grpc_port, timeout, pool_size)
+    with _registry_lock:
+        client = _client_registry.get(key)
+        if client is None:
+            logger.info(
+                f"Connecting to Qdrant at {url} "
+                f"({'gRPC' if prefer_grpc else 'REST'}, pool size {pool_size})"
+            )
+            client = QdrantClient(
+                url=url,
+                api_key=api_key,
+                prefer_grpc=prefer_grpc,
+                grpc_port=grpc_port,
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                    keepalive_expiry=QDRANT_KEEPALIVE_SECONDS,
+                ),
+                grpc_options={
+                    "grpc.keepalive_time_ms": int(QDRANT_KEEPALIVE_SECONDS * 1000),
+                    "grpc.keepalive_permit_without_calls": 1,
+                },
+            )
+            _client_registry[key] = client
+        return client
+
+
+def close_qdrant_clients() -> None:
+    """
+    Close and forget all shared Qdrant clients.
+    """
+    with _registry_lock:
+        for client in _client_registry.values():
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Error closing Qdrant client: {str(e)}")
+        _client_registry.clear()
+        _verified_collections.clear()
+
+
+def _payload_selector(payload_fields: Optional[List[str]]) -> Any:
+    """
+    Build the with_payload argument of a search.
+
+    Args:
+        payload_fields: Payload fields to return, or None for all
+
+    Returns:
+        True for the full payload, else the list of fields
+    """
+    return True if payload_fields is None else list(payload_fields)
+
 
 class QdrantService:
     """
@@ -26,6 +161,14 @@ class QdrantService:
         url: str = QDRANT_URL,
         api_key: Optional[str] = QDRANT_API_KEY,
         distance: models.Distance = models.Distance.COSINE,
+        prefer_grpc: bool = QDRANT_PREFER_GRPC,
+        grpc_port: int = QDRANT_GRPC_PORT,
+        timeout: int = QDRANT_TIMEOUT,
+        pool_size: int = QDRANT_POOL_SIZE,
+        client: Optional[QdrantClient] = None,
+        shard_number: Optional[int] = None,
+        replication_factor: Optional[int] = None,
+        shard_key: Optional[str] = None,
     ):
         """
         Initialize Qdrant client and ensure collection exists.
@@ -36,15 +179,42 @@ class QdrantService:
             url: URL of the Qdrant server
             api_key: API key for Qdrant server
             distance: Distance metric to use
+            prefer_grpc: Use gRPC instead of REST for data operations
+            grpc_port: Port of the Qdrant gRPC endpoint
+            timeout: Request timeout in seconds
+            pool_size: Maximum number of pooled keep-alive HTTP connections
+            client: Existing client to use instead of the shared one
+            shard_number: Number of shards for a new collection
+            replication_factor: Number of replicas of each shard for a new collection
+            shard_key: Custom shard key this service reads and writes (new
+                collections are then created with custom sharding)
 
         Raises:
             ValueError: If collection doesn't exist and vector_size is not provided
         """
-        self.client = QdrantClient(url=url, api_key=api_key)
+        self.client = client or get_qdrant_client(
+            url=url,
+            api_key=api_key,
+            prefer_grpc=prefer_grpc,
+            grpc_port=grpc_port,
+            timeout=timeout,
+            pool_size=pool_size,
+        )
         self.collection_name = collection_name
+        self.shard_key = shard_key
+        self._registry_key = (
+            None
+            if client is not None
+            else _registry_key(url, api_key, prefer_grpc, grpc_port, timeout, pool_size)
+        )
 
-        # Check if collection exists, create if needed
-        if not self.client.collection_exists(self.collection_name):
+        # Whether this service created the collection (it is then empty)
+        self.created = False
+
+        # Skip the existence round trip for collections this client already checked
+        if self._is_verified(self.collection_name):
+            logger.debug(f"Using verified collection: {collection_name}")
+        elif not self.client.collection_exists(self.collection_name):
             if vector_size is None:
                 raise ValueError(
                     f"Collection '{collection_name}' does not exist. "
@@ -53,17 +223,110 @@ class QdrantService:
             logger.info(
                 f"Creating collection '{collection_name}' with vector size {vector_size}"
             )
+            sharding: Dict[str, Any] = {}
+            if shard_number is not None:
+                sharding["shard_number"] = shard_number
+            if replication_factor is not None:
+                sharding["replication_factor"] = replication_factor
+            if shard_key is not None:
+                sharding["sharding_method"] = models.ShardingMethod.CUSTOM
             self.client.create_collection(
                 collection_name=self.collection_name,
                 vectors_config=models.VectorParams(size=vector_size, distance=distance),
+                **sharding,
             )
+            self.created = True
+            self._mark_verified(self.collection_name)
         else:
             logger.info(f"Using existing collection: {collection_name}")
+            self._mark_verified(self.collection_name)
+
+        if shard_key is not None:
+            self._ensure_shard_key(shard_key)
+
+    def _ensure_shard_key(self, shard_key: str) -> None:
+        """
+        Create a custom shard key unless it already exists.
+
+        Args:
+            shard_key: Shard key to create
+
+        Raises:
+            Exception: If Qdrant fails to create a key that does not exist yet
+        """
+        verified_name = f"{self.collection_name}/{shard_key}"
+        if self._is_verified(verified_name):
+            return
+        try:
+            self.client.create_shard_key(self.collection_name, shard_key)
+            logger.info(f"Created shard key '{shard_key}' in '{self.collection_name}'")
+        except Exception as e:
+            if "already exists" not in str(e).lower():
+                logger.error(
+                    f"Error creating shard key '{shard_key}' in "
+                    f"'{self.collection_name}': {str(e)}"
+                )
+                self._forget_if_missing(e)
+                raise
+            logger.debug(f"Shard key '{shard_key}' already exists")
+        self._mark_verified(verified_name)
+
+    def _is_verified(self, name: str) -> bool:
+        """
+        Check whether a collection or shard key is known to exist.
+
+        Args:
+            name: Collection name, or "collection/shard_key"
+
+        Returns:
+            True if the shared client already verified it
+        """
+        if self._registry_key is None:
+            return False
+        return (self._registry_key, name) in _verified_collections
+
+    def _mark_verified(self, name: str) -> None:
+        """
+        Remember that a collection or shard key exists.
+
+        Args:
+            name: Collection name, or "collection/shard_key"
+        """
+        if self._registry_key is not None:
+            _verified_collections.add((self._registry_key, name))
+
+    def _forget_if_missing(self, error: Exception) -> None:
+        """
+        Forget the verified collection and its shard keys when an error
+        says it no longer exists, so the next service checks it again.
+
+        Args:
+            error: Error raised by a Qdrant operation
+        """
+        if self._registry_key is None or "not found" not in str(error).lower():
+            return
+        prefix = f"{self.collection_name}/"
+        for key, name in list(_verified_collections):
+            if key == self._registry_key and (
+                name == self.collection_name or name.startswith(prefix)
+            ):
+                _verified_collections.discard((key, name))
+
+    def _shard_kwargs(self) -> Dict[str, Any]:
+        """
+        Get the shard selector arguments for requests.
+
+        Returns:
+            Keyword arguments selecting this service's shard key, if any
+        """
+        if self.shard_key is None:
+            return {}
+        return {"shard_key_selector": self.shard_key}
 
     def upsert(
         self,
-        ids: List[Union[str, int]],
-        vectors: List[List[float]],
+        ids: Sequence[Union[str, int]],
+        vectors: Union[np.ndarray, List[List[float]]],
         payloads: Optional[List[Dict[str, Any]]] = None,
     ) -> None:
         """
@@ -71,7 +334,8 @@ class QdrantService:
 
         Args:
             ids: List of unique IDs for the vectors
-            vectors: List of vector embeddings
+            vectors: Embedding matrix or list of vector embeddings; matrix
+                rows are handed to the client as they are
             payloads: Optional list of payload dictionaries
 
         Raises:
@@ -85,17 +349,129 @@ class QdrantService:
                     models.PointStruct(id=ids[i], vector=vec, payload=payload)
                 )
 
-            self.client.upsert(collection_name=self.collection_name, points=points)
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=points,
+                **self._shard_kwargs(),
+            )
             logger.info(
                 f"Upserted {len(points)} vectors into collection '{self.collection_name}'"
             )
         except Exception as e:
             logger.error(f"Error upserting vectors: {str(e)}")
+            self._forget_if_missing(e)
+            raise
+
+    def upsert_batch(
+        self,
+        ids: Sequence[Union[str, int]],
+        vectors: Union[np.ndarray, List[List[float]]],
+        payloads: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        Insert or update points sent as parallel columns.
+
+        Same as upsert, but the points go out as one columnar batch instead
+        of a PointStruct per point.
+
+        Args:
+            ids: List of unique IDs for the vectors
+            vectors: Embedding matrix or list of vector embeddings
+            payloads: Optional list of payload dictionaries
+
+        Raises:
+            Exception: If there's an error upserting vectors
+        """
+        try:
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=models.Batch(
+                    ids=list(ids),
+                    vectors=(
+                        vectors.tolist() if isinstance(vectors, np.ndarray) else vectors
+                    ),
+                    payloads=payloads,
+                ),
+                **self._shard_kwargs(),
+            )
+            logger.info(
+                f"Upserted {len(ids)} vectors into collection '{self.collection_name}'"
+            )
+        except Exception as e:
+            logger.error(f"Error upserting vectors: {str(e)}")
+            self._forget_if_missing(e)
+            raise
+
+    def delete(self, ids: Sequence[Union[str, int]]) -> None:
+        """
+        Delete points by ID.
+
+        Args:
+            ids: Point IDs (missing ones are ignored)
+
+        Raises:
+            Exception: If there's an error deleting points
+        """
+        try:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.PointIdsList(points=list(ids)),
+                **self._shard_kwargs(),
+            )
+            logger.info(
+                f"Deleted {len(ids)} points from collection '{self.collection_name}'"
+            )
+        except Exception as e:
+            logger.error(f"Error deleting points: {str(e)}")
+            self._forget_if_missing(e)
+            raise
+
+    def delete_chunks(self, source: str, from_index: int = 0) -> None:
+        """
+        Delete the chunks of a source.
+
+        Args:
+            source: Source whose chunks are deleted
+            from_index: Only delete chunks from this chunk_index on (e.g. the
+                tail left over when a source shrank)
+
+        Raises:
+            Exception: If there's an error deleting points
+        """
+        conditions: List[models.Condition] = [
+            models.FieldCondition(key="source", match=models.MatchValue(value=source))
+        ]
+        if from_index > 0:
+            conditions.append(
+                models.FieldCondition(
+                    key="chunk_index", range=models.Range(gte=from_index)
+                )
+            )
+        try:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=models.FilterSelector(
+                    filter=models.Filter(must=conditions)
+                ),
+                **self._shard_kwargs(),
+            )
+            logger.info(
+                f"Deleted chunks of '{source}' from index {from_index} in "
+                f"collection '{self.collection_name}'"
+            )
+        except Exception as e:
+            logger.error(f"Error deleting chunks: {str(e)}")
+            self._forget_if_missing(e)
             raise
 
     def search(
-        self, vector: List[float], top_k: int = 5, score_threshold: float = 0.3
-    ) -> List[Tuple[Union[str, int], float, Dict[str, Any]]]:
+        self,
+        vector: Union[np.ndarray, List[float]],
+        top_k: int = 5,
+        score_threshold: float = 0.3,
+        with_vectors: bool = False,
+        payload_fields: Optional[List[str]] = None,
+    ) -> List[Tuple[Any, ...]]:
         """
         Search for similar vectors in the collection.
 
@@ -103,9 +479,12 @@ class QdrantService:
             vector: Query vector
             top_k: Number of results to return
             score_threshold: Minimum similarity score
+            with_vectors: Also return the stored vector of each hit
+            payload_fields: Payload fields to return, or None for all
 
         Returns:
-            List of tuples (id, score, payload)
+            List of tuples (id, score, payload), or (id, score, payload, vector)
+            when with_vectors is True
 
         Raises:
             Exception: If there's an error searching
@@ -117,16 +496,269 @@ class QdrantService:
                     collection_name=self.collection_name,
                     query_vector=vector,
                     limit=top_k,
-                    with_payload=True,
+                    with_payload=_payload_selector(payload_fields),
+                    with_vectors=with_vectors,
                     score_threshold=score_threshold,
+                    **self._shard_kwargs(),
                 )
-            results = [(hit.id, hit.score, hit.payload) for hit in hits]
+            results: List[Tuple[Any, ...]]
+            if with_vectors:
+                results = [(hit.id, hit.score, hit.payload, hit.vector) for hit in hits]
+            else:
+                results = [(hit.id, hit.score, hit.payload) for hit in hits]
             logger.debug(f"Found {len(results)} results for search query")
             return results
         except Exception as e:
             logger.error(f"Error searching vectors: {str(e)}")
+            self._forget_if_missing(e)
             raise
 
+    def retrieve(
+        self,
+        ids: List[Union[str, int]],
+        payload_fields: Optional[List[str]] = None,
+    ) -> List[Tuple[Any, Dict[str, Any]]]:
+        """
+        Fetch points by ID in one request.
+
+        Args:
+            ids: Point IDs (missing ones are ignored)
+            payload_fields: Payload fields to return, or None for all
+
+        Returns:
+            List of tuples (id, payload) for the points found
+
+        Raises:
+            Exception: If there's an error fetching points
+        """
+        try:
+            records = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=ids,
+                with_payload=_payload_selector(payload_fields),
+                with_vectors=False,
+                **self._shard_kwargs(),
+            )
+            logger.debug(f"Retrieved {len(records)} of {len(ids)} points")
+            return [(record.id, record.payload or {}) for record in records]
+        except Exception as e:
+            logger.error(f"Error retrieving points: {str(e)}")
+            self._forget_if_missing(e)
+            raise
+
+    def search_batch(
+        self,
+        vectors: Union[np.ndarray, List[List[float]]],
+        top_k: int = 5,
+        score_threshold: float = 0.3,
+        payload_fields: Optional[List[str]] = None,
+    ) -> List[List[Tuple[Any, float, Dict[str, Any]]]]:
+        """
+        Run several searches in one request.
+
+        Args:
+            vectors: Query matrix or vectors
+            top_k: Number of results per query
+            score_threshold: Minimum similarity score
+            payload_fields: Payload fields to return, or None for all
+
+        Returns:
+            One list of (id, score, payload) tuples per query vector
+
+        Raises:
+            Exception: If there's an error searching
+        """
+        try:
+            if hasattr(models, "QueryRequest"):
+                # Universal query API (qdrant-client 1.10+)
+                requests = [
+                    models.QueryRequest(
+                        query=vector,
+                        limit=top_k,
+                        with_payload=_payload_selector(payload_fields),
+                        score_threshold=score_threshold,
+                        shard_key=self.shard_key,
+                    )
+                    for vector in vectors
+                ]
+                responses = self.client.query_batch_points(
+                    collection_name=self.collection_name, requests=requests
+                )
+                batches = [response.points for response in responses]
+            else:
+                requests = [
+                    models.SearchRequest(
+                        vector=vector,
+                        limit=top_k,
+                        with_payload=_payload_selector(payload_fields),
+                        score_threshold=score_threshold,
+                        shard_key=self.shard_key,
+                    )
+                    for vector in vectors
+                ]
+                batches = self.client.search_batch(
+                    collection_name=self.collection_name, requests=requests
+                )
+            results = [
+                [(hit.id, hit.score, hit.payload or {}) for hit in hits]
+                for hits in batches
+            ]
+            logger.debug(f"Ran {len(results)} searches in one batch")
+            return results
+        except Exception as e:
+            logger.error(f"Error running batch search: {str(e)}")
+            self._forget_if_missing(e)
+            raise
+
+    def upload(
+        self,
+        ids: Iterable[Union[str, int]],
+        vectors: Union[np.ndarray, Iterable[List[float]]],
+        payloads: Optional[Iterable[Dict[str, Any]]] = None,
+        batch_size: int = 256,
+        parallel: int = 1,
+    ) -> None:
+        """
+        Bulk-load points, splitting them into batches uploaded in parallel.
+
+        Unlike upsert, vectors may be a NumPy matrix, which is sent without
+        building per-point objects first.
+
+        Args:
+            ids: Unique IDs for the vectors
+            vectors: Matrix or iterable of vector embeddings
+            payloads: Optional iterable of payload dictionaries
+            batch_size: Number of points per request
+            parallel: Number of parallel upload workers
+
+        Raises:
+            Exception: If there's an error uploading vectors
+        """
+        try:
+            self.client.upload_collection(
+                collection_name=self.collection_name,
+                vectors=vectors,
+                payload=payloads,
+                ids=ids,
+                batch_size=batch_size,
+                parallel=parallel,
+                **self._shard_kwargs(),
+            )
+        except Exception as e:
+            logger.error(f"Error uploading vectors: {str(e)}")
+            self._forget_if_missing(e)
+            raise
+
+    def scroll(
+        self,
+        page_size: int = 1024,
+        with_vectors: bool = True,
+        scroll_filter: Optional[models.Filter] = None,
+    ) -> Iterator[List[models.Record]]:
+        """
+        Iterate over all points of the collection, one page at a time.
+
+        Args:
+            page_size: Number of points per page
+            with_vectors: Also return the stored vectors
+            scroll_filter: Optional filter restricting the points returned
+
+        Yields:
+            Lists of records with id, payload and (optionally) vector
+
+        Raises:
+            Exception: If there's an error reading points
+        """
+        offset = None
+        try:
+            while True:
+                records, offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=scroll_filter,
+                    limit=page_size,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=with_vectors,
+                )
+                if records:
+                    yield records
+                if offset is None:
+                    break
+        except Exception as e:
+            logger.error(f"Error scrolling collection: {str(e)}")
+            self._forget_if_missing(e)
+            raise
+
+    def _vector_params(self, info: models.CollectionInfo) -> models.VectorParams:
+        """
+        Get the parameters of the collection's single unnamed vector.
+
+        Args:
+            info: Collection info returned by Qdrant
+
+        Returns:
+            Vector parameters
+
+        Raises:
+            ValueError: If the collection has no vectors or only named vectors
+        """
+        params = info.config.params.vectors
+        if params is None or isinstance(params, dict):
+            raise ValueError(
+                f"Collection '{self.collection_name}' has no unnamed vector"
+            )
+        return params
+
+    def get_vector_size(self) -> int:
+        """
+        Get the vector size configured for the collection.
+
+        Returns:
+            Vector dimension
+        """
+        info = self.client.get_collection(self.collection_name)
+        return self._vector_params(info).size
+
+    def estimate_memory(self) -> int:
+        """
+        Estimate the RAM used by the collection's vectors and index.
+
+        Uses Qdrant's sizing rule of thumb (vector bytes times 1.5 for the
+        HNSW graph and metadata). Quantized vectors are counted at their
+        compressed size, and original vectors only if they are kept in memory.
+
+        Returns:
+            Estimated size in bytes
+        """
+        info = self.client.get_collection(self.collection_name)
+        params = self._vector_params(info)
+        points = info.points_count or 0
+        full_size = points * params.size * 4
+
+        total = 0 if getattr(params, "on_disk", False) else full_size
+        quantization = getattr(info.config, "quantization_config", None)
+        product = getattr(quantization, "product", None)
+        if getattr(quantization, "scalar", None) is not None:
+            total += full_size // 4
+        elif getattr(quantization, "binary", None) is not None:
+            total += full_size // 32
+        elif product is not None:
+            # Compression ratios are named "x4" ... "x64"
+            compression = product.compression
+            ratio = int(str(getattr(compression, "value", compression)).lstrip("x"))
+            total += full_size // ratio
+        return int(total * 1.5)
+
+    def is_empty(self) -> bool:
+        """
+        Check whether the collection holds no points.
+
+        Returns:
+            True if the collection has no points
+        """
+        info = self.client.get_collection(self.collection_name)
+        return not info.points_count
+
     def check_collection_exists(self) -> bool:
         """
         Check if the collection exists.
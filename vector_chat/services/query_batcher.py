@@ -0,0 +1,166 @@
+"""
+Coalescing of concurrent query embeddings into batched requests.
+
+Each chat session embeds one query per turn, so N concurrent sessions make N
+embedding round trips. A QueryBatcher shared by the sessions (e.g. by
+several OpenAIClient instances in one server process) collects queries for a
+few milliseconds, or until a maximum batch size, embeds them in one call and
+hands each caller its own vector. Batches are sent from a small thread pool,
+so new queries are collected while earlier batches are in flight.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from vector_chat.config import (
+    QUERY_BATCH_MAX_INFLIGHT,
+    QUERY_BATCH_MAX_SIZE,
+    QUERY_BATCH_WINDOW_MS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBatcher:
+    """
+    Embeds queries from concurrent callers in shared batches.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], Any],
+        window_ms: float = QUERY_BATCH_WINDOW_MS,
+        max_batch_size: int = QUERY_BATCH_MAX_SIZE,
+        max_inflight: int = QUERY_BATCH_MAX_INFLIGHT,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            embed_fn: Function embedding a list of texts into one row per
+                text, e.g. OpenAIClient.embed of a shared client
+            window_ms: Milliseconds to wait for more queries after the first
+                one of a batch arrives
+            max_batch_size: Queries after which a batch is sent without
+                waiting for the window to end
+            max_inflight: Batches being embedded at the same time
+        """
+        self.embed_fn = embed_fn
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.queries = 0
+        self._pending: List[Tuple[str, Future]] = []
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_inflight, thread_name_prefix="query-batch"
+        )
+
+    def embed(self, query: str) -> np.ndarray:
+        """
+        Embed one query, batched with those of other callers.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Query vector
+
+        Raises:
+            RuntimeError: If the batcher is closed
+            Exception: The error of the batched embedding call
+        """
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Query batcher is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="query-batcher", daemon=True
+                )
+                self._thread.start()
+            self._pending.append((query, future))
+            self._condition.notify()
+        vector: np.ndarray = future.result()
+        return vector
+
+    def _run(self) -> None:
+        """
+        Collect and send batches until the batcher is closed.
+        """
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                # The window starts with the first query of the batch
+                window_end = time.monotonic() + self.window
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = window_end - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._pending[: self.max_batch_size]
+                del self._pending[: self.max_batch_size]
+            self._executor.submit(self._send, batch)
+
+    def _send(self, batch: List[Tuple[str, Future]]) -> None:
+        """
+        Embed a batch in one call and resolve its callers' futures.
+
+        Identical queries in the batch are embedded once.
+
+        Args:
+            batch: (query, future) pairs
+        """
+        texts = list(dict.fromkeys(query for query, _ in batch))
+        try:
+            vectors = self.embed_fn(texts)
+            rows = {text: vectors[i] for i, text in enumerate(texts)}
+        except Exception as e:
+            logger.error(f"Error embedding a batch of {len(texts)} queries: {str(e)}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        with self._condition:
+            self.batches += 1
+            self.queries += len(batch)
+        logger.debug(f"Embedded {len(batch)} queries in one request")
+        for query, future in batch:
+            future.set_result(rows[query])
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the number of batches and queries, and the average batch size.
+
+        Returns:
+            Dictionary with batches, queries and mean_batch_size
+        """
+        with self._condition:
+            batches, queries = self.batches, self.queries
+        return {
+            "batches": batches,
+            "queries": queries,
+            "mean_batch_size": queries / batches if batches else 0.0,
+        }
+
+    def close(self) -> None:
+        """
+        Send the queries still waiting and stop the batching threads.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,325 @@
+"""
+Requests- and tokens-per-minute limiting shared by all local processes.
+
+Every process calling the OpenAI API (embed jobs, chat sessions) takes from
+the same token buckets, kept in a small SQLite database, before sending a
+request. Buckets refill continuously at the configured RPM and TPM and hold
+at most RATE_LIMIT_BURST_SECONDS worth of quota, so requests are spread out
+instead of being rejected with 429 errors. Bulk requests (ingestion) may not
+take the last RATE_LIMIT_INTERACTIVE_RESERVE of a bucket, which stays
+available to interactive requests (chat).
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from vector_chat.config import (
+    OPENAI_RPM,
+    OPENAI_TPM,
+    RATE_LIMIT_BURST_SECONDS,
+    RATE_LIMIT_INTERACTIVE_RESERVE,
+    RATE_LIMIT_MAX_SLEEP,
+    RATE_LIMIT_PATH,
+    RATE_LIMITS_FILE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Request priorities
+INTERACTIVE: str = "interactive"
+BULK: str = "bulk"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    requests REAL NOT NULL,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Shortfalls below this are rounding errors of the refill, not missing quota
+_EPSILON = 1e-6
+
+# Process-wide limiters, keyed by database path and limits
+_limiter_registry: Dict[Tuple[object, ...], "RateLimiter"] = {}
+_registry_lock = threading.Lock()
+
+
+def load_rate_limits(
+    path: Optional[str] = RATE_LIMITS_FILE,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Load per-model limits from a JSON file.
+
+    Args:
+        path: JSON file mapping model name to {"rpm", "tpm"}, or None
+
+    Returns:
+        Dictionary mapping model name to its limits (empty without a file)
+    """
+    if not path:
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            limits: Dict[str, Dict[str, float]] = json.load(f)
+        return limits
+    except Exception as e:
+        logger.error(f"Error loading rate limits {path}: {str(e)}")
+        return {}
+
+
+class RateLimiter:
+    """
+    Token buckets per model for requests and tokens per minute, stored in
+    SQLite so that every process using the same file shares them.
+    """
+
+    def __init__(
+        self,
+        rpm: float = OPENAI_RPM,
+        tpm: float = OPENAI_TPM,
+        path: str = RATE_LIMIT_PATH,
+        limits: Optional[Dict[str, Dict[str, float]]] = None,
+        burst_seconds: float = RATE_LIMIT_BURST_SECONDS,
+        interactive_reserve: float = RATE_LIMIT_INTERACTIVE_RESERVE,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Open (and create if needed) the bucket database.
+
+        Args:
+            rpm: Requests per minute of models without their own limits
+                (0 = unlimited)
+            tpm: Tokens per minute of models without their own limits
+                (0 = unlimited)
+            path: Path to the SQLite database shared by the processes
+            limits: Per-model {"rpm", "tpm"} overriding the defaults
+            burst_seconds: Seconds of quota a bucket holds when full
+            interactive_reserve: Fraction of each bucket bulk requests leave
+                to interactive ones
+            clock: Wall clock shared by the processes, replaceable in tests
+            sleep: Sleep function, replaceable in tests
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.path = path
+        self.limits = limits or {}
+        self.burst_seconds = burst_seconds
+        self.interactive_reserve = interactive_reserve
+        self.waited: Dict[str, float] = {INTERACTIVE: 0.0, BULK: 0.0}
+        self._clock = clock
+        self._sleep = sleep
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # Transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # Losing the last updates in a crash only frees some quota early
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self._conn.close()
+
+    def limits_for(self, model: str) -> Tuple[float, float]:
+        """
+        Get the limits of a model.
+
+        Args:
+            model: Model name
+
+        Returns:
+            Tuple of (rpm, tpm), 0 meaning unlimited
+        """
+        entry = self.limits.get(model, {})
+        return float(entry.get("rpm", self.rpm)), float(entry.get("tpm", self.tpm))
+
+    def try_acquire(
+        self, model: str, tokens: int, priority: str = INTERACTIVE
+    ) -> float:
+        """
+        Take one request and some tokens from a model's buckets, if available.
+
+        Args:
+            model: Model name
+            tokens: Estimated tokens of the request
+            priority: INTERACTIVE or BULK
+
+        Returns:
+            0 if the request may be sent now, else the seconds to wait
+            before trying again
+        """
+        rpm, tpm = self.limits_for(model)
+        if not rpm and not tpm:
+            return 0.0
+        reserve = self.interactive_reserve if priority == BULK else 0.0
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = self._clock()
+                requests, available = self._refill(model, rpm, tpm, now)
+                wait = 0.0
+                if rpm:
+                    capacity = max(1.0, rpm * self.burst_seconds / 60)
+                    # A bucket too small for the reserve lets bulk requests
+                    # go once it is full
+                    needed = min(capacity, 1 + reserve * capacity)
+                    if requests < needed - _EPSILON:
+                        wait = (needed - requests) * 60 / rpm
+                if tpm:
+                    capacity = max(1.0, tpm * self.burst_seconds / 60)
+                    # A request larger than the bucket goes once it is full,
+                    # leaving the bucket in debt
+                    needed = min(tokens, capacity * (1 - reserve)) + reserve * capacity
+                    if available < needed - _EPSILON:
+                        wait = max(wait, (needed - available) * 60 / tpm)
+                if wait == 0.0:
+                    requests -= 1
+                    available -= tokens
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, requests, tokens, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (model, requests, available, now),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def acquire(
+        self,
+        model: str,
+        tokens: int,
+        priority: str = INTERACTIVE,
+        timeout: Optional[float] = None,
+    ) -> float:
+        """
+        Wait until a request may be sent, then take its quota.
+
+        Args:
+            model: Model name
+            tokens: Estimated tokens of the request
+            priority: INTERACTIVE or BULK
+            timeout: Longest wait in seconds, or None to wait as long as needed
+
+        Returns:
+            Seconds waited
+
+        Raises:
+            TimeoutError: If the quota is not available within the timeout
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(model, tokens, priority)
+            if wait == 0.0:
+                break
+            if timeout is not None and waited + wait > timeout:
+                raise TimeoutError(
+                    f"Rate limit of {model} not available within {timeout:.1f}s"
+                )
+            # Short sleeps, so that quota freed by other processes is noticed
+            wait = min(wait, RATE_LIMIT_MAX_SLEEP)
+            self._sleep(wait)
+            waited += wait
+
+        if waited:
+            self.waited[priority] = self.waited.get(priority, 0.0) + waited
+            logger.debug(
+                f"Waited {waited:.2f}s for the {model} rate limit ({priority})"
+            )
+        return waited
+
+    def settle(self, model: str, estimated: int, actual: int) -> None:
+        """
+        Correct the tokens taken for a request once its usage is known.
+
+        Args:
+            model: Model name
+            estimated: Tokens taken when the request was acquired
+            actual: Tokens the API counted
+        """
+        _, tpm = self.limits_for(model)
+        if not tpm or actual == estimated:
+            return
+        with self._lock:
+            self._conn.execute(
+                "UPDATE buckets SET tokens = tokens - ? WHERE name = ?",
+                (actual - estimated, model),
+            )
+
+    def _refill(
+        self, model: str, rpm: float, tpm: float, now: float
+    ) -> Tuple[float, float]:
+        """
+        Read a model's buckets, refilled for the time since the last update.
+
+        Args:
+            model: Model name
+            rpm: Requests per minute
+            tpm: Tokens per minute
+            now: Current time
+
+        Returns:
+            Tuple of (requests, tokens) available
+        """
+        request_capacity = max(1.0, rpm * self.burst_seconds / 60)
+        token_capacity = max(1.0, tpm * self.burst_seconds / 60)
+        row = self._conn.execute(
+            "SELECT requests, tokens, updated_at FROM buckets WHERE name = ?",
+            (model,),
+        ).fetchone()
+        if row is None:
+            return request_capacity, token_capacity
+        requests, tokens, updated_at = row
+        elapsed = max(0.0, now - updated_at)
+        return (
+            min(request_capacity, requests + elapsed * rpm / 60),
+            min(token_capacity, tokens + elapsed * tpm / 60),
+        )
+
+
+def get_rate_limiter(
+    rpm: float = OPENAI_RPM,
+    tpm: float = OPENAI_TPM,
+    path: str = RATE_LIMIT_PATH,
+    limits_file: Optional[str] = RATE_LIMITS_FILE,
+) -> Optional[RateLimiter]:
+    """
+    Get the limiter shared by this process, if any limits are configured.
+
+    Args:
+        rpm: Default requests per minute (0 = unlimited)
+        tpm: Default tokens per minute (0 = unlimited)
+        path: Path to the SQLite database shared by the processes
+        limits_file: JSON file with per-model limits
+
+    Returns:
+        Shared RateLimiter, or None without any limits
+    """
+    if not rpm and not tpm and not limits_file:
+        return None
+    key = (rpm, tpm, path, limits_file)
+    with _registry_lock:
+        limiter = _limiter_registry.get(key)
+        if limiter is None:
+            limiter = RateLimiter(
+                rpm=rpm, tpm=tpm, path=path, limits=load_rate_limits(limits_file)
+            )
+            _limiter_registry[key] = limiter
+        return limiter
@@ -0,0 +1,571 @@
+"""
+Deadlines, hedged requests, retries and circuit breaking for remote calls.
+
+A ResilientCaller runs a call on a worker thread and waits for it at most
+until the call's deadline. If the call is slower than a configurable
+percentile of the latencies seen so far, an identical hedged request is sent
+and the first response wins, which cuts off the slow tail caused by a single
+straggling request. Failed calls are retried with jittered exponential
+backoff while the deadline allows it, and a CircuitBreaker stops calling a
+service that keeps failing, so that callers fail fast instead of waiting for
+every call to time out. Only transient errors (timeouts, connection errors,
+429 and 5xx responses) are retried and counted against the breaker; others,
+such as a rejected API key, are raised at once. Only idempotent calls
+(embeddings, searches) should be hedged or retried.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import httpx
+import numpy as np
+import openai
+from qdrant_client.http.exceptions import ResponseHandlingException
+
+from vector_chat.config import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_SECONDS,
+    CALL_DEADLINE_SECONDS,
+    CALL_MAX_RETRIES,
+    HEDGE_INITIAL_DELAY,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+    RESILIENCE_MAX_WORKERS,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+)
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+# Statuses worth retrying besides 5xx: request timeout, rate limited
+_TRANSIENT_STATUS_CODES = (408, 429)
+# gRPC status names of the same errors (gRPC errors report them via code())
+_TRANSIENT_GRPC_CODES = ("UNAVAILABLE", "DEADLINE_EXCEEDED", "RESOURCE_EXHAUSTED")
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when a call gets no response before its deadline.
+    """
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling a service whose circuit breaker is open.
+    """
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Check whether an error may go away when the call is retried.
+
+    Args:
+        error: Error raised by a remote call
+
+    Returns:
+        True for timeouts, connection errors and 408/429/5xx responses
+    """
+    if isinstance(
+        error,
+        (
+            TimeoutError,
+            ConnectionError,
+            httpx.TransportError,
+            openai.APIConnectionError,
+            ResponseHandlingException,
+        ),
+    ):
+        return True
+    code = getattr(error, "code", None)
+    if callable(code):
+        return getattr(code(), "name", None) in _TRANSIENT_GRPC_CODES
+    status = getattr(error, "status_code", None)
+    if status is None and isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+    return isinstance(status, int) and (
+        status in _TRANSIENT_STATUS_CODES or status >= 500
+    )
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a service after consecutive failures.
+
+    The breaker opens after failure_threshold failed calls in a row. While
+    open, calls are rejected; after reset_timeout one trial call is let
+    through (half-open), and its outcome closes or reopens the breaker.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a trial call
+            clock: Monotonic clock, replaceable in tests
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        Current state: "closed", "open" or "half-open".
+        """
+        with self._lock:
+            if (
+                self._state == OPEN
+                and self._clock() - self._opened_at >= self.reset_timeout
+            ):
+                return HALF_OPEN
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """
+        Whether calls are currently rejected without a trial.
+        """
+        return self.state == OPEN
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go through, claiming the trial call when
+        the reset timeout has passed.
+
+        Returns:
+            True if the call may be made
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            # A trial call that never reported back is replaced by a new one
+            if self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._opened_at = self._clock()
+                return True
+            # Open, or half-open with the trial call still running
+            return False
+
+    def record_success(self) -> None:
+        """
+        Record a successful call, closing the breaker.
+        """
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("Circuit breaker closed")
+            self._state = CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        """
+        Record a failed call, opening the breaker at the threshold or after
+        a failed trial.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                logger.warning(
+                    f"Circuit breaker opened after {self._failures} consecutive "
+                    f"failures, retrying in {self.reset_timeout:.0f}s"
+                )
+                self._state = OPEN
+                self._opened_at = self._clock()
+
+
+class LatencyTracker:
+    """
+    Keeps the latencies of recent successful requests.
+    """
+
+    def __init__(self, window: int = 500):
+        """
+        Initialize the tracker.
+
+        Args:
+            window: Number of recent latencies kept
+        """
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """
+        Get the number of recorded latencies.
+        """
+        return len(self._latencies)
+
+    def record(self, seconds: float) -> None:
+        """
+        Record the latency of one request.
+
+        Args:
+            seconds: Latency in seconds
+        """
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Get a latency percentile.
+
+        Args:
+            q: Percentile between 0 and 100
+
+        Returns:
+            Latency in seconds, or None without any recorded latency
+        """
+        with self._lock:
+            latencies = list(self._latencies)
+        if not latencies:
+            return None
+        return float(np.percentile(latencies, q))
+
+
+class ResilientCaller:
+    """
+    Calls a service with a deadline, hedged requests, retries and an
+    optional circuit breaker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        deadline: Optional[float] = CALL_DEADLINE_SECONDS,
+        hedge_percentile: Optional[float] = HEDGE_PERCENTILE,
+        max_retries: int = CALL_MAX_RETRIES,
+        backoff_base: float = RETRY_BACKOFF_BASE,
+        backoff_max: float = RETRY_BACKOFF_MAX,
+        breaker: Optional[CircuitBreaker] = None,
+        retry_on: Callable[[BaseException], bool] = is_transient,
+        initial_hedge_delay: float = HEDGE_INITIAL_DELAY,
+        min_hedge_delay: float = HEDGE_MIN_DELAY,
+        max_workers: int = RESILIENCE_MAX_WORKERS,
+    ):
+        """
+        Initialize the caller.
+
+        Args:
+            name: Service name used in logs and errors, e.g. "qdrant"
+            deadline: Seconds a call may take including retries, or None for
+                no deadline
+            hedge_percentile: Latency percentile after which a hedged request
+                is sent, or None (or 0) to never hedge
+            max_retries: Retries after the first attempt
+            backoff_base: Backoff before the first retry, in seconds; doubled
+                on every retry
+            backoff_max: Largest backoff, in seconds
+            breaker: Circuit breaker guarding the service
+            retry_on: Check whether an error is transient, i.e. worth
+                retrying and counted against the breaker
+            initial_hedge_delay: Hedge delay until HEDGE_MIN_SAMPLES latencies
+                are recorded
+            min_hedge_delay: Smallest hedge delay, so that a fast service is
+                not hedged on every jitter
+            max_workers: Threads running requests, including hedged ones and
+                abandoned ones still running past their deadline
+        """
+        self.name = name
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile or None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker
+        self.retry_on = retry_on
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.latencies = LatencyTracker()
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"resilient-{name}"
+        )
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        Get how long to wait for a request before sending a hedged one.
+
+        Returns:
+            Delay in seconds, or None if hedging is disabled
+        """
+        if self.hedge_percentile is None:
+            return None
+        observed = None
+        if len(self.latencies) >= HEDGE_MIN_SAMPLES:
+            observed = self.latencies.percentile(self.hedge_percentile)
+        if observed is None:
+            return self.initial_hedge_delay
+        return max(self.min_hedge_delay, observed)
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Call a function with the deadline, hedging, retry and breaker policy.
+
+        Args:
+            fn: Idempotent function making the remote call
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Result of the first successful request
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            DeadlineExceeded: If no request succeeded before the deadline
+            Exception: A non-transient error of fn, or the last transient
+                one once retries are exhausted
+        """
+        if self.breaker is not None and not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+
+        self._count("calls")
+        deadline = None if self.deadline is None else time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            try:
+                result = self._attempt(fn, args, kwargs, deadline)
+            except Exception as e:
+                if not self.retry_on(e):
+                    # The service answered, the request itself is wrong
+                    self._count("errors")
+                    if self.breaker is not None:
+                        self.breaker.record_success()
+                    raise
+                delay = self._backoff(attempt)
+                if (
+                    attempt >= self.max_retries
+                    or isinstance(e, DeadlineExceeded)
+                    or (deadline is not None and time.monotonic() + delay >= deadline)
+                ):
+                    self._count("failures")
+                    if self.breaker is not None:
+                        self.breaker.record_failure()
+                    raise
+                attempt += 1
+                self._count("retries")
+                logger.warning(
+                    f"{self.name} call failed ({str(e)}), retry {attempt} of "
+                    f"{self.max_retries} in {delay * 1000:.0f} ms"
+                )
+                time.sleep(delay)
+            else:
+                if self.breaker is not None:
+                    self.breaker.record_success()
+                return result
+
+    def _attempt(
+        self,
+        fn: Callable[..., Any],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        deadline: Optional[float],
+    ) -> Any:
+        """
+        Make one attempt: a request, plus a hedged one if it is slow.
+
+        Args:
+            fn: Function making the remote call
+            args: Positional arguments for fn
+            kwargs: Keyword arguments for fn
+            deadline: Monotonic time by which a response is needed, or None
+
+        Returns:
+            Result of the first successful request
+
+        Raises:
+            DeadlineExceeded: If no request finished before the deadline
+            Exception: The error of the first request if all of them failed
+        """
+        primary = self._submit(fn, args, kwargs)
+        futures = [primary]
+
+        hedge_delay = self.hedge_delay()
+        remaining = _remaining(deadline)
+        if hedge_delay is not None and (remaining is None or hedge_delay < remaining):
+            done, _ = wait(futures, timeout=hedge_delay)
+            if not done:
+                self._count("hedges")
+                logger.debug(
+                    f"{self.name} call slower than {hedge_delay * 1000:.0f} ms, "
+                    "sending a hedged request"
+                )
+                futures.append(self._submit(fn, args, kwargs))
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(
+                pending, timeout=_remaining(deadline), return_when=FIRST_COMPLETED
+            )
+            if not done:
+                # The requests keep running on their threads; their results
+                # are dropped
+                self._count("timeouts")
+                raise DeadlineExceeded(
+                    f"{self.name} call got no response within {self.deadline:.2f}s"
+                )
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self._count("hedge_wins")
+                    return future.result()
+        # Every request failed: report the first one's error
+        error = primary.exception()
+        assert error is not None
+        raise error
+
+    def _submit(
+        self, fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]
+    ) -> Future:
+        """
+        Run one request on a worker thread, recording its latency if it
+        succeeds (also when it finishes after the call gave up on it, so the
+        percentiles see the slow tail).
+
+        Args:
+            fn: Function making the remote call
+            args: Positional arguments for fn
+            kwargs: Keyword arguments for fn
+
+        Returns:
+            Future of the request
+        """
+        started = time.monotonic()
+        future = self._executor.submit(fn, *args, **kwargs)
+
+        def record(done: Future) -> None:
+            if not done.cancelled() and done.exception() is None:
+                self.latencies.record(time.monotonic() - started)
+
+        future.add_done_callback(record)
+        return future
+
+    def _backoff(self, attempt: int) -> float:
+        """
+        Get the backoff before a retry, with full jitter.
+
+        Args:
+            attempt: Number of retries made so far
+
+        Returns:
+            Delay in seconds
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _count(self, name: str) -> None:
+        """
+        Increment a counter.
+
+        Args:
+            name: Counter name
+        """
+        with self._lock:
+            self.counts[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get call counters and request latency percentiles.
+
+        Returns:
+            Dictionary of counters, p50_ms, p99_ms and the breaker state
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.counts)
+        for q in (50, 99):
+            latency = self.latencies.percentile(q)
+            stats[f"p{q}_ms"] = None if latency is None else latency * 1000
+        if self.breaker is not None:
+            stats["breaker"] = self.breaker.state
+        return stats
+
+    def close(self) -> None:
+        """
+        Stop the worker threads, without waiting for abandoned requests.
+        """
+        self._executor.shutdown(wait=False)
+
+
+class ResilientIndex:
+    """
+    Wraps a QdrantService or CollectionRouter so that its searches go
+    through a ResilientCaller; other attributes are passed through.
+    """
+
+    def __init__(self, index: Any, caller: ResilientCaller):
+        """
+        Initialize the wrapper.
+
+        Args:
+            index: QdrantService or CollectionRouter
+            caller: Caller applying the deadline, hedging and breaker policy
+        """
+        self.index = index
+        self.caller = caller
+
+    @property
+    def breaker(self) -> Optional[CircuitBreaker]:
+        """
+        Circuit breaker guarding the index, if any.
+        """
+        return self.caller.breaker
+
+    def search(self, *args: Any, **kwargs: Any) -> Any:
+        """
+        Search the index (see QdrantService.search).
+        """
+        return self.caller.call(self.index.search, *args, **kwargs)
+
+    def search_batch(self, *args: Any, **kwargs: Any) -> Any:
+        """
+        Search the index for several vectors (see QdrantService.search_batch).
+        """
+        return self.caller.call(self.index.search_batch, *args, **kwargs)
+
+    def retrieve(self, *args: Any, **kwargs: Any) -> Any:
+        """
+        Fetch points by ID (see QdrantService.retrieve).
+        """
+        return self.caller.call(self.index.retrieve, *args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Pass other attributes through to the wrapped index.
+        """
+        return getattr(self.index, name)
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    """
+    Get the time left before a deadline.
+
+    Args:
+        deadline: Monotonic deadline, or None
+
+    Returns:
+        Seconds left (at least 0), or None without a deadline
+    """
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
@@ -0,0 +1,302 @@
+"""
+Post-retrieval processing of search results.
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from vector_chat.config import (
+    DEFAULT_CUTOFF_MIN_GAP,
+    DEFAULT_CUTOFF_RATIO,
+    DEFAULT_DUPLICATE_THRESHOLD,
+    DEFAULT_MMR_LAMBDA,
+)
+from vector_chat.services.chunker import make_chunk_id
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    Scale each row of a matrix to unit length.
+
+    Args:
+        matrix: 2-D array of vectors
+
+    Returns:
+        Row-normalized copy of the matrix
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    normalized: np.ndarray = matrix / norms
+    return normalized
+
+
+def maximal_marginal_relevance(
+    query_vector: Union[np.ndarray, Sequence[float]],
+    candidate_vectors: Sequence[Sequence[float]],
+    k: int,
+    lambda_mult: float = DEFAULT_MMR_LAMBDA,
+    duplicate_threshold: float = DEFAULT_DUPLICATE_THRESHOLD,
+) -> List[int]:
+    """
+    Select a relevant and diverse subset of candidates with MMR.
+
+    Each step picks the candidate maximizing
+    ``lambda * sim(query, c) - (1 - lambda) * max(sim(c, selected))``.
+    Candidates whose similarity to an already selected one reaches
+    ``duplicate_threshold`` are dropped as near-duplicates.
+
+    Args:
+        query_vector: Query embedding
+        candidate_vectors: Candidate embeddings
+        k: Maximum number of candidates to select
+        lambda_mult: Trade-off between relevance (1.0) and diversity (0.0)
+        duplicate_threshold: Cosine similarity at which candidates are duplicates
+
+    Returns:
+        Indices of the selected candidates, in selection order
+    """
+    if k <= 0 or len(candidate_vectors) == 0:
+        return []
+
+    candidates = _normalize_rows(np.asarray(candidate_vectors, dtype=np.float32))
+    query = _normalize_rows(np.asarray(query_vector, dtype=np.float32)[None, :])[0]
+
+    relevance = candidates @ query
+    # Highest similarity of each candidate to anything selected so far
+    redundancy = np.full(len(candidates), -np.inf, dtype=np.float32)
+    available = np.ones(len(candidates), dtype=bool)
+    selected: List[int] = []
+
+    while len(selected) < k and available.any():
+        if selected:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+
+        # Update redundancy with one matrix-vector product per selection
+        redundancy = np.maximum(redundancy, candidates @ candidates[best])
+        available &= redundancy < duplicate_threshold
+
+    return selected
+
+
+def merge_adjacent_chunks(
+    results: List[Tuple[Any, float, Dict[str, Any]]],
+) -> List[Tuple[Any, float, Dict[str, Any]]]:
+    """
+    Merge hits that are consecutive chunks of the same source.
+
+    Merged hits keep the ID and score of their best-scoring chunk, the
+    ``chunk_index`` of the first chunk and a ``chunk_end_index`` for the last.
+
+    Args:
+        results: List of tuples (id, score, payload)
+
+    Returns:
+        Merged list of tuples (id, score, payload), sorted by score
+    """
+    by_source: Dict[Any, List[Tuple[Any, float, Dict[str, Any]]]] = {}
+    passthrough = []
+    for result in results:
+        payload = result[2]
+        if "source" in payload and "chunk_index" in payload:
+            by_source.setdefault(payload["source"], []).append(result)
+        else:
+            passthrough.append(result)
+
+    merged = list(passthrough)
+    for hits in by_source.values():
+        hits.sort(key=lambda hit: hit[2]["chunk_index"])
+        run = [hits[0]]
+        for hit in hits[1:]:
+            last_index = run[-1][2].get("chunk_end_index", run[-1][2]["chunk_index"])
+            if hit[2]["chunk_index"] <= last_index:
+                # Same chunk returned twice; keep the first copy
+                continue
+            if hit[2]["chunk_index"] == last_index + 1:
+                run.append(hit)
+            else:
+                merged.append(_merge_run(run))
+                run = [hit]
+        merged.append(_merge_run(run))
+
+    merged.sort(key=lambda hit: hit[1], reverse=True)
+    return merged
+
+
+def fetch_neighbors(
+    results: List[Tuple[Any, ...]],
+    retrieve: Callable[[List[Any]], List[Tuple[Any, Dict[str, Any]]]],
+    window: int,
+) -> List[Tuple[Any, float, Dict[str, Any]]]:
+    """
+    Fetch the chunks surrounding each hit, in one retrieve call.
+
+    Neighbour IDs are derived from ``source`` and ``chunk_index`` (see
+    make_chunk_id), so no extra search or embedding is needed. Each
+    neighbour gets the score of the hit it surrounds; merge the result with
+    the hits using merge_adjacent_chunks to get passages.
+
+    Args:
+        results: Search hits (id, score, payload, ...)
+        retrieve: Callable fetching points by ID and returning (id, payload)
+            tuples, e.g. QdrantService.retrieve
+        window: Number of chunks to add on each side of a hit
+
+    Returns:
+        List of (id, score, payload) tuples for neighbours not among the hits
+    """
+    if window <= 0:
+        return []
+
+    hit_ids = {str(result[0]) for result in results}
+    # Neighbour ID -> (collection of the hit, best score of a surrounded hit)
+    wanted: Dict[str, Tuple[Optional[str], float]] = {}
+    for result in results:
+        payload = result[2] or {}
+        if "source" not in payload or "chunk_index" not in payload:
+            continue
+        first = payload["chunk_index"] - window
+        last = payload.get("chunk_end_index", payload["chunk_index"]) + window
+        if "total_chunks" in payload:
+            last = min(last, payload["total_chunks"] - 1)
+        for index in range(max(0, first), last + 1):
+            chunk_id = make_chunk_id(payload["source"], index)
+            if chunk_id in hit_ids:
+                continue
+            score = max(result[1], wanted.get(chunk_id, (None, result[1]))[1])
+            wanted[chunk_id] = (payload.get("collection"), score)
+
+    if not wanted:
+        return []
+
+    neighbors = []
+    for point_id, payload in retrieve(list(wanted)):
+        collection, score = wanted.get(str(point_id), (None, None))
+        if score is None:
+            continue
+        if (
+            collection is not None
+            and payload.get("collection", collection) != collection
+        ):
+            continue
+        neighbors.append((point_id, score, payload))
+    logger.debug(f"Fetched {len(neighbors)} neighbouring chunks of {len(results)} hits")
+    return neighbors
+
+
+def _merge_run(
+    run: List[Tuple[Any, float, Dict[str, Any]]],
+) -> Tuple[Any, float, Dict[str, Any]]:
+    """
+    Combine a run of consecutive chunks into a single hit.
+
+    Args:
+        run: Hits sorted by chunk_index
+
+    Returns:
+        Tuple (id, score, payload) for the merged passage
+    """
+    if len(run) == 1:
+        return run[0]
+
+    best = max(run, key=lambda hit: hit[1])
+    payload = dict(run[0][2])
+    payload["chunk_text"] = " ".join(hit[2]["chunk_text"] for hit in run)
+    payload["chunk_end_index"] = run[-1][2].get(
+        "chunk_end_index", run[-1][2]["chunk_index"]
+    )
+    return best[0], best[1], payload
+
+
+def diversify_results(
+    query_vector: Union[np.ndarray, Sequence[float]],
+    results: List[Tuple[Any, float, Dict[str, Any], Sequence[float]]],
+    top_k: int,
+    lambda_mult: float = DEFAULT_MMR_LAMBDA,
+    duplicate_threshold: float = DEFAULT_DUPLICATE_THRESHOLD,
+) -> List[Tuple[Any, float, Dict[str, Any]]]:
+    """
+    Rerank over-fetched hits with MMR and merge adjacent chunks.
+
+    Args:
+        query_vector: Query embedding
+        results: List of tuples (id, score, payload, vector)
+        top_k: Number of hits to keep before merging
+        lambda_mult: Trade-off between relevance (1.0) and diversity (0.0)
+        duplicate_threshold: Cosine similarity at which hits are duplicates
+
+    Returns:
+        List of tuples (id, score, payload)
+    """
+    if not results:
+        return []
+
+    selected = maximal_marginal_relevance(
+        query_vector,
+        [result[3] for result in results],
+        top_k,
+        lambda_mult=lambda_mult,
+        duplicate_threshold=duplicate_threshold,
+    )
+    reranked = [results[i][:3] for i in selected]
+    merged = merge_adjacent_chunks(reranked)
+    logger.debug(
+        f"MMR kept {len(reranked)} of {len(results)} candidates, "
+        f"merged into {len(merged)} passages"
+    )
+    return merged
+
+
+def adaptive_cutoff(
+    results: List[Tuple[Any, ...]],
+    max_k: int,
+    min_k: int = 1,
+    min_ratio: float = DEFAULT_CUTOFF_RATIO,
+    min_gap: float = DEFAULT_CUTOFF_MIN_GAP,
+) -> List[Tuple[Any, ...]]:
+    """
+    Keep only the hits that stand out, instead of a fixed number of them.
+
+    Hits scoring below min_ratio times the best score are dropped, then the
+    list is cut at the largest drop between consecutive scores if that drop
+    is at least min_gap.
+
+    Args:
+        results: Search results (id, score, ...) sorted best first
+        max_k: Maximum number of hits to keep
+        min_k: Minimum number of hits to keep (if available)
+        min_ratio: Fraction of the best score a hit must reach
+        min_gap: Smallest score drop considered a cut point
+
+    Returns:
+        Leading slice of results
+    """
+    if not results or max_k <= 0:
+        return []
+
+    scores = np.asarray([result[1] for result in results[:max_k]], dtype=np.float32)
+    min_k = max(1, min(min_k, len(scores)))
+
+    # Relative-to-best cut (scores may be negative for some metrics)
+    keep = max(min_k, int(np.count_nonzero(scores >= scores[0] * min_ratio)))
+    if scores[0] <= 0:
+        keep = len(scores)
+
+    # Largest-gap cut among the remaining hits, never below min_k
+    if keep > min_k:
+        gaps = scores[min_k - 1 : keep - 1] - scores[min_k:keep]
+        largest = int(np.argmax(gaps))
+        if gaps[largest] >= min_gap:
+            keep = min_k + largest
+
+    logger.debug(f"Adaptive cutoff kept {keep} of {len(results)} hits")
+    return results[:keep]
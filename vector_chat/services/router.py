@@ -0,0 +1,333 @@
+"""
+Routing of tenants to collections and fan-out search across them.
+"""
+
+import heapq
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from vector_chat.config import ROUTER_MAX_WORKERS
+from vector_chat.services.qdrant_service import QdrantService
+
+logger = logging.getLogger(__name__)
+
+# A route target: (collection name, shard key or None)
+Route = Tuple[str, Optional[str]]
+
+
+def _parse_route(target: Union[str, Dict[str, Any]]) -> Route:
+    """
+    Parse a route target from its configuration form.
+
+    Args:
+        target: Collection name, or dictionary with "collection" and
+            optional "shard_key"
+
+    Returns:
+        Route tuple
+
+    Raises:
+        ValueError: If the target has no collection
+    """
+    if isinstance(target, str):
+        return target, None
+    if not target.get("collection"):
+        raise ValueError(f"Route target without collection: {target}")
+    return target["collection"], target.get("shard_key")
+
+
+class CollectionRouter:
+    """
+    Maps tenants (customers, sources, ...) to collections or shard keys and
+    searches several of them at once.
+
+    Searches run concurrently on a thread pool kept for the router's
+    lifetime, one request per route, and the results are merged into a
+    single top-k by score. The router exposes the same search() signature
+    as QdrantService, so it can be used in its place; call close() when
+    done with it.
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, Union[str, Dict[str, Any]]],
+        service_factory: Optional[Callable[[str, Optional[str]], Any]] = None,
+        max_workers: int = ROUTER_MAX_WORKERS,
+        prefer_grpc: bool = False,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            routes: Dictionary mapping tenant to a collection name or to
+                {"collection": ..., "shard_key": ...}
+            service_factory: Callable returning a service for (collection,
+                shard_key); defaults to creating a QdrantService
+            max_workers: Maximum number of concurrent searches
+            prefer_grpc: Use gRPC transport for the default services
+
+        Raises:
+            ValueError: If no routes are given
+        """
+        if not routes:
+            raise ValueError("At least one route is required")
+        self.routes: Dict[str, Route] = {
+            tenant: _parse_route(target) for tenant, target in routes.items()
+        }
+        self.service_factory = service_factory or (
+            lambda collection, shard_key: QdrantService(
+                collection_name=collection,
+                shard_key=shard_key,
+                prefer_grpc=prefer_grpc,
+            )
+        )
+        self.max_workers = max_workers
+        self._services: Dict[Route, Any] = {}
+        self._lock = threading.Lock()
+        # Threads are started on the first fan-out and reused afterwards
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(set(self.routes.values())))),
+            thread_name_prefix="router",
+        )
+
+    @classmethod
+    def for_collections(
+        cls, collection_names: Sequence[str], **kwargs: Any
+    ) -> "CollectionRouter":
+        """
+        Create a router with one route per collection, named after it.
+
+        Args:
+            collection_names: Names of the collections
+            **kwargs: Additional arguments for the router
+
+        Returns:
+            Router instance
+        """
+        return cls({name: name for name in collection_names}, **kwargs)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs: Any) -> "CollectionRouter":
+        """
+        Create a router from a JSON file mapping tenants to route targets.
+
+        Args:
+            path: Path to the JSON routes file
+            **kwargs: Additional arguments for the router
+
+        Returns:
+            Router instance
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            routes = json.load(f)
+        return cls(routes, **kwargs)
+
+    @property
+    def collection_name(self) -> str:
+        """
+        Names of the routed collections, for logging.
+        """
+        return ", ".join(sorted({collection for collection, _ in self.routes.values()}))
+
+    def get_service(self, tenant: str) -> Any:
+        """
+        Get the service for a tenant, creating it on first use.
+
+        Args:
+            tenant: Tenant name
+
+        Returns:
+            Service bound to the tenant's collection and shard key
+
+        Raises:
+            KeyError: If the tenant has no route
+        """
+        if tenant not in self.routes:
+            raise KeyError(f"No route for tenant '{tenant}'")
+        return self._service_for(self.routes[tenant])
+
+    def _service_for(self, route: Route) -> Any:
+        """
+        Get the service of a route, creating it on first use.
+
+        Args:
+            route: Route tuple
+
+        Returns:
+            Service bound to the route's collection and shard key
+        """
+        with self._lock:
+            service = self._services.get(route)
+            if service is None:
+                service = self.service_factory(*route)
+                self._services[route] = service
+        return service
+
+    def _selected_routes(self, tenants: Optional[Sequence[str]]) -> List[Route]:
+        """
+        Get the distinct routes of the selected tenants.
+
+        Args:
+            tenants: Tenant names, or None for all tenants
+
+        Returns:
+            List of routes, in tenant order
+
+        Raises:
+            KeyError: If a tenant has no route
+        """
+        selected = list(self.routes) if tenants is None else tenants
+        routes: List[Route] = []
+        for tenant in selected:
+            if tenant not in self.routes:
+                raise KeyError(f"No route for tenant '{tenant}'")
+            if self.routes[tenant] not in routes:
+                routes.append(self.routes[tenant])
+        return routes
+
+    def _search_route(
+        self,
+        route: Route,
+        vector: Union[np.ndarray, List[float]],
+        top_k: int,
+        score_threshold: float,
+        with_vectors: bool,
+        payload_fields: Optional[List[str]] = None,
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Search one route and tag the payloads with the collection.
+
+        Args:
+            route: Route to search
+            vector: Query vector
+            top_k: Number of results to return
+            score_threshold: Minimum similarity score
+            with_vectors: Also return the stored vectors
+            payload_fields: Payload fields to return, or None for all
+
+        Returns:
+            List of result tuples
+        """
+        results = self._service_for(route).search(
+            vector,
+            top_k=top_k,
+            score_threshold=score_threshold,
+            with_vectors=with_vectors,
+            payload_fields=payload_fields,
+        )
+        tagged = []
+        for result in results:
+            payload = dict(result[2] or {})
+            payload.setdefault("collection", route[0])
+            tagged.append((result[0], result[1], payload) + tuple(result[3:]))
+        return tagged
+
+    def retrieve(
+        self,
+        ids: List[Any],
+        payload_fields: Optional[List[str]] = None,
+        tenants: Optional[Sequence[str]] = None,
+    ) -> List[Tuple[Any, Dict[str, Any]]]:
+        """
+        Fetch points by ID from every routed collection.
+
+        A route that fails is logged and left out of the results.
+
+        Args:
+            ids: Point IDs (missing ones are ignored)
+            payload_fields: Payload fields to return, or None for all
+            tenants: Tenants to read from, or None for all
+
+        Returns:
+            List of (id, payload) tuples, payloads tagged with their collection
+        """
+        records: List[Tuple[Any, Dict[str, Any]]] = []
+        for route in self._selected_routes(tenants):
+            try:
+                found = self._service_for(route).retrieve(
+                    ids, payload_fields=payload_fields
+                )
+            except Exception as e:
+                logger.error(f"Error retrieving from '{route[0]}': {str(e)}")
+                continue
+            for point_id, payload in found:
+                payload = dict(payload or {})
+                payload.setdefault("collection", route[0])
+                records.append((point_id, payload))
+        return records
+
+    def search(
+        self,
+        vector: Union[np.ndarray, List[float]],
+        top_k: int = 5,
+        score_threshold: float = 0.3,
+        with_vectors: bool = False,
+        tenants: Optional[Sequence[str]] = None,
+        payload_fields: Optional[List[str]] = None,
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Search the routed collections concurrently and merge the results.
+
+        A route that fails is logged and left out of the results.
+
+        Args:
+            vector: Query vector
+            top_k: Number of results to return
+            score_threshold: Minimum similarity score
+            with_vectors: Also return the stored vectors
+            tenants: Tenants to search, or None for all
+            payload_fields: Payload fields to return, or None for all
+
+        Returns:
+            List of (id, score, payload) tuples, or (id, score, payload, vector)
+            when with_vectors is True, best first
+
+        Raises:
+            RuntimeError: If every route failed
+        """
+        routes = self._selected_routes(tenants)
+        if len(routes) == 1:
+            return self._search_route(
+                routes[0], vector, top_k, score_threshold, with_vectors, payload_fields
+            )
+
+        merged: List[Tuple[Any, ...]] = []
+        failures = 0
+        futures = {
+            route: self._executor.submit(
+                self._search_route,
+                route,
+                vector,
+                top_k,
+                score_threshold,
+                with_vectors,
+                payload_fields,
+            )
+            for route in routes
+        }
+        for (collection, shard_key), future in futures.items():
+            try:
+                merged.extend(future.result())
+            except Exception as e:
+                failures += 1
+                target = f"{collection}/{shard_key}" if shard_key else collection
+                logger.error(f"Error searching '{target}': {str(e)}")
+
+        if failures == len(routes):
+            raise RuntimeError("Search failed on every routed collection")
+
+        logger.debug(
+            f"Merged {len(merged)} results from {len(routes) - failures} collections"
+        )
+        return heapq.nlargest(top_k, merged, key=lambda result: result[1])
+
+    def close(self) -> None:
+        """
+        Stop the search threads, waiting for running searches.
+        """
+        self._executor.shutdown(wait=True)
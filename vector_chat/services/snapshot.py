@@ -0,0 +1,206 @@
+"""
+Portable collection snapshots: export and import without re-embedding.
+
+A snapshot is a directory holding a manifest, vector blocks stored as
+.npy files (float16 or float32) and a gzipped JSONL table of point IDs
+and payloads whose rows line up with the vector rows.
+"""
+
+import gzip
+import itertools
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional, cast
+
+import numpy as np
+
+from vector_chat.config import SNAPSHOT_BLOCK_SIZE, SNAPSHOT_PAGE_SIZE
+from vector_chat.services.qdrant_service import QdrantService
+from vector_chat.services.text_store import ChunkTextStore
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE: str = "manifest.json"
+PAYLOADS_FILE: str = "payloads.jsonl.gz"
+SNAPSHOT_FORMAT_VERSION: int = 1
+SUPPORTED_DTYPES = ("float16", "float32")
+
+
+def _write_block(
+    output_dir: str, block_index: int, vectors: List[List[float]], dtype: str
+) -> Dict[str, Any]:
+    """
+    Write one block of vectors as a .npy file.
+
+    Args:
+        output_dir: Snapshot directory
+        block_index: Position of the block
+        vectors: Vectors of the block
+        dtype: Storage dtype
+
+    Returns:
+        Manifest entry for the block
+    """
+    name = f"vectors_{block_index:05d}.npy"
+    np.save(os.path.join(output_dir, name), np.asarray(vectors, dtype=dtype))
+    return {"file": name, "count": len(vectors)}
+
+
+def export_collection(
+    qdrant: QdrantService,
+    output_dir: str,
+    dtype: str = "float16",
+    page_size: int = SNAPSHOT_PAGE_SIZE,
+    block_size: int = SNAPSHOT_BLOCK_SIZE,
+    text_store: Optional[ChunkTextStore] = None,
+) -> int:
+    """
+    Export every point of a collection to a snapshot directory.
+
+    Args:
+        qdrant: Service bound to the collection to export
+        output_dir: Directory to write the snapshot to
+        dtype: Vector storage dtype, "float16" (half size) or "float32" (lossless)
+        page_size: Number of points read per scroll request
+        block_size: Number of vectors per .npy block
+        text_store: Store holding the chunk texts of a collection embedded
+            with one; the texts are written into the exported payloads, so
+            the snapshot does not depend on the store
+
+    Returns:
+        Number of exported points
+
+    Raises:
+        ValueError: If dtype is not supported
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported dtype '{dtype}', use one of {SUPPORTED_DTYPES}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    blocks: List[Dict[str, Any]] = []
+    buffer: List[List[float]] = []
+    count = 0
+    missing_text = 0
+
+    with gzip.open(
+        os.path.join(output_dir, PAYLOADS_FILE), "wt", encoding="utf-8"
+    ) as f:
+        for records in qdrant.scroll(page_size=page_size, with_vectors=True):
+            slim_ids = [
+                record.id
+                for record in records
+                if "chunk_text" not in (record.payload or {})
+            ]
+            texts: Dict[str, str] = {}
+            if slim_ids and text_store is not None:
+                texts = text_store.get_many(qdrant.collection_name, slim_ids)
+            for record in records:
+                payload = record.payload or {}
+                if "chunk_text" not in payload:
+                    text = texts.get(str(record.id))
+                    if text is None:
+                        missing_text += 1
+                    else:
+                        payload = dict(payload, chunk_text=text)
+                f.write(json.dumps({"id": record.id, "payload": payload}) + "\n")
+                if not isinstance(record.vector, list):
+                    raise ValueError(f"Point {record.id} has no unnamed vector")
+                buffer.append(cast(List[float], record.vector))
+                if len(buffer) >= block_size:
+                    blocks.append(_write_block(output_dir, len(blocks), buffer, dtype))
+                    buffer = []
+            count += len(records)
+            logger.debug(f"Exported {count} points")
+    if buffer:
+        blocks.append(_write_block(output_dir, len(blocks), buffer, dtype))
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "collection": qdrant.collection_name,
+        "dimension": qdrant.get_vector_size(),
+        "dtype": dtype,
+        "count": count,
+        "blocks": blocks,
+        "payloads": PAYLOADS_FILE,
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    if missing_text:
+        logger.warning(
+            f"{missing_text} exported points have no chunk text"
+            + ("" if text_store else "; export with --text-store if they have one")
+        )
+    logger.info(
+        f"Exported {count} points from '{qdrant.collection_name}' to {output_dir}"
+    )
+    return count
+
+
+def read_manifest(input_dir: str) -> Dict[str, Any]:
+    """
+    Read the manifest of a snapshot directory.
+
+    Args:
+        input_dir: Snapshot directory
+
+    Returns:
+        Manifest dictionary
+
+    Raises:
+        ValueError: If the snapshot format is not supported
+    """
+    with open(os.path.join(input_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest: Dict[str, Any] = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format: {manifest.get('format')}")
+    return manifest
+
+
+def import_collection(
+    input_dir: str,
+    qdrant_factory: Callable[[int], QdrantService],
+    parallel: int = 4,
+    batch_size: int = 256,
+) -> int:
+    """
+    Bulk-load a snapshot directory into a collection.
+
+    Vector blocks are memory-mapped and handed to the upload as float32
+    matrices, so the per-point work in Python is limited to payload parsing.
+
+    Args:
+        input_dir: Snapshot directory
+        qdrant_factory: Callable returning a service for the target collection,
+            given the vector dimension (so it can create the collection)
+        parallel: Number of parallel upload workers
+        batch_size: Number of points per upload request
+
+    Returns:
+        Number of imported points
+    """
+    manifest = read_manifest(input_dir)
+    qdrant = qdrant_factory(manifest["dimension"])
+    imported = 0
+
+    with gzip.open(
+        os.path.join(input_dir, manifest["payloads"]), "rt", encoding="utf-8"
+    ) as f:
+        for block in manifest["blocks"]:
+            vectors = np.load(os.path.join(input_dir, block["file"]), mmap_mode="r")
+            rows = [json.loads(line) for line in itertools.islice(f, block["count"])]
+            qdrant.upload(
+                ids=[row["id"] for row in rows],
+                vectors=np.asarray(vectors, dtype=np.float32),
+                payloads=[row["payload"] for row in rows],
+                batch_size=batch_size,
+                parallel=parallel,
+            )
+            imported += block["count"]
+            logger.debug(f"Imported {imported} of {manifest['count']} points")
+
+    logger.info(
+        f"Imported {imported} points into '{qdrant.collection_name}' from {input_dir}"
+    )
+    return imported
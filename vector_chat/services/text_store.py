@@ -0,0 +1,182 @@
+"""
+Local SQLite store of chunk texts, keyed by collection and point ID.
+
+Storing chunk text here instead of in the Qdrant payload keeps points down
+to their vector and filterable metadata, so Qdrant memory, disk and search
+responses no longer grow with text size. Texts are fetched in bulk by ID
+after the search.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from vector_chat.config import TEXT_STORE_PATH
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    collection TEXT NOT NULL,
+    chunk_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (collection, chunk_id)
+) WITHOUT ROWID;
+"""
+
+# Keep IN (...) lists below SQLite's variable limit
+_MAX_VARIABLES = 500
+
+
+class ChunkTextStore:
+    """
+    Chunk texts of one or more collections in a SQLite database.
+    """
+
+    def __init__(self, path: str = TEXT_STORE_PATH):
+        """
+        Open (and create if needed) the store.
+
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self._conn.close()
+
+    def put_many(self, collection: str, items: Iterable[Tuple[Any, str]]) -> None:
+        """
+        Store chunk texts, replacing existing ones with the same ID.
+
+        Args:
+            collection: Collection the chunks belong to
+            items: (point ID, text) pairs
+        """
+        rows = [(collection, str(chunk_id), text) for chunk_id, text in items]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (collection, chunk_id, text) "
+                "VALUES (?, ?, ?)",
+                rows,
+            )
+        logger.debug(f"Stored {len(rows)} chunk texts for '{collection}'")
+
+    def get_many(self, collection: str, chunk_ids: Sequence[Any]) -> Dict[str, str]:
+        """
+        Fetch chunk texts by ID.
+
+        Args:
+            collection: Collection the chunks belong to
+            chunk_ids: Point IDs
+
+        Returns:
+            Dictionary mapping point ID (as a string) to text; missing IDs are
+            left out
+        """
+        keys = list(dict.fromkeys(str(chunk_id) for chunk_id in chunk_ids))
+        texts: Dict[str, str] = {}
+        with self._lock:
+            for start in range(0, len(keys), _MAX_VARIABLES):
+                batch = keys[start : start + _MAX_VARIABLES]
+                rows = self._conn.execute(
+                    "SELECT chunk_id, text FROM chunks WHERE collection = ? "
+                    f"AND chunk_id IN ({', '.join('?' * len(batch))})",
+                    [collection] + batch,
+                ).fetchall()
+                texts.update(rows)
+        return texts
+
+    def delete_many(self, collection: str, chunk_ids: Sequence[Any]) -> int:
+        """
+        Remove chunk texts by ID.
+
+        Args:
+            collection: Collection the chunks belong to
+            chunk_ids: Point IDs
+
+        Returns:
+            Number of texts removed
+        """
+        keys = [str(chunk_id) for chunk_id in chunk_ids]
+        removed = 0
+        with self._lock, self._conn:
+            for start in range(0, len(keys), _MAX_VARIABLES):
+                batch = keys[start : start + _MAX_VARIABLES]
+                cursor = self._conn.execute(
+                    "DELETE FROM chunks WHERE collection = ? "
+                    f"AND chunk_id IN ({', '.join('?' * len(batch))})",
+                    [collection] + batch,
+                )
+                removed += cursor.rowcount
+        return removed
+
+    def delete_collection(self, collection: str) -> int:
+        """
+        Remove every chunk text of a collection.
+
+        Args:
+            collection: Collection name
+
+        Returns:
+            Number of texts removed
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM chunks WHERE collection = ?", (collection,)
+            )
+        return cursor.rowcount
+
+
+def hydrate_results(
+    results: List[Tuple[Any, ...]], store: ChunkTextStore, collection: str
+) -> List[Tuple[Any, ...]]:
+    """
+    Fill in the chunk text of search hits whose payload has none.
+
+    Args:
+        results: Search result tuples (id, score, payload, ...)
+        store: Store holding the chunk texts
+        collection: Collection of hits whose payload names none
+
+    Returns:
+        Result tuples with chunk_text in every payload found in the store;
+        hits without a stored text are dropped
+    """
+    missing: Dict[str, List[Any]] = {}
+    for result in results:
+        payload = result[2] or {}
+        if "chunk_text" not in payload:
+            missing.setdefault(payload.get("collection", collection), []).append(
+                result[0]
+            )
+    if not missing:
+        return results
+
+    texts = {
+        name: store.get_many(name, chunk_ids) for name, chunk_ids in missing.items()
+    }
+    hydrated = []
+    for result in results:
+        payload = result[2] or {}
+        if "chunk_text" not in payload:
+            text = texts[payload.get("collection", collection)].get(str(result[0]))
+            if text is None:
+                logger.warning(f"No stored text for chunk {result[0]}, skipping it")
+                continue
+            payload = dict(payload, chunk_text=text)
+        hydrated.append((result[0], result[1], payload) + tuple(result[3:]))
+    return hydrated
@@ -0,0 +1,212 @@
+"""
+Token usage and cost accounting for OpenAI calls.
+"""
+
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional, Set
+
+from vector_chat.config import MODEL_PRICES, PRICES_FILE
+
+logger = logging.getLogger(__name__)
+
+# Counters kept for every model
+_COUNTERS = ("calls", "prompt_tokens", "cached_tokens", "completion_tokens")
+
+
+def usage_counts(usage: Any) -> Dict[str, int]:
+    """
+    Extract token counts from the usage object of an API response.
+
+    Args:
+        usage: Usage object of a chat or embeddings response (may be None)
+
+    Returns:
+        Dictionary with prompt_tokens, completion_tokens and cached_tokens
+    """
+
+    def count(obj: Any, name: str) -> int:
+        value = getattr(obj, name, 0)
+        return value if isinstance(value, int) else 0
+
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": count(usage, "prompt_tokens"),
+        "completion_tokens": count(usage, "completion_tokens"),
+        "cached_tokens": count(details, "cached_tokens"),
+    }
+
+
+def load_price_table(path: Optional[str] = PRICES_FILE) -> Dict[str, Dict[str, float]]:
+    """
+    Get the price table, with overrides from a JSON file if given.
+
+    Args:
+        path: JSON file mapping model name to {"input", "cached_input", "output"}
+            prices in USD per 1M tokens, or None for the built-in table
+
+    Returns:
+        Dictionary mapping model name to its prices
+    """
+    prices = {model: dict(entry) for model, entry in MODEL_PRICES.items()}
+    if path:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for model, entry in json.load(f).items():
+                    prices.setdefault(model, {}).update(entry)
+        except Exception as e:
+            logger.error(f"Error loading price table {path}: {str(e)}")
+    return prices
+
+
+class UsageTracker:
+    """
+    Aggregates token usage per model and prices it.
+
+    One tracker covers one scope (a chat session or an ingestion job); it is
+    shared by every client taking part in it and is safe to use from
+    several threads.
+    """
+
+    def __init__(
+        self,
+        scope: Optional[str] = None,
+        prices: Optional[Dict[str, Dict[str, float]]] = None,
+    ):
+        """
+        Initialize an empty tracker.
+
+        Args:
+            scope: Label of what is tracked (session or job ID)
+            prices: Price table, defaults to load_price_table()
+        """
+        self.scope = scope
+        self.prices = prices if prices is not None else load_price_table()
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._unpriced_logged: Set[str] = set()
+
+    def record(
+        self,
+        model: str,
+        kind: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cached_tokens: int = 0,
+    ) -> None:
+        """
+        Record the usage of one API call.
+
+        Args:
+            model: Model name
+            kind: Type of call ("chat" or "embedding")
+            prompt_tokens: Input tokens, including cached ones
+            completion_tokens: Output tokens
+            cached_tokens: Input tokens served from the prompt cache
+        """
+        with self._lock:
+            entry = self._models.get(model)
+            if entry is None:
+                entry = {"kind": kind}
+                entry.update({counter: 0 for counter in _COUNTERS})
+                self._models[model] = entry
+            entry["calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["cached_tokens"] += cached_tokens
+            entry["completion_tokens"] += completion_tokens
+
+    def record_response(self, model: str, kind: str, usage: Any) -> None:
+        """
+        Record the usage object of an API response.
+
+        Args:
+            model: Model name
+            kind: Type of call ("chat" or "embedding")
+            usage: Usage object of the response (may be None)
+        """
+        if usage is None:
+            return
+        self.record(model, kind, **usage_counts(usage))
+
+    def cost(self, model: str, entry: Dict[str, Any]) -> Optional[float]:
+        """
+        Price the usage of a model.
+
+        Args:
+            model: Model name
+            entry: Aggregated counters of the model
+
+        Returns:
+            Cost in USD, or None if the model has no price
+        """
+        price = self.prices.get(model)
+        if price is None:
+            if model not in self._unpriced_logged:
+                logger.warning(f"No price configured for model '{model}'")
+                self._unpriced_logged.add(model)
+            return None
+        input_price = price.get("input", 0.0)
+        uncached = entry["prompt_tokens"] - entry["cached_tokens"]
+        total = (
+            uncached * input_price
+            + entry["cached_tokens"] * price.get("cached_input", input_price)
+            + entry["completion_tokens"] * price.get("output", 0.0)
+        )
+        return float(total) / 1_000_000
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get the aggregated usage and cost.
+
+        Returns:
+            Dictionary with scope, per-model usage and totals
+        """
+        with self._lock:
+            models = {model: dict(entry) for model, entry in self._models.items()}
+
+        totals: Dict[str, Any] = {counter: 0 for counter in _COUNTERS}
+        totals["cost_usd"] = 0.0
+        for model, entry in models.items():
+            cost = self.cost(model, entry)
+            entry["cost_usd"] = None if cost is None else round(cost, 6)
+            for counter in _COUNTERS:
+                totals[counter] += entry[counter]
+            totals["cost_usd"] += cost or 0.0
+        totals["cost_usd"] = round(totals["cost_usd"], 6)
+
+        return {"scope": self.scope, "models": models, "totals": totals}
+
+    def format_report(self) -> str:
+        """
+        Format the summary as human-readable lines.
+
+        Returns:
+            Multi-line report
+        """
+        summary = self.summary()
+        lines = [f"Token usage ({summary['scope'] or 'total'}):"]
+        for model, entry in sorted(summary["models"].items()):
+            cost = entry["cost_usd"]
+            lines.append(
+                f"  {model} [{entry['kind']}]: {entry['calls']} calls, "
+                f"{entry['prompt_tokens']} prompt ({entry['cached_tokens']} cached), "
+                f"{entry['completion_tokens']} completion tokens, "
+                f"{'unpriced' if cost is None else f'${cost:.4f}'}"
+            )
+        lines.append(f"  Total cost: ${summary['totals']['cost_usd']:.4f}")
+        return "\n".join(lines)
+
+    def render(self, fmt: str = "text") -> str:
+        """
+        Render the usage report.
+
+        Args:
+            fmt: "text" for a readable report, "json" for the summary as JSON
+
+        Returns:
+            Rendered report
+        """
+        if fmt == "json":
+            return json.dumps(self.summary(), indent=2)
+        return self.format_report()
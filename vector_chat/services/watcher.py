@@ -0,0 +1,333 @@
+"""
+Change detection for watch-mode ingestion.
+
+A DirectoryWatcher compares the files of a directory with the state saved
+by the last run and reports which were created, modified or deleted. File
+system events (inotify on Linux, through the optional ``watchdog`` package)
+wake it up as soon as something changes; without them it polls.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vector_chat.config import (
+    TEXT_FILE_EXTENSIONS,
+    WATCH_DEBOUNCE_SECONDS,
+    WATCH_POLL_INTERVAL,
+)
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - depends on installed extras
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+# Kinds of file changes
+CREATED = "created"
+MODIFIED = "modified"
+DELETED = "deleted"
+
+
+def scan_directory(
+    directory: str, extensions: Sequence[str] = TEXT_FILE_EXTENSIONS
+) -> Dict[str, Tuple[float, int]]:
+    """
+    List the text files under a directory, recursively.
+
+    Args:
+        directory: Directory to scan
+        extensions: File extensions to include
+
+    Returns:
+        Dictionary mapping relative path to (modification time, size)
+    """
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if os.path.splitext(name)[1].lower() not in extensions:
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Removed while scanning
+            files[os.path.relpath(path, directory)] = (stat.st_mtime, stat.st_size)
+    return files
+
+
+def file_digest(path: str) -> str:
+    """
+    Hash the content of a file.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Hex SHA-1 digest
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class WatchState:
+    """
+    What was ingested from each file of a watched directory.
+
+    Entries hold the modification time, size and digest of the ingested
+    version and its number of chunks, so a restarted watcher only handles
+    what changed while it was down.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize an empty state.
+
+        Args:
+            path: JSON file the state is saved to, or None to keep it in memory
+        """
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "WatchState":
+        """
+        Load a saved state, or start an empty one.
+
+        Args:
+            path: JSON file of the state
+
+        Returns:
+            Watch state
+        """
+        state = cls(path)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                state.files = json.load(f)
+        return state
+
+    def save(self) -> None:
+        """
+        Save the state atomically (no-op for in-memory states).
+        """
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.files, f)
+        os.replace(tmp_path, self.path)
+
+
+class _WakeUpHandler(FileSystemEventHandler):
+    """
+    Sets an event whenever the file system reports a change.
+    """
+
+    def __init__(self, wakeup: threading.Event):
+        """
+        Initialize the handler.
+
+        Args:
+            wakeup: Event to set on changes
+        """
+        super().__init__()
+        self.wakeup = wakeup
+
+    def on_any_event(self, event: Any) -> None:
+        """
+        Wake up the watcher.
+
+        Args:
+            event: File system event
+        """
+        if not event.is_directory:
+            self.wakeup.set()
+
+
+class DirectoryWatcher:
+    """
+    Detects created, modified and deleted text files in a directory.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        state: WatchState,
+        extensions: Sequence[str] = TEXT_FILE_EXTENSIONS,
+        debounce: float = WATCH_DEBOUNCE_SECONDS,
+        poll_interval: float = WATCH_POLL_INTERVAL,
+        use_events: bool = True,
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            directory: Directory to watch (recursively)
+            state: What was ingested so far
+            extensions: File extensions to watch
+            debounce: Seconds without changes before a burst is handled, and
+                minimum age of a file before it is read
+            poll_interval: Seconds between scans when no event arrives
+            use_events: Use file system events if watchdog is installed
+        """
+        self.directory = directory
+        self.state = state
+        self.extensions = list(extensions)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._observer: Any = None
+        self._use_events = use_events and Observer is not None
+
+    @property
+    def mode(self) -> str:
+        """
+        How changes are detected ("events" or "polling").
+        """
+        return "events" if self._use_events else "polling"
+
+    def start(self) -> None:
+        """
+        Start receiving file system events, if available.
+        """
+        if not self._use_events:
+            logger.info(f"Polling {self.directory} every {self.poll_interval}s")
+            return
+        self._observer = Observer()
+        self._observer.schedule(
+            _WakeUpHandler(self._wakeup), self.directory, recursive=True
+        )
+        self._observer.start()
+        logger.info(f"Watching {self.directory} for file system events")
+
+    def stop(self) -> None:
+        """
+        Stop receiving file system events.
+        """
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def wait(self) -> None:
+        """
+        Block until something may have changed.
+
+        Returns after an event burst has been quiet for the debounce time,
+        or after the poll interval.
+        """
+        if self._wakeup.wait(self.poll_interval):
+            # Let the burst settle: editors write, rename and touch in a row
+            while True:
+                self._wakeup.clear()
+                if not self._wakeup.wait(self.debounce):
+                    break
+
+    def changes(self) -> List[Tuple[str, str]]:
+        """
+        Compare the directory with the state.
+
+        Files modified less than the debounce time ago are left for the
+        next call, as they may still be being written. Files whose content
+        did not change only get their state refreshed.
+
+        Returns:
+            List of (kind, relative path), kind being CREATED, MODIFIED or DELETED
+        """
+        now = time.time()
+        current = scan_directory(self.directory, self.extensions)
+        changes = []
+        for rel_path, (mtime, size) in sorted(current.items()):
+            known = self.state.files.get(rel_path)
+            if known and known["mtime"] == mtime and known["size"] == size:
+                continue
+            if now - mtime < self.debounce:
+                continue
+            if known:
+                try:
+                    digest = file_digest(os.path.join(self.directory, rel_path))
+                except OSError:
+                    continue
+                if digest == known.get("digest"):
+                    known.update({"mtime": mtime, "size": size})
+                    continue
+                changes.append((MODIFIED, rel_path))
+            else:
+                changes.append((CREATED, rel_path))
+        for rel_path in sorted(set(self.state.files) - set(current)):
+            changes.append((DELETED, rel_path))
+        return changes
+
+
+class IngestMetrics:
+    """
+    Throughput and lag of watch-mode ingestion.
+
+    Lag is the time from a file's modification (or a deletion being
+    noticed) to its chunks being searchable.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize empty metrics.
+        """
+        self.started = time.time()
+        self.files = 0
+        self.deleted = 0
+        self.errors = 0
+        self.chunks = 0
+        self.busy_seconds = 0.0
+        # Lags of the most recent files only, for the percentiles
+        self.lags: Deque[float] = deque(maxlen=1000)
+
+    def record(self, chunks: int, seconds: float, lag: float) -> None:
+        """
+        Record an ingested file.
+
+        Args:
+            chunks: Number of chunks embedded
+            seconds: Time spent ingesting it
+            lag: Seconds from modification to searchable
+        """
+        self.files += 1
+        self.chunks += chunks
+        self.busy_seconds += seconds
+        self.lags.append(lag)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get the metrics.
+
+        Returns:
+            Dictionary of counters, chunks per second and lag percentiles
+        """
+        lags = list(self.lags)
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "files_ingested": self.files,
+            "files_deleted": self.deleted,
+            "errors": self.errors,
+            "chunks_embedded": self.chunks,
+            "chunks_per_second": (
+                round(self.chunks / self.busy_seconds, 1) if self.busy_seconds else 0.0
+            ),
+            "lag_seconds": {
+                "last": round(lags[-1], 3) if lags else None,
+                "p50": round(float(np.percentile(lags, 50)), 3) if lags else None,
+                "p95": round(float(np.percentile(lags, 95)), 3) if lags else None,
+            },
+        }